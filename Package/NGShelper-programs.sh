@@ -204,6 +204,14 @@ echo
 echo
 echo "**********************************************************************"
 echo
+/home/fmm/Documents/Trabajo/ProyectosVScode/NGShelper/measure-startup-time.py --help
+echo
+echo "**********************************************************************"
+echo
+/home/fmm/Documents/Trabajo/ProyectosVScode/NGShelper/ngshelper.py --help
+echo
+echo "**********************************************************************"
+echo
 /home/fmm/Documents/Trabajo/ProyectosVScode/NGShelper/phase2structure.py --help
 echo
 echo "**********************************************************************"
@@ -31,10 +31,16 @@ import math
 import os
 import sys
 
+import xgenotype
 import xlib
 
 #-------------------------------------------------------------------------------
 
+# import heavy modules when they are used for the first time
+np = xlib.LazyModule('numpy')
+
+#-------------------------------------------------------------------------------
+
 def main():
     '''
     Main line of the program.
@@ -59,7 +65,8 @@ def build_parser():
     '''
 
     # create the parser and add arguments
-    description = 'Description: This program builds the allele frequency from a VCF file in the format required by SimHyb application.'
+    description = 'Description: This program builds the allele frequency from a VCF file in the format required by SimHyb application.\n' \
+        f'Allele indexes of genotypes (subfield GT) greater than {xlib.Const.GT_MAX_ALLELE_CODE} are not supported.'
     text = f'{xlib.get_project_name()} v{xlib.get_project_version()} - {os.path.basename(__file__)}\n\n{description}\n'
     usage = f'\r{text.ljust(len("usage:"))}\nUsage: {os.path.basename(__file__)} arguments'
     parser = argparse.ArgumentParser(usage=usage)
@@ -201,17 +208,21 @@ def build_allele_frequency(vcf_file, sample_file, sp1_id, sp2_id, hybrid_id, out
     species_id_list = []
     mother_id_list = []
 
-    # initialize the maximum allele number per varaint
-    maximum_allele_number = 0
+    # initialize the lists of the allele frequency blocks per species: (variant index array, allele code array, frequency array)
+    frequency_block_list_1 = []
+    frequency_block_list_2 = []
 
-    # initialize allele frequency dictionaries
-    allele_frequency_dict_1 = {}
-    allele_frequency_dict_2 = {}
+    # initialize the lists of the current variant block: left and right allele codes, variant identifications and allele numbers
+    left_array_list = []
+    right_array_list = []
+    block_variant_id_list = []
+    block_allele_number_list = []
 
-    # initialize ATCG conversión dictionary
+    # initialize ATCG conversión list and the position of the first ATCG code of every variant
     # A -> 1; T -> 2; C -> 3; G -> 4
     atcg = 'ATCG'
-    atcg_conversion_dict = {}
+    atcg_code_list = []
+    atcg_position_list = [0]
 
     # open the input VCF file
     if vcf_file.endswith('.gz'):
@@ -264,11 +275,15 @@ def build_allele_frequency(vcf_file, sample_file, sp1_id, sp2_id, hybrid_id, out
 
             # check if the sample species list is empty
             if not species_id_list:
-                raise xlib.ProgramException(e, 'L003')
+                raise xlib.ProgramException('', 'L003')
 
             # set the sample number
             sample_number = len(species_id_list)
 
+            # create the genotype parser and the allele counter per species
+            genotype_parser = xgenotype.GenotypeParser(sample_number)
+            species_allele_counter = xgenotype.SpeciesAlleleCounter(species_id_list, mother_id_list, sp1_id, sp2_id)
+
             # print the counters
             xlib.Message.print('verbose', f'\rProcessed records ... {input_record_counter:8d} - Total variants ... {total_variant_counter:8d}')
 
@@ -292,104 +307,40 @@ def build_allele_frequency(vcf_file, sample_file, sp1_id, sp2_id, hybrid_id, out
 
             # get the reference bases (field REF) and alternative alleles (field ALT)
             reference_bases = data_dict['ref']
-            alternative_alleles = data_dict['alt']
 
             # build the alternative alleles list from field ALT
             alternative_allele_list = data_dict['alt'].split(',')
 
-            # build ATCG conversion list
-            atcg_conversion_list = []
-            index = atcg.find(reference_bases.upper())
-            if index == -1:
-                raise xlib.ProgramException('', 'L016', variant_id)
-            else:
-                atcg_conversion_list.append(index + 1)
-            for i in range(len(alternative_allele_list)):
-                index = atcg.find(alternative_allele_list[i].upper())
+            # add the ATCG codes of the variant
+            for allele in [reference_bases] + alternative_allele_list:
+                index = atcg.find(allele.upper())
                 if index == -1:
                     raise xlib.ProgramException('', 'L016', variant_id)
-                else:
-                    atcg_conversion_list.append(index + 1)
-            atcg_conversion_dict[total_variant_counter] = atcg_conversion_list
+                atcg_code_list.append(index + 1)
+            atcg_position_list.append(len(atcg_code_list))
 
-            # get the position of the genotype (subfield GT) in the field FORMAT
-            format_subfield_list = data_dict['format'].upper().split(':')
-            try:
-                gt_position = format_subfield_list.index('GT')
-            except Exception as e:
-                raise xlib.ProgramException(e, 'L007', 'GT', data_dict['chrom'], data_dict['pos'])
-
-            # build the list of sample genotypes of a variant
-            sample_data_list = []
-            sample_gt_list = []
-            for i in range(sample_number):
-                sample_data_list.append(data_dict['sample_list'][i].split(':'))
-                sample_gt_list.append(sample_data_list[i][gt_position])
-
-            # build the lists of the left and right side of sample genotypes of a variant
-            sample_gt_left_list = []
-            sample_gt_right_list = []
-            for i in range(sample_number):
-                sep = '/'
-                sep_pos = sample_gt_list[i].find(sep)
-                if sep_pos == -1:
-                    sep = '|'
-                    sep_pos = sample_gt_list[i].find(sep)
-                if sep_pos == -1:
-                    raise xlib.ProgramException('L008', 'GT', data_dict['chrom'], data_dict['pos'])
-                sample_gt_left_list.append(sample_gt_list[i][:sep_pos])
-                sample_gt_right_list.append(sample_gt_list[i][sep_pos+1:])
+            # get the left and right allele codes of the sample genotypes
+            (left_array, right_array) = genotype_parser.parse(data_dict)
 
             if variant_id in tvi_list: xlib.Message.print('trace', f'reference_bases: {reference_bases}')
             if variant_id in tvi_list: xlib.Message.print('trace', f'alternative_allele_list: {alternative_allele_list}')
-            if variant_id in tvi_list: xlib.Message.print('trace', f'sample_gt_list: {sample_gt_list}')
-
-            # get the allele counters per species
-            allele_counter_dict_1 = {}
-            allele_counter_dict_2 = {}
-            allele_counter_dict_h = {}
-            for i in range(sample_number):
-                # only when the sample is an adult
-                if mother_id_list[i] == 'NONE':
-                    if sample_gt_left_list[i] != xlib.get_md_symbol():
-                        if species_id_list[i] == sp1_id:
-                            allele_counter_dict_1[sample_gt_left_list[i]] = allele_counter_dict_1.get(sample_gt_left_list[i], 0) + 1
-                        elif species_id_list[i] == sp2_id:
-                            allele_counter_dict_2[sample_gt_left_list[i]] = allele_counter_dict_2.get(sample_gt_left_list[i], 0) + 1
-                        else:
-                            allele_counter_dict_h[sample_gt_left_list[i]] = allele_counter_dict_h.get(sample_gt_left_list[i], 0) + 1
-                    if sample_gt_right_list[i] != xlib.get_md_symbol():
-                        if species_id_list[i] == sp1_id:
-                            allele_counter_dict_1[sample_gt_right_list[i]] = allele_counter_dict_1.get(sample_gt_right_list[i], 0) + 1
-                        elif species_id_list[i] == sp2_id:
-                            allele_counter_dict_2[sample_gt_right_list[i]] = allele_counter_dict_2.get(sample_gt_right_list[i], 0) + 1
-                        else:
-                            allele_counter_dict_h[sample_gt_right_list[i]] = allele_counter_dict_h.get(sample_gt_right_list[i], 0) + 1
-            if variant_id in tvi_list: xlib.Message.print('trace', f'allele_counter_dict_1: {allele_counter_dict_1}')
-            if variant_id in tvi_list: xlib.Message.print('trace', f'allele_counter_dict_2: {allele_counter_dict_2}')
-            if variant_id in tvi_list: xlib.Message.print('trace', f'allele_counter_dict_h: {allele_counter_dict_h}')
-
-            # calculate the maximum allele number
-            if maximum_allele_number < len(allele_counter_dict_1.keys()):
-                maximum_allele_number = len(allele_counter_dict_1.keys())
-            if maximum_allele_number < len(allele_counter_dict_2.keys()):
-                maximum_allele_number = len(allele_counter_dict_2.keys())
-
-            # calculate the variant allele frecuencies per species
-            allele_frequency_dict_1[total_variant_counter] = {}
-            sp1_allele_total = 0
-            for allele in allele_counter_dict_1.keys():
-                sp1_allele_total += allele_counter_dict_1[allele]
-            for allele in allele_counter_dict_1.keys():
-                allele_frequency_dict_1[total_variant_counter][allele] = allele_counter_dict_1[allele] / sp1_allele_total
-                if variant_id in tvi_list: xlib.Message.print('trace', f'allele_frequency_dict_1[{total_variant_counter}][{allele}]: {allele_frequency_dict_1[total_variant_counter][allele]}')
-            allele_frequency_dict_2[total_variant_counter] = {}
-            sp2_allele_total = 0
-            for allele in allele_counter_dict_2.keys():
-                sp2_allele_total += allele_counter_dict_2[allele]
-            for allele in allele_counter_dict_2.keys():
-                allele_frequency_dict_2[total_variant_counter][allele] = allele_counter_dict_2[allele] / sp2_allele_total
-                if variant_id in tvi_list: xlib.Message.print('trace', f'allele_frequency_dict_2[{total_variant_counter}][{allele}]: {allele_frequency_dict_2[total_variant_counter][allele]}')
+            if variant_id in tvi_list: xlib.Message.print('trace', f'left allele codes: {left_array.tolist()} - right allele codes: {right_array.tolist()}')
+
+            # add the variant to the current block
+            left_array_list.append(left_array)
+            right_array_list.append(right_array)
+            block_variant_id_list.append(variant_id)
+            block_allele_number_list.append(len(alternative_allele_list) + 1)
+
+            # calculate the allele frecuencies per species of the variants of the block when it is full
+            if len(left_array_list) == xlib.Const.ALLELE_COUNTING_BLOCK_SIZE:
+                (frequency_block_1, frequency_block_2) = calculate_allele_frequency_block(species_allele_counter, left_array_list, right_array_list, total_variant_counter - len(left_array_list), block_variant_id_list, block_allele_number_list, allele_transformation, tvi_list)
+                frequency_block_list_1.append(frequency_block_1)
+                frequency_block_list_2.append(frequency_block_2)
+                left_array_list = []
+                right_array_list = []
+                block_variant_id_list = []
+                block_allele_number_list = []
 
             # print the counters
             xlib.Message.print('verbose', f'\rProcessed records ... {input_record_counter:8d} - Total variants ... {total_variant_counter:8d}')
@@ -402,6 +353,23 @@ def build_allele_frequency(vcf_file, sample_file, sp1_id, sp2_id, hybrid_id, out
     # close the VCF file
     vcf_file_id.close()
 
+    # calculate the allele frecuencies per species of the variants of the last block
+    if left_array_list:
+        (frequency_block_1, frequency_block_2) = calculate_allele_frequency_block(species_allele_counter, left_array_list, right_array_list, total_variant_counter - len(left_array_list), block_variant_id_list, block_allele_number_list, allele_transformation, tvi_list)
+        frequency_block_list_1.append(frequency_block_1)
+        frequency_block_list_2.append(frequency_block_2)
+
+    # get the allele data per species sorted as the allele symbols
+    allele_data_1 = get_allele_data(frequency_block_list_1, total_variant_counter)
+    allele_data_2 = get_allele_data(frequency_block_list_2, total_variant_counter)
+
+    # calculate the maximum allele number per variant
+    maximum_allele_number = int(max(allele_data_1['allele_number_array'].max(initial=0), allele_data_2['allele_number_array'].max(initial=0)))
+
+    # get the array of the ATCG codes and the position of the first code of every variant
+    atcg_code_array = np.array(atcg_code_list, dtype=np.int8)
+    atcg_position_array = np.array(atcg_position_list, dtype=np.int64)
+
     # calculate the output SimHyb file number
     simhyb_file_num = math.ceil(total_variant_counter / variant_number_per_file)
 
@@ -436,75 +404,18 @@ def build_allele_frequency(vcf_file, sample_file, sp1_id, sp2_id, hybrid_id, out
             except Exception as e:
                 raise xlib.ProgramException(e, 'F003', current_simhyb_file)
 
-        # write allele frequency records
+        # write allele frequency records: the i-th allele of the species 1 and the species 2 in every variant (0;0 when the variant has not the allele)
         for i in range(maximum_allele_number):
 
             xlib.Message.print('trace', f'i: {i}')
 
-            # initialize the variable to control the record begin
-            is_begin = True
-
-            # species 1
-            for j in range(begin_variant, end_variant + 1):
-
-                xlib.Message.print('trace', f'j: {j}')
-
-                # get the allele and its frequency
-                variant_data_dict = allele_frequency_dict_1.get(j, {})
-
-                xlib.Message.print('trace', f'variant_data_dict: {variant_data_dict}')
-
-                if variant_data_dict == {}:
-                    allele = 0
-                    allele_frequency = 0
-                else:
-                    allele_list = sorted(variant_data_dict.keys())
-                    if i < len(allele_list):
-                        allele = allele_list[i]
-                        allele_frequency = variant_data_dict[allele]
-                        if allele_transformation == 'ADD100' and xlib.check_int(allele):
-                            allele = int(allele) + 100
-                        elif allele_transformation == 'ATCG':
-                            allele = atcg_conversion_dict[j][int(allele)]
-                    else:
-                        allele = 0
-                        allele_frequency = 0
-
-                # write the part of this record corresponding with the sample
-                if is_begin:
-                    record_part = f'{allele};{allele_frequency}'
-                    is_begin = False
-                else:
-                    record_part = f';{allele};{allele_frequency}'
-                current_simhyb_file_id.write(record_part)
-
-            # species 2
-            for j in range(begin_variant, end_variant + 1):
-
-                # get the allele and its frequency
-                variant_data_dict = allele_frequency_dict_2.get(j, {})
-                if variant_data_dict == {}:
-                    allele = 0
-                    allele_frequency = 0
-                else:
-                    allele_list = sorted(variant_data_dict.keys())
-                    if i < len(allele_list):
-                        allele = allele_list[i]
-                        allele_frequency = variant_data_dict[allele]
-                        if allele_transformation == 'ADD100' and xlib.check_int(allele):
-                            allele = int(allele) + 100
-                        elif allele_transformation == 'ATCG':
-                            allele = atcg_conversion_dict[j][int(allele)]
-                    else:
-                        allele = 0
-                        allele_frequency = 0
-
-                # write the part of this record corresponding with the variant
-                record_part = f';{allele};{allele_frequency}'
-                current_simhyb_file_id.write(record_part)
-
-            # write the end of the record
-            current_simhyb_file_id.write('\n')
+            # build the record parts of both species
+            record_part_list = []
+            for allele_data in [allele_data_1, allele_data_2]:
+                record_part_list.extend(get_allele_record_part_list(allele_data, i, begin_variant - 1, end_variant, allele_transformation, atcg_code_array, atcg_position_array))
+
+            # write the record
+            current_simhyb_file_id.write(f'{";".join(record_part_list)}\n')
 
         # close SymHyb file
         current_simhyb_file_id.close()
@@ -518,6 +429,98 @@ def build_allele_frequency(vcf_file, sample_file, sp1_id, sp2_id, hybrid_id, out
 
 #-------------------------------------------------------------------------------
 
+def calculate_allele_frequency_block(species_allele_counter, left_array_list, right_array_list, first_variant_index, variant_id_list, allele_number_list, allele_transformation, tvi_list):
+    '''
+    Calculate the allele frequencies of the adults of both species in a block of variants and get, per species,
+    the arrays of the variant indexes, the allele codes and the frequencies of the alleles found.
+    '''
+
+    # count the left and right alleles (except missing data) per species of the block variants
+    count_block = species_allele_counter.count_alleles(np.array(left_array_list)) + species_allele_counter.count_alleles(np.array(right_array_list))
+    count_block[:, :, xlib.Const.GT_MD_CODE + xlib.Const.GT_CODE_OFFSET] = 0
+
+    for k, variant_id in enumerate(variant_id_list):
+        if variant_id in tvi_list:
+            for (group, name) in [(0, '1'), (1, '2'), (2, 'h')]:
+                allele_counter_dict = {str(column - xlib.Const.GT_CODE_OFFSET): int(count_block[k, group, column]) for column in np.flatnonzero(count_block[k, group])}
+                xlib.Message.print('trace', f'allele_counter_dict_{name}: {allele_counter_dict}')
+
+    # calculate the allele frequencies
+    frequency_block = species_allele_counter.get_allele_frequencies(count_block)
+
+    # get the variant indexes, allele codes and frequencies of the alleles found per species
+    frequency_block_list = []
+    for group in [0, 1]:
+        (variant_index_array, column_array) = np.nonzero(count_block[:, group, :])
+        allele_code_array = column_array - xlib.Const.GT_CODE_OFFSET
+        frequency_block_list.append((variant_index_array + first_variant_index, allele_code_array, frequency_block[variant_index_array, group, column_array]))
+
+        # check the alleles can be transformed to their ATCG codes
+        if allele_transformation == 'ATCG':
+            wrong_index_array = np.flatnonzero(allele_code_array >= np.array(allele_number_list)[variant_index_array])
+            if wrong_index_array.size > 0:
+                raise xlib.ProgramException('', 'L016', variant_id_list[variant_index_array[wrong_index_array[0]]])
+
+    # return the frequency data of both species
+    return frequency_block_list[0], frequency_block_list[1]
+
+#-------------------------------------------------------------------------------
+
+def get_allele_data(frequency_block_list, variant_number):
+    '''
+    Get the allele data of a species: the allele codes and frequencies sorted by variant and allele symbol,
+    and the number of alleles and the position of the first allele of every variant.
+    '''
+
+    # concatenate the frequency blocks
+    if frequency_block_list:
+        variant_index_array = np.concatenate([frequency_block[0] for frequency_block in frequency_block_list])
+        allele_code_array = np.concatenate([frequency_block[1] for frequency_block in frequency_block_list])
+        frequency_array = np.concatenate([frequency_block[2] for frequency_block in frequency_block_list])
+    else:
+        variant_index_array = np.empty(0, dtype=np.intp)
+        allele_code_array = np.empty(0, dtype=np.intp)
+        frequency_array = np.empty(0, dtype=float)
+
+    # sort the alleles of every variant as their symbols (text) are sorted
+    symbol_list = [str(code) for code in range(-xlib.Const.GT_CODE_OFFSET, xlib.Const.GT_MAX_ALLELE_CODE + 1)]
+    symbol_rank_array = np.argsort(np.argsort(symbol_list))
+    order_array = np.lexsort((symbol_rank_array[allele_code_array + xlib.Const.GT_CODE_OFFSET], variant_index_array))
+
+    # get the allele number and the position of the first allele of every variant
+    allele_number_array = np.bincount(variant_index_array, minlength=variant_number)
+    position_array = np.concatenate(([0], np.cumsum(allele_number_array)[:-1])).astype(np.intp)
+
+    # return the allele data
+    return {'allele_code_array': allele_code_array[order_array], 'frequency_array': frequency_array[order_array], 'allele_number_array': allele_number_array, 'position_array': position_array}
+
+#-------------------------------------------------------------------------------
+
+def get_allele_record_part_list(allele_data, allele_index, first_variant_index, last_variant_index, allele_transformation, atcg_code_array, atcg_position_array):
+    '''
+    Get the record parts (allele;frequency) of an allele index in a range of variants of a species.
+    '''
+
+    # get the variants with the allele index and the position of their alleles
+    found_mask = allele_data['allele_number_array'][first_variant_index:last_variant_index] > allele_index
+    position_array = allele_data['position_array'][first_variant_index:last_variant_index][found_mask] + allele_index
+
+    # get the allele symbols
+    allele_code_array = allele_data['allele_code_array'][position_array]
+    if allele_transformation == 'ADD100':
+        allele_code_array = allele_code_array + 100
+    elif allele_transformation == 'ATCG':
+        allele_code_array = atcg_code_array[atcg_position_array[first_variant_index:last_variant_index][found_mask] + allele_code_array]
+
+    # build the record parts (0;0 when the variant has not the allele)
+    record_part_array = np.full(len(found_mask), '0;0', dtype=object)
+    record_part_array[found_mask] = [f'{allele};{allele_frequency}' for (allele, allele_frequency) in zip(allele_code_array.tolist(), allele_data['frequency_array'][position_array].tolist())]
+
+    # return the record part list
+    return record_part_array.tolist()
+
+#-------------------------------------------------------------------------------
+
 if __name__ == '__main__':
 
     main()
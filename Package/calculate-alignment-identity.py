@@ -30,12 +30,15 @@ import os
 import re
 import sys
 
-import Bio.AlignIO
-
 import xlib
 
 #-------------------------------------------------------------------------------
 
+# import heavy modules when they are used for the first time
+AlignIO = xlib.LazyModule('Bio.AlignIO')
+
+#-------------------------------------------------------------------------------
+
 def main():
     '''
     Main line of the program.
@@ -198,7 +201,7 @@ def calculate_cluster_alignment_identity(alignment_file):
 
     # get the sequences aligned
     try:
-        alignment = Bio.AlignIO.read(alignment_file, 'fasta')
+        alignment = AlignIO.read(alignment_file, 'fasta')
     except Exception as e:
         raise xlib.ProgramException(e, 'F001', alignment_file)
     xlib.Message.print('info', f'File: {os.path.basename(alignment_file)}')
@@ -27,17 +27,21 @@ Licence: GNU General Public Licence Version 3.
 
 import argparse
 import gzip
+import itertools
 import os
 import sys
 
-import numpy as np
-import scipy.stats as stats
-
 import xlib
 import xsqlite
 
 #-------------------------------------------------------------------------------
 
+# import heavy modules when they are used for the first time
+np = xlib.LazyModule('numpy')
+stats = xlib.LazyModule('scipy.stats')
+
+#-------------------------------------------------------------------------------
+
 def main():
     '''
     Main line of the program.
@@ -328,33 +332,12 @@ def build_gymnotoa_annotation_goterm_dict(annotation_file):
     # initialize the counter of annotations sequences with GO terms
     annotation_seqs_wgoterms = 0
 
-    # open the annotation file
-    if annotation_file.endswith('.gz'):
-        try:
-            annotation_file_id = gzip.open(annotation_file, mode='rt', encoding='iso-8859-1')
-        except Exception:
-            raise xlib.ProgramException('F002', annotation_file) from None
-    else:
-        try:
-            annotation_file_id = open(annotation_file, mode='r', encoding='iso-8859-1')
-        except Exception:
-            raise xlib.ProgramException('F001', annotation_file) from None
-
     # initialize the annotation counter
     annotation_counter = 0
 
-    # read the first record of the annotation file (header)
-    (record, key, data_dict) = xlib.read_gymnotoa_annotation_record(annotation_file, annotation_file_id, annotation_counter)
-
-    # read the secord record of the annotation file (first data record)
-    (record, key, data_dict) = xlib.read_gymnotoa_annotation_record(annotation_file, annotation_file_id, annotation_counter)
-    xlib.Message.print('trace', f'key: {key} - record: {record}')
-
-    # while there are records
-    while record != '':
-
-        # set the old sequence identification
-        old_qseqid = data_dict['qseqid']
+    # for each sequence identification of the annotation file (the records of a sequence are consecutive)
+    record_iterator = xlib.iter_annotation_file_records(annotation_file, 'GYMNOTOA', ['qseqid', 'evalue', 'interpro_goterms', 'panther_goterms', 'eggnog_goterms'])
+    for (_, seq_record_iterator) in itertools.groupby(record_iterator, key=lambda record_data: record_data[0]):
 
         # initialize the minimum e-value and go identification list of the sequence hit/hsp with less e-value
         min_evalue = 9999
@@ -363,35 +346,31 @@ def build_gymnotoa_annotation_goterm_dict(annotation_file):
         # initialize the list of GO term identifications corresponding to the sequence
         goterm_id_list = []
 
-        # while there are records and the same sequence identification
-        while record != '' and data_dict['qseqid'] == old_qseqid:
+        # for each record of the sequence identification
+        for (_, evalue, interpro_goterms, panther_goterms, eggnog_goterms) in seq_record_iterator:
 
             # add 1 to the annotation counter
             annotation_counter += 1
 
             # extract the GO term identifications and add them into the GO term identification list
             # goterms format: "goterm_id1|goterm_id2|...|gotermo_idn"
-            if data_dict['interpro_goterms'] != '' and data_dict['interpro_goterms'] != '-':
-                interpro_goterm_id_list = data_dict['interpro_goterms'].split('|')
+            if interpro_goterms != '' and interpro_goterms != '-':
+                interpro_goterm_id_list = interpro_goterms.split('|')
                 goterm_id_list.extend(interpro_goterm_id_list)
-            if data_dict['panther_goterms'] != '' and  data_dict['panther_goterms'] != '-':
-                panther_goterm_id_list = data_dict['panther_goterms'].split('|')
+            if panther_goterms != '' and  panther_goterms != '-':
+                panther_goterm_id_list = panther_goterms.split('|')
                 goterm_id_list.extend(panther_goterm_id_list)
-            if data_dict['eggnog_goterms'] != '' and  data_dict['eggnog_goterms'] != '-':
-                eggnog_goterm_id_list = data_dict['eggnog_goterms'].split('|')
+            if eggnog_goterms != '' and  eggnog_goterms != '-':
+                eggnog_goterm_id_list = eggnog_goterms.split('|')
                 goterm_id_list.extend(eggnog_goterm_id_list)
 
             # save the GO identification list of the sequence hit/hsp with less e-value  (if GO data is not empty)
-            if goterm_id_list and float(data_dict['evalue']) < min_evalue:
+            if goterm_id_list and float(evalue) < min_evalue:
                 min_evalue_goterm_id_list = goterm_id_list
-                min_evalue = float(data_dict['evalue'])
+                min_evalue = float(evalue)
 
             xlib.Message.print('verbose', f'\rProcessed annotations: {annotation_counter}')
 
-            # read the next record of the annotation file
-            (record, key, data_dict) = xlib.read_gymnotoa_annotation_record(annotation_file, annotation_file_id, annotation_counter)
-            xlib.Message.print('trace', f'key: {key} - record: {record}')
-
         # get the list of GO term identifications without duplicates
         goterm_id_set = set(min_evalue_goterm_id_list)
         goterm_id_list = sorted(goterm_id_set)
@@ -411,9 +390,6 @@ def build_gymnotoa_annotation_goterm_dict(annotation_file):
     # print summary
     xlib.Message.print('info', f'{annotation_counter} records read in annotation file.')
 
-    # close annotation file
-    annotation_file_id.close()
-
     # return the annotation GO term dictionary
     return annotation_goterm_dict, annotation_seqs_wgoterms
 
@@ -430,48 +406,27 @@ def build_toa_annotation_goterm_dict(annotation_file):
     # initialize the counter of annotations sequences with GO terms
     annotation_seqs_wgoterms = 0
 
-    # open the annotation file
-    if annotation_file.endswith('.gz'):
-        try:
-            annotation_file_id = gzip.open(annotation_file, mode='rt', encoding='iso-8859-1')
-        except Exception:
-            raise xlib.ProgramException('F002', annotation_file) from None
-    else:
-        try:
-            annotation_file_id = open(annotation_file, mode='r', encoding='iso-8859-1')
-        except Exception:
-            raise xlib.ProgramException('F001', annotation_file) from None
-
     # initialize the annotation counter
     annotation_counter = 0
 
-    # read the first record of the annotation file (header)
-    (record, key, data_dict) = xlib.read_toa_annotation_record(annotation_file, annotation_file_id, 'MERGER', annotation_counter)
-
-    # read the secord record of the annotation file (first data record)
-    (record, key, data_dict) = xlib.read_toa_annotation_record(annotation_file, annotation_file_id, 'MERGER', annotation_counter)
-    xlib.Message.print('trace', f'key: {key} - record: {record}')
-
-    # while there are records
-    while record != '':
-
-        # initialize the old sequence identification
-        old_nt_seq_id = data_dict['nt_seq_id']
+    # for each sequence identification of the annotation file (the records of a sequence are consecutive)
+    record_iterator = xlib.iter_annotation_file_records(annotation_file, 'TOA-MERGER', ['nt_seq_id', 'hsp_evalue', 'go_id'])
+    for (_, seq_record_iterator) in itertools.groupby(record_iterator, key=lambda record_data: record_data[0]):
 
         # initialize the minimum e-value and go identification list of the sequence hit/hsp with less e-value
         min_evalue = 9999
         min_evalue_go_id_list = []
 
-        # while there are records and the same sequence identification
-        while record != '' and data_dict['nt_seq_id'] == old_nt_seq_id:
+        # for each record of the sequence identification
+        for (_, hsp_evalue, go_id) in seq_record_iterator:
 
             # add 1 to the annotation counter
             annotation_counter += 1
 
             # extract the GO term identifications and add them into the GO identification list
             # go_id format: "GO:id1*id2*...*idn"
-            if data_dict['go_id'] != '':
-                go_id_list = data_dict['go_id'][3:].split('*')
+            if go_id != '':
+                go_id_list = go_id[3:].split('*')
             else:
                 go_id_list = []
 
@@ -481,16 +436,12 @@ def build_toa_annotation_goterm_dict(annotation_file):
                     go_id_list[i] = f'GO:{go_id}'
 
             # save the GO identification list of the sequence hit/hsp with less e-value  (if GO data is not empty)
-            if float(data_dict['hsp_evalue']) < min_evalue and go_id_list:
+            if float(hsp_evalue) < min_evalue and go_id_list:
                 min_evalue_go_id_list = go_id_list
-                min_evalue = float(data_dict['hsp_evalue'])
+                min_evalue = float(hsp_evalue)
 
             xlib.Message.print('verbose', f'\rProcessed annotations: {annotation_counter}')
 
-            # read the next record of the annotation file
-            (record, key, data_dict) = xlib.read_toa_annotation_record(annotation_file, annotation_file_id, 'MERGER', annotation_counter)
-            xlib.Message.print('trace', f'key: {key} - record: {record}')
-
         # get the list of GO term identifications without duplicates
         goterm_id_set = set(min_evalue_go_id_list)
         goterm_id_list = sorted(goterm_id_set)
@@ -510,9 +461,6 @@ def build_toa_annotation_goterm_dict(annotation_file):
     # print summary
     xlib.Message.print('info', f'{annotation_counter} records read in annotation file.')
 
-    # close annotation file
-    annotation_file_id.close()
-
     # return the annotation GO term dictionary
     return annotation_goterm_dict, annotation_seqs_wgoterms
 
@@ -529,36 +477,11 @@ def build_entap_run_annotation_goterm_dict(app, annotation_file):
     # initialize the counter of annotations sequences with GO terms
     annotation_seqs_wgoterms = 0
 
-    # open the annotation file
-    if annotation_file.endswith('.gz'):
-        try:
-            annotation_file_id = gzip.open(annotation_file, mode='rt', encoding='iso-8859-1')
-        except Exception:
-            raise xlib.ProgramException('F002', annotation_file) from None
-    else:
-        try:
-            annotation_file_id = open(annotation_file, mode='r', encoding='iso-8859-1')
-        except Exception:
-            raise xlib.ProgramException('F001', annotation_file) from None
-
     # initialize the annotation counter
     annotation_counter = 0
 
-    # read the first record of the annotation file (header)
-    if app == 'ENTAP-RUNN':
-        (record, key, data_dict) = xlib.read_entap_runn_annotation_record(annotation_file, annotation_file_id, annotation_counter)
-    elif app == 'ENTAP-RUNP':
-        (record, key, data_dict) = xlib.read_entap_runp_annotation_record(annotation_file, annotation_file_id, annotation_counter)
-
-    # read the secord record of the annotation file (first data record)
-    if app == 'ENTAP-RUNN':
-        (record, key, data_dict) = xlib.read_entap_runn_annotation_record(annotation_file, annotation_file_id, annotation_counter)
-    elif app == 'ENTAP-RUNP':
-        (record, key, data_dict) = xlib.read_entap_runp_annotation_record(annotation_file, annotation_file_id, annotation_counter)
-    xlib.Message.print('trace', f'key: {key} - record: {record}')
-
-    # while there are records
-    while record != '':
+    # for each data record of the annotation file
+    for (query_sequence, eggnog_go_biological, eggnog_go_cellular, eggnog_go_molecular) in xlib.iter_annotation_file_records(annotation_file, app, ['query_sequence', 'eggnog_go_biological', 'eggnog_go_cellular', 'eggnog_go_molecular']):
 
         # initialize the list of GO term identifications corresponding to the sequence
         goterm_id_list = []
@@ -569,18 +492,18 @@ def build_entap_run_annotation_goterm_dict(app, annotation_file):
         # extract the GO term identifications and add them into the GO term identification list
         # goterms format: "goterm_id1,goterm_id2,...,gotermo_idn,"
 
-        if data_dict['eggnog_go_biological'] != '' and data_dict['eggnog_go_biological'] != '-' and data_dict['eggnog_go_biological'] != 'NA':
-            eggnog_go_biological_list = data_dict['eggnog_go_biological'].split(',')
+        if eggnog_go_biological != '' and eggnog_go_biological != '-' and eggnog_go_biological != 'NA':
+            eggnog_go_biological_list = eggnog_go_biological.split(',')
             if '' in eggnog_go_biological_list:
                 eggnog_go_biological_list.remove('')
             goterm_id_list.extend(eggnog_go_biological_list)
-        if data_dict['eggnog_go_cellular'] != '' and  data_dict['eggnog_go_cellular'] != '-' and data_dict['eggnog_go_cellular'] != 'NA':
-            eggnog_go_cellular_list = data_dict['eggnog_go_cellular'].split(',')
+        if eggnog_go_cellular != '' and  eggnog_go_cellular != '-' and eggnog_go_cellular != 'NA':
+            eggnog_go_cellular_list = eggnog_go_cellular.split(',')
             if '' in eggnog_go_cellular_list:
                 eggnog_go_cellular_list.remove('')
             goterm_id_list.extend(eggnog_go_cellular_list)
-        if data_dict['eggnog_go_molecular'] != '' and  data_dict['eggnog_go_molecular'] != '-' and data_dict['eggnog_go_molecular'] != 'NA':
-            eggnog_go_molecular_list = data_dict['eggnog_go_molecular'].split(',')
+        if eggnog_go_molecular != '' and  eggnog_go_molecular != '-' and eggnog_go_molecular != 'NA':
+            eggnog_go_molecular_list = eggnog_go_molecular.split(',')
             if '' in eggnog_go_molecular_list:
                 eggnog_go_molecular_list.remove('')
             goterm_id_list.extend(eggnog_go_molecular_list)
@@ -593,7 +516,7 @@ def build_entap_run_annotation_goterm_dict(app, annotation_file):
         if goterm_id_list != []:
             for goterm_id in goterm_id_list:
                 if not goterm_id.startswith('GO:'):
-                    print(f"seq_id: {data_dict['query_sequence']} - goterm_id: {goterm_id}")
+                    print(f"seq_id: {query_sequence} - goterm_id: {goterm_id}")
                 counter = annotation_goterm_dict.get(goterm_id, 0)
                 annotation_goterm_dict[goterm_id] = counter + 1
 
@@ -603,21 +526,11 @@ def build_entap_run_annotation_goterm_dict(app, annotation_file):
 
         xlib.Message.print('verbose', f'\rProcessed annotations: {annotation_counter}')
 
-        # read the next record of the annotation file
-        if app == 'ENTAP-RUNN':
-            (record, key, data_dict) = xlib.read_entap_runn_annotation_record(annotation_file, annotation_file_id, annotation_counter)
-        elif app == 'ENTAP-RUNP':
-            (record, key, data_dict) = xlib.read_entap_runp_annotation_record(annotation_file, annotation_file_id, annotation_counter)
-        xlib.Message.print('trace', f'key: {key} - record: {record}')
-
     xlib.Message.print('verbose', '\n')
 
     # print summary
     xlib.Message.print('info', f'{annotation_counter} records read in annotation file.')
 
-    # close annotation file
-    annotation_file_id.close()
-
     # return the annotation GO term dictionary
     return annotation_goterm_dict, annotation_seqs_wgoterms
 
@@ -634,53 +547,27 @@ def build_trapid_annotation_goterm_dict(annotation_file):
     # initialize the counter of annotations sequences with GO terms
     annotation_seqs_wgoterms = 0
 
-    # open the annotation file
-    if annotation_file.endswith('.gz'):
-        try:
-            annotation_file_id = gzip.open(annotation_file, mode='rt', encoding='iso-8859-1')
-        except Exception:
-            raise xlib.ProgramException('F002', annotation_file) from None
-    else:
-        try:
-            annotation_file_id = open(annotation_file, mode='r', encoding='iso-8859-1')
-        except Exception:
-            raise xlib.ProgramException('F001', annotation_file) from None
-
     # initialize the annotation counter
     annotation_counter = 0
 
-    # read the first record of the annotation file (header)
-    (record, key, data_dict) = xlib.read_trapid_annotation_record(annotation_file, annotation_file_id, annotation_counter)
-
-    # read the secord record of the annotation file (first data record)
-    (record, key, data_dict) = xlib.read_trapid_annotation_record(annotation_file, annotation_file_id, annotation_counter)
-    xlib.Message.print('trace', f'key: {key} - record: {record}')
-
-    # while there are records
-    while record != '':
-
-        # set the old sequence identification
-        old_transcript_id = data_dict['transcript_id']
+    # for each sequence identification of the annotation file (the records of a sequence are consecutive)
+    record_iterator = xlib.iter_annotation_file_records(annotation_file, 'TRAPID', ['transcript_id', 'go'])
+    for (_, seq_record_iterator) in itertools.groupby(record_iterator, key=lambda record_data: record_data[0]):
 
         # initialize the list of GO term identifications corresponding to the sequence
         goterm_id_list = []
 
-        # while there are records and the same sequence identification
-        while record != '' and data_dict['transcript_id'] == old_transcript_id:
+        # for each record of the sequence identification
+        for (_, go) in seq_record_iterator:
 
             # add 1 to the annotation counter
             annotation_counter += 1
 
             # extract the GO term identification and add it into the GO term identification list
-            go = data_dict['go']
             goterm_id_list.append(go)
 
             xlib.Message.print('verbose', f'\rProcessed annotations: {annotation_counter}')
 
-            # read the next record of the annotation file
-            (record, key, data_dict) = xlib.read_trapid_annotation_record(annotation_file, annotation_file_id, annotation_counter)
-            xlib.Message.print('trace', f'key: {key} - record: {record}')
-
         # get the list of GO term identifications without duplicates
         goterm_id_set = set(goterm_id_list)
         goterm_id_list = sorted(goterm_id_set)
@@ -700,9 +587,6 @@ def build_trapid_annotation_goterm_dict(annotation_file):
     # print summary
     xlib.Message.print('info', f'{annotation_counter} records read in annotation file.')
 
-    # close annotation file
-    annotation_file_id.close()
-
     # return the annotation GO term dictionary
     return annotation_goterm_dict, annotation_seqs_wgoterms
 
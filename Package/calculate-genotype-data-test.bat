@@ -50,6 +50,7 @@ rem Run the program calculate-genotype-data.py
     --threads=8 ^
     --db=%DATA_DIR%\ddRADseqTools2.db ^
     --vcf=%DATA_DIR%\variants-nonko.vcf ^
+    --metrics=NONE ^
     --verbose=Y ^
     --trace=N ^
     --tvi=NONE
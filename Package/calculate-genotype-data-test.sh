@@ -47,6 +47,7 @@ cd $NGSHELPER_DIR
         --threads=8 \
         --db=$DATA_DIR/ddRADseqTools2.db \
         --vcf=$DATA_DIR/variants-nonko.vcf \
+        --metrics=NONE \
         --verbose=Y \
         --trace=N \
         --tvi=NONE
@@ -31,18 +31,23 @@ Licence: GNU General Public Licence Version 3.
 #-------------------------------------------------------------------------------
 
 import argparse
-import gzip
 import os
 import sys
 import threading
 
 from threading import Semaphore
 
+import xgenotype
 import xlib
 import xsqlite
 
 #-------------------------------------------------------------------------------
 
+# import heavy modules when they are used for the first time
+np = xlib.LazyModule('numpy')
+
+#-------------------------------------------------------------------------------
+
 def main():
     '''
     Main line of the program.
@@ -59,8 +64,11 @@ def main():
     # connect to the SQLite database
     conn = xsqlite.connect_database(args.sqlite_database, check_same_thread=False)
 
-    # calculate genotype data
-    calculate_genotype_data(conn, args.threads_num, args.vcf_file, args.tvi_list)
+    # measure the run metrics (the report is written when the run ends)
+    with xlib.Metrics.run(args.metrics_file):
+
+        # calculate genotype data
+        calculate_genotype_data(conn, args.threads_num, args.vcf_file, args.tvi_list)
 
 #-------------------------------------------------------------------------------
 
@@ -71,7 +79,8 @@ def build_parser():
 
     # create the parser and add arguments
     description = 'Description: This program calculates genotype data: sample genotypes of SNPs, linkage disequilibrium\n' \
-        'between each pair of SNPs and sample kinship.'
+        'between each pair of SNPs and sample kinship.\n' \
+        f'Allele indexes of genotypes (subfield GT) greater than {xlib.Const.GT_MAX_ALLELE_CODE} are not supported.'
     text = f'{xlib.get_project_name()} v{xlib.get_project_version()} - {os.path.basename(__file__)}\n\n{description}\n'
     usage = f'\r{text.ljust(len("usage:"))}\nUsage: {os.path.basename(__file__)} arguments'
     parser = argparse.ArgumentParser(usage=usage)
@@ -79,6 +88,7 @@ def build_parser():
     parser.add_argument('--threads', dest='threads_num', help='Number of threads (mandatory).')
     parser.add_argument('--db', dest='sqlite_database', help='Path of the SQLite database (mandatory).')
     parser.add_argument('--vcf', dest='vcf_file', help='Path of the input VCF file (mandatory).')
+    parser.add_argument('--metrics', dest='metrics_file', help='Path of the output JSON file with the run metrics (elapsed time, throughput of stages and peak memory) or NONE; default: NONE.')
     parser.add_argument('--verbose', dest='verbose', help=f'Additional job status info during the run: {xlib.get_verbose_code_list_text()}; default: {xlib.Const.DEFAULT_VERBOSE}.')
     parser.add_argument('--trace', dest='trace', help=f'Additional info useful to the developer team: {xlib.get_trace_code_list_text()}; default: {xlib.Const.DEFAULT_TRACE}.')
     parser.add_argument('--tvi', dest='tvi_list', help='Variant identification list to trace with format seq_id_1-pos_1,seq_id_2-pos_2,...,seq_id_n-pos_n or NONE; default: NONE.')
@@ -119,6 +129,10 @@ def check_args(args):
         xlib.Message.print('error', f'*** The file {args.vcf_file} does not exist.')
         OK = False
 
+    # check "metrics_file"
+    if args.metrics_file is None or args.metrics_file.upper() == 'NONE':
+        args.metrics_file = None
+
     # check "verbose"
     if args.verbose is None:
         args.verbose = xlib.Const.DEFAULT_VERBOSE
@@ -179,8 +193,8 @@ def calculate_genotype_data(conn, threads_num, vcf_file, tvi_list):
     sample_number = 0
     label_dict = {}
 
-    # initialize the kinship dictionary
-    kinship_dict = xlib.NestedDefaultDict()
+    # initialize the kinship accumulator
+    kinship_accumulator = None
 
     # drop the table "vcf_snps" (if it exists)
     xlib.Message.print('verbose', 'Droping the table "vcf_snps" ...\n')
@@ -216,88 +230,43 @@ def calculate_genotype_data(conn, threads_num, vcf_file, tvi_list):
 
     xlib.Message.print('verbose', 'Reading the VCF file:\n')
 
-    # open the input VCF file
-    if vcf_file.endswith('.gz'):
-        try:
-            vcf_file_id = gzip.open(vcf_file, mode='rt', encoding='iso-8859-1')
-        except Exception as e:
-            raise xlib.ProgramException(e, 'F002', vcf_file)
-    else:
-        try:
-            vcf_file_id = open(vcf_file, mode='r', encoding='iso-8859-1')
-        except Exception as e:
-            raise xlib.ProgramException(e, 'F001', vcf_file)
-
-    # initialize counters
-    input_record_counter = 0
-    total_variant_counter = 0
-
-    # read the first record of input VCF file
-    (record, _, data_dict) = xlib.read_vcf_file(vcf_file_id, sample_number=0, check_sample_number=False)
-
-    # while there are records in the VCF file to check
-    while record != '':
+    # get the genotype data of the VCF file (in pipeline mode, they can be got from the genotype data cache)
+    genotype_data = xgenotype.read_genotype_data(vcf_file, None, None, tvi_list)
+    genotype_matrix = genotype_data['genotype_matrix']
 
-        # process metadata records
-        while record != '' and record.startswith('##'):
+    # build the sample list and sample dictionary
+    for i, sample_id in enumerate(genotype_data['sample_id_list']):
+        sample_list.append(os.path.basename(sample_id))
+        label_dict[f'{i:04d}'] = i
 
-            # add 1 to the read sequence counter
-            input_record_counter += 1
+    # set the samples number
+    sample_number = len(sample_list)
+    xlib.Message.print('trace', f'sample_number: {sample_number}')
 
-            # print the counters
-            xlib.Message.print('verbose', f'\rRecords ... {input_record_counter:8d} - Variants ... {total_variant_counter:8d}')
-
-            # read the next record of the input VCF file
-            (record, _, data_dict) = xlib.read_vcf_file(vcf_file_id, sample_number=0, check_sample_number=False)
-
-        # process the column description record
-        if record.startswith('#CHROM'):
-
-            # add 1 to the read sequence counter
-            input_record_counter += 1
-
-            # get the record data list
-            record_data_list = data_dict['record_data_list']
-
-            # build the sample list and sample dictionary
-            for i in range(9, len(record_data_list)):
-                sample_list.append(os.path.basename(record_data_list[i]))
-                label_dict[f'{i - 9:04d}'] = i - 9
-
-            # set the samples number
-            sample_number = len(sample_list)
-            xlib.Message.print('trace', f'sample_number: {sample_number}')
+    # create the kinship accumulator
+    kinship_accumulator = xgenotype.KinshipAccumulator(sample_number)
 
-            # set 0 in the values of the kinship dictionary
-            for i in range(sample_number):
-                for j in range(i + 1, sample_number):
-                    kinship_dict[i][j]['rbeta_summation'] = 0
-                    kinship_dict[i][j]['rw_numerator_summation'] = 0
-                    kinship_dict[i][j]['rw_denominator_summation'] = 0
-                    kinship_dict[i][j]['ru_summation'] = 0
-                    kinship_dict[i][j]['ru_l'] = 0
-
-            # print the counters
-            xlib.Message.print('verbose', f'\rRecords ... {input_record_counter:8d} - Variants ... {total_variant_counter:8d}')
+    # initialize counters
+    total_variant_counter = 0
 
-            # read the next record of the input VCF file
-            (record, _, data_dict) = xlib.read_vcf_file(vcf_file_id, sample_number=0, check_sample_number=False)
+    # process the variants by blocks
+    for (first_variant, left_block, right_block) in genotype_matrix.iter_variant_blocks():
 
-        # process variant record
-        while record != '' and not record.startswith('##') and not record.startswith('#CHROM'):
+        # build the block of sample genotypes using binary numbers: 0b00 -> 0 (0/0), 0b01 -> 1 (0/1 or 1/0), 0b11 -> 3 (1/1) and 0b111 -> 7 (missing data or other alleles)
+        pseudobinary_gt_block = np.full(left_block.shape, 7, dtype=np.int8)
+        pseudobinary_gt_block[(left_block == 0) & (right_block == 0)] = 0
+        pseudobinary_gt_block[((left_block == 0) & (right_block == 1)) | ((left_block == 1) & (right_block == 0))] = 1
+        pseudobinary_gt_block[(left_block == 1) & (right_block == 1)] = 3
 
-            # add 1 to the read sequence counter
-            input_record_counter += 1
+        # for each variant of the block
+        for k in range(pseudobinary_gt_block.shape[0]):
 
             # add 1 to the total variant counter
             total_variant_counter += 1
 
             # set the variant identification
-            variant_id = f'{data_dict["chrom"]}-{data_dict["pos"]}'
-
-            # get the reference allele and alternative alleles (field ALT)
-            reference_allele = data_dict['ref']
-            alternative_alleles = data_dict['alt']
+            (chrom, pos, reference_allele, alternative_alleles) = genotype_data['variant_data_list'][first_variant + k]
+            variant_id = f'{chrom}-{pos}'
 
             # build the alternative alleles list from field ALT
             alternative_allele_list = alternative_alleles.split(',')
@@ -306,121 +275,31 @@ def calculate_genotype_data(conn, threads_num, vcf_file, tvi_list):
             if len(alternative_allele_list) > 1:
                 raise xlib.ProgramException('', 'L021', variant_id) from None
 
-            # get the position of the genotype (subfield GT) in the field FORMAT
-            format_subfield_list = data_dict['format'].upper().split(':')
-            try:
-                gt_position = format_subfield_list.index('GT')
-            except Exception as e:
-                raise xlib.ProgramException(e, 'L007', 'GT', data_dict['chrom'], data_dict['pos'])
-
-            # build the list of sample genotypes of a variant
-            sample_data_list = []
-            sample_gt_list = []
-            for i in range(sample_number):
-                sample_data_list.append(data_dict['sample_list'][i].split(':'))
-                sample_gt_list.append(sample_data_list[i][gt_position])
-
-            # build the lists of sample genotypes using binary numbers and samples with missing data
-            pseudobinary_sample_gt_list = []
-            gt_00 = 0
-            gt_01 = 0
-            gt_11 = 0
-            sample_withmd_list = []
-            for i in range(sample_number):
-                # build the lists of the left and right side of sample genotypes of a variant
-                sep = '/'
-                sep_pos = sample_gt_list[i].find(sep)
-                if sep_pos == -1:
-                    sep = '|'
-                    sep_pos = sample_gt_list[i].find(sep)
-                if sep_pos == -1:
-                    raise xlib.ProgramException('', 'L008', 'GT', data_dict['chrom'], data_dict['pos'])
-                sample_gt_left = sample_gt_list[i][:sep_pos]
-                sample_gt_right = sample_gt_list[i][sep_pos+1:]
-
-                if sample_gt_left == '0' and sample_gt_right == '0':
-                    gt_00 += 1
-                    # 0b00 -> 0
-                    pseudobinary_sample_gt_list.append(0)
-                elif sample_gt_left == '0' and sample_gt_right == '1' or sample_gt_left == '1' and sample_gt_right == '0':
-                    gt_01 += 1
-                    # 0b01 -> 1
-                    pseudobinary_sample_gt_list.append(1)
-                elif sample_gt_left == '1' and sample_gt_right == '1':
-                    gt_11 += 1
-                    # 0b11 -> 3
-                    pseudobinary_sample_gt_list.append(3)
-                else:
-                    # 0b111 -> 7
-                    pseudobinary_sample_gt_list.append(7)
-                    sample_withmd_list.append(i)
-
-            # update the kinship dictionary adding data of the samples i and j in the summations
-            # used to the calculation of rbeta, rw (weighted estimator) y ru (unweighted average estimator)
-            #
-            #    rbeta:
-            #        (1 + (Xi - 1) * (Xj - 1)) / 2 ---> rbeta_summation
-            #
-            #    rw:
-            #        (Xi - 2 * p) * (Xj - 2 * p) ---> rw_numerator_summation
-            #        2 * p * (1 - p) ---> rw_denominator_summation
-            #
-            #    ru:
-            #        (Xi - 2 * p) * (Xj - 2 * p) / (2 * p * (1 - p)) ---> ru_summation
-            #
-            # where Xi are Xj are the dosage of reference allele for samples i and j respectivily
-            # and p is the frecuence of reference allele in the current variant
-            #
-            # (no update is done when there is missing data in samples i or j, or p value is 0 or 1 when rw and ru)
-            summation_summation_mij = 0
-            p = (gt_00 * 2 + gt_01) / (sample_number * 2)
-            for i in range(sample_number):
-                Xi = 0
-                # 0b00 -> 0
-                if pseudobinary_sample_gt_list[i] == 0:
-                    Xi = 2
-                # 0b01 -> 1
-                elif pseudobinary_sample_gt_list[i] == 1:
-                    Xi = 1
-                for j in range(i + 1, sample_number):
-                    Xj = 0
-                    # 0b00 -> 0
-                    if pseudobinary_sample_gt_list[j] == 0:
-                        Xj = 2
-                    # 0b01 -> 1
-                    elif pseudobinary_sample_gt_list[j] == 1:
-                        Xj = 1
-                    # 0b111 -> 7
-                    if pseudobinary_sample_gt_list[i] != 7 and pseudobinary_sample_gt_list[j] != 7:
-                        mij_item = (1 + (Xi - 1) * (Xj - 1)) / 2
-                        kinship_dict[i][j]['rbeta_summation'] += mij_item
-                        summation_summation_mij += mij_item
-                        if p not in [0, 1]:
-                            kinship_dict[i][j]['rw_numerator_summation'] += (Xi - 2 * p) * (Xj - 2 * p)
-                            kinship_dict[i][j]['rw_denominator_summation'] += 2 * p * (1 - p)
-                            kinship_dict[i][j]['ru_summation'] += (Xi - 2 * p) * (Xj - 2 * p) / (2 * p * (1 - p))
-                            kinship_dict[i][j]['ru_l'] += 1
+            # add the genotypes of the variant to the kinship accumulator (the summations used to the calculation
+            # of rbeta, rw and ru between the samples i and j are updated with blocks of variants)
+            pseudobinary_gt_array = pseudobinary_gt_block[k]
+            kinship_accumulator.add_variant(pseudobinary_gt_array)
 
             # save SNP data into table "vcf_snps" if there are more than one genotype
+            gt_00 = np.count_nonzero(pseudobinary_gt_array == 0)
+            gt_01 = np.count_nonzero(pseudobinary_gt_array == 1)
+            gt_11 = np.count_nonzero(pseudobinary_gt_array == 3)
             if gt_00 != sample_number and gt_01 != sample_number and gt_11 != sample_number:
                 snp_row_dict = {}
                 snp_row_dict['variant_id'] = variant_id
                 snp_row_dict['ref'] = reference_allele
                 snp_row_dict['alt'] = alternative_allele_list[0]
-                snp_row_dict['sample_gt_list'] = ','.join(str(x) for x in pseudobinary_sample_gt_list)
-                snp_row_dict['sample_withmd_list'] = ','.join(str(x) for x in sample_withmd_list)
+                snp_row_dict['sample_gt_list'] = ','.join(str(x) for x in pseudobinary_gt_array.tolist())
+                snp_row_dict['sample_withmd_list'] = ','.join(str(x) for x in np.flatnonzero(pseudobinary_gt_array == 7).tolist())
                 xsqlite.insert_vcf_snps_row(conn, snp_row_dict)
 
             # print the counters
-            xlib.Message.print('verbose', f'\rRecords ... {input_record_counter:8d} - Variants ... {total_variant_counter:8d}')
-
-            # read the next record of the VCF file to check
-            (record, _, data_dict) = xlib.read_vcf_file(vcf_file_id, sample_number=0, check_sample_number=False)
+            xlib.Message.print('verbose', f'\rVariants ... {total_variant_counter:8d}')
 
     xlib.Message.print('verbose', '\n')
 
-    # close input VCF file
-    vcf_file_id.close()
+    # release the genotype data (in pipeline mode, they are kept in the genotype data cache)
+    xgenotype.release_genotype_data(genotype_data)
 
     xlib.Message.print('verbose', 'SNPs are processed.\n')
 
@@ -436,26 +315,12 @@ def calculate_genotype_data(conn, threads_num, vcf_file, tvi_list):
 
     # save kinship calculations into the table "vcf_kinship"
     xlib.Message.print('verbose', 'Saving kinship calculations into the table "vcf_kinship" ...\n')
-    ms = summation_summation_mij * 2 / (sample_number * (sample_number - 1))
-    for i in range(sample_number):
-        for j in range(i + 1, sample_number):
-            rbeta = (kinship_dict[i][j]['rbeta_summation'] - ms) / (1 - ms)
-            try:
-                rw = kinship_dict[i][j]['rw_numerator_summation'] / kinship_dict[i][j]['rw_denominator_summation']
-                ru = kinship_dict[i][j]['ru_summation'] / kinship_dict[i][j]['ru_l']
-            except ZeroDivisionError as e:
-                xlib.Message.print('trace', '*** WARNING: ZeroDivisionError calculating kinship data')
-                xlib.Message.print('trace', f'between samples {sample_list[i]} & {sample_list[j]}')
-                xlib.Message.print('trace', 'due to all variants have missing data in at least one of the two samples.')
-                rw = -999
-                ru = -999
-            kinship_row_dict = {}
-            kinship_row_dict['individual_i'] = i
-            kinship_row_dict['individual_j'] = j
-            kinship_row_dict['rbeta'] = rbeta
-            kinship_row_dict['rw'] = rw
-            kinship_row_dict['ru'] = ru
-            xsqlite.insert_vcf_kinship_row(conn, kinship_row_dict)
+    ms = kinship_accumulator.get_ms()
+    xsqlite.insert_vcf_kinship_rows(conn, kinship_accumulator.iter_kinship_rows())
+    for (i, j) in kinship_accumulator.get_undefined_pair_list():
+        xlib.Message.print('trace', '*** WARNING: ZeroDivisionError calculating kinship data')
+        xlib.Message.print('trace', f'between samples {sample_list[i]} & {sample_list[j]}')
+        xlib.Message.print('trace', 'due to all variants have missing data in at least one of the two samples.')
     xlib.Message.print('verbose', 'Kinship calculations are saved.\n')
 
     # create the index "vcf_kinship_index" on the table "vcf_kinship"
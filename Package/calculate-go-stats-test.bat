@@ -51,6 +51,7 @@ rem Run the program calculate-go-stats.py
     --annotation=%DATA_DIR%\PCAN_omicsbox_table.txt ^
     --ontology=%DATA_DIR%\go.obo ^
     --outdir=%OUTPUT_DIR% ^
+    --propagation=N ^
     --verbose=Y ^
     --trace=N
 if %ERRORLEVEL% neq 0 (set RC=%ERRORLEVEL% & set ERROR=2 & goto END)
@@ -60,6 +61,7 @@ if %ERRORLEVEL% neq 0 (set RC=%ERRORLEVEL% & set ERROR=2 & goto END)
     --annotation=%DATA_DIR%\final_annotations_no_contam_lvl0.tsv ^
     --ontology=%DATA_DIR%\go.obo ^
     --outdir=%OUTPUT_DIR% ^
+    --propagation=N ^
     --verbose=Y ^
     --trace=N
 if %ERRORLEVEL% neq 0 (set RC=%ERRORLEVEL% & set ERROR=2 & goto END)
@@ -70,6 +72,7 @@ if %ERRORLEVEL% neq 0 (set RC=%ERRORLEVEL% & set ERROR=2 & goto END)
     --ontology=%DATA_DIR%\go.obo ^
     --outdir=%OUTPUT_DIR% ^
     --toasel=LEVWD ^
+    --propagation=N ^
     --verbose=Y ^
     --trace=N
 if %ERRORLEVEL% neq 0 (set RC=%ERRORLEVEL% & set ERROR=2 & goto END)
@@ -79,6 +82,7 @@ if %ERRORLEVEL% neq 0 (set RC=%ERRORLEVEL% & set ERROR=2 & goto END)
     --annotation=%DATA_DIR%\transcripts_go_exp1524.txt ^
     --ontology=%DATA_DIR%\go.obo ^
     --outdir=%OUTPUT_DIR% ^
+    --propagation=N ^
     --verbose=Y ^
     --trace=N
 if %ERRORLEVEL% neq 0 (set RC=%ERRORLEVEL% & set ERROR=2 & goto END)
@@ -88,6 +92,7 @@ if %ERRORLEVEL% neq 0 (set RC=%ERRORLEVEL% & set ERROR=2 & goto END)
     --annotation=%DATA_DIR%\trinotate_annotation_report.xls ^
     --ontology=%DATA_DIR%\go.obo ^
     --outdir=%OUTPUT_DIR% ^
+    --propagation=N ^
     --verbose=Y ^
     --trace=N
 if %ERRORLEVEL% neq 0 (set RC=%ERRORLEVEL% & set ERROR=2 & goto END)
@@ -48,6 +48,7 @@ cd $NGSHELPER_DIR
         --annotation=$DATA_DIR/PCAN_omicsbox_table.txt \
         --ontology=$DATA_DIR/go.obo \
         --outdir=$OUTPUT_DIR \
+        --propagation=N \
         --verbose=Y  \
         --trace=N
 if [ $? -ne 0 ]; then echo 'Script ended with errors.'; exit 1; fi
@@ -58,6 +59,7 @@ if [ $? -ne 0 ]; then echo 'Script ended with errors.'; exit 1; fi
         --annotation=$DATA_DIR/final_annotations_no_contam_lvl0.tsv \
         --ontology=$DATA_DIR/go.obo \
         --outdir=$OUTPUT_DIR \
+        --propagation=N \
         --verbose=Y  \
         --trace=N
 if [ $? -ne 0 ]; then echo 'Script ended with errors.'; exit 1; fi
@@ -69,6 +71,7 @@ if [ $? -ne 0 ]; then echo 'Script ended with errors.'; exit 1; fi
         --ontology=$DATA_DIR/go.obo \
         --outdir=$OUTPUT_DIR \
         --toasel=LEVWD \
+        --propagation=N \
         --verbose=Y  \
         --trace=N
 if [ $? -ne 0 ]; then echo 'Script ended with errors.'; exit 1; fi
@@ -79,6 +82,7 @@ if [ $? -ne 0 ]; then echo 'Script ended with errors.'; exit 1; fi
         --annotation=$DATA_DIR/transcripts_go_exp1524.txt \
         --ontology=$DATA_DIR/go.obo \
         --outdir=$OUTPUT_DIR \
+        --propagation=N \
         --verbose=Y  \
         --trace=N
 if [ $? -ne 0 ]; then echo 'Script ended with errors.'; exit 1; fi
@@ -89,6 +93,7 @@ if [ $? -ne 0 ]; then echo 'Script ended with errors.'; exit 1; fi
         --annotation=$DATA_DIR/trinotate_annotation_report.xls \
         --ontology=$DATA_DIR/go.obo \
         --outdir=$OUTPUT_DIR \
+        --propagation=N \
         --verbose=Y  \
         --trace=N
 if [ $? -ne 0 ]; then echo 'Script ended with errors.'; exit 1; fi
@@ -25,7 +25,9 @@ Licence: GNU General Public Licence Version 3.
 #-------------------------------------------------------------------------------
 
 import argparse
+import array
 import gzip
+import itertools
 import os
 import sys
 
@@ -33,6 +35,12 @@ import xlib
 
 #-------------------------------------------------------------------------------
 
+# import heavy modules when they are used for the first time
+np = xlib.LazyModule('numpy')
+sparse = xlib.LazyModule('scipy.sparse')
+
+#-------------------------------------------------------------------------------
+
 def main():
     '''
     Main line of the program.
@@ -50,16 +58,7 @@ def main():
     go_ontology_dict = xlib.build_go_ontology_dict(args.ontology_file)
 
     # calculate annotation statistics
-    if args.app == 'BLAST2GO':
-        calculate_blast2go_go_stats(args.annotation_file, go_ontology_dict, args.output_dir)
-    elif args.app == 'ENTAP':
-        calculate_entap_go_stats(args.annotation_file, go_ontology_dict, args.output_dir)
-    elif args.app == 'TOA':
-        calculate_toa_go_stats(args.annotation_file, go_ontology_dict, args.output_dir, args.toa_go_selection)
-    elif args.app == 'TRAPID':
-        calculate_trapid_go_stats(args.annotation_file, go_ontology_dict, args.output_dir)
-    elif args.app == 'TRINOTATE':
-        calculate_trinotate_go_stats(args.annotation_file, go_ontology_dict, args.output_dir)
+    calculate_go_stats(args.app, args.annotation_file, go_ontology_dict, args.output_dir, args.toa_go_selection, args.go_propagation)
 
 #-------------------------------------------------------------------------------
 
@@ -79,6 +78,7 @@ def build_parser():
     parser.add_argument('--ontology', dest='ontology_file', help='Path of the GO ontology file (mandatory).')
     parser.add_argument('--outdir', dest='output_dir', help='Path of output directoty where GO term statistics saved (mandatory).')
     parser.add_argument('--toasel', dest='toa_go_selection', help=f'GO terms seleccion (TOA app): {xlib.get_toa_go_seleccion_code_list_text()}; default: {xlib.Const.DEFAULT_TOA_GO_SELECCTION}.')
+    parser.add_argument('--propagation', dest='go_propagation', help=f'Propagation of the GO terms of every sequence to their ancestors (true path rule) writing additional statistics files where the count is the number of sequences: {xlib.get_go_propagation_code_list_text()}; default: {xlib.Const.DEFAULT_GO_PROPAGATION}.')
     parser.add_argument('--verbose', dest='verbose', help=f'Additional job status info during the run: {xlib.get_verbose_code_list_text()}; default: {xlib.Const.DEFAULT_VERBOSE}.')
     parser.add_argument('--trace', dest='trace', help=f'Additional info useful to the developer team: {xlib.get_trace_code_list_text()}; default: {xlib.Const.DEFAULT_TRACE}.')
 
@@ -138,6 +138,15 @@ def check_args(args):
     else:
         args.toa_go_selection = args.toa_go_selection.upper()
 
+    # check "go_propagation"
+    if args.go_propagation is None:
+        args.go_propagation = xlib.Const.DEFAULT_GO_PROPAGATION
+    elif not xlib.check_code(args.go_propagation, xlib.get_go_propagation_code_list(), case_sensitive=False):
+        xlib.Message.print('error', f'*** propagation has to be {xlib.get_go_propagation_code_list_text()}.')
+        OK = False
+    else:
+        args.go_propagation = args.go_propagation.upper()
+
     # check "verbose"
     if args.verbose is None:
         args.verbose = xlib.Const.DEFAULT_VERBOSE
@@ -162,40 +171,61 @@ def check_args(args):
 
 #-------------------------------------------------------------------------------
 
-def calculate_blast2go_go_stats(annotation_file, go_ontology_dict, output_dir):
+def calculate_go_stats(app, annotation_file, go_ontology_dict, output_dir, toa_go_selection, go_propagation):
     '''
-    Calculate GO term statistics of a Blast2GO annotation file.
+    Calculate GO term statistics of an annotation file.
     '''
 
-    # initialize the dictionaries
-    go_frequency_dict = xlib.NestedDefaultDict()
-    go_per_seq_dict = xlib.NestedDefaultDict()
-    seq_per_go_dict = xlib.NestedDefaultDict()
+    # get the iterator of the GO term identifications per sequence and the analysis list
+    # (the GO terms of Trinotate blastx and blastp hits are analysed separately)
+    if app == 'BLAST2GO':
+        seq_go_id_iterator = get_blast2go_go_ids(annotation_file)
+        analysis_list = ['blast2go']
+    elif app == 'ENTAP':
+        seq_go_id_iterator = get_entap_go_ids(annotation_file)
+        analysis_list = ['entap']
+    elif app == 'TOA':
+        seq_go_id_iterator = get_toa_go_ids(annotation_file, toa_go_selection)
+        analysis_list = ['toa']
+    elif app == 'TRAPID':
+        seq_go_id_iterator = get_trapid_go_ids(annotation_file)
+        analysis_list = ['trapid']
+    elif app == 'TRINOTATE':
+        seq_go_id_iterator = get_trinotate_go_ids(annotation_file)
+        analysis_list = ['trinotate-blastx', 'trinotate-blastp']
+
+    # build the GO term incidence of the sequences of every analysis in a single pass over the annotation file
+    incidence_dict = build_go_incidence(seq_go_id_iterator, len(analysis_list))
+    seq_id_list = incidence_dict['seq_id_list']
+    go_id_list = incidence_dict['go_id_list']
+
+    # for each analysis
+    for i, analysis in enumerate(analysis_list):
+
+        # get the GO term frequencies and the incidence matrix (rows: sequences; columns: GO terms)
+        (go_frequency_array, incidence_matrix) = get_go_incidence_matrix(incidence_dict, i)
+
+        # write the statistics
+        write_go_stats(f'{output_dir}/{analysis}', seq_id_list, go_id_list, go_frequency_array, incidence_matrix, go_ontology_dict)
+
+        # propagate the GO terms of every sequence to their ancestors and write the statistics
+        if go_propagation == 'Y':
+            (propagated_go_id_list, propagated_incidence_matrix) = propagate_go_incidence(go_id_list, incidence_matrix, go_ontology_dict)
+            propagated_go_frequency_array = propagated_incidence_matrix.getnnz(axis=0)
+            write_go_stats(f'{output_dir}/{analysis}-propagated', seq_id_list, propagated_go_id_list, propagated_go_frequency_array, propagated_incidence_matrix, go_ontology_dict)
 
-    # open the annotation file
-    if annotation_file.endswith('.gz'):
-        try:
-            annotation_file_id = gzip.open(annotation_file, mode='rt', encoding='iso-8859-1')
-        except Exception as e:
-            raise xlib.ProgramException(e, 'F002', annotation_file)
-    else:
-        try:
-            annotation_file_id = open(annotation_file, mode='r', encoding='iso-8859-1')
-        except Exception as e:
-            raise xlib.ProgramException(e, 'F001', annotation_file)
+#-------------------------------------------------------------------------------
+
+def get_blast2go_go_ids(annotation_file):
+    '''
+    Get the GO term identifications of every record of a Blast2GO annotation file.
+    '''
 
     # initialize the annotation counter
     annotation_counter = 0
 
-    # read the first record of the annotation file (header)
-    annotation_file_id.readline()
-
-    # read the next record of the annotation file (first data record)
-    (record, key, data_dict) = xlib.read_blast2go_annotation_record(annotation_file, annotation_file_id, annotation_counter)
-    xlib.Message.print('trace', f'key: {key} - record: {record}')
-
-    # while there are records
-    while record != '':
+    # for each data record of the annotation file
+    for (seq_name, go_ids, interpro_go_ids) in xlib.iter_annotation_file_records(annotation_file, 'BLAST2GO', ['seq_name', 'go_ids', 'interpro_go_ids']):
 
         # add 1 to the annotation counter
         annotation_counter += 1
@@ -204,538 +234,334 @@ def calculate_blast2go_go_stats(annotation_file, go_ontology_dict, output_dir):
         # go_ids format: "aspect1:GO:id1;aspect2:GO:id2;...;aspectn:GO:idn"
         # aspect values values: P (biological process), F (molecular function), C (cellular component)
         go_id_list_1 = []
-        if data_dict['go_ids'] != '':
-            seq_go_id_list = data_dict['go_ids'].split(';')
-            for i in range(len(seq_go_id_list)):
-                go_id_list_1.append(seq_go_id_list[i].strip()[2:])
+        if go_ids != '':
+            go_id_list_1 = [go_id.strip()[2:] for go_id in go_ids.split(';')]
 
         # extract InterPro GO term identifications and add them into the GO identification list
         # interpro_go_ids format: "aspect1:GO:id1;aspect2:GO:id2;...;aspectn:GO:idn"
         # aspect values values: P (biological process), F (molecular function), C (cellular component)
         go_id_list_2 = []
-        if data_dict['interpro_go_ids'] not in ['', 'no GO terms', 'no IPS match']:
-            seq_go_id_list = data_dict['interpro_go_ids'].split(';')
-            for i in range(len(seq_go_id_list)):
-                go_id_list_2.append(seq_go_id_list[i].strip()[2:])
-
-        # concat GO identification lists
-        go_id_list = go_id_list_1 + go_id_list_2
-
-        # increase the GO term counters in the go term frequency dictionary
-        for i in range(len(go_id_list)):
-            go_id = go_id_list[i]
-            counter = go_frequency_dict.get(go_id, 0)
-            go_frequency_dict[go_id] = counter + 1
-
-        # add GO term identifications in the go terms per sequence dictionary
-        seq_go_list = go_per_seq_dict.get(data_dict['seq_name'], [])
-        for go_id in go_id_list:
-            if go_id not in seq_go_list:
-                seq_go_list.append(go_id)
-        go_per_seq_dict[data_dict['seq_name']] = seq_go_list
-
-        # add sequence identication in the sequences per GO term dictionary
-        for go_id in go_id_list:
-            go_seq_list = seq_per_go_dict.get(go_id, [])
-            if data_dict['seq_name'] not in go_seq_list:
-                go_seq_list.append(data_dict['seq_name'])
-                seq_per_go_dict[go_id] = go_seq_list
+        if interpro_go_ids not in ['', 'no GO terms', 'no IPS match']:
+            go_id_list_2 = [go_id.strip()[2:] for go_id in interpro_go_ids.split(';')]
 
-        xlib.Message.print('verbose', f'\rAnnotation file: {annotation_counter} processed records')
+        # yield the sequence identification and the concatenated GO identification lists
+        yield seq_name, [go_id_list_1 + go_id_list_2]
 
-        # read the next record of the annotation file
-        (record, key, data_dict) = xlib.read_blast2go_annotation_record(annotation_file, annotation_file_id, annotation_counter)
-        xlib.Message.print('trace', f'key: {key} - record: {record}')
+        xlib.Message.print('verbose', f'\rAnnotation file: {annotation_counter} processed records')
 
     xlib.Message.print('verbose', '\n')
 
     # print summary
     xlib.Message.print('info', f'{annotation_counter} annotation records in annotation file.')
 
-    # close annotation file
-    annotation_file_id.close()
-
-    # write the GO term frequency
-    go_frequency_file = f'{output_dir}/blast2go-go-frequency.csv'
-    write_go_frequency(go_frequency_dict, go_ontology_dict, go_frequency_file)
-    xlib.Message.print('info', f'The file {os.path.basename(go_frequency_file)} is generated.')
-
-    # write go terms per sequence
-    go_per_seq_file = f'{output_dir}/blast2go-go-per-seq.csv'
-    write_go_per_seq(go_per_seq_dict, go_ontology_dict, go_per_seq_file)
-    xlib.Message.print('info', f'The file {os.path.basename(go_per_seq_file)} is generated.')
-
-    # write sequence identification per go term
-    seq_per_go_file = f'{output_dir}/blast2go-seq-per-go.csv'
-    write_seq_per_go(seq_per_go_dict, go_ontology_dict, seq_per_go_file)
-    xlib.Message.print('info', f'The file {os.path.basename(seq_per_go_file)} is generated.')
-
 #-------------------------------------------------------------------------------
 
-def calculate_entap_go_stats(annotation_file, go_ontology_dict, output_dir):
+def get_entap_go_ids(annotation_file):
     '''
-    Calculate GO term statistics of a EnTAP annotation file.
+    Get the GO term identifications of every record of a EnTAP annotation file.
     '''
 
-    # initialize the dictionaries
-    go_frequency_dict = xlib.NestedDefaultDict()
-    go_per_seq_dict = xlib.NestedDefaultDict()
-    seq_per_go_dict = xlib.NestedDefaultDict()
-
-    # open the annotation file
-    if annotation_file.endswith('.gz'):
-        try:
-            annotation_file_id = gzip.open(annotation_file, mode='rt', encoding='iso-8859-1')
-        except Exception as e:
-            raise xlib.ProgramException(e, 'F002', annotation_file)
-    else:
-        try:
-            annotation_file_id = open(annotation_file, mode='r', encoding='iso-8859-1')
-        except Exception as e:
-            raise xlib.ProgramException(e, 'F001', annotation_file)
-
     # initialize the annotation counter
     annotation_counter = 0
 
-    # read the first record of the annotation file (header)
-    annotation_file_id.readline()
-
-    # read the next record of the annotation file (first data record)
-    (record, key, data_dict) = xlib.read_entap_runn_annotation_record(annotation_file, annotation_file_id, annotation_counter)
-    xlib.Message.print('trace', f'key: {key} - record: {record}')
-
-    # while there are records
-    while record != '':
+    # for each data record of the annotation file
+    for (query_sequence, eggnog_go_biological, eggnog_go_cellular, eggnog_go_molecular) in xlib.iter_annotation_file_records(annotation_file, 'ENTAP-RUNN', ['query_sequence', 'eggnog_go_biological', 'eggnog_go_cellular', 'eggnog_go_molecular']):
 
         # add 1 to the annotation counter
         annotation_counter += 1
 
-        # extract biological GO term identifications and add them into the GO identification list
-        # go_biological format: "GO:id1-desc1,GO:id2-desc2,...,GO:idn-descn"
-        go_id_list_1 = []
-        if data_dict['eggnog_go_biological'] != '':
-            seq_go_data_list_1 = data_dict['eggnog_go_biological'].split(',')
-            for go_data in seq_go_data_list_1:
-                if go_data.strip().startswith('GO:'):
-                    go_id_list_1.append(go_data[:10])
-
-        # extract cellular GO terms identifications and add them into the GO identification list
-        # go_cellular format: "GO:id1-desc1,GO:id2-desc2,...,GO:idn-descn"
-        go_id_list_2 = []
-        if data_dict['eggnog_go_cellular'] != '':
-            seq_go_data_list_2 = data_dict['eggnog_go_cellular'].split(',')
-            for go_data in seq_go_data_list_2:
-                if go_data.strip().startswith('GO:'):
-                    go_id_list_2.append(go_data[:10])
-
-        # extract molecular GO term identifications and add them into the GO identification list
-        # go_molecular format: "GO:id1-desc1,GO:id2-desc2,...,GO:idn-descn"
-        go_id_list_3 = []
-        if data_dict['eggnog_go_molecular'] != '':
-            seq_go_data_list_3 = data_dict['eggnog_go_molecular'].split(',')
-            for go_data in seq_go_data_list_3:
-                if go_data.strip().startswith('GO:'):
-                    go_id_list_3.append(go_data[:10])
-
-        # concat GO identification lists
-        go_id_list = go_id_list_1 + go_id_list_2 + go_id_list_3
-
-        # increase the GO term counters in the go term frequency dictionary
-        for i in range(len(go_id_list)):
-            go_id = go_id_list[i]
-            counter = go_frequency_dict.get(go_id, 0)
-            go_frequency_dict[go_id] = counter + 1
-
-        # add GO term identifications in the go term per sequence dictionary
-        seq_go_list = go_per_seq_dict.get(data_dict['query_sequence'], [])
-        for go_id in go_id_list:
-            if go_id not in seq_go_list:
-                seq_go_list.append(go_id)
-        go_per_seq_dict[data_dict['query_sequence']] = seq_go_list
-
-        # add sequence identication in the sequences per GO term dictionary
-        for go_id in go_id_list:
-            go_seq_list = seq_per_go_dict.get(go_id, [])
-            if data_dict['query_sequence'] not in go_seq_list:
-                go_seq_list.append(data_dict['query_sequence'])
-                seq_per_go_dict[go_id] = go_seq_list
+        # extract biological, cellular and molecular GO term identifications and add them into the GO identification list
+        # go_biological, go_cellular and go_molecular format: "GO:id1-desc1,GO:id2-desc2,...,GO:idn-descn"
+        go_id_list = []
+        for go_data_list in (eggnog_go_biological, eggnog_go_cellular, eggnog_go_molecular):
+            if go_data_list != '':
+                go_id_list.extend([go_data[:10] for go_data in go_data_list.split(',') if go_data.strip().startswith('GO:')])
 
-        xlib.Message.print('verbose', f'\rAnnotation file: {annotation_counter} processed records')
+        # yield the sequence identification and the GO identification list
+        yield query_sequence, [go_id_list]
 
-        # read the next record of the annotation file
-        (record, key, data_dict) = xlib.read_entap_runn_annotation_record(annotation_file, annotation_file_id, annotation_counter)
-        xlib.Message.print('trace', f'key: {key} - record: {record}')
+        xlib.Message.print('verbose', f'\rAnnotation file: {annotation_counter} processed records')
 
     xlib.Message.print('verbose', '\n')
 
     # print summary
     xlib.Message.print('info', f'{annotation_counter} annotation records in annotation file.')
 
-    # close annotation file
-    annotation_file_id.close()
-
-    # write the GO term frequency
-    go_frequency_file = f'{output_dir}/entap-go-frequency.csv'
-    write_go_frequency(go_frequency_dict, go_ontology_dict, go_frequency_file)
-    xlib.Message.print('info', f'The file {os.path.basename(go_frequency_file)} is generated.')
-
-    # write go terms per sequence
-    go_per_seq_file = f'{output_dir}/entap-go-per-seq.csv'
-    write_go_per_seq(go_per_seq_dict, go_ontology_dict, go_per_seq_file)
-    xlib.Message.print('info', f'The file {os.path.basename(go_per_seq_file)} is generated.')
-
-    # write sequence identification per go term
-    seq_per_go_file = f'{output_dir}/entap-seq-per-go.csv'
-    write_seq_per_go(seq_per_go_dict, go_ontology_dict, seq_per_go_file)
-    xlib.Message.print('info', f'The file {os.path.basename(seq_per_go_file)} is generated.')
-
 #-------------------------------------------------------------------------------
 
-def calculate_toa_go_stats(annotation_file, go_ontology_dict, output_dir, toa_go_selection):
+def get_toa_go_ids(annotation_file, toa_go_selection):
     '''
-    Calculate GO term statistics of a TOA annotation file (only the sequence with the lowest e-Value is considered).
+    Get the GO term identifications of every sequence of a TOA annotation file (only the hit/hsp with the lowest e-Value is considered).
     '''
 
-    # initialize the statistics dictionaries
-    go_frequency_dict = xlib.NestedDefaultDict()
-    go_per_seq_dict = xlib.NestedDefaultDict()
-    seq_per_go_dict = xlib.NestedDefaultDict()
-
-    # open the annotation file
-    if annotation_file.endswith('.gz'):
-        try:
-            annotation_file_id = gzip.open(annotation_file, mode='rt', encoding='iso-8859-1')
-        except Exception as e:
-            raise xlib.ProgramException(e, 'F002', annotation_file)
-    else:
-        try:
-            annotation_file_id = open(annotation_file, mode='r', encoding='iso-8859-1')
-        except Exception as e:
-            raise xlib.ProgramException(e, 'F001', annotation_file)
-
     # initialize the annotation counter
     annotation_counter = 0
 
-    # read the first record of the annotation file (header)
-    annotation_file_id.readline()
-
-    # read the secord record of the annotation file (first data record)
-    (record, key, data_dict) = xlib.read_toa_annotation_record(annotation_file, annotation_file_id, 'MERGER', annotation_counter)
-    xlib.Message.print('trace', f'key: {key} - record: {record}')
-
-    # while there are records
-    while record != '':
-
-        # initialize the old sequence identification
-        old_nt_seq_id = data_dict['nt_seq_id']
+    # for each sequence identification of the annotation file (the records of a sequence are consecutive)
+    record_iterator = xlib.iter_annotation_file_records(annotation_file, 'TOA-MERGER', ['nt_seq_id', 'hsp_evalue', 'go_id'])
+    for (nt_seq_id, seq_record_iterator) in itertools.groupby(record_iterator, key=lambda record_data: record_data[0]):
 
         # initialize the minimum e-value and go identification list of the sequence hit/hsp with less e-value
         min_evalue = 9999
         min_evalue_go_id_list = []
 
-        # while there are records and the same sequence identification
-        while record != '' and data_dict['nt_seq_id'] == old_nt_seq_id:
+        # for each record of the sequence identification
+        for (_, hsp_evalue, go_id) in seq_record_iterator:
 
             # add 1 to the annotation counter
             annotation_counter += 1
 
             # extract the GO term identifications and add them into the GO identification list
             # go_id format: "GO:id1*id2*...*idn"
-            if data_dict['go_id'] != '':
-                go_id_list = data_dict['go_id'][3:].split('*')
+            if go_id != '':
+                go_id_list = go_id[3:].split('*')
             else:
                 go_id_list = []
 
             # save the go identification list of the sequence hit/hsp with less e-value
             if toa_go_selection == 'LEV': # the lowest e-value (GO data can be empty) is considered
-                if float(data_dict['hsp_evalue']) < min_evalue:
+                if float(hsp_evalue) < min_evalue:
                     min_evalue_go_id_list = go_id_list
-                    min_evalue = float(data_dict['hsp_evalue'])
+                    min_evalue = float(hsp_evalue)
             elif toa_go_selection == 'LEVWD': # the lowest e-value with GO data not empty is considered
-                if float(data_dict['hsp_evalue']) < min_evalue and go_id_list:
+                if float(hsp_evalue) < min_evalue and go_id_list:
                     min_evalue_go_id_list = go_id_list
-                    min_evalue = float(data_dict['hsp_evalue'])
+                    min_evalue = float(hsp_evalue)
 
             xlib.Message.print('verbose', f'\rAnnotation file: {annotation_counter} processed records')
 
-            # read the next record of the annotation file
-            (record, key, data_dict) = xlib.read_toa_annotation_record(annotation_file, annotation_file_id, 'MERGER', annotation_counter)
-            xlib.Message.print('trace', f'key: {key} - record: {record}')
-
-        # increase the GO term counter in the go term frequency dictionary
-        for i in range(len(min_evalue_go_id_list)):
-            go_id = f'GO:{min_evalue_go_id_list[i]}'
-            frequency = go_frequency_dict.get(go_id, 0)
-            go_frequency_dict[go_id] = frequency + 1
-
-        # add GO term identifications in the blastx go terms per sequence dictionary
-        seq_go_list = go_per_seq_dict.get(old_nt_seq_id, [])
-        for i in range(len(min_evalue_go_id_list)):
-            go_id = f'GO:{min_evalue_go_id_list[i]}'
-            if go_id not in seq_go_list:
-                seq_go_list.append(go_id)
-        go_per_seq_dict[old_nt_seq_id] = seq_go_list
-
-        # add sequence identication in the blastx sequences per GO term dictionary
-        for i in range(len(min_evalue_go_id_list)):
-            go_id = f'GO:{min_evalue_go_id_list[i]}'
-            go_seq_list = seq_per_go_dict.get(go_id, [])
-            if old_nt_seq_id not in go_seq_list:
-                go_seq_list.append(old_nt_seq_id)
-                seq_per_go_dict[go_id] = go_seq_list
+        # yield the sequence identification and the GO identification list
+        yield nt_seq_id, [[f'GO:{go_id}' for go_id in min_evalue_go_id_list]]
 
     xlib.Message.print('verbose', '\n')
 
     # print summary
     xlib.Message.print('info', f'{annotation_counter} annotation records in annotation file.')
 
-    # close annotation file
-    annotation_file_id.close()
-
-    # write the GO term frequency
-    go_frequency_file = f'{output_dir}/toa-go-frequency.csv'
-    write_go_frequency(go_frequency_dict, go_ontology_dict, go_frequency_file)
-    xlib.Message.print('info', f'The file {os.path.basename(go_frequency_file)} is generated.')
-
-    # write go terms per sequence
-    go_per_seq_file = f'{output_dir}/toa-go-per-seq.csv'
-    write_go_per_seq(go_per_seq_dict, go_ontology_dict, go_per_seq_file)
-    xlib.Message.print('info', f'The file {os.path.basename(go_per_seq_file)} is generated.')
-
-    # write sequence identification per go term
-    seq_per_go_file = f'{output_dir}/toa-seq-per-go.csv'
-    write_seq_per_go(seq_per_go_dict, go_ontology_dict, seq_per_go_file)
-    xlib.Message.print('info', f'The file {os.path.basename(seq_per_go_file)} is generated.')
-
 #-------------------------------------------------------------------------------
 
-def calculate_trapid_go_stats(annotation_file, go_ontology_dict, output_dir):
+def get_trapid_go_ids(annotation_file):
     '''
-    Calculate GO term statistics of a TRAPID annotation file.
+    Get the GO term identification of every record of a TRAPID annotation file.
     '''
 
-    # initialize the dictionaries
-    go_frequency_dict = xlib.NestedDefaultDict()
-    go_per_seq_dict = xlib.NestedDefaultDict()
-    seq_per_go_dict = xlib.NestedDefaultDict()
-
-    # open the annotation file
-    if annotation_file.endswith('.gz'):
-        try:
-            annotation_file_id = gzip.open(annotation_file, mode='rt', encoding='iso-8859-1')
-        except Exception as e:
-            raise xlib.ProgramException(e, 'F002', annotation_file)
-    else:
-        try:
-            annotation_file_id = open(annotation_file, mode='r', encoding='iso-8859-1')
-        except Exception as e:
-            raise xlib.ProgramException(e, 'F001', annotation_file)
-
     # initialize the annotation counter
     annotation_counter = 0
 
-    # read the first record of the annotation file (header)
-    annotation_file_id.readline()
-
-    # read the next record of the annotation file (first data record)
-    (record, key, data_dict) = xlib.read_trapid_annotation_record(annotation_file, annotation_file_id, annotation_counter)
-    xlib.Message.print('trace', f'key: {key} - record: {record}')
-
-    # while there are records
-    while record != '':
+    # for each data record of the annotation file
+    for (transcript_id, go) in xlib.iter_annotation_file_records(annotation_file, 'TRAPID', ['transcript_id', 'go']):
 
         # add 1 to the annotation counter
         annotation_counter += 1
 
-        # increase the GO term counter in the go term frequency dictionary
-        frequency = go_frequency_dict.get(data_dict['go'], 0)
-        go_frequency_dict[data_dict['go']] = frequency + 1
-
-        # add GO term identification in the go term per sequence dictionary
-        seq_go_list = go_per_seq_dict.get(data_dict['transcript_id'], [])
-        if data_dict['go'] not in seq_go_list:
-            seq_go_list.append(data_dict['go'])
-            go_per_seq_dict[data_dict['transcript_id']] = seq_go_list
-
-        # add sequence identication in the sequences per GO term dictionary
-        go_seq_list = seq_per_go_dict.get(data_dict['go'], [])
-        if data_dict['transcript_id'] not in go_seq_list:
-            go_seq_list.append(data_dict['transcript_id'])
-            seq_per_go_dict[data_dict['go']] = go_seq_list
+        # yield the sequence identification and the GO identification
+        yield transcript_id, [[go]]
 
         xlib.Message.print('verbose', f'\rAnnotation file: {annotation_counter} processed records')
 
-        # read the next record of the annotation file
-        (record, key, data_dict) = xlib.read_trapid_annotation_record(annotation_file, annotation_file_id, annotation_counter)
-        xlib.Message.print('trace', f'key: {key} - record: {record}')
-
     xlib.Message.print('verbose', '\n')
 
     # print summary
-    xlib.Message.print('info', f'{annotation_counter} annotation records in annotation file.'.format())
-
-    # close annotation file
-    annotation_file_id.close()
-
-    # write the GO term frequency
-    go_frequency_file = f'{output_dir}/trapid-go-frequency.csv'
-    write_go_frequency(go_frequency_dict, go_ontology_dict, go_frequency_file)
-    xlib.Message.print('info', f'The file {os.path.basename(go_frequency_file)} is generated.')
-
-    # write go terms per sequence
-    go_per_seq_file = f'{output_dir}/trapid-go-per-seq.csv'
-    write_go_per_seq(go_per_seq_dict, go_ontology_dict, go_per_seq_file)
-    xlib.Message.print('info', f'The file {os.path.basename(go_per_seq_file)} is generated.')
-
-    # write sequence identification per go term
-    seq_per_go_file = f'{output_dir}/trapid-seq-per-go.csv'
-    write_seq_per_go(seq_per_go_dict, go_ontology_dict, seq_per_go_file)
-    xlib.Message.print('info', f'The file {os.path.basename(seq_per_go_file)} is generated.')
+    xlib.Message.print('info', f'{annotation_counter} annotation records in annotation file.')
 
 #-------------------------------------------------------------------------------
 
-def calculate_trinotate_go_stats(annotation_file, go_ontology_dict, output_dir):
+def get_trinotate_go_ids(annotation_file):
     '''
-    Calculate GO term statistics of a Trinotate annotation file.
+    Get the GO term identifications of the blastx and blastp hits of every record of a Trinotate annotation file.
     '''
 
-    # initialize the dictionaries
-    blastx_go_frequency_dict = xlib.NestedDefaultDict()
-    blastx_go_per_seq_dict = xlib.NestedDefaultDict()
-    blastx_seq_per_go_dict = xlib.NestedDefaultDict()
-    blastp_go_frequency_dict = xlib.NestedDefaultDict()
-    blastp_go_per_seq_dict = xlib.NestedDefaultDict()
-    blastp_seq_per_go_dict = xlib.NestedDefaultDict()
-
-    # open the annotation file
-    if annotation_file.endswith('.gz'):
-        try:
-            annotation_file_id = gzip.open(annotation_file, mode='rt', encoding='iso-8859-1')
-        except Exception as e:
-            raise xlib.ProgramException(e, 'F002', annotation_file)
-    else:
-        try:
-            annotation_file_id = open(annotation_file, mode='r', encoding='iso-8859-1')
-        except Exception as e:
-            raise xlib.ProgramException(e, 'F001', annotation_file)
-
     # initialize the annotation counter
     annotation_counter = 0
 
-    # read the first record of the annotation file (header)
-    annotation_file_id.readline()
-
-    # read the next record of the annotation file (first data record)
-    (record, key, data_dict) = xlib.read_trinotate_annotation_record(annotation_file, annotation_file_id, annotation_counter)
-    xlib.Message.print('trace', f'key: {key} - record: {record}')
-
-    # while there are records
-    while record != '':
+    # for each data record of the annotation file
+    for (transcript_id, gene_ontology_blastx, gene_ontology_blastp) in xlib.iter_annotation_file_records(annotation_file, 'TRINOTATE', ['transcript_id', 'gene_ontology_blastx', 'gene_ontology_blastp']):
 
         # add 1 to the annotation counter
         annotation_counter += 1
 
-        # extract blastx GO term identifications and add them into the GO identification list
-        # gene_ontology_blastx format: GO:id1^aspect1^desc1`GO:id2^aspect2^desc2`...`GO:idn^aspectn^descn
+        # extract blastx and blastp GO term identifications and add them into their GO identification list
+        # gene_ontology_blastx and gene_ontology_blastp format: GO:id1^aspect1^desc1`GO:id2^aspect2^desc2`...`GO:idn^aspectn^descn
         # aspect values: biological process (P), molecular function (F), cellular component (C)
         blastx_go_id_list = []
-        if data_dict['gene_ontology_blastx'] != '.':
-            go_data_list = data_dict['gene_ontology_blastx'].split(r'`')
-            for go_data in go_data_list:
+        if gene_ontology_blastx != '.':
+            for go_data in gene_ontology_blastx.split(r'`'):
                 (go_id, _, _) = go_data.split('^')
                 blastx_go_id_list.append(go_id)
-
-        # increase the GO term counter in the blastx go term frequency dictionary
-        for i in range(len(blastx_go_id_list)):
-            go_id = blastx_go_id_list[i]
-            frequency = blastx_go_frequency_dict.get(go_id, 0)
-            blastx_go_frequency_dict[go_id] = frequency + 1
-
-        # add GO term identifications in the blastx go terms per sequence dictionary
-        seq_go_list = blastx_go_per_seq_dict.get(data_dict['transcript_id'], [])
-        for go_id in blastx_go_id_list:
-            if go_id not in seq_go_list:
-                seq_go_list.append(go_id)
-        blastx_go_per_seq_dict[data_dict['transcript_id']] = seq_go_list
-
-        # add sequence identication in the blastx sequences per GO term dictionary
-        for go_id in blastx_go_id_list:
-            go_seq_list = blastx_seq_per_go_dict.get(go_id, [])
-            if data_dict['transcript_id'] not in go_seq_list:
-                go_seq_list.append(data_dict['transcript_id'])
-                blastx_seq_per_go_dict[go_id] = go_seq_list
-
-        # extract blastp GO term identifications and add them into the GO identification list
-        # gene_ontology_blastp format: GO:id1^aspect1^desc1`GO:id2^aspect2^desc2`...`GO:idn^aspectn^descn
-        # aspect values: biological process (P), molecular function (F), cellular component (C)
         blastp_go_id_list = []
-        if data_dict['gene_ontology_blastp'] != '.':
-            go_data_list = data_dict['gene_ontology_blastp'].split(r'`')
-            for go_data in go_data_list:
+        if gene_ontology_blastp != '.':
+            for go_data in gene_ontology_blastp.split(r'`'):
                 (go_id, _, _) = go_data.split('^')
                 blastp_go_id_list.append(go_id)
 
-        # increase the GO term counter in the blastp go term frequency dictionary
-        for i in range(len(blastp_go_id_list)):
-            go_id = blastp_go_id_list[i]
-            frequency = blastp_go_frequency_dict.get(go_id, 0)
-            blastp_go_frequency_dict[go_id] = frequency + 1
-
-        # add GO term identifications in the blastp go terms per sequence dictionary
-        seq_go_list = blastp_go_per_seq_dict.get(data_dict['transcript_id'], [])
-        for go_id in blastp_go_id_list:
-            if go_id not in seq_go_list:
-                seq_go_list.append(go_id)
-        blastp_go_per_seq_dict[data_dict['transcript_id']] = seq_go_list
-
-        # add sequence identication in the blastp sequences per GO term dictionary
-        for go_id in blastp_go_id_list:
-            go_seq_list = blastp_seq_per_go_dict.get(go_id, [])
-            if data_dict['transcript_id'] not in go_seq_list:
-                go_seq_list.append(data_dict['transcript_id'])
-                blastp_seq_per_go_dict[go_id] = go_seq_list
+        # yield the sequence identification and the GO identification lists
+        yield transcript_id, [blastx_go_id_list, blastp_go_id_list]
 
         xlib.Message.print('verbose', f'\rAnnotation file: {annotation_counter} processed records')
 
-        # read the next record of the annotation file
-        (record, key, data_dict) = xlib.read_trinotate_annotation_record(annotation_file, annotation_file_id, annotation_counter)
-        xlib.Message.print('trace', f'key: {key} - record: {record}')
-
     xlib.Message.print('verbose', '\n')
 
     # print summary
     xlib.Message.print('info', f'{annotation_counter} annotation records in annotation file.')
 
-    # close annotation file
-    annotation_file_id.close()
+#-------------------------------------------------------------------------------
+
+def build_go_incidence(seq_go_id_iterator, analysis_number):
+    '''
+    Build the GO term incidence of the sequences of every analysis: the sequence and GO term identifications are encoded
+    to integers and the pairs sequence code-GO term code of every GO term assignment are saved in two integer arrays.
+    '''
+
+    # initialize the dictionaries of sequence and GO term codes
+    seq_code_dict = {}
+    go_code_dict = {}
+
+    # initialize the arrays of sequence and GO term codes of every analysis
+    seq_code_array_list = [array.array('i') for _ in range(analysis_number)]
+    go_code_array_list = [array.array('i') for _ in range(analysis_number)]
+
+    # for each sequence and its GO term identification lists (a list per analysis)
+    for (seq_id, go_id_list_list) in seq_go_id_iterator:
+
+        # get the sequence code
+        seq_code = seq_code_dict.setdefault(seq_id, len(seq_code_dict))
+
+        # add the GO term assignments of every analysis
+        for (go_id_list, seq_code_array, go_code_array) in zip(go_id_list_list, seq_code_array_list, go_code_array_list):
+            if go_id_list:
+                go_code_array.extend([go_code_dict.setdefault(go_id, len(go_code_dict)) for go_id in go_id_list])
+                seq_code_array.extend([seq_code] * len(go_id_list))
+
+    # return the incidence dictionary
+    return {'seq_id_list': list(seq_code_dict), 'go_id_list': list(go_code_dict), 'seq_code_array_list': seq_code_array_list, 'go_code_array_list': go_code_array_list}
+
+#-------------------------------------------------------------------------------
+
+def get_go_incidence_matrix(incidence_dict, analysis_index):
+    '''
+    Get the GO term frequencies (GO term assignments) and the sparse incidence matrix (rows: sequences; columns: GO terms) of an analysis.
+    '''
+
+    # get the code arrays of the GO term assignments
+    seq_code_array = np.frombuffer(incidence_dict['seq_code_array_list'][analysis_index], dtype=np.intc)
+    go_code_array = np.frombuffer(incidence_dict['go_code_array_list'][analysis_index], dtype=np.intc)
+    seq_number = len(incidence_dict['seq_id_list'])
+    go_number = len(incidence_dict['go_id_list'])
+
+    # count the assignments of every GO term
+    go_frequency_array = np.bincount(go_code_array, minlength=go_number)
+
+    # build the incidence matrix (the duplicated assignments of a GO term to a sequence are summed)
+    incidence_matrix = sparse.csr_matrix((np.ones(len(go_code_array), dtype=np.int32), (seq_code_array, go_code_array)), shape=(seq_number, go_number))
+    incidence_matrix.sum_duplicates()
+
+    # return the GO term frequencies and the incidence matrix
+    return go_frequency_array, incidence_matrix
+
+#-------------------------------------------------------------------------------
+
+def get_go_ancestor_set(go_id, go_ontology_dict, go_ancestor_set_dict):
+    '''
+    Get the set of a GO term identification and its ancestors in the ontology (relationships is_a and part_of).
+    '''
+
+    # get the ancestor set when it has not been calculated before
+    go_ancestor_set = go_ancestor_set_dict.get(go_id)
+    if go_ancestor_set is None:
+        go_ancestor_set = {go_id}
+        go_data_dict = go_ontology_dict.get(go_id)
+        if go_data_dict is not None:
+            for parent_id in go_data_dict.get('parent_id_list', []):
+                go_ancestor_set |= get_go_ancestor_set(parent_id, go_ontology_dict, go_ancestor_set_dict)
+        go_ancestor_set_dict[go_id] = go_ancestor_set
+
+    # return the ancestor set
+    return go_ancestor_set
+
+#-------------------------------------------------------------------------------
+
+def propagate_go_incidence(go_id_list, incidence_matrix, go_ontology_dict):
+    '''
+    Propagate the GO terms of every sequence to their ancestors in the ontology (true path rule) and get the extended
+    GO term identification list and the propagated incidence matrix (rows: sequences; columns: GO terms and ancestors).
+    '''
+
+    # initialize the extended GO term identification list and its code dictionary
+    propagated_go_id_list = list(go_id_list)
+    go_code_dict = {go_id: i for i, go_id in enumerate(go_id_list)}
+
+    # build the lists of the pairs GO term code-ancestor code (a GO term is an ancestor of itself)
+    go_ancestor_set_dict = {}
+    go_code_list = []
+    ancestor_code_list = []
+    for go_code, go_id in enumerate(go_id_list):
+        for ancestor_id in get_go_ancestor_set(go_id, go_ontology_dict, go_ancestor_set_dict):
+            ancestor_code = go_code_dict.get(ancestor_id)
+            if ancestor_code is None:
+                ancestor_code = len(propagated_go_id_list)
+                go_code_dict[ancestor_id] = ancestor_code
+                propagated_go_id_list.append(ancestor_id)
+            go_code_list.append(go_code)
+            ancestor_code_list.append(ancestor_code)
+
+    # build the ancestor matrix (rows: GO terms; columns: GO terms and ancestors)
+    ancestor_matrix = sparse.csr_matrix((np.ones(len(go_code_list), dtype=np.int32), (go_code_list, ancestor_code_list)), shape=(len(go_id_list), len(propagated_go_id_list)))
+
+    # build the propagated incidence matrix (a sequence is annotated with a GO term when it is annotated with the term or a descendant)
+    propagated_incidence_matrix = ((incidence_matrix > 0).astype(np.int32) @ ancestor_matrix).tocsr()
+    propagated_incidence_matrix.sum_duplicates()
+
+    # return the extended GO term identification list and the propagated incidence matrix
+    return propagated_go_id_list, propagated_incidence_matrix
+
+#-------------------------------------------------------------------------------
+
+def write_go_stats(stats_file_prefix, seq_id_list, go_id_list, go_frequency_array, incidence_matrix, go_ontology_dict):
+    '''
+    Write the GO term frequency, the GO terms per sequence and the sequences per GO term.
+    '''
+
+    # get the rank of the sequence and GO term identifications in alphabetical order
+    seq_rank_array = get_rank_array(seq_id_list)
+    go_rank_array = get_rank_array(go_id_list)
+
+    # get the pairs sequence code-GO term code of the incidence matrix
+    coo_incidence_matrix = incidence_matrix.tocoo()
+    seq_code_array = coo_incidence_matrix.row
+    go_code_array = coo_incidence_matrix.col
 
     # write the GO term frequency
-    blastx_go_frequency_file = f'{output_dir}/trinotate-blastx-go-frequency.csv'
-    write_go_frequency(blastx_go_frequency_dict, go_ontology_dict, blastx_go_frequency_file)
-    xlib.Message.print('info', f'The file {os.path.basename(blastx_go_frequency_file)} is generated.')
-    blastp_go_frequency_file = f'{output_dir}/trinotate-blastp-go-frequency.csv'
-    write_go_frequency(blastp_go_frequency_dict, go_ontology_dict, blastp_go_frequency_file)
-    xlib.Message.print('info', f'The file {os.path.basename(blastp_go_frequency_file)} is generated.')
+    go_frequency_file = f'{stats_file_prefix}-go-frequency.csv'
+    write_go_frequency(go_id_list, go_frequency_array, np.argsort(go_rank_array), go_ontology_dict, go_frequency_file)
+    xlib.Message.print('info', f'The file {os.path.basename(go_frequency_file)} is generated.')
 
     # write go terms per sequence
-    blastx_go_per_seq_file = f'{output_dir}/trinotate-blastx-go-per-seq.csv'
-    write_go_per_seq(blastx_go_per_seq_dict, go_ontology_dict, blastx_go_per_seq_file)
-    xlib.Message.print('info', f'The file {os.path.basename(blastx_go_per_seq_file)} is generated.')
-    blastp_go_per_seq_file = f'{output_dir}/trinotate-blastp-go-per-seq.csv'
-    write_go_per_seq(blastp_go_per_seq_dict, go_ontology_dict, blastp_go_per_seq_file)
-    xlib.Message.print('info', f'The file {os.path.basename(blastp_go_per_seq_file)} is generated.')
+    go_per_seq_file = f'{stats_file_prefix}-go-per-seq.csv'
+    pair_order_array = np.lexsort((go_rank_array[go_code_array], seq_rank_array[seq_code_array]))
+    write_go_per_seq(seq_id_list, go_id_list, seq_code_array[pair_order_array], go_code_array[pair_order_array], go_ontology_dict, go_per_seq_file)
+    xlib.Message.print('info', f'The file {os.path.basename(go_per_seq_file)} is generated.')
 
     # write sequence identification per go term
-    blastx_seq_per_go_file = f'{output_dir}/trinotate-blastx-seq-per-go.csv'
-    write_seq_per_go(blastx_seq_per_go_dict, go_ontology_dict, blastx_seq_per_go_file)
-    xlib.Message.print('info', f'The file {os.path.basename(blastx_seq_per_go_file)} is generated.')
-    blastp_seq_per_go_file = f'{output_dir}/trinotate-blastp-seq-per-go.csv'
-    write_seq_per_go(blastp_seq_per_go_dict, go_ontology_dict, blastp_seq_per_go_file)
-    xlib.Message.print('info', f'The file {os.path.basename(blastp_seq_per_go_file)} is generated.')
+    seq_per_go_file = f'{stats_file_prefix}-seq-per-go.csv'
+    pair_order_array = np.lexsort((seq_rank_array[seq_code_array], go_rank_array[go_code_array]))
+    write_seq_per_go(seq_id_list, go_id_list, seq_code_array[pair_order_array], go_code_array[pair_order_array], go_ontology_dict, seq_per_go_file)
+    xlib.Message.print('info', f'The file {os.path.basename(seq_per_go_file)} is generated.')
+
+#-------------------------------------------------------------------------------
+
+def get_rank_array(id_list):
+    '''
+    Get the array with the rank of every identification of a list in alphabetical order.
+    '''
+
+    rank_array = np.empty(len(id_list), dtype=np.int64)
+    rank_array[sorted(range(len(id_list)), key=id_list.__getitem__)] = np.arange(len(id_list))
+
+    return rank_array
 
 #-------------------------------------------------------------------------------
 
-def write_go_frequency(go_frequency_dict, go_ontology_dict, go_id_stats_file):
+def write_go_frequency(go_id_list, go_frequency_array, go_code_order_array, go_ontology_dict, go_id_stats_file):
     '''
     Write GO term frequency.
     '''
@@ -755,18 +581,20 @@ def write_go_frequency(go_frequency_dict, go_ontology_dict, go_id_stats_file):
     # write the header in the file of statistics
     go_id_stats_file_id.write( '"go_term";"name";"namespace";"count"\n')
 
-    # write data in the file of statistics
-    for go_id in sorted(go_frequency_dict.keys()):
-        go_name = go_ontology_dict[go_id]['go_name']
-        namespace = go_ontology_dict[go_id]['namespace']
-        go_id_stats_file_id.write(f'"{go_id}";"{go_name}";"{namespace}";{go_frequency_dict[go_id]}\n')
+    # write data in the file of statistics (GO terms in alphabetical order without the GO terms of other analyses)
+    for go_code in go_code_order_array.tolist():
+        if go_frequency_array[go_code] > 0:
+            go_id = go_id_list[go_code]
+            go_name = go_ontology_dict[go_id]['go_name']
+            namespace = go_ontology_dict[go_id]['namespace']
+            go_id_stats_file_id.write(f'"{go_id}";"{go_name}";"{namespace}";{go_frequency_array[go_code]}\n')
 
     # close the file of statistics
     go_id_stats_file_id.close()
 
 #-------------------------------------------------------------------------------
 
-def write_go_per_seq(go_per_seq_dict, go_ontology_dict, stats_file):
+def write_go_per_seq(seq_id_list, go_id_list, seq_code_array, go_code_array, go_ontology_dict, stats_file):
     '''
     Write GO terms per sequence (each record is a pair sequence identification-go term).
     '''
@@ -786,19 +614,19 @@ def write_go_per_seq(go_per_seq_dict, go_ontology_dict, stats_file):
     # write the header in the file of statistics
     stats_file_id.write( '"seq_id";"go_id";"namespace"\n')
 
-    # write data in the file of statistics
-    for seq_id in sorted(go_per_seq_dict.keys()):
-        go_id_list = go_per_seq_dict[seq_id]
-        for go_id in sorted(go_id_list):
-            namespace = go_ontology_dict[go_id]['namespace']
-            stats_file_id.write(f'"{seq_id}";"{go_id}";"{namespace}"\n')
+    # write data in the file of statistics (pairs sorted by sequence identification and GO term identification)
+    for (seq_code, go_code) in zip(seq_code_array.tolist(), go_code_array.tolist()):
+        seq_id = seq_id_list[seq_code]
+        go_id = go_id_list[go_code]
+        namespace = go_ontology_dict[go_id]['namespace']
+        stats_file_id.write(f'"{seq_id}";"{go_id}";"{namespace}"\n')
 
     # close the file of statistics
     stats_file_id.close()
 
 #-------------------------------------------------------------------------------
 
-def write_seq_per_go(seq_per_go_dict, go_ontology_dict, stats_file):
+def write_seq_per_go(seq_id_list, go_id_list, seq_code_array, go_code_array, go_ontology_dict, stats_file):
     '''
     Write sequences identifications per GO terms (each record is a pair sequence go term-identification).
     '''
@@ -818,12 +646,12 @@ def write_seq_per_go(seq_per_go_dict, go_ontology_dict, stats_file):
     # write the header in the file of statistics
     stats_file_id.write( '"go_id";"namespace";"seq_id"\n')
 
-    # write data in the file of statistics
-    for go_id in sorted(seq_per_go_dict.keys()):
-        seq_id_list = seq_per_go_dict[go_id]
-        for seq_id in sorted(seq_id_list):
-            namespace = go_ontology_dict[go_id]['namespace']
-            stats_file_id.write(f'"{go_id}";"{namespace}";"{seq_id}"\n')
+    # write data in the file of statistics (pairs sorted by GO term identification and sequence identification)
+    for (seq_code, go_code) in zip(seq_code_array.tolist(), go_code_array.tolist()):
+        seq_id = seq_id_list[seq_code]
+        go_id = go_id_list[go_code]
+        namespace = go_ontology_dict[go_id]['namespace']
+        stats_file_id.write(f'"{go_id}";"{namespace}";"{seq_id}"\n')
 
     # close the file of statistics
     stats_file_id.close()
@@ -51,7 +51,7 @@ def main():
     conn = xsqlite.connect_database(args.sqlite_database)
 
     # calculate statistics of the gymnoTOA SQLite database
-    calculate_gymnotoadb_stats(conn, args.stats_file)
+    calculate_gymnotoadb_stats(conn, args.stats_file, args.threads_num)
 
     # close connection to SQLite database
     conn.close()
@@ -71,6 +71,7 @@ def build_parser():
     parser._optionals.title = 'Arguments'    #pylint: disable=protected-access
     parser.add_argument('--db', dest='sqlite_database', help='Path of the gymnoTOA SQLite database (mandatory).')
     parser.add_argument('--stats', dest='stats_file', help='Path of statistics file (mandatory).')
+    parser.add_argument('--threads', dest='threads_num', help=f'Number of threads (read connections calculating in parallel the statistics not saved in the database); default: {xlib.Const.DEFAULT_THREADS_NUMBER}.')
     parser.add_argument('--verbose', dest='verbose', help=f'Additional job status info during the run: {xlib.get_verbose_code_list_text()}; default: {xlib.Const.DEFAULT_VERBOSE}.')
     parser.add_argument('--trace', dest='trace', help=f'Additional info useful to the developer team: {xlib.get_trace_code_list_text()}; default: {xlib.Const.DEFAULT_TRACE}.')
 
@@ -97,6 +98,15 @@ def check_args(args):
         xlib.Message.print('error', '*** The statistics file is not indicated in the input arguments.')
         OK = False
 
+    # check "threads_num"
+    if args.threads_num is None:
+        args.threads_num = xlib.Const.DEFAULT_THREADS_NUMBER
+    elif not xlib.check_int(args.threads_num, minimum=1):
+        xlib.Message.print('error', '*** The number of threads has to be an integer number greater than or equal to 1.')
+        OK = False
+    else:
+        args.threads_num = int(args.threads_num)
+
     # check "verbose"
     if args.verbose is None:
         args.verbose = xlib.Const.DEFAULT_VERBOSE
@@ -121,7 +131,7 @@ def check_args(args):
 
 #-------------------------------------------------------------------------------
 
-def calculate_gymnotoadb_stats(conn, stats_file):
+def calculate_gymnotoadb_stats(conn, stats_file, threads_num):
     '''
     Calculate statistics of the gymnoTOA SQLite database.
     '''
@@ -138,7 +148,10 @@ def calculate_gymnotoadb_stats(conn, stats_file):
         except Exception as e:
             raise xlib.ProgramException(e, 'F003', stats_file)
 
-    (seqnum_acrogymnospermae, clusternum_total, clusternum_interproscan_annotations, clusternum_emapper_annotations, clusternum_tair10_ortologs, clusternum_without_annotations) = xsqlite.get_gymnotoa_db_stats(conn)
+    (seqnum_acrogymnospermae, clusternum_total, clusternum_interproscan_annotations, clusternum_emapper_annotations, clusternum_tair10_ortologs, clusternum_without_annotations) = xsqlite.get_gymnotoa_db_stats(conn, threads_num)
+
+    # save the statistics calculated into SQLite database (they are only saved when the database can be written)
+    conn.commit()
 
     # write records
     stats_file_id.write( '[statistics]\n')
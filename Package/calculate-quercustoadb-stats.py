@@ -29,13 +29,17 @@ import gzip
 import os
 import sys
 
-from Bio import Entrez, SeqIO
-
 import xlib
 import xsqlite
 
 #-------------------------------------------------------------------------------
 
+# import heavy modules when they are used for the first time
+Entrez = xlib.LazyModule('Bio.Entrez')
+SeqIO = xlib.LazyModule('Bio.SeqIO')
+
+#-------------------------------------------------------------------------------
+
 def main():
     '''
     Main line of the program.
@@ -53,7 +57,7 @@ def main():
     conn = xsqlite.connect_database(args.sqlite_database)
 
     # calculate statistics of the quercusTOA SQLite database
-    calculate_quercustoadb_stats(conn, args.stats_file, args.noannot_file)
+    calculate_quercustoadb_stats(conn, args.stats_file, args.noannot_file, args.threads_num)
 
     # close connection to SQLite database
     conn.close()
@@ -74,6 +78,7 @@ def build_parser():
     parser.add_argument('--db', dest='sqlite_database', help='Path of the quercusTOA SQLite database (mandatory).')
     parser.add_argument('--stats', dest='stats_file', help='Path of the statistics file (mandatory).')
     parser.add_argument('--noannot', dest='noannot_file', help='Path of the file with sequences without annotations or NONE; default: NONE.')
+    parser.add_argument('--threads', dest='threads_num', help=f'Number of threads (read connections calculating in parallel the statistics not saved in the database); default: {xlib.Const.DEFAULT_THREADS_NUMBER}.')
     parser.add_argument('--verbose', dest='verbose', help=f'Additional job status info during the run: {xlib.get_verbose_code_list_text()}; default: {xlib.Const.DEFAULT_VERBOSE}.')
     parser.add_argument('--trace', dest='trace', help=f'Additional info useful to the developer team: {xlib.get_trace_code_list_text()}; default: {xlib.Const.DEFAULT_TRACE}.')
 
@@ -104,6 +109,15 @@ def check_args(args):
     if args.noannot_file is None or args.noannot_file.upper() == 'NONE':
         args.noannot_file = 'NONE'
 
+    # check "threads_num"
+    if args.threads_num is None:
+        args.threads_num = xlib.Const.DEFAULT_THREADS_NUMBER
+    elif not xlib.check_int(args.threads_num, minimum=1):
+        xlib.Message.print('error', '*** The number of threads has to be an integer number greater than or equal to 1.')
+        OK = False
+    else:
+        args.threads_num = int(args.threads_num)
+
     # check "verbose"
     if args.verbose is None:
         args.verbose = xlib.Const.DEFAULT_VERBOSE
@@ -128,7 +142,7 @@ def check_args(args):
 
 #-------------------------------------------------------------------------------
 
-def calculate_quercustoadb_stats(conn, stats_file, noannot_file):
+def calculate_quercustoadb_stats(conn, stats_file, noannot_file, threads_num):
     '''
     Calculate statistics of the quercusTOA SQLite database.
     '''
@@ -146,7 +160,10 @@ def calculate_quercustoadb_stats(conn, stats_file, noannot_file):
             raise xlib.ProgramException(e, 'F003', stats_file)
 
     # get the statistics of the quercusTOA database
-    (seqnum_quercus, clusternum_total, clusternum_interproscan_annotations, clusternum_emapper_annotations, clusternum_tair10_ortologs, clusternum_without_annotations, ids_without_annotations_list) = xsqlite.get_quercustoa_db_stats(conn)
+    (seqnum_quercus, clusternum_total, clusternum_interproscan_annotations, clusternum_emapper_annotations, clusternum_tair10_ortologs, clusternum_without_annotations) = xsqlite.get_quercustoa_db_stats(conn, threads_num)
+
+    # save the statistics calculated into SQLite database (they are only saved when the database can be written)
+    conn.commit()
 
     # write records in the statistics file
     stats_file_id.write( '[statistics]\n')
@@ -178,6 +195,9 @@ def calculate_quercustoadb_stats(conn, stats_file, noannot_file):
             except Exception as e:
                 raise xlib.ProgramException(e, 'F003', noannot_file)
 
+        # get the cluster and sequence identifications without annotations
+        ids_without_annotations_list = xsqlite.get_ids_without_annotations_list(conn)
+
         # write head in the file with sequences without annotations
         noannot_file_id.write('cluster_id;seq_id;description;aminoacids#\n')
 
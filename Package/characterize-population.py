@@ -37,6 +37,7 @@ import threading
 
 from threading import Semaphore
 
+import xgenotype
 import xlib
 import xsqlite
 
@@ -180,8 +181,8 @@ def characterize_population(conn, threads_num, vcf_file, tvi_list):
     # initialize the SNPs identification list
     snp_id_list = []
 
-    # initialize the kinship dictionary
-    kinship_dict = xlib.NestedDefaultDict()
+    # initialize the kinship accumulator
+    kinship_accumulator = None
 
     # drop the table "vcf_snps" (if it exists)
     xlib.Message.print('verbose', 'Droping the table "vcf_snps" ...\n')
@@ -269,14 +270,8 @@ def characterize_population(conn, threads_num, vcf_file, tvi_list):
             sample_number = len(sample_list)
             xlib.Message.print('trace', f'sample_number: {sample_number}')
 
-            # set 0 the counter values in the kinship dictionary
-            for i in range(sample_number):
-                for j in range(i + 1, sample_number):
-                    kinship_dict[i][j]['rbeta_summation'] = 0
-                    kinship_dict[i][j]['rw_numerator_summation'] = 0
-                    kinship_dict[i][j]['rw_denominator_summation'] = 0
-                    kinship_dict[i][j]['ru_summation'] = 0
-                    kinship_dict[i][j]['ru_l'] = 0
+            # create the kinship accumulator
+            kinship_accumulator = xgenotype.KinshipAccumulator(sample_number)
 
             # print the counters
             xlib.Message.print('verbose', f'\rRecords ... {input_record_counter:8d} - Variants ... {total_variant_counter:8d}')
@@ -356,51 +351,9 @@ def characterize_population(conn, threads_num, vcf_file, tvi_list):
                     pseudobinary_sample_gt_list.append(7)
                     sample_withmd_list.append(i)
 
-            # update the kinship dictionary adding data of the samples i and j in the summations
-            # used to the calculation of rbeta, rw (weighted estimator) y ru (unweighted average estimator)
-            #
-            #    rbeta:
-            #        (1 + (Xi - 1) * (Xj - 1)) / 2 ---> rbeta_summation
-            #
-            #    rw:
-            #        (Xi - 2 * p) * (Xj - 2 * p) ---> rw_numerator_summation
-            #        2 * p * (1 - p) ---> rw_denominator_summation
-            #
-            #    ru:
-            #        (Xi - 2 * p) * (Xj - 2 * p) / (2 * p * (1 - p)) ---> ru_summation
-            #
-            # where Xi are Xj are the dosage of reference allele for samples i and j respectivily
-            # and p is the frecuence of reference allele in the current variant
-            #
-            # (no update is done when there is missing data in samples i or j, or p value is 0 or 1 when rw and ru)
-            summation_summation_mij = 0
-            p = (gt_00 * 2 + gt_01) / (sample_number * 2)
-            for i in range(sample_number):
-                Xi = 0
-                # 0b00 -> 0
-                if pseudobinary_sample_gt_list[i] == 0:
-                    Xi = 2
-                # 0b01 -> 1
-                elif pseudobinary_sample_gt_list[i] == 1:
-                    Xi = 1
-                for j in range(i + 1, sample_number):
-                    Xj = 0
-                    # 0b00 -> 0
-                    if pseudobinary_sample_gt_list[j] == 0:
-                        Xj = 2
-                    # 0b01 -> 1
-                    elif pseudobinary_sample_gt_list[j] == 1:
-                        Xj = 1
-                    # 0b111 -> 7
-                    if pseudobinary_sample_gt_list[i] != 7 and pseudobinary_sample_gt_list[j] != 7:
-                        mij_item = (1 + (Xi - 1) * (Xj - 1)) / 2
-                        kinship_dict[i][j]['rbeta_summation'] += mij_item
-                        summation_summation_mij += mij_item
-                        if p not in [0, 1]:
-                            kinship_dict[i][j]['rw_numerator_summation'] += (Xi - 2 * p) * (Xj - 2 * p)
-                            kinship_dict[i][j]['rw_denominator_summation'] += 2 * p * (1 - p)
-                            kinship_dict[i][j]['ru_summation'] += (Xi - 2 * p) * (Xj - 2 * p) / (2 * p * (1 - p))
-                            kinship_dict[i][j]['ru_l'] += 1
+            # add the genotypes of the variant to the kinship accumulator (the summations used to the calculation
+            # of rbeta, rw and ru between the samples i and j are updated with blocks of variants)
+            kinship_accumulator.add_variant(pseudobinary_sample_gt_list)
 
             # save SNP data into table "vcf_snps" if there are more than one genotype
             if gt_00 != sample_number and gt_01 != sample_number and gt_11 != sample_number:
@@ -440,19 +393,12 @@ def characterize_population(conn, threads_num, vcf_file, tvi_list):
 
     # save kinship calculations into the table "vcf_kinship"
     xlib.Message.print('verbose', 'Saving kinship calculations into the table "vcf_kinship" ...\n')
-    ms = summation_summation_mij * 2 / (sample_number * (sample_number - 1))
-    for i in range(sample_number):
-        for j in range(i + 1, sample_number):
-            rbeta = (kinship_dict[i][j]['rbeta_summation'] - ms) / (1 - ms)
-            rw = kinship_dict[i][j]['rw_numerator_summation'] / kinship_dict[i][j]['rw_denominator_summation']
-            ru = kinship_dict[i][j]['ru_summation'] / kinship_dict[i][j]['ru_l']
-            kinship_row_dict = {}
-            kinship_row_dict['individual_i'] = i
-            kinship_row_dict['individual_j'] = j
-            kinship_row_dict['rbeta'] = rbeta
-            kinship_row_dict['rw'] = rw
-            kinship_row_dict['ru'] = ru
-            xsqlite.insert_vcf_kinship_row(conn, kinship_row_dict)
+    ms = kinship_accumulator.get_ms()
+    xsqlite.insert_vcf_kinship_rows(conn, kinship_accumulator.iter_kinship_rows())
+    for (i, j) in kinship_accumulator.get_undefined_pair_list():
+        xlib.Message.print('trace', '*** WARNING: ZeroDivisionError calculating kinship data')
+        xlib.Message.print('trace', f'between samples {sample_list[i]} & {sample_list[j]}')
+        xlib.Message.print('trace', 'due to all variants have missing data in at least one of the two samples.')
     xlib.Message.print('verbose', 'Kinship calculations are saved.\n')
 
     # create the index "vcf_kinship_index" on the table "vcf_kinship"
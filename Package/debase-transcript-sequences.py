@@ -27,13 +27,16 @@ Licence: GNU General Public Licence Version 3.
 import argparse
 import gzip
 import os
-import random
 import sys
 
 import xlib
 
 #-------------------------------------------------------------------------------
 
+np = xlib.LazyModule('numpy')
+
+#-------------------------------------------------------------------------------
+
 def main():
     '''
     Main line of the program.
@@ -48,7 +51,7 @@ def main():
     check_args(args)
 
     # debase sequences from a transcript FASTA file
-    debase_sequences(args.fasta_file, args.output_file, args.fragmentation_probability, args.max_fragment_number, args.max_end_shortening, args.min_fragment_length, args.mutation_probability, args.max_mutation_number, args.indel_probability, args.max_mutation_size)
+    debase_sequences(args.fasta_file, args.output_file, args.fragmentation_probability, args.max_fragment_number, args.max_end_shortening, args.min_fragment_length, args.mutation_probability, args.max_mutation_number, args.indel_probability, args.max_mutation_size, args.seed)
 
 #-------------------------------------------------------------------------------
 
@@ -73,6 +76,7 @@ def build_parser():
     parser.add_argument('--maxmutnum', dest='max_mutation_number', help=f'Maximum mutation number ({xlib.Const.MAXMUTNUM_LOWEST} <= maxmutnum <= {xlib.Const.MAXMUTNUM_UPPEST}) (mandatory)')
     parser.add_argument('--indelprob', dest='indel_probability', help=f'Insertion/deletion probability ({xlib.Const.INDELPROB_LOWEST} <= indelprob <= {xlib.Const.INDELPROB_UPPEST}) (mandatory)')
     parser.add_argument('--maxmutsize', dest='max_mutation_size', help=f'Maximum mutation size ({xlib.Const.MAXMUTSIZE_LOWEST} <= maxmutsize <= {xlib.Const.MAXMUTSIZE_UPPEST}) (mandatory)')
+    parser.add_argument('--seed', dest='seed', help='Seed of the random number generator (non negative integer) or NONE; default: NONE.')
     parser.add_argument('--verbose', dest='verbose', help=f'Additional job status info during the run: {get_verbose_code_list_text()}; default: {xlib.Const.DEFAULT_VERBOSE}.')
     parser.add_argument('--trace', dest='trace', help=f'Additional info useful to the developer team: {get_trace_code_list_text()}; default: {xlib.Const.DEFAULT_TRACE}.')
 
@@ -182,6 +186,15 @@ def check_args(args):
     else:
         args.max_mutation_size = int(args.max_mutation_size)
 
+    # check "seed"
+    if args.seed is None or args.seed.upper() == 'NONE':
+        args.seed = None
+    elif not xlib.check_int(args.seed, minimum=0):
+        xlib.Message.print('error', 'The seed has to be a non negative integer number or NONE.')
+        OK = False
+    else:
+        args.seed = int(args.seed)
+
     # check "verbose"
     if args.verbose is None:
         args.verbose = xlib.Const.DEFAULT_VERBOSE
@@ -206,11 +219,15 @@ def check_args(args):
 
 #-------------------------------------------------------------------------------
 
-def debase_sequences(fasta_file, output_file, fragmentation_probability, max_fragment_number, max_end_shortening, min_fragment_length, mutation_probability, max_mutation_number, indel_probability, max_mutation_size):
+def debase_sequences(fasta_file, output_file, fragmentation_probability, max_fragment_number, max_end_shortening, min_fragment_length, mutation_probability, max_mutation_number, indel_probability, max_mutation_size, seed):
     '''
-    Debase sequences from a transcript FASTA file.
+    Debase sequences from a transcript FASTA file. The transcripts are debased by blocks: the sequences of a block
+    are NumPy arrays of bytes and the random events of all transcripts of the block are drawn at once.
     '''
 
+    # build the random number generator
+    rng = np.random.default_rng(seed)
+
     # open the FASTA file
     if fasta_file.endswith('.gz'):
         try:
@@ -235,216 +252,329 @@ def debase_sequences(fasta_file, output_file, fragmentation_probability, max_fra
         except Exception as e:
             raise xlib.ProgramException(e, 'F003', output_file)
 
+    # set the debasing parameters
+    parameter_dict = {
+        'fragmentation_probability': fragmentation_probability,
+        'max_fragment_number': max_fragment_number,
+        'max_end_shortening': max_end_shortening,
+        'min_fragment_length': min_fragment_length,
+        'mutation_probability': mutation_probability,
+        'max_mutation_number': max_mutation_number,
+        'indel_probability': indel_probability,
+        'max_mutation_size': max_mutation_size,
+        }
+
     # initialize record counters
     read_seq_counter = 0
     written_seq_counter = 0
 
-    # read the first record of FASTA file
-    record = fasta_file_id.readline()
+    # initialize the identification and sequence lists of the transcript block
+    id_list = []
+    seq_list = []
+
+    # initialize the sequence parts of the current transcript
+    seq_part_list = None
 
-    # while there are records in FASTA file
-    while record != '':
+    # for each record of the FASTA file
+    for record in fasta_file_id:
 
         # process the head record
         if record.startswith('>'):
 
-            # extract the identification
-            id = record[1:].strip('\n')
+            # add the previous transcript to the block
+            if seq_part_list is not None:
+                seq_list.append(''.join(seq_part_list))
+                read_seq_counter += 1
+
+            # debase the transcripts of the block when it is full
+            if len(id_list) == xlib.Const.DEBASING_BLOCK_SIZE:
+                written_seq_counter += debase_block(rng, id_list, seq_list, parameter_dict, output_file_id)
+                id_list = []
+                seq_list = []
 
-            # initialize the sequence
-            seq = ''
+                # print the counters
+                xlib.Message.print('verbose', f'\rTranscripts seqs ... {read_seq_counter:8d} - Output seqs ... {written_seq_counter:8d}')
 
-            # read the next record
-            record = fasta_file_id.readline()
+            # extract the identification and initialize the sequence parts
+            id_list.append(record[1:].strip('\n'))
+            seq_part_list = []
 
+        # control the FASTA format
+        elif seq_part_list is None:
+            raise xlib.ProgramException('', 'F006', fasta_file, 'FASTA')
+
+        # add the record to the sequence parts
         else:
+            seq_part_list.append(record.strip())
 
-            # control the FASTA format
-            raise xlib.ProgramException('F006', fasta_file, 'FASTA')
+    # add the last transcript to the block and debase the transcripts of the block
+    if seq_part_list is not None:
+        seq_list.append(''.join(seq_part_list))
+        read_seq_counter += 1
+        written_seq_counter += debase_block(rng, id_list, seq_list, parameter_dict, output_file_id)
 
-        # while there are records and they are sequence
-        while record != '' and not record.startswith('>'):
+    # print the counters
+    xlib.Message.print('verbose', f'\rTranscripts seqs ... {read_seq_counter:8d} - Output seqs ... {written_seq_counter:8d}')
 
-            # concatenate the record to the sequence
-            seq += record.strip()
+    # close files
+    fasta_file_id.close()
+    output_file_id.close()
 
-            # read the next record of FASTA file
-            record = fasta_file_id.readline()
+    # print OK message
+    xlib.Message.print('verbose', f'\nThe file {os.path.basename(output_file)} containing debased sequences is created.')
 
-        # add 1 to the read sequence counter
-        read_seq_counter += 1
+#-------------------------------------------------------------------------------
 
-        # initialize the sequence list
-        seq_list = []
+def debase_block(rng, id_list, seq_list, parameter_dict, output_file_id):
+    '''
+    Debase a block of transcripts (fragmentation, end shortening and mutations), write the debased sequences
+    whose length is greater than or equal to the minimum fragment length and return the number of written sequences.
+    '''
 
-        xlib.Message.print('trace', f'\nid: {id}')
+    # get the sequences of the block as an array of bytes and their lengths and start positions
+    seq_array = np.frombuffer(''.join(seq_list).encode('iso-8859-1'), dtype=np.uint8)
+    seq_length_array = np.array([len(seq) for seq in seq_list], dtype=np.int64)
+    seq_start_array = np.cumsum(seq_length_array) - seq_length_array
 
-        # determine the fragmentation of the sequence
-        if fragmentation_probability > random.random():
+    # get the fragments (transcript, start and end in the array of bytes) with some nucleotide
+    (fragment_transcript_array, fragment_start_array, fragment_end_array) = get_fragments(rng, seq_length_array, parameter_dict['fragmentation_probability'], parameter_dict['max_fragment_number'], parameter_dict['max_end_shortening'])
+    fragment_start_array += seq_start_array[fragment_transcript_array]
+    fragment_end_array += seq_start_array[fragment_transcript_array]
 
-            # get the fragment number
-            fragment_number = random.randrange(2, max_fragment_number + 1)
+    # get the fragment number of every transcript
+    fragment_number_array = np.bincount(fragment_transcript_array, minlength=len(id_list))
 
-            # get the cut points
-            cut_point_list = []
-            for i in range(fragment_number):
-                cut_point_list.append(random.randrange(2, len(seq)))
+    # get the mutations (fragment, position in the fragment, size and type)
+    (mutation_fragment_array, mutation_position_array, mutation_size_array, mutation_type_array) = get_mutations(rng, fragment_number_array, fragment_end_array - fragment_start_array, parameter_dict['mutation_probability'], parameter_dict['max_mutation_number'], parameter_dict['indel_probability'], parameter_dict['max_mutation_size'])
 
-            # sort the cut points
-            cut_point_list.sort()
+    xlib.Message.print('trace', f'\ntranscripts: {len(id_list)} - fragments: {len(fragment_transcript_array)} - mutations: {len(mutation_fragment_array)}')
 
-            xlib.Message.print('trace', f'fragment_number: {fragment_number} - cut_point_list: {cut_point_list}')
+    # get the fragment sequences applying the mutations
+    (base_array, fragment_length_array) = mutate_fragments(rng, seq_array, fragment_start_array, fragment_end_array, mutation_fragment_array, mutation_position_array, mutation_size_array, mutation_type_array)
 
-            # get the fragment sequences
-            init = 0
-            for i in range(fragment_number):
-                initial_fragment_seq = seq[init:cut_point_list[i]]
-                left_end_shortening = random.randrange(0, max_end_shortening + 1)
-                right_end_shortening = random.randrange(0, max_end_shortening + 1)
-                if right_end_shortening == 0:
-                    fragment_seq = initial_fragment_seq[left_end_shortening:]
-                else:
-                    fragment_seq = initial_fragment_seq[left_end_shortening:-right_end_shortening]
-                if len(fragment_seq) > 0:
-                    seq_list.append(fragment_seq)
-                init = cut_point_list[i]
+    # write the fragments whose lenght is greater than or equeal to the minimum fragment length
+    return write_fragments(output_file_id, id_list, fragment_transcript_array, fragment_number_array, base_array, fragment_length_array, parameter_dict['min_fragment_length'])
 
-                xlib.Message.print('trace', f'initial_fragment_seq: {initial_fragment_seq}')
-                xlib.Message.print('trace', f'left_end_shortening: {left_end_shortening} - right_end_shortening: {right_end_shortening}')
-                xlib.Message.print('trace', f'fragment_seq: {fragment_seq}')
+#-------------------------------------------------------------------------------
 
-        # there is not fragmentation
-        else:
-            seq_list.append(seq)
+def get_fragments(rng, seq_length_array, fragmentation_probability, max_fragment_number, max_end_shortening):
+    '''
+    Get the fragments with some nucleotide of a block of transcripts: arrays with the transcript, start and end
+    of every fragment ordered by transcript and start. When a transcript is fragmented, a random number of cut
+    points are drawn, the fragments are the sequences ending in every cut point and their ends are shortened.
+    '''
 
-        xlib.Message.print('trace', f'len(seq_list): {len(seq_list)}')
+    # set the transcript number
+    transcript_number = len(seq_length_array)
 
-        # determine mutations of the sequence
-        if mutation_probability > random.random():
+    # determine the fragmentation of the sequences (sequences with less than 3 nucleotides can not be cut)
+    fragmented_array = (rng.random(transcript_number) < fragmentation_probability) & (seq_length_array > 2)
+    fragmented_transcript_array = np.flatnonzero(fragmented_array)
+    unfragmented_transcript_array = np.flatnonzero(~fragmented_array)
 
-            # get the mutation number
-            mutation_number = random.randrange(1, max_mutation_number + 1)
+    # get the cut points of the fragmented sequences ordered by transcript and position
+    cut_number_array = rng.integers(2, max_fragment_number + 1, size=len(fragmented_transcript_array))
+    cut_transcript_array = np.repeat(fragmented_transcript_array, cut_number_array)
+    cut_point_array = rng.integers(2, seq_length_array[cut_transcript_array])
+    cut_order_array = np.lexsort((cut_point_array, cut_transcript_array))
+    cut_transcript_array = cut_transcript_array[cut_order_array]
+    cut_point_array = cut_point_array[cut_order_array]
 
-            xlib.Message.print('trace', f'mutation_number: {mutation_number}')
+    # every fragment begins in the previous cut point of the transcript and ends in its cut point
+    cut_start_array = np.zeros(len(cut_point_array), dtype=np.int64)
+    cut_start_array[1:] = cut_point_array[:-1]
+    cut_start_array[np.flatnonzero(np.diff(cut_transcript_array, prepend=-1))] = 0
 
-            # calculate mutations
-            for i in range(mutation_number):
+    # shorten the ends of the fragments
+    cut_start_array += rng.integers(0, max_end_shortening + 1, size=len(cut_point_array))
+    cut_end_array = cut_point_array - rng.integers(0, max_end_shortening + 1, size=len(cut_point_array))
 
-                # determine the fragment where the mutation is locate
-                j = random.randrange(0, len(seq_list))
+    # join the fragments and the unfragmented sequences ordered by transcript
+    fragment_transcript_array = np.concatenate((cut_transcript_array, unfragmented_transcript_array))
+    fragment_start_array = np.concatenate((cut_start_array, np.zeros(len(unfragmented_transcript_array), dtype=np.int64)))
+    fragment_end_array = np.concatenate((cut_end_array, seq_length_array[unfragmented_transcript_array]))
+    fragment_order_array = np.argsort(fragment_transcript_array, kind='stable')
 
-                # mutate the fragment
-                seq_list[j] = mutate_sequence(seq_list[j], indel_probability, max_mutation_size)
+    # get the fragments with some nucleotide
+    fragment_order_array = fragment_order_array[fragment_end_array[fragment_order_array] > fragment_start_array[fragment_order_array]]
 
-                xlib.Message.print('trace', f'fragment mutate: {j}')
-                xlib.Message.print('trace', f'mutated fragment_seq: {seq_list[j]}')
+    # return the fragment data
+    return fragment_transcript_array[fragment_order_array], fragment_start_array[fragment_order_array], fragment_end_array[fragment_order_array]
 
-        # write sequences whose lenght is greater than or equeal to the minimum fragment length
-        for i in range(len(seq_list)):
-            if len(seq_list[i]) >= min_fragment_length:
+#-------------------------------------------------------------------------------
 
-                # write the header record
-                if len(seq_list) == 1:
-                    output_file_id.write(f'>{id}\n')
-                else:
-                    output_file_id.write(f'>{id}-FRAGMENT{i + 1}\n')
+def get_mutations(rng, fragment_number_array, fragment_length_array, mutation_probability, max_mutation_number, indel_probability, max_mutation_size):
+    '''
+    Get the mutations of the fragments of a block of transcripts: arrays with the fragment, position in the fragment,
+    size and type (Const.DEBASING_SUBSTITUTION, Const.DEBASING_INSERTION or Const.DEBASING_DELETION) of every mutation.
+    The positions are drawn in the fragment before mutating it.
+    '''
 
-                # write the sequence
-                j = 0
-                while j < len(seq_list[i]) - xlib.Const.FASTA_RECORD_LEN:
-                    output_file_id.write(f'{seq_list[i][j:j + xlib.Const.FASTA_RECORD_LEN]}\n')
-                    j += xlib.Const.FASTA_RECORD_LEN
-                output_file_id.write(f'{seq_list[i][j:]}\n')
+    # set the transcript number
+    transcript_number = len(fragment_number_array)
 
-                # add 1 to the written sequence counter
-                written_seq_counter += 1
+    # determine the mutations number of the sequences
+    mutated_array = (rng.random(transcript_number) < mutation_probability) & (fragment_number_array > 0)
+    mutation_number_array = np.where(mutated_array, rng.integers(1, max_mutation_number + 1, size=transcript_number), 0)
 
-        # print the counters
-        xlib.Message.print('verbose', f'\rTranscripts seqs ... {read_seq_counter:8d} - Output seqs ... {written_seq_counter:8d}')
+    # determine the fragment where every mutation is located
+    mutation_transcript_array = np.repeat(np.arange(transcript_number), mutation_number_array)
+    first_fragment_array = np.cumsum(fragment_number_array) - fragment_number_array
+    mutation_fragment_array = first_fragment_array[mutation_transcript_array] + rng.integers(0, fragment_number_array[mutation_transcript_array])
+    mutation_number = len(mutation_fragment_array)
 
-    # close files
-    fasta_file_id.close()
-    output_file_id.close()
+    # get the mutation sizes and types
+    mutation_size_array = rng.integers(1, max_mutation_size + 1, size=mutation_number)
+    mutation_type_array = np.full(mutation_number, xlib.Const.DEBASING_SUBSTITUTION, dtype=np.int8)
+    indel_array = rng.random(mutation_number) < indel_probability
+    insertion_array = rng.random(mutation_number) < 0.5
+    mutation_type_array[indel_array & insertion_array] = xlib.Const.DEBASING_INSERTION
+    mutation_type_array[indel_array & ~insertion_array] = xlib.Const.DEBASING_DELETION
 
-    # print OK message
-    xlib.Message.print('verbose', f'\nThe file {os.path.basename(output_file)} containing debased sequences is created.')
+    # get the mutation positions: an insertion is located before any nucleotide and the rest of mutations can not exceed the fragment end
+    mutation_fragment_length_array = fragment_length_array[mutation_fragment_array]
+    position_limit_array = np.where(mutation_type_array == xlib.Const.DEBASING_INSERTION, mutation_fragment_length_array, np.maximum(mutation_fragment_length_array - mutation_size_array, 1))
+    mutation_position_array = rng.integers(0, position_limit_array)
+
+    # return the mutation data
+    return mutation_fragment_array, mutation_position_array, mutation_size_array, mutation_type_array
 
 #-------------------------------------------------------------------------------
 
-def mutate_sequence(seq, indel_probability, max_mutation_size):
+def mutate_fragments(rng, seq_array, fragment_start_array, fragment_end_array, mutation_fragment_array, mutation_position_array, mutation_size_array, mutation_type_array):
     '''
-    Mutate the sequence varying several nucleotides or doing a indel.
+    Build the array of bytes with the fragment sequences applying the mutations and get it and the array
+    of the fragment lengths. Substituted and inserted nucleotides are lowercase.
     '''
 
-    # initialize the new sequence
-    new_seq = ''
+    # get the fragment sequences
+    base_array = seq_array[get_range_mask(fragment_start_array, fragment_end_array, len(seq_array))]
+    fragment_length_array = fragment_end_array - fragment_start_array
+    fragment_offset_array = np.cumsum(fragment_length_array) - fragment_length_array
+
+    # get the mutation positions in the array of the fragment sequences and the mutation sizes limited to the fragment end
+    mutation_offset_array = fragment_offset_array[mutation_fragment_array] + mutation_position_array
+    limited_size_array = np.minimum(mutation_size_array, fragment_length_array[mutation_fragment_array] - mutation_position_array)
+
+    # substitute nucleotides: the substituted nucleotides of a mutation have to be different from the original ones
+    substitution_array = np.flatnonzero(mutation_type_array == xlib.Const.DEBASING_SUBSTITUTION)
+    (substitution_index_array, substitution_mutation_array) = get_range_index_array(mutation_offset_array[substitution_array], limited_size_array[substitution_array])
+    substitution_base_array = get_random_nucleotides(rng, len(substitution_index_array))
+    while True:
+        # (clearing the bit 5 of a letter gets its uppercase)
+        different_array = (base_array[substitution_index_array] & 0xDF) != (substitution_base_array & 0xDF)
+        unchanged_mutation_array = np.bincount(substitution_mutation_array, weights=different_array, minlength=len(substitution_array)) == 0
+        if not unchanged_mutation_array.any():
+            break
+        redrawn_array = unchanged_mutation_array[substitution_mutation_array]
+        substitution_base_array[redrawn_array] = get_random_nucleotides(rng, np.count_nonzero(redrawn_array))
+    base_array[substitution_index_array] = substitution_base_array
+
+    # mark the deleted nucleotides and subtract them from the fragment lengths
+    keep_array = np.ones(len(base_array), dtype=bool)
+    deletion_array = np.flatnonzero(mutation_type_array == xlib.Const.DEBASING_DELETION)
+    (deletion_index_array, _) = get_range_index_array(mutation_offset_array[deletion_array], limited_size_array[deletion_array])
+    keep_array[deletion_index_array] = False
+    deleted_index_array = np.flatnonzero(~keep_array)
+    fragment_length_array = fragment_length_array - np.bincount(np.searchsorted(fragment_offset_array, deleted_index_array, side='right') - 1, minlength=len(fragment_length_array))
+
+    # insert nucleotides in one pass and add them to the fragment lengths
+    insertion_array = np.flatnonzero(mutation_type_array == xlib.Const.DEBASING_INSERTION)
+    insertion_offset_array = np.repeat(mutation_offset_array[insertion_array], mutation_size_array[insertion_array])
+    base_array = np.insert(base_array, insertion_offset_array, get_random_nucleotides(rng, len(insertion_offset_array)))
+    keep_array = np.insert(keep_array, insertion_offset_array, True)
+    fragment_length_array += np.bincount(mutation_fragment_array[insertion_array], weights=mutation_size_array[insertion_array], minlength=len(fragment_length_array)).astype(np.int64)
+
+    # return the fragment sequences without the deleted nucleotides and their lengths
+    return base_array[keep_array], fragment_length_array
 
-    # get the mutation size
-    mutation_size = random.randrange(1, max_mutation_size + 1)
+#-------------------------------------------------------------------------------
 
-    # there is an indel
-    if indel_probability > random.random():
+def write_fragments(output_file_id, id_list, fragment_transcript_array, fragment_number_array, base_array, fragment_length_array, min_fragment_length):
+    '''
+    Write the fragments whose lenght is greater than or equeal to the minimum fragment length
+    and return the number of written sequences.
+    '''
 
-        # if there is a insertion
-        if random.random() < 0.5:
+    # get the fragment order in its transcript
+    fragment_order_array = np.arange(len(fragment_transcript_array)) - (np.cumsum(fragment_number_array) - fragment_number_array)[fragment_transcript_array]
+
+    # get the written fragments and their nucleotides
+    fragment_offset_array = np.cumsum(fragment_length_array) - fragment_length_array
+    written_fragment_array = np.flatnonzero(fragment_length_array >= min_fragment_length)
+    written_length_array = fragment_length_array[written_fragment_array]
+    written_base_array = base_array[get_range_mask(fragment_offset_array[written_fragment_array], fragment_offset_array[written_fragment_array] + written_length_array, len(base_array))]
+
+    # build the sequence records of the written fragments: the nucleotides with a new line after every Const.FASTA_RECORD_LEN nucleotides and after the last one
+    record_number_array = (written_length_array + xlib.Const.FASTA_RECORD_LEN - 1) // xlib.Const.FASTA_RECORD_LEN
+    text_length_array = written_length_array + record_number_array
+    text_offset_array = np.cumsum(text_length_array) - text_length_array
+    (record_index_array, record_fragment_array) = get_range_index_array(np.zeros(len(record_number_array), dtype=np.int64), record_number_array)
+    new_line_array = text_offset_array[record_fragment_array] + np.minimum((record_index_array + 1) * xlib.Const.FASTA_RECORD_LEN, written_length_array[record_fragment_array]) + record_index_array
+    text_array = np.empty(int(text_length_array.sum()), dtype=np.uint8)
+    base_mask_array = np.ones(len(text_array), dtype=bool)
+    base_mask_array[new_line_array] = False
+    text_array[base_mask_array] = written_base_array
+    text_array[new_line_array] = ord('\n')
+    text = text_array.tobytes().decode('iso-8859-1')
+
+    # build the records of the written fragments
+    record_list = []
+    for (fragment, text_offset, text_length) in zip(written_fragment_array.tolist(), text_offset_array.tolist(), text_length_array.tolist()):
+        transcript = fragment_transcript_array[fragment]
+        if fragment_number_array[transcript] == 1:
+            record_list.append(f'>{id_list[transcript]}\n')
+        else:
+            record_list.append(f'>{id_list[transcript]}-FRAGMENT{fragment_order_array[fragment] + 1}\n')
+        record_list.append(text[text_offset:text_offset + text_length])
 
-            # get indel initial position
-            j = random.randrange(0, len(seq))
+    # write the records
+    output_file_id.write(''.join(record_list))
 
-            # get the insertion sequence
-            insertion_seq = generate_random_sequence(mutation_size).lower()
+    # return the number of written sequences
+    return len(written_fragment_array)
 
-            # build the new sequence
-            new_seq = seq[:j] + insertion_seq + seq[j:]
+#-------------------------------------------------------------------------------
 
-        # there is a deletion
-        else:
+def get_range_index_array(start_array, length_array):
+    '''
+    Get the concatenated indexes of several ranges (start and length) and the range of every index.
+    '''
 
-            # get indel initial position
-            j = random.randrange(0, max(len(seq) - mutation_size, 1))
+    range_array = np.repeat(np.arange(len(start_array)), length_array)
+    index_array = start_array[range_array] + np.arange(len(range_array)) - (np.cumsum(length_array) - length_array)[range_array]
 
-            # build the new sequence
-            new_seq = seq[:j] + seq[(j + mutation_size):]
+    return index_array, range_array
 
-    # there is a mutation of several nucleotides
-    else:
+#-------------------------------------------------------------------------------
 
-        # get mutation position
-        j = random.randrange(0, max(len(seq) - mutation_size, 1))
+def get_range_mask(start_array, end_array, size):
+    '''
+    Get the boolean mask of the indexes of an array with the passed size which are in several ranges (start and end)
+    ordered and disjoint. The mask is built as the runs of indexes out of and in the ranges.
+    '''
 
-        # get the mutated nucleotide
-        while True:
-            mutated_nucleotides = generate_random_sequence(mutation_size).lower()
-            # verify that mutated nucleotide is not equal to nucleotide without mutation
-            if mutated_nucleotides.upper() != seq[j:j+mutation_size].upper():
-                break
+    # get the run lengths: a run out of the ranges before every range, the range and the run after the last range
+    run_length_array = np.empty(2 * len(start_array) + 1, dtype=np.int64)
+    run_length_array[0:-1:2] = start_array - np.concatenate(([0], end_array[:-1]))
+    run_length_array[1::2] = end_array - start_array
+    run_length_array[-1] = size - (end_array[-1] if len(end_array) > 0 else 0)
 
-        # build the new sequence
-        new_seq = seq[:j] + mutated_nucleotides + seq[(j + mutation_size):]
+    # get the run values
+    run_value_array = np.zeros(len(run_length_array), dtype=bool)
+    run_value_array[1::2] = True
 
-    # return the mutated sequence
-    return new_seq
+    # return the mask
+    return np.repeat(run_value_array, run_length_array)
 
 #-------------------------------------------------------------------------------
 
-def generate_random_sequence(length):
+def get_random_nucleotides(rng, length):
     '''
-    Generate randomly a nucleotides sequence with the length passed.
+    Generate randomly an array of bytes with lowercase nucleotides with the length passed.
     '''
 
-    # the four nucleotides
-    nucleotide_list = ['A', 'T', 'C', 'G']
-
-    # initialize the sequence
-    seq = ''
-
-    # get randomly a new nucleotide and add it to the sequence
-    for _ in range(length):
-        radnum = random.randrange(0, 4)
-        seq += nucleotide_list[radnum]
-
-    # return the sequence
-    return seq
+    return np.frombuffer(b'atcg', dtype=np.uint8)[rng.integers(0, 4, size=length)]
 
 #-------------------------------------------------------------------------------
 
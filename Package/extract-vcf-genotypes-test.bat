@@ -50,6 +50,7 @@ rem Run the program extract-vcf-genotypes.py
     --vcf=%DATA_DIR%\EFS.vcf ^
     --imd_id=99 ^
     --out=%OUTPUT_DIR%\EFS-genotypes.csv ^
+    --metrics=NONE ^
     --verbose=Y ^
     --trace=N ^
     --tvi=NONE
@@ -47,6 +47,7 @@ cd $NGSHELPER_DIR
         --vcf=$DATA_DIR/EFS.vcf \
         --imd_id=99 \
         --out=$OUTPUT_DIR/EFS-genotypes.csv \
+        --metrics=NONE \
         --verbose=Y \
         --trace=N \
         --tvi=NONE
@@ -29,10 +29,16 @@ import gzip
 import os
 import sys
 
+import xgenotype
 import xlib
 
 #-------------------------------------------------------------------------------
 
+# import heavy modules when they are used for the first time
+np = xlib.LazyModule('numpy')
+
+#-------------------------------------------------------------------------------
+
 def main():
     '''
     Main line of the program.
@@ -46,8 +52,13 @@ def main():
     args = parser.parse_args()
     check_args(args)
 
-    # extract genotype data of every variant from a VCF file
-    extract_vcf_genotypes(args.input_vcf_file, args.imputed_md_id, args.output_genotype_file, args.tvi_list)
+    # measure the run metrics (the report is written when the run ends)
+    with xlib.Metrics.run(args.metrics_file):
+
+        # extract genotype data of every variant from a VCF file
+        with xlib.Metrics.stage('extract genotype data') as stage:
+            record_counter = extract_vcf_genotypes(args.input_vcf_file, args.imputed_md_id, args.output_genotype_file, args.tvi_list)
+            stage.add(records=record_counter, bytes_number=os.path.getsize(args.input_vcf_file))
 
 #-------------------------------------------------------------------------------
 
@@ -59,7 +70,8 @@ def build_parser():
     # create the parser and add arguments
     description = 'Description: This program extracts genotype data of every variant from a VCF file.\n' \
         'compatibility between each mother and its progeny, and imputes missing data of progeny genotypes\n' \
-        'according to the selected imputation scenario.'
+        'according to the selected imputation scenario.\n' \
+        f'Allele indexes of genotypes (subfield GT) greater than {xlib.Const.GT_MAX_ALLELE_CODE} are not supported.'
     text = f'{xlib.get_project_name()} v{xlib.get_project_version()} - {os.path.basename(__file__)}\n\n{description}\n'
     usage = f'\r{text.ljust(len("usage:"))}\nUsage: {os.path.basename(__file__)} arguments'
     parser = argparse.ArgumentParser(usage=usage)
@@ -67,6 +79,7 @@ def build_parser():
     parser.add_argument('--vcf', dest='input_vcf_file', help='Path of input VCF file (mandatory).')
     parser.add_argument('--imd_id', dest='imputed_md_id', help=f'Identification of the alternative allele for imputed missing data; default {xlib.Const.DEFAULT_IMPUTED_MD_ID}')
     parser.add_argument('--out', dest='output_genotype_file', help='Path of genotype data file (mandatory).')
+    parser.add_argument('--metrics', dest='metrics_file', help='Path of the output JSON file with the run metrics (elapsed time, throughput of stages and peak memory) or NONE; default: NONE.')
     parser.add_argument('--verbose', dest='verbose', help=f'Additional job status info during the run: {xlib.get_verbose_code_list_text()}; default: {xlib.Const.DEFAULT_VERBOSE}.')
     parser.add_argument('--trace', dest='trace', help=f'Additional info useful to the developer team: {xlib.get_trace_code_list_text()}; default: {xlib.Const.DEFAULT_TRACE}.')
     parser.add_argument('--tvi', dest='tvi_list', help='Variant identification list to trace with format seq_id_1-pos_1,seq_id_2-pos_2,...,seq_id_n-pos_n or NONE; default: NONE.')
@@ -101,6 +114,10 @@ def check_args(args):
         xlib.Message.print('error', '*** The output genotype data file is not indicated in the input arguments.')
         OK = False
 
+    # check "metrics_file"
+    if args.metrics_file is None or args.metrics_file.upper() == 'NONE':
+        args.metrics_file = None
+
     # check "verbose"
     if args.verbose is None:
         args.verbose = xlib.Const.DEFAULT_VERBOSE
@@ -133,7 +150,7 @@ def check_args(args):
 
 def extract_vcf_genotypes(input_vcf_file, imputed_md_id, output_genotype_file, tvi_list):
     '''
-    Extract genotype data of every variant from a VCF file.
+    Extract genotype data of every variant from a VCF file and return the number of records read.
     '''
 
     # initialize the sample number
@@ -154,26 +171,16 @@ def extract_vcf_genotypes(input_vcf_file, imputed_md_id, output_genotype_file, t
         except Exception as e:
             raise xlib.ProgramException(e, 'F001', input_vcf_file)
 
-    # set temporal genotype data file name
-    if output_genotype_file.endswith('.gz'):
-        tmp_genotype_file = f'{output_genotype_file[:-3]}.tmp.gz'
-    else:
-        tmp_genotype_file = f'{output_genotype_file}.tmp'
+    # initialize the genotype parser
+    genotype_parser = xgenotype.GenotypeParser(sample_number, imputed_md_id)
 
-    # open the temporal genotype data file
-    if tmp_genotype_file.endswith('.gz'):
-        try:
-            tmp_genotype_file_id = gzip.open(tmp_genotype_file, mode='wt', encoding='iso-8859-1', newline='\n')
-        except Exception as e:
-            raise xlib.ProgramException(e, 'F004', tmp_genotype_file)
-    else:
-        try:
-            tmp_genotype_file_id = open(tmp_genotype_file, mode='w', encoding='iso-8859-1', newline='\n')
-        except Exception as e:
-            raise xlib.ProgramException(e, 'F003', tmp_genotype_file)
+    # initialize the variant data lists
+    variant_data_list = []
 
-    # write the header of the temporal genotype data file
-    tmp_genotype_file_id.write('seq_id;position;ref;alt;genotype;counter\n')
+    # initialize the matrix of genotype class counters per variant (rows: variants; columns: canonical genotype class indexes)
+    # and the missing data counter array; both grow when it is necessary
+    genotype_counter_matrix = np.zeros((xlib.Const.GENOTYPE_CHUNK_SIZE, 0), dtype=np.int32)
+    md_counter_array = np.zeros(xlib.Const.GENOTYPE_CHUNK_SIZE, dtype=np.int32)
 
     # initialize counters
     input_record_counter = 0
@@ -208,6 +215,7 @@ def extract_vcf_genotypes(input_vcf_file, imputed_md_id, output_genotype_file, t
 
             # set the sample number
             sample_number = len(record_data_list) - 9
+            genotype_parser = xgenotype.GenotypeParser(sample_number, imputed_md_id)
 
             # print the counters
             xlib.Message.print('verbose', f'\rProcessed records ... {input_record_counter:8d} - Total variants ... {total_variant_counter:8d}')
@@ -240,85 +248,46 @@ def extract_vcf_genotypes(input_vcf_file, imputed_md_id, output_genotype_file, t
             except Exception:
                 pass
 
-            # set the maximum allele number
-            if maximum_allele_number < 1 + len(alternative_allele_list):
-                maximum_allele_number = 1 + len(alternative_allele_list)
-
-            # get the position of the genotype (subfield GT) in the field FORMAT
-            format_subfield_list = data_dict['format'].upper().split(':')
-            try:
-                gt_position = format_subfield_list.index('GT')
-            except Exception as e:
-                raise xlib.ProgramException(e, 'L007', 'GT', data_dict['chrom'], data_dict['pos'])
-
-            # build the list of sample genotypes of a variant
-            sample_data_list = []
-            sample_gt_list = []
-            for i in range(sample_number):
-                sample_data_list.append(data_dict['sample_list'][i].split(':'))
-                sample_gt_list.append(sample_data_list[i][gt_position])
-
-            # build the lists of the left and right side of sample genotypes of a variant
-            sample_gt_left_list = []
-            sample_sep_list = []
-            sample_gt_right_list = []
-            for i in range(sample_number):
-                sep = '/'
-                sep_pos = sample_gt_list[i].find(sep)
-                if sep_pos == -1:
-                    sep = '|'
-                    sep_pos = sample_gt_list[i].find(sep)
-                if sep_pos == -1:
-                    raise xlib.ProgramException('', 'L008', 'GT', data_dict['chrom'], data_dict['pos'])
-                sample_sep_list.append(sep)
-                if sample_gt_list[i][:sep_pos] == xlib.get_md_symbol():
-                    sample_gt_left_list.append(xlib.get_md_symbol())
-                elif sample_gt_list[i][:sep_pos] == imputed_md_id:
-                    sample_gt_left_list.append(99)
-                else:
-                    sample_gt_left_list.append(int(sample_gt_list[i][:sep_pos]))
-                if sample_gt_list[i][sep_pos+1:] == xlib.get_md_symbol():
-                    sample_gt_right_list.append(xlib.get_md_symbol())
-                elif sample_gt_list[i][sep_pos+1:] == imputed_md_id:
-                    sample_gt_right_list.append(99)
-                else:
-                    sample_gt_right_list.append(int(sample_gt_list[i][sep_pos+1:]))
-
-            # initialize genotype counter dictionary
-            genotype_counter_dict = {}
-            for j in range(1 + len(alternative_allele_list) + 1):
-                for k in range(j, 1 + len(alternative_allele_list) + 1):
-                    if j != (1 + len(alternative_allele_list)) and k != (1 + len(alternative_allele_list)):
-                        genotype_counter_dict[f'{j}/{k}'] = 0
-                    elif j != (1 + len(alternative_allele_list)) and k == (1 + len(alternative_allele_list)):
-                        genotype_counter_dict[f'{j}/99'] = 0
-                    elif j == (1 + len(alternative_allele_list)) and k != (1 + len(alternative_allele_list)):
-                        genotype_counter_dict[f'99/{k}'] = 0
-                    elif j == (1 + len(alternative_allele_list)) and k == (1 + len(alternative_allele_list)):
-                        genotype_counter_dict['99/99'] = 0
-            if variant_id in tvi_list: xlib.Message.print('trace', f'genotype_counter_dict: {genotype_counter_dict}')
-
-            # initialize missing data counter
-            md_counter = 0
+            # set the allele number of the variant and the maximum allele number
+            allele_number = 1 + len(alternative_allele_list)
+            if maximum_allele_number < allele_number:
+                maximum_allele_number = allele_number
+
+            # get the arrays of the left and right allele codes of the sample genotypes (missing data: -1; imputed missing data: 99)
+            (left_array, right_array) = genotype_parser.parse(data_dict)
+            left_array = np.where(left_array == xlib.Const.GT_IMPUTED_MD_CODE, 99, left_array)
+            right_array = np.where(right_array == xlib.Const.GT_IMPUTED_MD_CODE, 99, right_array)
+
+            # count the genotypes with missing data
+            md_mask = (left_array == xlib.Const.GT_MD_CODE) | (right_array == xlib.Const.GT_MD_CODE)
+            md_counter = int(np.count_nonzero(md_mask))
+
+            # get the canonical genotype class index of the genotypes without missing data
+            (left_array, right_array) = (left_array[~md_mask], right_array[~md_mask])
+            if np.any(((left_array >= allele_number) & (left_array != 99)) | ((right_array >= allele_number) & (right_array != 99))):
+                raise xlib.ProgramException('', 'L008', 'GT', data_dict['chrom'], data_dict['pos'])
+            genotype_class_index_array = get_genotype_class_index_array(left_array, right_array)
+
+            # grow the matrix of genotype class counters and the missing data counter array when it is necessary
+            (row_number, column_number) = genotype_counter_matrix.shape
+            if len(variant_data_list) == row_number or get_genotype_class_number(allele_number) > column_number:
+                if len(variant_data_list) == row_number:
+                    row_number *= 2
+                column_number = max(column_number, get_genotype_class_number(allele_number))
+                new_genotype_counter_matrix = np.zeros((row_number, column_number), dtype=np.int32)
+                new_genotype_counter_matrix[:genotype_counter_matrix.shape[0], :genotype_counter_matrix.shape[1]] = genotype_counter_matrix
+                genotype_counter_matrix = new_genotype_counter_matrix
+                md_counter_array = np.resize(md_counter_array, row_number)
 
             # count genotypes
-            for i in range(sample_number):
-                if sample_gt_left_list[i] == xlib.get_md_symbol() or sample_gt_right_list == xlib.get_md_symbol():
-                    md_counter += 1
-                else:
-                    if sample_gt_left_list[i] <= sample_gt_right_list[i]:
-                        j = sample_gt_left_list[i]
-                        k = sample_gt_right_list[i]
-                    else:
-                        j = sample_gt_right_list[i]
-                        k = sample_gt_left_list[i]
-                    genotype_counter_dict[f'{j}/{k}'] = genotype_counter_dict[f'{j}/{k}'] + 1
-            if variant_id in tvi_list: xlib.Message.print('trace', f'genotype_counter_dict: {genotype_counter_dict}')
-
-            # write the variant gewnotype count records
-            for key in genotype_counter_dict.keys():
-                tmp_genotype_file_id.write(f'{data_dict["chrom"]};{data_dict["pos"]};{reference_bases};{alternative_alleles};{key};{genotype_counter_dict[key]}\n')
-            tmp_genotype_file_id.write(f'{data_dict["chrom"]};{data_dict["pos"]};{reference_bases};{alternative_alleles};{xlib.get_md_symbol()};{md_counter}\n')
+            variant_index = len(variant_data_list)
+            genotype_counter_matrix[variant_index] = np.bincount(genotype_class_index_array, minlength=column_number)
+            md_counter_array[variant_index] = md_counter
+            variant_data_list.append((data_dict['chrom'], data_dict['pos'], reference_bases, alternative_alleles))
+            if variant_id in tvi_list:
+                (genotype_class_list, genotype_class_index_list) = get_genotype_class_list(allele_number)
+                genotype_counter_dict = dict(zip(genotype_class_list, genotype_counter_matrix[variant_index, genotype_class_index_list].tolist()))
+                xlib.Message.print('trace', f'genotype_counter_dict: {genotype_counter_dict} - md_counter: {md_counter}')
 
             # print the counters
             xlib.Message.print('verbose', f'\rProcessed records ... {input_record_counter:8d} - Total variants ... {total_variant_counter:8d}')
@@ -328,24 +297,8 @@ def extract_vcf_genotypes(input_vcf_file, imputed_md_id, output_genotype_file, t
 
     xlib.Message.print('verbose', '\n')
 
-    # close files
+    # close the input VCF file
     input_vcf_file_id.close()
-    tmp_genotype_file_id.close()
-
-    # print OK message
-    xlib.Message.print('info', f'The file {os.path.basename(tmp_genotype_file)} is created.')
-
-    # open the temporal genotype data file
-    if tmp_genotype_file.endswith('.gz'):
-        try:
-            tmp_genotype_file_id = gzip.open(tmp_genotype_file, mode='rt', encoding='iso-8859-1', newline='\n')
-        except Exception as e:
-            raise xlib.ProgramException(e, 'F002', tmp_genotype_file)
-    else:
-        try:
-            tmp_genotype_file_id = open(tmp_genotype_file, mode='r', encoding='iso-8859-1', newline='\n')
-        except Exception as e:
-            raise xlib.ProgramException(e, 'F001', tmp_genotype_file)
 
     # open the genotype data file
     if output_genotype_file.endswith('.gz'):
@@ -359,153 +312,87 @@ def extract_vcf_genotypes(input_vcf_file, imputed_md_id, output_genotype_file, t
         except Exception as e:
             raise xlib.ProgramException(e, 'F003', output_genotype_file)
 
-    # initialize record counters
-    input_record_counter = 0
-
     # write the header of the genotype data file
-    maximum_variant_list = []
-    for j in range(maximum_allele_number + 1):
-        for k in range(j, maximum_allele_number + 1):
-            if j != (maximum_allele_number) and k != (maximum_allele_number):
-                maximum_variant_list.append(f'{j}/{k}')
-            elif j != (maximum_allele_number) and k == (maximum_allele_number):
-                maximum_variant_list.append(f'{j}/99')
-            elif j == (maximum_allele_number) and k != (maximum_allele_number):
-                maximum_variant_list.append(f'99/{k}')
-            elif j == (maximum_allele_number) and k == (maximum_allele_number):
-                maximum_variant_list.append('99/99')
-    maximum_variant_list.append('.')
-    if variant_id in tvi_list: xlib.Message.print('trace', f'maximum_variant_list: {maximum_variant_list}')
-    output_genotype_file_id.write(f'seq_id;position;ref;alt;{';'.join(maximum_variant_list)}\n')
-
-    # read the first record of the temporal genotype data file
-    (record, _, data_dict) = read_temporal_genotype_data_file_record(tmp_genotype_file, tmp_genotype_file_id, input_record_counter)
-
-    # set the first record control variable
-    first_record = True
-
-    # while there are records in the temporal genotype data file
-    while record != '':
-
-        # the header record
-        if first_record:
-
-            # set the first record control variable
-            first_record = False
-
-            # read the next record of the temporal genotype data file
-            (record, _, data_dict) = read_temporal_genotype_data_file_record(tmp_genotype_file, tmp_genotype_file_id, input_record_counter)
-
-        # data records
-        else:
-
-            # save old values
-            old_seq_id = data_dict['seq_id']
-            old_position = data_dict['position']
-            old_ref = data_dict['ref']
-            old_alt = data_dict['alt']
-
-            # initialize genotype counter dictionary
-            genotype_counter_dict = {}
-            for j in range(maximum_allele_number + 1):
-                for k in range(j, maximum_allele_number + 1):
-                    if j != maximum_allele_number and k != maximum_allele_number:
-                        genotype_counter_dict[f'{j}/{k}'] = 0
-                    elif j != maximum_allele_number and k == maximum_allele_number:
-                        genotype_counter_dict[f'{j}/99'] = 0
-                    elif j == maximum_allele_number and k != maximum_allele_number:
-                        genotype_counter_dict[f'99/{k}'] = 0
-                    elif j == maximum_allele_number and k == maximum_allele_number:
-                        genotype_counter_dict['99/99'] = 0
-            genotype_counter_dict['.'] = 0
-            if f'{old_seq_id}-{old_position}' in tvi_list: xlib.Message.print('trace', f'***genotype_counter_dict: {genotype_counter_dict}')
-
-            # while there are records in the temporal genotype data file and the same variant
-            while record != '' and data_dict['seq_id'] == old_seq_id and data_dict['position'] == old_position:
-
-                # save the genotype counter in the genotype counter dictionary
-                genotype_counter_dict[data_dict['genotype']] = data_dict['counter']
-
-                # read the next record of the temporal genotype data file
-                (record, _, data_dict) = read_temporal_genotype_data_file_record(tmp_genotype_file, tmp_genotype_file_id, input_record_counter)
-
-            if f'{old_seq_id}-{old_position}' in tvi_list: xlib.Message.print('trace', f'***genotype_counter_dict: {genotype_counter_dict}')
-
-            # write the variant gewnotype count records
-            genotype_counter_list = []
-            if sample_number - int(genotype_counter_dict['.']) > 0:
-                for j in range(maximum_allele_number + 1):
-                    for k in range(j, maximum_allele_number + 1):
-                        if j != (maximum_allele_number) and k != (maximum_allele_number):
-                            genotype_counter_list.append(str(int(genotype_counter_dict[f'{j}/{k}'])/(sample_number - int(genotype_counter_dict['.']))))
-                        elif j != (maximum_allele_number) and k == (maximum_allele_number):
-                            genotype_counter_list.append(str(int(genotype_counter_dict[f'{j}/99'])/(sample_number - int(genotype_counter_dict['.']))))
-                        elif j == (maximum_allele_number) and k != (maximum_allele_number):
-                            genotype_counter_list.append(str(int(genotype_counter_dict[f'99/{k}'])/(sample_number - int(genotype_counter_dict['.']))))
-                        elif j == (maximum_allele_number) and k == (maximum_allele_number):
-                            genotype_counter_list.append(str(int(genotype_counter_dict['99/99'])/(sample_number - int(genotype_counter_dict['.']))))
-            genotype_counter_list.append(genotype_counter_dict['.'])
+    (maximum_genotype_class_list, maximum_genotype_class_index_list) = get_genotype_class_list(maximum_allele_number)
+    maximum_variant_text = ';'.join(maximum_genotype_class_list + [xlib.get_md_symbol()])
+    if tvi_list: xlib.Message.print('trace', f'maximum_variant_list: {maximum_genotype_class_list + [xlib.get_md_symbol()]}')
+    output_genotype_file_id.write(f'seq_id;position;ref;alt;{maximum_variant_text}\n')
+
+    # write the genotype class frequencies and the missing data counter of every variant
+    variant_number = len(variant_data_list)
+    genotype_counter_matrix = np.pad(genotype_counter_matrix[:variant_number], ((0, 0), (0, max(0, get_genotype_class_number(maximum_allele_number) - genotype_counter_matrix.shape[1]))))
+    md_counter_array = md_counter_array[:variant_number]
+    for first_variant_index in range(0, variant_number, xlib.Const.GENOTYPE_CHUNK_SIZE):
+        last_variant_index = min(first_variant_index + xlib.Const.GENOTYPE_CHUNK_SIZE, variant_number)
+        genotyped_sample_number_array = sample_number - md_counter_array[first_variant_index:last_variant_index]
+        frequency_matrix = genotype_counter_matrix[first_variant_index:last_variant_index, maximum_genotype_class_index_list] / np.maximum(genotyped_sample_number_array, 1)[:, np.newaxis]
+        for (i, frequency_list) in enumerate(frequency_matrix.tolist()):
+            (seq_id, position, reference_bases, alternative_alleles) = variant_data_list[first_variant_index + i]
+            md_counter = md_counter_array[first_variant_index + i]
+            genotype_counter_list = [str(frequency) for frequency in frequency_list] if genotyped_sample_number_array[i] > 0 else []
+            genotype_counter_list.append(str(md_counter))
             genotype_counter_list_text = ';'.join(genotype_counter_list)
-            output_genotype_file_id.write(f'{old_seq_id};{old_position};{old_ref};{old_alt};{genotype_counter_list_text}\n')
+            output_genotype_file_id.write(f'{seq_id};{position};{reference_bases};{alternative_alleles};{genotype_counter_list_text}\n')
 
-    # close files
-    tmp_genotype_file_id.close()
+    # close the genotype data file
     output_genotype_file_id.close()
 
     # print OK message
     xlib.Message.print('info', f'The file {os.path.basename(output_genotype_file)} is created.')
 
+    # return the record counter
+    return input_record_counter
+
 #-------------------------------------------------------------------------------
 
-def read_temporal_genotype_data_file_record(file_name, file_id, record_counter):
-    '''
-    x
+def get_genotype_class_index_array(left_array, right_array):
     '''
+    Get the canonical index of the genotype classes of the allele code arrays of a variant.
 
-    # initialize the data dictionary
-    data_dict = {}
-
-    # initialize the key
-    key = None
+    The imputed missing data allele (99) is ranked first and the allele n is ranked n + 1, so the canonical
+    index of a genotype class (i/j with rank(i) <= rank(j)) is rank(j) * (rank(j) + 1) / 2 + rank(i) and
+    it does not depend on the allele number of the variant.
+    '''
 
-    # read next record
-    record = file_id.readline()
+    left_rank_array = np.where(left_array == 99, 0, left_array.astype(np.intp) + 1)
+    right_rank_array = np.where(right_array == 99, 0, right_array.astype(np.intp) + 1)
+    low_rank_array = np.minimum(left_rank_array, right_rank_array)
+    high_rank_array = np.maximum(left_rank_array, right_rank_array)
 
-    # if there is record
-    if record != '':
+    return high_rank_array * (high_rank_array + 1) // 2 + low_rank_array
 
-        # remove EOL
-        record = record.strip('\n')
+#-------------------------------------------------------------------------------
 
-        # extract data
-        # format: seq_id;position;ref;alt;genotype;counter
-        data_list = []
-        start = 0
-        for end in [i for i, chr in enumerate(record) if chr == ';']:
-            data_list.append(record[start:end])
-            start = end + 1
-        data_list.append(record[start:].strip('\n'))
-        try:
-            seq_id = data_list[0]
-            position = data_list[1]
-            ref = data_list[2]
-            alt = data_list[3]
-            genotype = data_list[4]
-            counter = data_list[5]
-        except Exception as e:
-            raise xlib.ProgramException(e, 'F009', os.path.basename(file_name), record_counter)
+def get_genotype_class_number(allele_number):
+    '''
+    Get the number of canonical genotype class indexes of a variant with an allele number.
+    '''
 
-        # get the record data dictionary
-        data_dict = {'seq_id': seq_id, 'position': position, 'ref': ref, 'alt': alt, 'genotype': genotype, 'counter': counter}
+    return (allele_number + 1) * (allele_number + 2) // 2
 
-    # if there is not record
-    else:
+#-------------------------------------------------------------------------------
 
-        # set the key
-        key = bytes.fromhex('7E').decode('utf-8')
+def get_genotype_class_list(allele_number):
+    '''
+    Get the genotype classes (i/j with i <= j and the imputed missing data allele 99 as the last allele)
+    of a variant with an allele number and their canonical indexes.
+    '''
 
-    # return the record, key and data dictionary
-    return record, key, data_dict
+    # build the left and right allele codes of the genotype classes
+    allele_code_list = list(range(allele_number)) + [99]
+    left_code_list = []
+    right_code_list = []
+    for (j, left_code) in enumerate(allele_code_list):
+        for right_code in allele_code_list[j:]:
+            left_code_list.append(left_code)
+            right_code_list.append(right_code)
+
+    # build the genotype classes and get their canonical indexes
+    genotype_class_list = [f'{left_code}/{right_code}' for (left_code, right_code) in zip(left_code_list, right_code_list)]
+    genotype_class_index_list = get_genotype_class_index_array(np.array(left_code_list), np.array(right_code_list)).tolist()
+
+    # return the lists
+    return genotype_class_list, genotype_class_index_list
 
 #-------------------------------------------------------------------------------
 
@@ -29,7 +29,6 @@ import collections
 import gzip
 import os
 import sys
-import threading
 
 import xlib
 
@@ -253,62 +252,29 @@ def filter_vcf(threads_num, filtering_action, input_vcf_file, output_vcf_file, t
             # print the counters
             xlib.Message.print('verbose', f'\rProcessed records ... {input_record_counter:8d} - Total variants ... {total_variant_counter:8d} - Imputed variants ... {filtered_variant_counter:8d}')
 
-        # process variant records
-        while record != '' and not record.startswith('##') and not record.startswith('#CHROM'):
+        # process variant records in parallel keeping their order
+        if record != '' and not record.startswith('##') and not record.startswith('#CHROM'):
 
-            # initialize working threads number
-            w_threads_num = 0
+            with xlib.VariantPipeline(max_threads_num, process_variant, [tvi_list, sample_number, filtering_action]) as variant_pipeline:
+                for result_dict in variant_pipeline.process(xlib.iter_vcf_variant_records(record, input_vcf_file_id)):
 
-            # initialize variant data dictionaries list
-            data_dict_list = []
+                    # add 1 to the read sequence counter
+                    input_record_counter += 1
 
-            # create a group of max_threads_num variant records
-            while record != '' and not record.startswith('##') and not record.startswith('#CHROM') and w_threads_num < max_threads_num:
+                    # add 1 to the total variant counter
+                    total_variant_counter += 1
 
-                # add 1 to the read sequence counter
-                input_record_counter += 1
-
-                # add 1 to the total variant counter
-                total_variant_counter += 1
-
-                # add 1 to the working threads number
-                w_threads_num += 1
-
-                # add variant data dictionary to variant data dictionaries list
-                data_dict_list.append(data_dict)
-
-                # read the next record of the input VCF file
-                (record, _, data_dict) = xlib.read_vcf_file(input_vcf_file_id, sample_number=0, check_sample_number=False)
-
-            # create and start threads
-            threads_list = []
-            result_list = []
-            for thread_id in range(w_threads_num):
-                result_list.append({})
-                threads_list.append(threading.Thread(target=process_variant, args=[thread_id, tvi_list, sample_number, filtering_action, data_dict_list[thread_id], result_list]))
-                threads_list[thread_id].start()
-
-            # wait until all threads terminate
-            for thread_id in range(w_threads_num):
-                threads_list[thread_id].join()
-
-            # process results of threads
-            for thread_id in range(w_threads_num):
-
-                # -- print(f'\nthread_id: {thread_id} - result_list[{thread_id}]: {result_list[thread_id]}')
-
-                # write the variant record if filtering is not ncessary
-                try:
-                    if not result_list[thread_id]['filtering']:
-                        output_vcf_file_id.write(result_list[thread_id]['output_vcf_record'])
+                    # write the variant record if filtering is not ncessary
+                    if not result_dict['filtering']:
+                        output_vcf_file_id.write(result_dict['output_vcf_record'])
                     else:
                         filtered_variant_counter += 1
-                except Exception:
-                    print(f'result_list: {result_list}')
-                    sys.exit(1)
 
-                # print the counters
-                xlib.Message.print('verbose', f'\rProcessed records ... {input_record_counter:8d} - Total variants ... {total_variant_counter:8d} - Imputed variants ... {filtered_variant_counter:8d}')
+                    # print the counters
+                    xlib.Message.print('verbose', f'\rProcessed records ... {input_record_counter:8d} - Total variants ... {total_variant_counter:8d} - Imputed variants ... {filtered_variant_counter:8d}')
+
+            # all the records of the input VCF file have been read
+            record = ''
 
     xlib.Message.print('verbose', '\n')
 
@@ -318,9 +284,9 @@ def filter_vcf(threads_num, filtering_action, input_vcf_file, output_vcf_file, t
 
 #-------------------------------------------------------------------------------
 
-def process_variant(thread_id, tvi_list, sample_number, filtering_action, data_dict, result_list):
+def process_variant(tvi_list, sample_number, filtering_action, data_dict):
     '''
-    Process a variant and check if it has to be filtered out.
+    Process a variant, check if it has to be filtered out and return the result.
     '''
 
     # initialize the variable to indicate weather to filter the variant
@@ -391,8 +357,8 @@ def process_variant(thread_id, tvi_list, sample_number, filtering_action, data_d
     sample_list_text = '\t'.join(sample_list)
     output_vcf_record = f'{data_dict["chrom"]}\t{data_dict["pos"]}\t{data_dict["id"]}\t{data_dict["ref"]}\t{data_dict["alt"]}\t{data_dict["qual"]}\t{data_dict["filter"]}\t{data_dict["info"]}\t{data_dict["format"]}\t{sample_list_text}\n'
 
-    # update the result list
-    result_list[thread_id] = {'output_vcf_record': output_vcf_record, 'filtering': filtering}
+    # return the result
+    return {'output_vcf_record': output_vcf_record, 'filtering': filtering}
 
 #-------------------------------------------------------------------------------
 
@@ -49,6 +49,7 @@ rem Run the program get-exon-data-nochim.py
 %PYTHON% %PYTHON_OPTIONS% get-exon-data-nochim.py ^
     --alignment=%DATA_DIR%\alignment.log.gz ^
     --outdir=%OUTPUT_DIR% ^
+    --threads=4 ^
     --verbose=Y ^
     --trace=N
 if %ERRORLEVEL% neq 0 (set RC=%ERRORLEVEL% & set ERROR=2 & goto END)
@@ -46,6 +46,7 @@ cd $NGSHELPER_DIR
     $PYTHON $PYTHON_OPTIONS get-exon-data-wchim.py \
         --alignment=$DATA_DIR/alignment.log.gz \
         --outdir=$OUTPUT_DIR \
+        --threads=4 \
         --verbose=Y  \
         --trace=N
 if [ $? -ne 0 ]; then echo 'Script ended with errors.'; exit 1; fi
@@ -27,6 +27,7 @@ Licence: GNU General Public Licence Version 3.
 
 import argparse
 import gzip
+import io
 import os
 import re
 import sys
@@ -49,7 +50,7 @@ def main():
     check_args(args)
 
     # extract sequences
-    get_exon_data(args.alignment_file, args.output_dir)
+    get_exon_data(args.alignment_file, args.output_dir, args.threads_num)
 
 #-------------------------------------------------------------------------------
 
@@ -66,6 +67,7 @@ def build_parser():
     parser._optionals.title = 'Arguments'    # pylint: disable=protected-access
     parser.add_argument('--alignment', dest='alignment_file', help='Path of GMAP alignment file (mandatory)')
     parser.add_argument('--outdir', dest='output_dir', help='Path of output directoty where files with exons data are saved (mandatory).')
+    parser.add_argument('--threads', dest='threads_num', help=f'Number of threads (processes parsing chunks of the alignment file in parallel); default: {xlib.Const.DEFAULT_THREADS_NUMBER}.')
     parser.add_argument('--verbose', dest='verbose', help=f'Additional job status info during the run: {get_verbose_code_list_text()}; default: {xlib.Const.DEFAULT_VERBOSE}.')
     parser.add_argument('--trace', dest='trace', help=f'Additional info useful to the developer team: {get_trace_code_list_text()}; default: {xlib.Const.DEFAULT_TRACE}.')
 
@@ -98,6 +100,15 @@ def check_args(args):
         xlib.Message.print('error', '*** The output directy does not exist.')
         OK = False
 
+    # check "threads_num"
+    if args.threads_num is None:
+        args.threads_num = xlib.Const.DEFAULT_THREADS_NUMBER
+    elif not xlib.check_int(args.threads_num, minimum=1):
+        xlib.Message.print('error', 'The number of threads has to be an integer number greater than or equal to 1.')
+        OK = False
+    else:
+        args.threads_num = int(args.threads_num)
+
     # check "verbose"
     if args.verbose is None:
         args.verbose = xlib.Const.DEFAULT_VERBOSE
@@ -122,24 +133,13 @@ def check_args(args):
 
 #-------------------------------------------------------------------------------
 
-def get_exon_data(alignment_file, output_dir):
+def get_exon_data(alignment_file, output_dir, threads_num):
     '''
     Parse a GMAP alignment considering chimeras (GMAP options -n 0 -m) in order to get data about
-    the coverage, identity and coordinates of exons.
+    the coverage, identity and coordinates of exons. The alignment file is parsed by chunks beginning in
+    a head record, in parallel when there are several threads, and the results are written in the input order.
     '''
 
-    # open the alignment file
-    if alignment_file.endswith('.gz'):
-        try:
-            alignment_file_id = gzip.open(alignment_file, mode='rt', encoding='iso-8859-1')
-        except Exception as e:
-            raise xlib.ProgramException(e, 'F002', alignment_file)
-    else:
-        try:
-            alignment_file_id = open(alignment_file, mode='r', encoding='iso-8859-1')
-        except Exception as e:
-            raise xlib.ProgramException(e, 'F001', alignment_file)
-
     # set the exon data file
     exon_data_file = f'{output_dir}{os.sep}exon-data.csv'
 
@@ -212,6 +212,79 @@ def get_exon_data(alignment_file, output_dir):
     # write head record of the file of assembly identifications with n paths
     assembly_ids_npaths_file_id.write(f'{head_record}\n')
 
+    # set the chunks of the alignment file: byte ranges read by the workers when the file is uncompressed
+    # and text chunks read by the main process when it is compressed
+    if alignment_file.endswith('.gz'):
+        try:
+            alignment_file_id = gzip.open(alignment_file, mode='rt', encoding='iso-8859-1')
+        except Exception as e:
+            raise xlib.ProgramException(e, 'F002', alignment_file)
+        parse_function = parse_alignment_text
+        chunk_arg_list_iterator = ((alignment_file, alignment_text) for alignment_text in xlib.iter_record_chunks(alignment_file_id, xlib.Const.ALIGNMENT_CHUNK_SIZE))
+    else:
+        alignment_file_id = None
+        parse_function = parse_alignment_range
+        chunk_arg_list_iterator = ((alignment_file, range_offset, length) for (range_offset, length) in xlib.get_record_range_list(alignment_file, xlib.Const.ALIGNMENT_CHUNK_SIZE))
+
+    # initialize record counters
+    alignment_counter = 0
+    exon_counter = 0
+
+    # parse the chunks and write their results in the input order
+    output_file_id_list = [exon_data_file_id, chimera_fasta_file_id, assembly_ids_chimeras_file_id, assembly_ids_0paths_file_id, assembly_ids_1path_file_id, assembly_ids_npaths_file_id]
+    with xlib.OrderedProcessPool(threads_num) as process_pool:
+        for (chunk_alignment_counter, chunk_exon_counter, output_text_list) in process_pool.iter_results(parse_function, chunk_arg_list_iterator):
+
+            # write the results of the chunk
+            for output_file_id, output_text in zip(output_file_id_list, output_text_list):
+                output_file_id.write(output_text)
+
+            # print the counters
+            alignment_counter += chunk_alignment_counter
+            exon_counter += chunk_exon_counter
+            xlib.Message.print('verbose', f'\rAlignments ... {alignment_counter:8d} - Exons ... {exon_counter:8d}')
+
+    # close files
+    if alignment_file_id is not None:
+        alignment_file_id.close()
+    exon_data_file_id.close()
+    chimera_fasta_file_id.close()
+    assembly_ids_chimeras_file_id.close()
+    assembly_ids_0paths_file_id.close()
+    assembly_ids_1path_file_id.close()
+    assembly_ids_npaths_file_id.close()
+
+    # print OK message
+    xlib.Message.print('verbose', f'\nThe file {os.path.basename(exon_data_file)} containing the extacted sequences is created.')
+
+#-------------------------------------------------------------------------------
+
+def parse_alignment_range(alignment_file, range_offset, length):
+    '''
+    Parse a byte range of an uncompressed GMAP alignment file.
+    '''
+
+    return parse_alignment_text(alignment_file, xlib.read_record_range(alignment_file, range_offset, length))
+
+#-------------------------------------------------------------------------------
+
+def parse_alignment_text(alignment_file, alignment_text):
+    '''
+    Parse a chunk of a GMAP alignment file beginning in a head record and get the alignment and exon counters
+    and the text list of the exon data file, chimera FASTA file and files of assembly identifications.
+    '''
+
+    # set the alignment chunk as a file
+    alignment_file_id = io.StringIO(alignment_text)
+
+    # set the outputs of the chunk
+    exon_data_file_id = io.StringIO()
+    chimera_fasta_file_id = io.StringIO()
+    assembly_ids_chimeras_file_id = io.StringIO()
+    assembly_ids_0paths_file_id = io.StringIO()
+    assembly_ids_1path_file_id = io.StringIO()
+    assembly_ids_npaths_file_id = io.StringIO()
+
     # initialize record counters
     alignment_counter = 0
     exon_counter = 0
@@ -268,7 +341,7 @@ def get_exon_data(alignment_file, output_dir):
         else:
 
             # control the FASTA format
-            raise xlib.ProgramException('F006', alignment_file, 'FASTA')
+            raise xlib.ProgramException('', 'F006', alignment_file, 'FASTA')
 
         # while there are records and they are sequence
         while record != '' and not record.startswith('>'):
@@ -610,8 +683,7 @@ def get_exon_data(alignment_file, output_dir):
                                 mapped_genes_1 = f'{mapped_genes_1}*{record[last_tab_pos+1:]}'
                             record = alignment_file_id.readline()
 
-                        # read records until the next transcript or EOF
-                        record = alignment_file_id.readline()
+                        # read records until the next transcript or EOF (the current record can already be the head record of the next transcript)
                         while record != '' and not record.startswith('>'):
                             record = alignment_file_id.readline()
 
@@ -663,20 +735,8 @@ def get_exon_data(alignment_file, output_dir):
             else:
                 assembly_ids_npaths_file_id.write(f'{assembly_id};{paths_num};1;{position_1};{length_1};{genomic_seq_id_1};{coverage_1};{percent_identity_1};{mapped_genes_1}\n')
 
-        # print the counters
-        xlib.Message.print('verbose', f'\rAlignments ... {alignment_counter:8d} - Exons ... {exon_counter:8d}')
-
-    # close files
-    alignment_file_id.close()
-    exon_data_file_id.close()
-    chimera_fasta_file_id.close()
-    assembly_ids_chimeras_file_id.close()
-    assembly_ids_0paths_file_id.close()
-    assembly_ids_1path_file_id.close()
-    assembly_ids_npaths_file_id.close()
-
-    # print OK message
-    xlib.Message.print('verbose', f'\nThe file {os.path.basename(exon_data_file)} containing the extacted sequences is created.')
+    # return the counters and the outputs of the chunk
+    return alignment_counter, exon_counter, [exon_data_file_id.getvalue(), chimera_fasta_file_id.getvalue(), assembly_ids_chimeras_file_id.getvalue(), assembly_ids_0paths_file_id.getvalue(), assembly_ids_1path_file_id.getvalue(), assembly_ids_npaths_file_id.getvalue()]
 
 #-------------------------------------------------------------------------------
 
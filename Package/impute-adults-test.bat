@@ -62,6 +62,7 @@ rem Run the program impute-adults.py
     --maf=0.0 ^
     --dp=10 ^
     --out=%OUTPUT_DIR%\concatenated_imputed_adults-scenario2.vcf.gz ^
+    --metrics=NONE ^
     --verbose=Y ^
     --trace=N ^
     --tvi=NONE
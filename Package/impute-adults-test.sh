@@ -59,6 +59,7 @@ cd $NGSHELPER_DIR
         --maf=0.0 \
         --dp=10 \
         --out=$OUTPUT_DIR/concatenated_imputed_adults-scenario2.vcf \
+        --metrics=NONE \
         --verbose=Y \
         --trace=N \
         --tvi=NONE
@@ -31,10 +31,16 @@ import gzip
 import os
 import sys
 
+import xgenotype
 import xlib
 
 #-------------------------------------------------------------------------------
 
+# import heavy modules when they are used for the first time
+np = xlib.LazyModule('numpy')
+
+#-------------------------------------------------------------------------------
+
 def main():
     '''
     Main line of the program.
@@ -48,8 +54,13 @@ def main():
     args = parser.parse_args()
     check_args(args)
 
-    # imputate adults
-    impute_adults(args.input_vcf_file, args.sample_file, args.fix, args.scenario, args.min_aa_percentage, args.min_md_imputation_percentage, args.imputed_md_id, args.sp1_id, args.sp1_max_md_percentage, args.sp2_id, args.sp2_max_md_percentage, args.hybrid_id, args.min_afr_percentage, args.min_depth, args.output_vcf_file, args.tvi_list)
+    # measure the run metrics (the report is written when the run ends)
+    with xlib.Metrics.run(args.metrics_file):
+
+        # imputate adults
+        with xlib.Metrics.stage('impute adults') as stage:
+            record_counter = impute_adults(args.input_vcf_file, args.sample_file, args.fix, args.scenario, args.min_aa_percentage, args.min_md_imputation_percentage, args.imputed_md_id, args.sp1_id, args.sp1_max_md_percentage, args.sp2_id, args.sp2_max_md_percentage, args.hybrid_id, args.min_afr_percentage, args.min_depth, args.output_vcf_file, args.tvi_list)
+            stage.add(records=record_counter, bytes_number=os.path.getsize(args.input_vcf_file))
 
 #-------------------------------------------------------------------------------
 
@@ -62,7 +73,8 @@ def build_parser():
     description = 'Description: This program imputes genotypes with missing data of adult individuals in a VCF\n' \
         'file generated in a hybridization studies of two parental species, hybrids and their half-sib\n' \
         'progenies, based on the relative frequencies of missing data in the adults of both parental\n' \
-        'species.'
+        'species.\n' \
+        f'Allele indexes of genotypes (subfield GT) greater than {xlib.Const.GT_MAX_ALLELE_CODE} are not supported.'
     text = f'{xlib.get_project_name()} v{xlib.get_project_version()} - {os.path.basename(__file__)}\n\n{description}\n'
     usage = f'\r{text.ljust(len("usage:"))}\nUsage: {os.path.basename(__file__)} arguments'
     parser = argparse.ArgumentParser(usage=usage)
@@ -82,6 +94,7 @@ def build_parser():
     parser.add_argument('--maf', dest='min_afr_percentage', help='Minimum percentage of allele frequency per species (mandatory).')
     parser.add_argument('--dp', dest='min_depth', help=f'Minimum combined depth across samples; default: {xlib.Const.DEFAULT_MIN_DEPTH}.')
     parser.add_argument('--out', dest='output_vcf_file', help='Path of output VCF file (mandatory).')
+    parser.add_argument('--metrics', dest='metrics_file', help='Path of the output JSON file with the run metrics (elapsed time, throughput of stages and peak memory) or NONE; default: NONE.')
     parser.add_argument('--verbose', dest='verbose', help=f'Additional job status info during the run: {xlib.get_verbose_code_list_text()}; default: {xlib.Const.DEFAULT_VERBOSE}.')
     parser.add_argument('--trace', dest='trace', help=f'Additional info useful to the developer team: {xlib.get_trace_code_list_text()}; default: {xlib.Const.DEFAULT_TRACE}.')
     parser.add_argument('--tvi', dest='tvi_list', help='Variant identification list to trace with format seq_id_1-pos_1,seq_id_2-pos_2,...,seq_id_n-pos_n or NONE; default: NONE.')
@@ -215,6 +228,10 @@ def check_args(args):
         xlib.Message.print('error', '*** The output VCF file is not indicated in the input arguments.')
         OK = False
 
+    # check "metrics_file"
+    if args.metrics_file is None or args.metrics_file.upper() == 'NONE':
+        args.metrics_file = None
+
     # check "verbose"
     if args.verbose is None:
         args.verbose = xlib.Const.DEFAULT_VERBOSE
@@ -254,7 +271,7 @@ def check_args(args):
 
 def impute_adults(input_vcf_file, sample_file, fix, scenario, min_aa_percentage, min_md_imputation_percentage, imputed_md_id, sp1_id, sp1_max_md_percentage, sp2_id, sp2_max_md_percentage, hybrid_id, min_afr_percentage, min_depth, output_vcf_file, tvi_list):
     '''
-    Filter and fixes variant data of a VCF file.
+    Filter and fixes variant data of a VCF file and return the number of records read.
     '''
 
     # initialize the sample number
@@ -276,6 +293,7 @@ def impute_adults(input_vcf_file, sample_file, fix, scenario, min_aa_percentage,
             else:
                 adult_num_h += 1
     xlib.Message.print('verbose', f'{sp1_id} adults: {adult_num_1} - {sp2_id} adults: {adult_num_2} - hybrid adults: {adult_num_h}\n')
+    adult_num_array = np.array([adult_num_1, adult_num_2, adult_num_h])
 
     # initialize the sample species and mother identification lists per variant
     species_id_list = []
@@ -363,6 +381,15 @@ def impute_adults(input_vcf_file, sample_file, fix, scenario, min_aa_percentage,
             # set the sample number
             sample_number = len(species_id_list)
 
+            # create the genotype parser and the allele counter per species
+            genotype_parser = xgenotype.GenotypeParser(sample_number)
+            species_allele_counter = xgenotype.SpeciesAlleleCounter(species_id_list, mother_id_list, sp1_id, sp2_id)
+
+            # get the species group of every sample, the mask of the adult samples and the mask of the samples of both species and hybrids
+            group_array = species_allele_counter.group_array
+            adult_mask = species_allele_counter.adult_mask
+            species_mask = (group_array < 2) | (hybrid_id != 'NONE')
+
             # write the column description record
             temporal_vcf_file_id.write(record)
 
@@ -418,41 +445,21 @@ def impute_adults(input_vcf_file, sample_file, fix, scenario, min_aa_percentage,
                 raise xlib.ProgramException('', 'L007', 'DP', data_dict['chrom'], data_dict['pos'])
 
             # get the position of the genotype (subfield GT) in the field FORMAT
-            format_subfield_list = data_dict['format'].upper().split(':')
-            try:
-                gt_position = format_subfield_list.index('GT')
-            except Exception as e:
-                raise xlib.ProgramException(e, 'L007', 'GT', data_dict['chrom'], data_dict['pos'])
-
-            # build the list of sample genotypes of a variant
-            sample_data_list = []
-            sample_gt_list = []
-            for i in range(sample_number):
-                sample_data_list.append(data_dict['sample_list'][i].split(':'))
-                sample_gt_list.append(sample_data_list[i][gt_position])
-
-            # build the lists of the left and right side of sample genotypes of a variant
-            sample_gt_left_list = []
-            sample_sep_list = []
-            sample_gt_right_list = []
-            for i in range(sample_number):
-                sep = '/'
-                sep_pos = sample_gt_list[i].find(sep)
-                if sep_pos == -1:
-                    sep = '|'
-                    sep_pos = sample_gt_list[i].find(sep)
-                if sep_pos == -1:
-                    raise xlib.ProgramException('', 'L008', 'GT', data_dict['chrom'], data_dict['pos'])
-                sample_sep_list.append(sep)
-                if sample_gt_list[i] not in xlib.get_md_code_list():
-                    try:
-                        sample_gt_left_list.append(int(sample_gt_list[i][:sep_pos]))
-                        sample_gt_right_list.append(int(sample_gt_list[i][sep_pos+1:]))
-                    except Exception as e:
-                        raise xlib.ProgramException(e, 'L008', 'GT', data_dict['chrom'], data_dict['pos'])
-                else:
-                    sample_gt_left_list.append(-1)
-                    sample_gt_right_list.append(-1)
+            gt_position = genotype_parser.get_gt_position(data_dict)
+
+            # get the arrays of the left and right allele codes of the sample genotypes (missing data: -1)
+            (left_array, right_array) = genotype_parser.parse(data_dict)
+            left_array = left_array.astype(np.int16)
+            right_array = right_array.astype(np.int16)
+
+            # check that the missing data are in both sides of the genotypes
+            if np.any((left_array == -1) != (right_array == -1)):
+                raise xlib.ProgramException('', 'L008', 'GT', data_dict['chrom'], data_dict['pos'])
+
+            # get the genotypes and their separators
+            sample_list = data_dict['sample_list']
+            sample_gt_list = [sample_list[i].split(':', gt_position + 1)[gt_position] for i in range(sample_number)]
+            sample_sep_list = ['/' if '/' in sample_gt else '|' for sample_gt in sample_gt_list]
 
             if variant_id in tvi_list: xlib.Message.print('trace', f'(2) reference_bases: {reference_bases}')
             if variant_id in tvi_list: xlib.Message.print('trace', f'(3) alternative_allele_list: {alternative_allele_list}')
@@ -461,15 +468,8 @@ def impute_adults(input_vcf_file, sample_file, fix, scenario, min_aa_percentage,
             # fix the reference base(s) when there are not individual with this reference
             if fix.upper() == 'Y':
 
-                # check if there are samples with 0/n or 0|n in their field GT
-                found_0_n = False
-                for i in range(sample_number):
-                    if sample_gt_left_list[i] == 0 or sample_gt_right_list[i] == 0:
-                        found_0_n = True
-                        break
-
                 # if there is not any sample with 0/n or 0|n in its field GT
-                if not found_0_n:
+                if not np.any((left_array == 0) | (right_array == 0)):
 
                     # change the reference_base(s) and alternative alleles
                     reference_bases = alternative_allele_list[0]
@@ -478,261 +478,111 @@ def impute_adults(input_vcf_file, sample_file, fix, scenario, min_aa_percentage,
                     if variant_id in tvi_list: xlib.Message.print('trace', '(5) 0 is not found, the reference_bases and alternative_allele_list have been changed.')
 
                     # fix the of the field GT of every sample
-                    for i in range(sample_number):
-                        if sample_gt_left_list[i] >= 1:
-                            sample_gt_left_list[i] -= 1
-                            sample_gt_right_list[i] -= 1
+                    fix_mask = left_array >= 1
+                    left_array[fix_mask] -= 1
+                    right_array[fix_mask] -= 1
+
+            # check the alternative alleles of the genotypes
+            if max(left_array.max(), right_array.max()) > len(alternative_allele_list):
+                raise xlib.ProgramException('', 'L008', 'GT', data_dict['chrom'], data_dict['pos'])
 
             # calculate the alternative allele counter per allele (2 or higher) and species and their percentages
-            aa_counter_list_1 = []
-            aa_counter_list_2 = []
-            aa_counter_list_h = []
-            for _ in range(len(alternative_allele_list)):
-                aa_counter_list_1.append(0)
-                aa_counter_list_2.append(0)
-                aa_counter_list_h.append(0)
-            for i in range(sample_number):
-                if mother_id_list[i] == 'NONE':
-                    if sample_gt_right_list[i] >=2:
-                        if species_id_list[i] == sp1_id:
-                            aa_counter_list_1[sample_gt_right_list[i] - 1] += 1
-                        elif species_id_list[i] == sp2_id:
-                            aa_counter_list_2[sample_gt_right_list[i] - 1] += 1
-                        else:
-                            aa_counter_list_h[sample_gt_right_list[i] - 1] += 1
-            if variant_id in tvi_list: xlib.Message.print('trace', f'(6) aa_counter_list_1: {aa_counter_list_1} - aa_counter_list_2 {aa_counter_list_2} - aa_counter_list_h: {aa_counter_list_h}')
-            aa_percentage_list_1 = []
-            aa_percentage_list_2 = []
-            aa_percentage_list_h = []
-            for i in range(len(alternative_allele_list)):
-                aa_percentage_list_1.append(aa_counter_list_1[i] / adult_num_1 * 100)
-                aa_percentage_list_2.append(aa_counter_list_2[i] / adult_num_2 * 100)
-                aa_percentage_list_h.append(aa_counter_list_h[i] / adult_num_h * 100) if hybrid_id != 'NONE' else 0
-            if variant_id in tvi_list: xlib.Message.print('trace', f'(7) aa_percentage_list_1: {aa_percentage_list_1} - aa_percentage_list_2 {aa_percentage_list_2} - aa_percentage_list_h: {aa_percentage_list_h}')
+            aa_count_matrix = species_allele_counter.count_alleles(right_array, right_array >= 2)[:, xlib.Const.GT_CODE_OFFSET + 1:xlib.Const.GT_CODE_OFFSET + 1 + len(alternative_allele_list)]
+            if variant_id in tvi_list: xlib.Message.print('trace', f'(6) aa_counter_list_1: {aa_count_matrix[0].tolist()} - aa_counter_list_2 {aa_count_matrix[1].tolist()} - aa_counter_list_h: {aa_count_matrix[2].tolist()}')
+            aa_percentage_matrix = np.divide(aa_count_matrix, adult_num_array[:, np.newaxis], out=np.zeros(aa_count_matrix.shape), where=adult_num_array[:, np.newaxis] > 0) * 100
+            if variant_id in tvi_list: xlib.Message.print('trace', f'(7) aa_percentage_list_1: {aa_percentage_matrix[0].tolist()} - aa_percentage_list_2 {aa_percentage_matrix[1].tolist()} - aa_percentage_list_h: {aa_percentage_matrix[2].tolist() if hybrid_id != "NONE" else []}')
 
             # fix the GT field of alternative alleles if the alternative allele percentage is less than the minimum percentage in every species when the variant is not a indel
             if not is_indel:
-
-                for i in range(sample_number):
-                    if sample_gt_right_list[i] >= 2:
-                        if (species_id_list[i] == sp1_id and aa_percentage_list_1[sample_gt_right_list[i] - 1] < min_aa_percentage) or \
-                            (species_id_list[i] == sp2_id and aa_percentage_list_2[sample_gt_right_list[i] - 1] < min_aa_percentage) or \
-                            (species_id_list[i] == hybrid_id and aa_percentage_list_h[sample_gt_right_list[i] - 1] < min_aa_percentage):
-                            # set missing data
-                            if variant_id in tvi_list: xlib.Message.print('trace', f'(8) Setting missing data in i: {i} - sample_gt_left_list[i]: {sample_gt_left_list[i]} - sample_gt_right_list[i]: {sample_gt_right_list[i]}')
-                            sample_gt_left_list[i] = -1
-                            sample_gt_right_list[i] = -1
+                aa_mask = species_mask & (right_array >= 2)
+                aa_mask[aa_mask] = aa_percentage_matrix[group_array[aa_mask], right_array[aa_mask] - 1] < min_aa_percentage
+                if variant_id in tvi_list:
+                    for i in np.flatnonzero(aa_mask):
+                        xlib.Message.print('trace', f'(8) Setting missing data in i: {i} - sample_gt_left_list[i]: {left_array[i]} - sample_gt_right_list[i]: {right_array[i]}')
+                left_array[aa_mask] = -1
+                right_array[aa_mask] = -1
 
             # fix the alternative allele list when a alternative allele does not have any sample
-            alternative_allele_counter_list = []
-            for _ in range(len(alternative_allele_list)):
-                alternative_allele_counter_list.append(0)
-            for i in range(sample_number):
-                if sample_gt_left_list[i] > 0 :
-                    alternative_allele_counter_list[sample_gt_left_list[i] - 1] += 1
-                if sample_gt_right_list[i] > 0 :
-                    alternative_allele_counter_list[sample_gt_right_list[i] - 1] += 1
-            for i in range(len(alternative_allele_counter_list) -1, -1, -1):
-                if alternative_allele_counter_list[i] == 0:
-                    del alternative_allele_list[i]
-                if alternative_allele_list == []:
-                    alternative_allele_list = [xlib.get_md_symbol()]
-                else:
-                    alternative_allele_list
-            if variant_id in tvi_list: xlib.Message.print('trace', f'(9) alternative_allele_counter_list: {alternative_allele_counter_list}')
+            alternative_allele_counter_array = (np.bincount(left_array[left_array > 0], minlength=len(alternative_allele_list) + 1) + np.bincount(right_array[right_array > 0], minlength=len(alternative_allele_list) + 1))[1:]
+            alternative_allele_list = [alternative_allele for (alternative_allele, counter) in zip(alternative_allele_list, alternative_allele_counter_array.tolist()) if counter > 0]
+            if alternative_allele_list == []:
+                alternative_allele_list = [xlib.get_md_symbol()]
+            if variant_id in tvi_list: xlib.Message.print('trace', f'(9) alternative_allele_counter_list: {alternative_allele_counter_array.tolist()}')
 
             # calculate the missing data counter per species and their percentages
-            md_counter_1 = 0
-            md_counter_2 = 0
-            md_counter_h = 0
-            for i in range(sample_number):
-                if mother_id_list[i] == 'NONE':
-                    if sample_gt_right_list[i] == -1:
-                        if species_id_list[i] == sp1_id:
-                            md_counter_1 += 1
-                        elif species_id_list[i] == sp2_id:
-                            md_counter_2 += 1
-                        else:
-                            md_counter_h += 1
+            (md_counter_1, md_counter_2, md_counter_h) = species_allele_counter.count_alleles(right_array)[:, xlib.Const.GT_MD_CODE + xlib.Const.GT_CODE_OFFSET].tolist()
             md_percentage_1 = md_counter_1 / adult_num_1 * 100
             md_percentage_2 = md_counter_2 / adult_num_2 * 100
-            md_percentage_h = md_counter_h / adult_num_h * 100
+            md_percentage_h = md_counter_h / adult_num_h * 100 if adult_num_h > 0 else 0.0
             if variant_id in tvi_list: xlib.Message.print('trace', f'(10) {sp1_id} missing data: {md_percentage_1:5.2f}% - {sp2_id} missing data: {md_percentage_2:5.2f}% - {hybrid_id} missing data: {md_percentage_h:5.2f}%')
 
-            # when sample is an adult individual, fix the symbol of missing data of the GP field of alternative alleles if the percentage of mising data per species is greater than to the minimum percentage of missing data imputation to a new alternative allele of the corresponding species of the corresponding species or the species is hybrid with the identification of the alternative allele for imputed missing data
-            for i in range(sample_number):
-
-                # only when the sample is an adult individual
-                if mother_id_list[i] == 'NONE':
+            # get the mask of the species groups whose missing data are imputed: the species whose percentage of missing data is greater than the minimum percentage of missing data imputation and the hybrids when it is greater in any species
+            md_imputation_group_array = np.array([md_percentage_1 > min_md_imputation_percentage, md_percentage_2 > min_md_imputation_percentage, md_percentage_1 > min_md_imputation_percentage or md_percentage_2 > min_md_imputation_percentage])
+            md_imputation_mask = adult_mask & species_mask & md_imputation_group_array[group_array]
 
-                    if sample_gt_right_list[i] == -1 and \
-                      (species_id_list[i] == sp1_id and md_percentage_1 > min_md_imputation_percentage or \
-                       species_id_list[i] == sp2_id and md_percentage_2 > min_md_imputation_percentage or \
-                       species_id_list[i] == hybrid_id and (md_percentage_1 > min_md_imputation_percentage or md_percentage_2 > min_md_imputation_percentage)):
-
-                        sample_gt_left_list[i] = 99
-                        sample_gt_right_list[i] = 99
+            # when sample is an adult individual, set the imputed missing data allele in the missing data of the species groups whose missing data are imputed
+            imputation_mask = md_imputation_mask & (right_array == -1)
+            left_array[imputation_mask] = 99
+            right_array[imputation_mask] = 99
 
             # get a list with the new order of the alternative alleles
-            new_order_list = []
-            order = 1
-            for i in range(len(alternative_allele_counter_list)):
-                if alternative_allele_counter_list[i] > 0:
-                    new_order_list.append(order)
-                    order += 1
-                else:
-                    new_order_list.append(0)
-            if variant_id in tvi_list: xlib.Message.print('trace', f'(11) new_order_list: {new_order_list}')
-
-            # check if all samples are monomorphic
-            monomorphic = True
-            left_allele = None
-            right_allele = None
-            for i in range(sample_number):
-                if mother_id_list[i] == 'NONE':
-                    if sample_gt_right_list[i] == 99:
-                        monomorphic = False
-                        break
-                    elif sample_gt_right_list[i] != -1:
-                        if left_allele == None:
-                            left_allele = sample_gt_left_list[i]
-                        if right_allele == None:
-                            right_allele = sample_gt_right_list[i]
-                        if left_allele != sample_gt_left_list[i] or right_allele != sample_gt_right_list[i]:
-                            monomorphic = False
-                            break
+            new_order_array = np.cumsum(alternative_allele_counter_array > 0) * (alternative_allele_counter_array > 0)
+            if variant_id in tvi_list: xlib.Message.print('trace', f'(11) new_order_list: {new_order_array.tolist()}')
+
+            # check if all samples are monomorphic (the adult genotypes without missing data are equal and there is not any imputed missing data)
+            adult_right_array = right_array[adult_mask]
+            adult_gt_mask = adult_right_array != -1
+            adult_gt_array = left_array[adult_mask][adult_gt_mask] * 1000 + adult_right_array[adult_gt_mask]
+            monomorphic = not np.any(adult_right_array == 99) and np.all(adult_gt_array == adult_gt_array[:1])
             if variant_id in tvi_list: xlib.Message.print('trace', f'(12) monomorphic: {monomorphic}')
 
             if variant_id in tvi_list:
                 literal = ''
                 for i in range(sample_number):
-                    literal += f'{str(sample_gt_left_list[i])}{sample_sep_list[i]}{str(sample_gt_right_list[i])} '
+                    literal += f'{left_array[i]}{sample_sep_list[i]}{right_array[i]} '
                 xlib.Message.print('trace', f'(13) genotype list before imputation revision: {literal}')
 
-            # review depending on the scenario
-            for i in range(sample_number):
-
-                # only when the sample is an adult individual
-                if mother_id_list[i] == 'NONE':
-
-                    # revision when the scenario is '0' (no imputation) or '2' (maximum possible imputation)
-                    if scenario in ['0', '2']:
-
-                        # the sample is hybrid
-                        if species_id_list[i] == hybrid_id and (md_percentage_1 > min_md_imputation_percentage or md_percentage_2 > min_md_imputation_percentage) and sample_gt_left_list[i] == sample_gt_right_list[i]:
-                            sample_gt_right_list[i] = 99
-                        elif species_id_list[i] == sp1_id and (md_percentage_1 > min_md_imputation_percentage) and sample_gt_left_list[i] == sample_gt_right_list[i]:
-                            sample_gt_right_list[i] = 99
-                        elif species_id_list[i] == sp2_id and (md_percentage_2 > min_md_imputation_percentage) and sample_gt_left_list[i] == sample_gt_right_list[i]:
-                            sample_gt_right_list[i] = 99
-
-                    # revision when the scenario is '1' (standard)
-                    elif scenario == '1':
-
-                        #if sample_gt_right_list[i] == -1:
-                        #    sample_gt_left_list[i] = 99
-                        #    sample_gt_right_list[i] = 99
-                        pass
+            # review depending on the scenario (only when the sample is an adult individual)
+            # -- revision when the scenario is '1' (standard): no revision
+            # revision when the scenario is '0' (no imputation) or '2' (maximum possible imputation)
+            if scenario in ['0', '2']:
+                right_array[md_imputation_mask & (left_array == right_array)] = 99
 
-                    # revision when the scenario is '3' (maximum possible missing data)
-                    elif scenario == '3':
-
-                        if sample_gt_left_list[i] == sample_gt_right_list[i]:
-                            sample_gt_right_list[i] = -1
+            # revision when the scenario is '3' (maximum possible missing data)
+            elif scenario == '3':
+                right_array[adult_mask & (left_array == right_array)] = -1
 
             if variant_id in tvi_list:
                 literal = ' '
                 for i in range(sample_number):
-                    literal += f'{str(sample_gt_left_list[i])}{sample_sep_list[i]}{str(sample_gt_right_list[i])} '
+                    literal += f'{left_array[i]}{sample_sep_list[i]}{right_array[i]} '
                 xlib.Message.print('trace', f'(14)  genotype list after imputation revision: {literal}')
 
-            # rebuild the list of the field GT for every sample
-            for i in range(sample_number):
-                if sample_gt_left_list[i] == -1:
-                    left = xlib.get_md_symbol()
-                elif sample_gt_left_list[i] == 99:
-                    left = imputed_md_id
-                else:
-                    left = new_order_list[sample_gt_left_list[i] - 1] if sample_gt_left_list[i] > 0 else 0
-                if sample_gt_right_list[i] == -1:
-                    right = xlib.get_md_symbol()
-                elif sample_gt_right_list[i] == 99:
-                    right = imputed_md_id
-                else:
-                    right = new_order_list[sample_gt_right_list[i] - 1] if sample_gt_right_list[i] > 0 else 0
-                sample_gt_left_list[i] = left
-                sample_gt_right_list[i] = right
-                sample_gt_list[i] = f'{sample_gt_left_list[i]}{sample_sep_list[i]}{sample_gt_right_list[i]}'
-
-            # rebuild the alternative alleles and its corresponding record data
-            alternative_alleles = ','.join(alternative_allele_list)
-
-            # rebuild the sample genotype data list and their corresponding record data
-            sample_list = []
-            for i in range(sample_number):
-                sample_data_list[i][gt_position] = sample_gt_list[i]
-                sample_list.append(':'.join(sample_data_list[i]))
-
-            if variant_id in tvi_list: xlib.Message.print('trace', f'(15) reference_bases: {reference_bases}')
-            if variant_id in tvi_list: xlib.Message.print('trace', f'(16) alternative_allele_list: {alternative_allele_list}')
-            if variant_id in tvi_list: xlib.Message.print('trace', f'(17) sample_gt_list: {sample_gt_list}')
-
             # check the allele frecuencies when the variant is not a indel
             allele_frequency_OK = True
             if not is_indel:
 
-                # get the allele counters per species
-                allele_counter_dict_1 = {}
-                allele_counter_dict_2 = {}
-                allele_counter_dict_h = {}
-                for i in range(sample_number):
-                    if mother_id_list[i] == 'NONE':
-                        if sample_gt_right_list[i] != xlib.get_md_symbol():
-                            if species_id_list[i] == sp1_id:
-                                allele_counter_dict_1[sample_gt_left_list[i]] = allele_counter_dict_1.get(sample_gt_left_list[i], 0) + 1
-                                allele_counter_dict_1[sample_gt_right_list[i]] = allele_counter_dict_1.get(sample_gt_right_list[i], 0) + 1
-                            elif species_id_list[i] == sp2_id:
-                                allele_counter_dict_2[sample_gt_left_list[i]] = allele_counter_dict_2.get(sample_gt_left_list[i], 0) + 1
-                                allele_counter_dict_2[sample_gt_right_list[i]] = allele_counter_dict_2.get(sample_gt_right_list[i], 0) + 1
-                            else:
-                                allele_counter_dict_h[sample_gt_left_list[i]] = allele_counter_dict_h.get(sample_gt_left_list[i], 0) + 1
-                                allele_counter_dict_h[sample_gt_right_list[i]] = allele_counter_dict_h.get(sample_gt_right_list[i], 0) + 1
-                if variant_id in tvi_list: xlib.Message.print('trace', f'(18) allele_counter_dict_1: {allele_counter_dict_1}')
-                if variant_id in tvi_list: xlib.Message.print('trace', f'(19) allele_counter_dict_2: {allele_counter_dict_2}')
-                if variant_id in tvi_list: xlib.Message.print('trace', f'(20) allele_counter_dict_h: {allele_counter_dict_h}')
+                # get the allele counters per species of the adults without missing data in the right side
+                allele_count_matrix = species_allele_counter.count_alleles(left_array, right_array != -1) + species_allele_counter.count_alleles(right_array, right_array != -1)
+                if variant_id in tvi_list:
+                    for (group, name, number) in [(0, '1', 18), (1, '2', 19), (2, 'h', 20)]:
+                        allele_counter_dict = {column - xlib.Const.GT_CODE_OFFSET: int(allele_count_matrix[group, column]) for column in np.flatnonzero(allele_count_matrix[group])}
+                        xlib.Message.print('trace', f'({number}) allele_counter_dict_{name}: {allele_counter_dict}')
 
                 # check the allele frecuencies per species
-                if imputed_md_id in allele_counter_dict_1.keys() and len(allele_counter_dict_1.keys()) > 3 or \
-                    imputed_md_id not in allele_counter_dict_1.keys() and len(allele_counter_dict_1.keys()) > 2 or \
-                    imputed_md_id in allele_counter_dict_2.keys() and len(allele_counter_dict_2.keys()) > 3 or \
-                    imputed_md_id not in allele_counter_dict_2.keys() and len(allele_counter_dict_2.keys()) > 2:
+                allele_number_array = np.count_nonzero(allele_count_matrix[:2], axis=1)
+                imputed_md_array = allele_count_matrix[:2, 99 + xlib.Const.GT_CODE_OFFSET] > 0
+                if np.any(imputed_md_array & (allele_number_array > 3) | ~imputed_md_array & (allele_number_array > 2)):
                     allele_frequency_OK = False
                     if variant_id in tvi_list: xlib.Message.print('trace', '(21) multiallelic variant.')
                 else:
-                    sp1_allele_total = 0
-                    for allele in allele_counter_dict_1.keys():
-                        sp1_allele_total += allele_counter_dict_1[allele]
-                    for allele in allele_counter_dict_1.keys():
-                        allele_frequency = allele_counter_dict_1[allele] / sp1_allele_total * 100
-                        if allele_frequency < min_afr_percentage:
-                            allele_frequency_OK = False
-                            if variant_id in tvi_list: xlib.Message.print('trace', f'(20) allele {allele} in species 1 has a frequency {allele_frequency:5.2f}% less than maf')
-                    sp2_allele_total = 0
-                    for allele in allele_counter_dict_2.keys():
-                        sp2_allele_total += allele_counter_dict_2[allele]
-                    for allele in allele_counter_dict_2.keys():
-                        allele_frequency = allele_counter_dict_2[allele] / sp2_allele_total * 100
-                        if allele_counter_dict_2[allele] / sp2_allele_total * 100 < min_afr_percentage:
-                            allele_frequency_OK = False
-                            if variant_id in tvi_list: xlib.Message.print('trace', f'(21) allele {allele} in species 2 has a frequency {allele_frequency:5.2f}% less than maf')
+                    allele_frequency_matrix = species_allele_counter.get_allele_frequencies(allele_count_matrix[:2]) * 100
+                    for (group, column) in zip(*np.nonzero((allele_count_matrix[:2] > 0) & (allele_frequency_matrix < min_afr_percentage))):
+                        allele_frequency_OK = False
+                        if variant_id in tvi_list: xlib.Message.print('trace', f'({20 + group}) allele {column - xlib.Const.GT_CODE_OFFSET} in species {group + 1} has a frequency {allele_frequency_matrix[group, column]:5.2f}% less than maf')
 
             # check if there are imputation in adult individuals when the scenario is 0 (no imputation)
-            scenario0_are_there_imputations = False
-            if scenario == '0':
-                for i in range(sample_number):
-                    if mother_id_list[i] == 'NONE' and (sample_gt_left_list[i]==imputed_md_id or sample_gt_right_list[i]==imputed_md_id):
-                        scenario0_are_there_imputations = True
-                        break
+            scenario0_are_there_imputations = scenario == '0' and np.any(adult_mask & ((left_array == 99) | (right_array == 99)))
 
             # if DP is less than the minimum combined depth or all samples are monomorphic or the missing data percentage is greater than or equal to the missing data percentage threshold in both species or allele frequency is not OK
             if variant_id in tvi_list: xlib.Message.print('trace', f'(22) dp: {dp} - md_percentage_1: {md_percentage_1:5.2f}% - md_percentage_2: {md_percentage_2:5.2f}% - allele_frequency_OK: {allele_frequency_OK}')
@@ -749,8 +599,30 @@ def impute_adults(input_vcf_file, sample_file, fix, scenario, min_aa_percentage,
                 if data_dict['chrom'] not in non_filtered_seq_id_list:
                     non_filtered_seq_id_list.append(data_dict['chrom'])
 
+                # build the text of every allele code: missing data (-1), imputed missing data (99), reference (0) and alternative alleles with their new order
+                allele_text_array = np.array([xlib.get_md_symbol(), '0'] + [str(order) for order in new_order_array.tolist()] + [imputed_md_id], dtype=object)
+                allele_index_lut = np.full(100 + 1, len(allele_text_array) - 1, dtype=np.intp)
+                allele_index_lut[:len(new_order_array) + 2] = np.arange(len(new_order_array) + 2)
+
+                # rebuild the field GT of every sample
+                left_text_list = allele_text_array[allele_index_lut[left_array + 1]].tolist()
+                right_text_list = allele_text_array[allele_index_lut[right_array + 1]].tolist()
+                sample_gt_list = [f'{left}{sep}{right}' for (left, sep, right) in zip(left_text_list, sample_sep_list, right_text_list)]
+
+                # rebuild the sample genotype data list and their corresponding record data
+                sample_data_list = [sample_list[i].split(':') for i in range(sample_number)]
+                for i in range(sample_number):
+                    sample_data_list[i][gt_position] = sample_gt_list[i]
+                sample_list_text = '\t'.join([':'.join(sample_data) for sample_data in sample_data_list])
+
+                if variant_id in tvi_list: xlib.Message.print('trace', f'(15) reference_bases: {reference_bases}')
+                if variant_id in tvi_list: xlib.Message.print('trace', f'(16) alternative_allele_list: {alternative_allele_list}')
+                if variant_id in tvi_list: xlib.Message.print('trace', f'(17) sample_gt_list: {sample_gt_list}')
+
+                # rebuild the alternative alleles and its corresponding record data
+                alternative_alleles = ','.join(alternative_allele_list)
+
                 # write the variant record
-                sample_list_text = '\t'.join(sample_list)
                 temporal_vcf_file_id.write(f'{data_dict["chrom"]}\t{data_dict["pos"]}\t{data_dict["id"]}\t{reference_bases}\t{alternative_alleles}\t{data_dict["qual"]}\t{data_dict["filter"]}\t{data_dict["info"]}\t{data_dict["format"]}\t{sample_list_text}\n')
 
             # print the counters
@@ -833,6 +705,9 @@ def impute_adults(input_vcf_file, sample_file, fix, scenario, min_aa_percentage,
     os.remove(temporal_vcf_file)
     xlib.Message.print('info', f'The temporal VCF file {os.path.basename(temporal_vcf_file)} is deleted.')
 
+    # return the record counter
+    return input_record_counter
+
 #-------------------------------------------------------------------------------
 
 if __name__ == '__main__':
@@ -28,17 +28,17 @@ import argparse
 import gzip
 import os
 import sys
-import threading
-
-from threading import Semaphore
-
-import minisom
 
 import xlib
 import xsqlite
 
 #-------------------------------------------------------------------------------
 
+# import heavy modules when they are used for the first time
+minisom = xlib.LazyModule('minisom')
+
+#-------------------------------------------------------------------------------
+
 def main():
     '''
     Main line of the program.
@@ -56,7 +56,7 @@ def main():
     conn = xsqlite.connect_database(args.sqlite_database, check_same_thread=False)
 
     # impute genotypes with missing data in a VCF file using Self-Organizing Maps
-    impute_md_som(conn, args.threads_num, args.input_vcf_file, args.output_vcf_file, args.imputation_data_file, args.minimum_r2, args.r_estimator, args.snps_num, args.xdim, args.ydim, args.sigma, args.learning_rate, args.num_iteration, args.genotype_imputation_method, args.tvi_list)
+    impute_md_som(conn, args.sqlite_database, args.threads_num, args.input_vcf_file, args.output_vcf_file, args.imputation_data_file, args.minimum_r2, args.r_estimator, args.snps_num, args.xdim, args.ydim, args.sigma, args.learning_rate, args.num_iteration, args.genotype_imputation_method, args.tvi_list)
 
 #-------------------------------------------------------------------------------
 
@@ -251,7 +251,7 @@ def check_args(args):
 
 #-------------------------------------------------------------------------------
 
-def impute_md_som(conn, threads_num, input_vcf_file, output_vcf_file, imputation_data_file, minimum_r2, r_estimator, snps_num, xdim, ydim, sigma, learning_rate, num_iteration, genotype_imputation_method, tvi_list):
+def impute_md_som(conn, sqlite_database, threads_num, input_vcf_file, output_vcf_file, imputation_data_file, minimum_r2, r_estimator, snps_num, xdim, ydim, sigma, learning_rate, num_iteration, genotype_imputation_method, tvi_list):
     '''
     Impute genotypes with missing data in a VCF file using Self-Organizing Maps.
     '''
@@ -275,9 +275,6 @@ def impute_md_som(conn, threads_num, input_vcf_file, output_vcf_file, imputation
             max_threads_num = cpus_num
         xlib.Message.print('verbose', f'CPUs in the system: {cpus_num}.  The process will use {max_threads_num} threads.\n')
 
-    # create the semaphore to control databases accesses
-    semaphore = Semaphore(1)
-
     # initialize the sample lists, sample number and label dict
     sample_id_list = []
     sample_label_list = []
@@ -380,62 +377,35 @@ def impute_md_som(conn, threads_num, input_vcf_file, output_vcf_file, imputation
             # print the counters
             xlib.Message.print('verbose', f'\rProcessed records ... {input_record_counter:8d} - Total variants ... {total_variant_counter:8d} - Imputed variants ... {imputed_variant_counter:8d}')
 
-        # process variant records
-        while record != '' and not record.startswith('##') and not record.startswith('#CHROM'):
-
-            # initialize working threads number
-            w_threads_num = 0
-
-            # initialize variant data dictionaries list
-            data_dict_list = []
-
-            # create a group of max_threads_num variant records
-            while record != '' and not record.startswith('##') and not record.startswith('#CHROM') and w_threads_num < max_threads_num:
-
-                # add 1 to the input record counter
-                input_record_counter += 1
-
-                # add 1 to the total variant counter
-                total_variant_counter += 1
-
-                # add 1 to the working threads number
-                w_threads_num += 1
-
-                # add variant data dictionary to variant data dictionaries list
-                data_dict_list.append(data_dict)
+        # process variant records in parallel keeping their order
+        if record != '' and not record.startswith('##') and not record.startswith('#CHROM'):
 
-                # read the next record of the input VCF file
-                (record, _, data_dict) = xlib.read_vcf_file(input_vcf_file_id, sample_number=0, check_sample_number=False)
+            with xlib.VariantPipeline(max_threads_num, process_variant, [minimum_r2, r_estimator, snps_num, xdim, ydim, sigma, learning_rate, num_iteration, genotype_imputation_method, tvi_list, kinship_dict, snp_id_1_list, sample_label_list, label_dict, sample_number], worker_initializer=initialize_worker, worker_initializer_arg_list=[sqlite_database], worker_finalizer=finalize_worker) as variant_pipeline:
+                for result_dict in variant_pipeline.process(xlib.iter_vcf_variant_records(record, input_vcf_file_id)):
 
-            # create and start threads
-            threads_list = []
-            result_list = []
-            for thread_id in range(w_threads_num):
-                result_list.append({})
-                threads_list.append(threading.Thread(target=process_variant, args=[thread_id, conn, semaphore, minimum_r2, r_estimator, snps_num, xdim, ydim, sigma, learning_rate, num_iteration, genotype_imputation_method, tvi_list, kinship_dict, snp_id_1_list, sample_label_list, label_dict, sample_number, data_dict_list[thread_id], result_list]))
-                threads_list[thread_id].start()
+                    # add 1 to the input record counter
+                    input_record_counter += 1
 
-            # wait until all threads terminate
-            for thread_id in range(w_threads_num):
-                threads_list[thread_id].join()
+                    # add 1 to the total variant counter
+                    total_variant_counter += 1
 
-            # process results of threads
-            for thread_id in range(w_threads_num):
+                    # write the variant record
+                    output_vcf_file_id.write(result_dict['output_vcf_record'])
 
-                # write the variant record
-                output_vcf_file_id.write(result_list[thread_id]['output_vcf_record'])
+                    # if the variant is imputed
+                    if result_dict['is_variant_imputed']:
 
-                # if the variant is imputed
-                if result_list[thread_id]['is_variant_imputed']:
+                        # write the record in the output file with imputation data
+                        imputation_data_file_id.write(result_dict['imputation_data_record'])
 
-                    # write the record in the output file with imputation data
-                    imputation_data_file_id.write(result_list[thread_id]['imputation_data_record'])
+                        # add 1 to imputed variant counter if the variant is imputed
+                        imputed_variant_counter += 1
 
-                    # add 1 to imputed variant counter if the variant is imputed
-                    imputed_variant_counter += 1
+                    # print the counters
+                    xlib.Message.print('verbose', f'\rProcessed records ... {input_record_counter:8d} - Total variants ... {total_variant_counter:8d} - Imputed variants ... {imputed_variant_counter:8d}')
 
-                # print the counters
-                xlib.Message.print('verbose', f'\rProcessed records ... {input_record_counter:8d} - Total variants ... {total_variant_counter:8d} - Imputed variants ... {imputed_variant_counter:8d}')
+            # all the records of the input VCF file have been read
+            record = ''
 
     xlib.Message.print('verbose', '\n')
 
@@ -450,9 +420,27 @@ def impute_md_som(conn, threads_num, input_vcf_file, output_vcf_file, imputation
 
 #-------------------------------------------------------------------------------
 
-def process_variant(thread_id, conn, semaphore, minimum_r2, r_estimator, snps_num, xdim, ydim, sigma, learning_rate, num_iteration, genotype_imputation_method, tvi_list, kinship_dict, snp_id_1_list, sample_label_list, label_dict, sample_number, data_dict, result_list):
+def initialize_worker(sqlite_database):
+    '''
+    Initialize a worker process connecting to the database and return the worker arguments of process_variant.
+    '''
+
+    return [xsqlite.connect_database(sqlite_database, check_same_thread=False)]
+
+#-------------------------------------------------------------------------------
+
+def finalize_worker(conn):
+    '''
+    Finalize a worker process closing its database connection.
+    '''
+
+    conn.close()
+
+#-------------------------------------------------------------------------------
+
+def process_variant(conn, minimum_r2, r_estimator, snps_num, xdim, ydim, sigma, learning_rate, num_iteration, genotype_imputation_method, tvi_list, kinship_dict, snp_id_1_list, sample_label_list, label_dict, sample_number, data_dict):
     '''
-    Process a variant and impute its genotypes with missing data using a Self-Organizing Map if necessary.
+    Process a variant, impute its genotypes with missing data using a Self-Organizing Map if necessary and return the result.
     '''
 
     # initialize the impute variant indicator
@@ -536,12 +524,10 @@ def process_variant(thread_id, conn, semaphore, minimum_r2, r_estimator, snps_nu
     # if there is missing data, impute it
     if variant_id in snp_id_1_list:
 
-        if variant_id in tvi_list: xlib.Message.print('trace', f'thread_id: {thread_id} - variant_id: {variant_id} - There is missing data')
+        if variant_id in tvi_list: xlib.Message.print('trace', f'process_id: {os.getpid()} - variant_id: {variant_id} - There is missing data')
 
         # get the linkage disequilibrium list
-        semaphore.acquire()
         ld_list = xsqlite.get_vcf_linkage_disequilibrium_list(conn, variant_id)
-        semaphore.release()
 
         # build the genotype text before imputation
         genotype_text_before_imputation = ''
@@ -549,16 +535,14 @@ def process_variant(thread_id, conn, semaphore, minimum_r2, r_estimator, snps_nu
             genotype_text_before_imputation += f'{str(sample_gt_left_list[i])}{sample_sep_list[i]}{str(sample_gt_right_list[i])} '
 
         # get data of the variant from table "vcf_snps"
-        semaphore.acquire()
         snp_data_dict_1 = xsqlite.get_snp_data_dict(conn, variant_id)
-        semaphore.release()
         pseudobinary_sample_gt_list_1 = xlib.split_literal_to_integer_list(snp_data_dict_1['sample_gt_list'])
         sample_withmd_list = xlib.split_literal_to_integer_list(snp_data_dict_1['sample_withmd_list'])
-        if variant_id in tvi_list: xlib.Message.print('trace', f'thread_id: {thread_id} - variant_id: {variant_id} - sample_withmd_list: {sample_withmd_list}')
+        if variant_id in tvi_list: xlib.Message.print('trace', f'process_id: {os.getpid()} - variant_id: {variant_id} - sample_withmd_list: {sample_withmd_list}')
 
         # get the list with SNPs with the highest r^2 values calculated with respect to the current variant identification
         selected_snp_id_2_list = get_selected_snp_id_2_list(ld_list, minimum_r2, snps_num, inds_wmd=False)
-        if variant_id in tvi_list: xlib.Message.print('trace', f'thread_id: {thread_id} - variant_id: {variant_id} - selected_snp_id_2_list: {selected_snp_id_2_list}')
+        if variant_id in tvi_list: xlib.Message.print('trace', f'process_id: {os.getpid()} - variant_id: {variant_id} - selected_snp_id_2_list: {selected_snp_id_2_list}')
 
         # get the complete list of SNPs considered (the current variant id is the first)
         selected_snp_id_list = [variant_id] + selected_snp_id_2_list
@@ -572,9 +556,7 @@ def process_variant(thread_id, conn, semaphore, minimum_r2, r_estimator, snps_nu
         for selected_snp_id in selected_snp_id_list:
 
             # get data of the selected SNP from table "vcf_snps"
-            semaphore.acquire()
             snp_data_dict_2 = xsqlite.get_snp_data_dict(conn, selected_snp_id)
-            semaphore.release()
             ref_2 = snp_data_dict_2['ref']
             alt_2 = snp_data_dict_2['alt']
             pseudobinary_sample_gt_list_2 = xlib.split_literal_to_integer_list(snp_data_dict_2['sample_gt_list'])
@@ -595,9 +577,9 @@ def process_variant(thread_id, conn, semaphore, minimum_r2, r_estimator, snps_nu
                     allele_list = ['N','N']
                 allele_list.sort()
                 allele_list_text = ''.join(allele_list)
-                if variant_id in tvi_list: xlib.Message.print('trace', f'thread_id: {thread_id} - variant_id: {variant_id} - i: {i} - ref_2: {ref_2} - alt_2: {alt_2}')
-                if variant_id in tvi_list: xlib.Message.print('trace', f'thread_id: {thread_id} - variant_id: {variant_id} - allele_list: {allele_list}')
-                if variant_id in tvi_list: xlib.Message.print('trace', f'thread_id: {thread_id} - variant_id: {variant_id} - allele_list_text: {allele_list_text}')
+                if variant_id in tvi_list: xlib.Message.print('trace', f'process_id: {os.getpid()} - variant_id: {variant_id} - i: {i} - ref_2: {ref_2} - alt_2: {alt_2}')
+                if variant_id in tvi_list: xlib.Message.print('trace', f'process_id: {os.getpid()} - variant_id: {variant_id} - allele_list: {allele_list}')
+                if variant_id in tvi_list: xlib.Message.print('trace', f'process_id: {os.getpid()} - variant_id: {variant_id} - allele_list_text: {allele_list_text}')
                 symbolic_genotype_list[i] = f'{symbolic_genotype_list[i]}{alleles2symbol_dict[allele_list_text]}'
 
         if variant_id in tvi_list:
@@ -606,7 +588,7 @@ def process_variant(thread_id, conn, semaphore, minimum_r2, r_estimator, snps_nu
                     mark = '<---'
                 else:
                     mark = ''
-                if variant_id in tvi_list: xlib.Message.print('trace', f'thread_id: {thread_id} - variant_id: {variant_id} - symbolic_genotype_list[{i:03d}]: {symbolic_genotype_list[i]} {mark}')
+                if variant_id in tvi_list: xlib.Message.print('trace', f'process_id: {os.getpid()} - variant_id: {variant_id} - symbolic_genotype_list[{i:03d}]: {symbolic_genotype_list[i]} {mark}')
 
         # build the list with numeric haplotypes of each sample
         numeric_haplotype_3dlist = []
@@ -649,7 +631,7 @@ def process_variant(thread_id, conn, semaphore, minimum_r2, r_estimator, snps_nu
             elif counter_1_1  == max(counter_0_0, counter_0_1, counter_1_1):
                 sample_gt_left_mf = 1
                 sample_gt_right_mf = 1
-        if variant_id in tvi_list: xlib.Message.print('trace', f'thread_id: {thread_id} - variant_id: {variant_id} - Most frequent genotype: sample_gt_left_mf: {sample_gt_left_mf} - sample_gt_right_mf: {sample_gt_right_mf}')
+        if variant_id in tvi_list: xlib.Message.print('trace', f'process_id: {os.getpid()} - variant_id: {variant_id} - Most frequent genotype: sample_gt_left_mf: {sample_gt_left_mf} - sample_gt_right_mf: {sample_gt_right_mf}')
 
         # when the length of symbolic genotypes is equal to 1
         if len(symbolic_genotype_list[0]) == 1:
@@ -701,7 +683,7 @@ def process_variant(thread_id, conn, semaphore, minimum_r2, r_estimator, snps_nu
 
             # get a dictionary with the number of samples from a given label in each position
             labels_map_dict = som.labels_map(data=training_data_list, labels=training_label_list)
-            # -- if variant_id in tvi_list: xlib.Message.print('trace', f'thread_id: {thread_id} - variant_id: {variant_id} - labels_map_dict:\n{labels_map_dict}')
+            # -- if variant_id in tvi_list: xlib.Message.print('trace', f'process_id: {os.getpid()} - variant_id: {variant_id} - labels_map_dict:\n{labels_map_dict}')
 
             # get a dictionary with samples in each coordinates
             samples_in_coordinates_dict = {}
@@ -711,9 +693,9 @@ def process_variant(thread_id, conn, semaphore, minimum_r2, r_estimator, snps_nu
 
             # get the dictionary with related labels in the same coordinates
             related_label_dict = {}
-            if variant_id in tvi_list: xlib.Message.print('trace', f'thread_id: {thread_id} - variant_id: {variant_id} - Labels-sequences in coordenates ({len(samples_in_coordinates_dict.keys())}):')
+            if variant_id in tvi_list: xlib.Message.print('trace', f'process_id: {os.getpid()} - variant_id: {variant_id} - Labels-sequences in coordenates ({len(samples_in_coordinates_dict.keys())}):')
             for coordinates_tup in sorted(samples_in_coordinates_dict.keys()):
-                if variant_id in tvi_list: xlib.Message.print('trace', f'thread_id: {thread_id} - variant_id: {variant_id} -     coordinates_tup: {coordinates_tup}')
+                if variant_id in tvi_list: xlib.Message.print('trace', f'process_id: {os.getpid()} - variant_id: {variant_id} -     coordinates_tup: {coordinates_tup}')
                 label_list = samples_in_coordinates_dict[coordinates_tup]
                 for label_id in label_list:
                     if label_dict[label_id] in sample_withmd_list:
@@ -723,7 +705,7 @@ def process_variant(thread_id, conn, semaphore, minimum_r2, r_estimator, snps_nu
                         mark = '<---'
                     else:
                         mark = ''
-                    if variant_id in tvi_list: xlib.Message.print('trace', f'thread_id: {thread_id} - variant_id: {variant_id} - label_id: {label_id} - seq: {seq} {mark}')
+                    if variant_id in tvi_list: xlib.Message.print('trace', f'process_id: {os.getpid()} - variant_id: {variant_id} - label_id: {label_id} - seq: {seq} {mark}')
 
             # get the coordinates of the winning neuron for the sample with missing data
             winning_neuron_coordinates_list = []
@@ -731,7 +713,7 @@ def process_variant(thread_id, conn, semaphore, minimum_r2, r_estimator, snps_nu
                 winning_neuron_coordinates_tup = som.winner(input_data_list[sample_withmd])
                 winning_neuron_coordinates_list.append(winning_neuron_coordinates_tup)
                 seq = symbolic_genotype_list[sample_withmd]
-                if variant_id in tvi_list: xlib.Message.print('trace', f'thread_id: {thread_id} - variant_id: {variant_id} - label_id: {sample_label_list[sample_withmd]} - seq: {seq} - winning_neuron_coordinates_tup:{winning_neuron_coordinates_tup}')
+                if variant_id in tvi_list: xlib.Message.print('trace', f'process_id: {os.getpid()} - variant_id: {variant_id} - label_id: {sample_label_list[sample_withmd]} - seq: {seq} - winning_neuron_coordinates_tup:{winning_neuron_coordinates_tup}')
 
             # update the genotypes with missing data in the data of sequence records
             for i in range(len(sample_withmd_list)):    # pylint: disable=consider-using-enumerate
@@ -739,7 +721,7 @@ def process_variant(thread_id, conn, semaphore, minimum_r2, r_estimator, snps_nu
                 try:
                     related_label_list = samples_in_coordinates_dict[coordinates_tup]
                 except KeyError:
-                    if variant_id in tvi_list: xlib.Message.print('trace', f'thread_id: {thread_id} - variant_id: {variant_id} - sample_withmd_list[{i}]: {sample_withmd_list[i]} - there are not related samples in winning_neuron_coordinates_tup => most frequent genotype')
+                    if variant_id in tvi_list: xlib.Message.print('trace', f'process_id: {os.getpid()} - variant_id: {variant_id} - sample_withmd_list[{i}]: {sample_withmd_list[i]} - there are not related samples in winning_neuron_coordinates_tup => most frequent genotype')
                     sample_gt_left_list[sample_withmd_list[i]] = sample_gt_left_mf
                     sample_gt_right_list[sample_withmd_list[i]] = sample_gt_right_mf
                 else:
@@ -758,7 +740,7 @@ def process_variant(thread_id, conn, semaphore, minimum_r2, r_estimator, snps_nu
                             # 0b11 -> 3
                             elif pseudobinary_sample_gt_list_1[label_dict[related_label]] == 3:
                                 counter_1_1 += 1
-                        if variant_id in tvi_list: xlib.Message.print('trace', f'thread_id: {thread_id} - variant_id: {variant_id} - sample_withmd_list[{i}]: {sample_withmd_list[i]} - counter_0_0: {counter_0_0} - counter_0_1: {counter_0_1} - counter_1_1: {counter_1_1}')
+                        if variant_id in tvi_list: xlib.Message.print('trace', f'process_id: {os.getpid()} - variant_id: {variant_id} - sample_withmd_list[{i}]: {sample_withmd_list[i]} - counter_0_0: {counter_0_0} - counter_0_1: {counter_0_1} - counter_1_1: {counter_1_1}')
                         if counter_0_0 > 0 or counter_0_1 > 0 or counter_1_1 > 0:
                             if counter_0_0  == max(counter_0_0, counter_0_1, counter_1_1):
                                 sample_gt_left_list[sample_withmd_list[i]] = '0'
@@ -775,8 +757,8 @@ def process_variant(thread_id, conn, semaphore, minimum_r2, r_estimator, snps_nu
                         most_related_sample_id = get_most_related_sample_id(kinship_dict, r_estimator, sample_withmd_list[i], related_sample_id_list)
                         sample_gt_left_list[sample_withmd_list[i]] = sample_gt_left_list[most_related_sample_id]
                         sample_gt_right_list[sample_withmd_list[i]] = sample_gt_right_list[most_related_sample_id]
-                        if variant_id in tvi_list: xlib.Message.print('trace', f'thread_id: {thread_id} - variant_id: {variant_id} - sample_withmd_list[{i}]: {sample_withmd_list[i]} - most_related_sample_id: {most_related_sample_id}')
-                if variant_id in tvi_list: xlib.Message.print('trace', f'thread_id: {thread_id} - variant_id: {variant_id} -     sample_gt_left_list[{sample_withmd_list[i]}]: {sample_gt_left_list[sample_withmd_list[i]]} - sample_gt_right_list[{sample_withmd_list[i]}]: {sample_gt_right_list[sample_withmd_list[i]]}')
+                        if variant_id in tvi_list: xlib.Message.print('trace', f'process_id: {os.getpid()} - variant_id: {variant_id} - sample_withmd_list[{i}]: {sample_withmd_list[i]} - most_related_sample_id: {most_related_sample_id}')
+                if variant_id in tvi_list: xlib.Message.print('trace', f'process_id: {os.getpid()} - variant_id: {variant_id} -     sample_gt_left_list[{sample_withmd_list[i]}]: {sample_gt_left_list[sample_withmd_list[i]]} - sample_gt_right_list[{sample_withmd_list[i]}]: {sample_gt_right_list[sample_withmd_list[i]]}')
 
             # set the impute variant indicator
             is_variant_imputed = True
@@ -785,13 +767,13 @@ def process_variant(thread_id, conn, semaphore, minimum_r2, r_estimator, snps_nu
         genotype_text_after_imputation = ''
         for i in range(sample_number):
             genotype_text_after_imputation += f'{str(sample_gt_left_list[i])}{sample_sep_list[i]}{str(sample_gt_right_list[i])} '
-        if variant_id in tvi_list: xlib.Message.print('trace', f'thread_id: {thread_id} - variant_id: {variant_id} - genotype list before imputation: {genotype_text_before_imputation}')
-        if variant_id in tvi_list: xlib.Message.print('trace', f'thread_id: {thread_id} - variant_id: {variant_id} - genotype list  after imputation: {genotype_text_after_imputation}')
+        if variant_id in tvi_list: xlib.Message.print('trace', f'process_id: {os.getpid()} - variant_id: {variant_id} - genotype list before imputation: {genotype_text_before_imputation}')
+        if variant_id in tvi_list: xlib.Message.print('trace', f'process_id: {os.getpid()} - variant_id: {variant_id} - genotype list  after imputation: {genotype_text_after_imputation}')
 
     # if there are no mising data
     else:
 
-        if variant_id in tvi_list: xlib.Message.print('trace', f'thread_id: {thread_id} - variant_id: {variant_id} - There is no missing data')
+        if variant_id in tvi_list: xlib.Message.print('trace', f'process_id: {os.getpid()} - variant_id: {variant_id} - There is no missing data')
 
     # rebuild the list of the field GT for every sample
     for i in range(sample_number):
@@ -822,8 +804,8 @@ def process_variant(thread_id, conn, semaphore, minimum_r2, r_estimator, snps_nu
     else:
         imputation_data_record = ''
 
-    # update the result list
-    result_list[thread_id] = {'output_vcf_record': output_vcf_record, 'imputation_data_record': imputation_data_record, 'is_variant_imputed': is_variant_imputed}
+    # return the result
+    return {'output_vcf_record': output_vcf_record, 'imputation_data_record': imputation_data_record, 'is_variant_imputed': is_variant_imputed}
 
 #-------------------------------------------------------------------------------
 
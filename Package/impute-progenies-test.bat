@@ -55,6 +55,7 @@ rem Run the program impute-progenies.py
     --sp2_id=EN ^
     --hyb_id=HY ^
     --out=%OUTPUT_DIR%\concatenated_imputed_progenies-scenario2.vcf ^
+    --metrics=NONE ^
     --verbose=Y ^
     --trace=N ^
     --tvi=NONE
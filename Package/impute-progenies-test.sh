@@ -52,6 +52,7 @@ cd $NGSHELPER_DIR
         --sp2_id=EN \
         --hyb_id=HY \
         --out=$OUTPUT_DIR/concatenated_imputed_progenies-scenario2.vcf \
+       --metrics=NONE \
        --verbose=Y \
         --trace=N \
         --tvi=NONE
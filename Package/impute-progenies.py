@@ -31,10 +31,16 @@ import gzip
 import os
 import sys
 
+import xgenotype
 import xlib
 
 #-------------------------------------------------------------------------------
 
+# import heavy modules when they are used for the first time
+np = xlib.LazyModule('numpy')
+
+#-------------------------------------------------------------------------------
+
 def main():
     '''
     Main line of the program.
@@ -48,8 +54,13 @@ def main():
     args = parser.parse_args()
     check_args(args)
 
-    # impute progenies in VCF file perviouly treated by impute-adults.py
-    impute_progenies(args.input_vcf_file, args.sample_file, args.scenario, args.imputed_md_id, args.sp1_id, args.sp2_id, args.hybrid_id, args.output_vcf_file, args.tvi_list)
+    # measure the run metrics (the report is written when the run ends)
+    with xlib.Metrics.run(args.metrics_file):
+
+        # impute progenies in VCF file perviouly treated by impute-adults.py
+        with xlib.Metrics.stage('impute progenies') as stage:
+            record_counter = impute_progenies(args.input_vcf_file, args.sample_file, args.scenario, args.imputed_md_id, args.sp1_id, args.sp2_id, args.hybrid_id, args.output_vcf_file, args.tvi_list)
+            stage.add(records=record_counter, bytes_number=os.path.getsize(args.input_vcf_file))
 
 #-------------------------------------------------------------------------------
 
@@ -61,7 +72,8 @@ def build_parser():
     # create the parser and add arguments
     description = 'Description: This program treats the VCF output file of impute-adults.py, checks the genotype\n' \
         'compatibility between each mother and its progeny, and imputes missing data of progeny genotypes\n' \
-        'according to the selected imputation scenario.'
+        'according to the selected imputation scenario.\n' \
+        f'Allele indexes of genotypes (subfield GT) greater than {xlib.Const.GT_MAX_ALLELE_CODE} are not supported.'
     text = f'{xlib.get_project_name()} v{xlib.get_project_version()} - {os.path.basename(__file__)}\n\n{description}\n'
     usage = f'\r{text.ljust(len("usage:"))}\nUsage: {os.path.basename(__file__)} arguments'
     parser = argparse.ArgumentParser(usage=usage)
@@ -74,6 +86,7 @@ def build_parser():
     parser.add_argument('--sp2_id', dest='sp2_id', help='Identification of the second species (mandatory).')
     parser.add_argument('--hyb_id', dest='hybrid_id', help='Identification of the hybrid or NONE; default NONE.')
     parser.add_argument('--out', dest='output_vcf_file', help='Path of output VCF file (mandatory).')
+    parser.add_argument('--metrics', dest='metrics_file', help='Path of the output JSON file with the run metrics (elapsed time, throughput of stages and peak memory) or NONE; default: NONE.')
     parser.add_argument('--verbose', dest='verbose', help=f'Additional job status info during the run: {xlib.get_verbose_code_list_text()}; default: {xlib.Const.DEFAULT_VERBOSE}.')
     parser.add_argument('--trace', dest='trace', help=f'Additional info useful to the developer team: {xlib.get_trace_code_list_text()}; default: {xlib.Const.DEFAULT_TRACE}.')
     parser.add_argument('--tvi', dest='tvi_list', help='Variant identification list to trace with format seq_id_1-pos_1,seq_id_2-pos_2,...,seq_id_n-pos_n or NONE; default: NONE.')
@@ -138,6 +151,10 @@ def check_args(args):
         xlib.Message.print('error', '*** The output VCF file is not indicated in the input arguments.')
         OK = False
 
+    # check "metrics_file"
+    if args.metrics_file is None or args.metrics_file.upper() == 'NONE':
+        args.metrics_file = None
+
     # check "verbose"
     if args.verbose is None:
         args.verbose = xlib.Const.DEFAULT_VERBOSE
@@ -177,7 +194,7 @@ def check_args(args):
 
 def impute_progenies(input_vcf_file, sample_file, scenario, imputed_md_id, sp1_id, sp2_id, hybrid_id, output_vcf_file, tvi_list):
     '''
-    Impute progenies in VCF file perviouly treated by impute-adults.py.
+    Impute progenies in VCF file perviouly treated by impute-adults.py and return the number of records read.
     '''
 
     # initialize the sample number
@@ -269,6 +286,12 @@ def impute_progenies(input_vcf_file, sample_file, scenario, imputed_md_id, sp1_i
             # set the sample number
             sample_number = len(species_id_list)
 
+            # get the arrays of the progeny indexes and the indexes of their mothers
+            (progeny_index_array, mother_index_array) = xgenotype.get_family_index_arrays(sample_id_list, mother_id_list)
+
+            # create the genotype parser
+            genotype_parser = xgenotype.GenotypeParser(sample_number, imputed_md_id)
+
             # write the column description record
             output_vcf_file_id.write(record)
 
@@ -306,618 +329,53 @@ def impute_progenies(input_vcf_file, sample_file, scenario, imputed_md_id, sp1_i
                 raise xlib.ProgramException('', 'L007', 'DP', data_dict['chrom'], data_dict['pos'])
 
             # get the position of the genotype (subfield GT) in the field FORMAT
-            format_subfield_list = data_dict['format'].upper().split(':')
-            try:
-                gt_position = format_subfield_list.index('GT')
-            except Exception as e:
-                raise xlib.ProgramException(e, 'L007', 'GT', data_dict['chrom'], data_dict['pos'])
-
-            # build the list of sample genotypes of a variant
-            sample_data_list = []
-            sample_gt_list = []
-            for i in range(sample_number):
-                sample_data_list.append(data_dict['sample_list'][i].split(':'))
-                sample_gt_list.append(sample_data_list[i][gt_position])
-
-            # build the lists of the left and right side of sample genotypes of a variant
-            sample_gt_left_list = []
-            sample_sep_list = []
-            sample_gt_right_list = []
-            for i in range(sample_number):
-                sep = '/'
-                sep_pos = sample_gt_list[i].find(sep)
-                if sep_pos == -1:
-                    sep = '|'
-                    sep_pos = sample_gt_list[i].find(sep)
-                if sep_pos == -1:
-                    raise xlib.ProgramException('', 'L008', 'GT', data_dict['chrom'], data_dict['pos'])
-                sample_sep_list.append(sep)
-                sample_gt_left_list.append(sample_gt_list[i][:sep_pos])
-                sample_gt_right_list.append(sample_gt_list[i][sep_pos+1:])
-            if variant_id in tvi_list: xlib.Message.print('trace', f'sample_gt_list: {sample_gt_list}')
-
-            if variant_id in tvi_list:
-                literal = ' '
-                for i in range(sample_number):
-                    literal += f'{str(sample_gt_left_list[i])}{sample_sep_list[i]}{str(sample_gt_right_list[i])} '
-                xlib.Message.print('trace', f'genotype list before imputation revision: {literal}')
-
-            # initialize imputation control variable
-            is_variant_imputed = False
-
-            # impute depending on the genotype compatibility between the sample and its mother
-            # A: any allele different to imputed (I) and missing data (M) ones
-            # B: other allele different to A and imputed (I) and missing data (M) ones
-            # *: a allele different to mother alleles and  missing data (M) one
-            # **: a allele different to * and mother alleles and  missing data (M) one
-            # #: any allele different to missing data (M) one
-            # ##: any allele different to # and missing data (M) one
-            # M (P): missing data allele
-            # I (99): imputed allele
-            for i in range(sample_number):
-
-                # only when the sample is progeny
-                if mother_id_list[i] != 'NONE':
-
-                    # get the sample identification
-                    sample_id = sample_id_list[i]
-
-                    # get the index of the mother in lists
-                    j = sample_id_list.index(mother_id_list[i])
-
-                    # get the list of the mother distinct alleles
-                    if sample_gt_left_list[j] == sample_gt_right_list[j]:
-                        mother_gt_list = [sample_gt_left_list[j]]
-                    else:
-                        mother_gt_list = [sample_gt_left_list[j], sample_gt_right_list[j]]
-
-                    # get the list of imputed and missing data alleles
-                    M_I_list = [imputed_md_id, xlib.get_md_symbol()]
-
-                    # get the list of mother distinct alleles plus missing data allele
-                    mother_gt_plus_M_list = mother_gt_list + [xlib.get_md_symbol()]
-
-                    # get the list of mother distinct alleles plus imputed and missing data alleles
-                    # -- mother_gt_plus_M_I_list = mother_gt_list + M_I_list
-
-                    # revision when the scenario is '0' (no imputation) or '2' (maximum possible imputation)
-                    if scenario in ['0', '2']:
-
-                        # mother alleles: A/A
-                        if len(mother_gt_list) == 1 and imputed_md_id not in mother_gt_list and xlib.get_md_symbol() not in mother_gt_list:
-
-                            # progeny alleles: A/# -> progeny alleles: A/#   OR   progeny alleles: #/A -> progeny alleles: #/A
-                            if sample_gt_left_list[i] in mother_gt_list and sample_gt_right_list[i] != xlib.get_md_symbol() or \
-                                sample_gt_left_list[i] != xlib.get_md_symbol() and sample_gt_right_list[i] in mother_gt_list:
-
-                                pass
-
-                            # progeny alleles: */* -> progeny alleles: M/M
-                            elif sample_gt_left_list[i] == sample_gt_right_list[i] and \
-                                sample_gt_left_list[i] not in mother_gt_plus_M_list:
-
-                                sample_gt_left_list[i] = xlib.get_md_symbol()
-                                sample_gt_right_list[i] = xlib.get_md_symbol()
-                                is_variant_imputed = True
-
-                            # progeny alleles: */** -> progeny alleles: M/M
-                            elif sample_gt_left_list[i] != sample_gt_right_list[i] and \
-                                sample_gt_left_list[i] not in mother_gt_plus_M_list and \
-                                sample_gt_right_list[i] not in mother_gt_plus_M_list:
-
-                                sample_gt_left_list[i] = xlib.get_md_symbol()
-                                sample_gt_right_list[i] = xlib.get_md_symbol()
-                                is_variant_imputed = True
-
-                            # progeny alleles: M/M -> progeny alleles: M/M
-                            elif sample_gt_left_list[i] == sample_gt_right_list[i] and \
-                                sample_gt_left_list[i] == xlib.get_md_symbol():
-
-                                pass
-
-                            # in any other progeny alleles
-                            else:
-
-                                raise xlib.ProgramException('', 'L010', data_dict['chrom'], data_dict['pos'], sample_id, scenario, ','.join(mother_gt_list), sample_gt_list[i])
-
-                        # mother alleles: A/I
-                        elif len(mother_gt_list) == 2 and imputed_md_id in mother_gt_list:
-
-                            # progeny alleles: A/A -> progeny alleles: A/I
-                            if sample_gt_left_list[i] == sample_gt_right_list[i] and \
-                                sample_gt_left_list[i] in mother_gt_list and sample_gt_left_list[i] != imputed_md_id:
-
-                                sample_gt_right_list[i] = imputed_md_id
-                                is_variant_imputed = True
-
-                            # progeny alleles: A/* -> progeny alleles: A/*    OR   progeny alleles: */A -> progeny alleles: */A
-                            elif sample_gt_left_list[i] != sample_gt_right_list[i] and \
-                                sample_gt_left_list[i] != imputed_md_id and sample_gt_right_list[i] != imputed_md_id and \
-                                (sample_gt_left_list[i] in mother_gt_list and sample_gt_right_list[i] not in mother_gt_list or \
-                                 sample_gt_left_list[i] not in mother_gt_list and sample_gt_right_list[i] in mother_gt_list):
-
-                                pass
-
-                            # progeny alleles: */* -> progeny alleles: */I
-                            elif sample_gt_left_list[i] == sample_gt_right_list[i] and \
-                                sample_gt_left_list[i] not in mother_gt_plus_M_list:
-
-                                sample_gt_right_list[i] = imputed_md_id
-                                is_variant_imputed = True
-
-                            # progeny alleles: */** -> progeny alleles: M/M
-                            elif sample_gt_left_list[i] != sample_gt_right_list[i] and \
-                                sample_gt_left_list[i] not in mother_gt_plus_M_list and \
-                                sample_gt_right_list[i] not in mother_gt_plus_M_list:
-
-                                sample_gt_left_list[i] = xlib.get_md_symbol()
-                                sample_gt_right_list[i] = xlib.get_md_symbol()
-                                is_variant_imputed = True
-
-                            # progeny alleles: M/M -> progeny alleles: I/I
-                            elif sample_gt_left_list[i] == sample_gt_right_list[i] and \
-                                sample_gt_left_list[i] == xlib.get_md_symbol():
-
-                                sample_gt_left_list[i] = imputed_md_id
-                                sample_gt_right_list[i] = imputed_md_id
-                                is_variant_imputed = True
-
-                            # in any other progeny alleles
-                            else:
-
-                                raise xlib.ProgramException('', 'L010', data_dict['chrom'], data_dict['pos'], sample_id, scenario, ','.join(mother_gt_list), sample_gt_list[i])
-
-                        # mother alleles: A/B
-                        elif len(mother_gt_list) == 2 and imputed_md_id not in mother_gt_list and xlib.get_md_symbol() not in mother_gt_list:
-
-                            # progeny alleles: A/# -> progeny alleles: A/#   OR   progeny alleles: #/A -> progeny alleles: #/A   OR
-                            # progeny alleles: B/# -> progeny alleles: B/#   OR   progeny alleles: #/B -> progeny alleles: #/B
-                            if sample_gt_left_list[i] in mother_gt_list and sample_gt_right_list[i] != xlib.get_md_symbol() or \
-                                sample_gt_left_list[i] != xlib.get_md_symbol() and sample_gt_right_list[i] in mother_gt_list:
-
-                                pass
-
-                            # progeny alleles: */* -> progeny alleles: M/M
-                            elif sample_gt_left_list[i] == sample_gt_right_list[i] and \
-                                sample_gt_left_list[i] not in mother_gt_plus_M_list:
-
-                                sample_gt_left_list[i] = xlib.get_md_symbol()
-                                sample_gt_right_list[i] = xlib.get_md_symbol()
-                                is_variant_imputed = True
-
-                            # progeny alleles: */** -> progeny alleles: M/M
-                            elif sample_gt_left_list[i] != sample_gt_right_list[i] and \
-                                sample_gt_left_list[i] not in mother_gt_plus_M_list and \
-                                sample_gt_right_list[i] not in mother_gt_plus_M_list:
-
-                                sample_gt_left_list[i] = xlib.get_md_symbol()
-                                sample_gt_right_list[i] = xlib.get_md_symbol()
-                                is_variant_imputed = True
-
-                            # progeny alleles: M/M -> progeny alleles: M/M
-                            elif sample_gt_left_list[i] == sample_gt_right_list[i] and \
-                                sample_gt_left_list[i] == xlib.get_md_symbol():
-
-                                pass
-
-                            # in any other progeny alleles
-                            else:
-
-                                raise xlib.ProgramException('', 'L010', data_dict['chrom'], data_dict['pos'], sample_id, scenario, ','.join(mother_gt_list), sample_gt_list[i])
-
-                        # mother alleles: I/I
-                        elif len(mother_gt_list) == 1 and imputed_md_id in mother_gt_list:
-
-                            # progeny alleles: A/A -> progeny alleles: A/I
-                            if sample_gt_left_list[i] == sample_gt_right_list[i] and \
-                                sample_gt_left_list[i] not in M_I_list:
-
-                                sample_gt_right_list[i] = imputed_md_id
-                                is_variant_imputed = True
-
-                            # progeny alleles: A/B -> progeny alleles: M/M
-                            elif sample_gt_left_list[i] != sample_gt_right_list[i] and \
-                                sample_gt_left_list[i] not in M_I_list and \
-                                sample_gt_right_list[i] not in M_I_list:
-
-                                sample_gt_left_list[i] = xlib.get_md_symbol()
-                                sample_gt_right_list[i] = xlib.get_md_symbol()
-                                is_variant_imputed = True
-
-                            # progeny alleles: M/M -> progeny alleles: I/I
-                            elif sample_gt_left_list[i] == sample_gt_right_list[i] and \
-                                sample_gt_left_list[i] == xlib.get_md_symbol():
-
-                                sample_gt_left_list[i] = imputed_md_id
-                                sample_gt_right_list[i] = imputed_md_id
-                                is_variant_imputed = True
-
-                            # in any other progeny alleles
-                            else:
-
-                                raise xlib.ProgramException('', 'L010', data_dict['chrom'], data_dict['pos'], sample_id, scenario, ','.join(mother_gt_list), sample_gt_list[i])
-
-                        # mother alleles: M/M
-                        elif len(mother_gt_list) == 1 and xlib.get_md_symbol() in mother_gt_list:
-
-                            # progeny alleles: */* -> progeny alleles: */*
-                            if sample_gt_left_list[i] == sample_gt_right_list[i] and \
-                                sample_gt_left_list[i] != xlib.get_md_symbol():
-
-                                pass
-
-                            # progeny alleles: */** -> progeny alleles: */**
-                            elif sample_gt_left_list[i] != sample_gt_right_list[i] and \
-                                sample_gt_left_list[i]  != xlib.get_md_symbol() and \
-                                sample_gt_right_list[i]  != xlib.get_md_symbol():
-
-                                pass
-
-                            # progeny alleles: M/M -> progeny alleles: M/M
-                            elif sample_gt_left_list[i] == sample_gt_right_list[i] and \
-                                sample_gt_left_list[i] == xlib.get_md_symbol():
-
-                                pass
-
-                            # in any other progeny alleles
-                            else:
-
-                                raise xlib.ProgramException('', 'L010', data_dict['chrom'], data_dict['pos'], sample_id, scenario, ','.join(mother_gt_list), sample_gt_list[i])
-
-                        # in any other mother alleles
-                        else:
-
-                            raise xlib.ProgramException('', 'L009', data_dict['chrom'], data_dict['pos'], sample_id, scenario, ','.join(mother_gt_list), sample_gt_list[i])
-
-                    # revision when the scenario is '1' (standard)
-                    elif scenario == '1':
-
-                        # mother alleles: A/A
-                        if len(mother_gt_list) == 1 and imputed_md_id not in mother_gt_list and xlib.get_md_symbol() not in mother_gt_list:
-
-                            # progeny alleles: A/# -> progeny alleles: A/#   OR   progeny alleles: #/A -> progeny alleles: #/A
-                            if sample_gt_left_list[i] in mother_gt_list and sample_gt_right_list[i] != xlib.get_md_symbol() or \
-                                sample_gt_left_list[i] != xlib.get_md_symbol() and sample_gt_right_list[i] in mother_gt_list:
-
-                                pass
-
-                            # progeny alleles: */* -> progeny alleles: M/M
-                            elif sample_gt_left_list[i] == sample_gt_right_list[i] and \
-                                sample_gt_left_list[i] not in mother_gt_plus_M_list:
-
-                                sample_gt_left_list[i] = xlib.get_md_symbol()
-                                sample_gt_right_list[i] = xlib.get_md_symbol()
-                                is_variant_imputed = True
-
-                            # progeny alleles: */** -> progeny alleles: M/M
-                            elif sample_gt_left_list[i] != sample_gt_right_list[i] and \
-                                sample_gt_left_list[i] not in mother_gt_plus_M_list and \
-                                sample_gt_right_list[i] not in mother_gt_plus_M_list:
-
-                                sample_gt_left_list[i] = xlib.get_md_symbol()
-                                sample_gt_right_list[i] = xlib.get_md_symbol()
-                                is_variant_imputed = True
-
-                            # progeny alleles: M/M -> progeny alleles: M/M
-                            elif sample_gt_left_list[i] == sample_gt_right_list[i] and \
-                                sample_gt_left_list[i] == xlib.get_md_symbol():
-
-                                pass
-
-                            # in any other progeny alleles
-                            else:
-
-                                raise xlib.ProgramException('', 'L010', data_dict['chrom'], data_dict['pos'], sample_id, scenario, ','.join(mother_gt_list), sample_gt_list[i])
-
-                        # mother alleles: A/B
-                        elif len(mother_gt_list) == 2 and imputed_md_id not in mother_gt_list and xlib.get_md_symbol() not in mother_gt_list:
-
-                            # progeny alleles: A/# -> progeny alleles: A/#   OR   progeny alleles: #/A -> progeny alleles: #/A   OR
-                            # progeny alleles: B/# -> progeny alleles: B/#   OR   progeny alleles: #/B -> progeny alleles: #/B
-                            if sample_gt_left_list[i] in mother_gt_list and sample_gt_right_list[i] != xlib.get_md_symbol() or \
-                                sample_gt_left_list[i] != xlib.get_md_symbol() and sample_gt_right_list[i] in mother_gt_list:
-
-                                pass
-
-                            # progeny alleles: */* -> progeny alleles: M/M
-                            elif sample_gt_left_list[i] == sample_gt_right_list[i] and \
-                                sample_gt_left_list[i] not in mother_gt_plus_M_list:
-
-                                sample_gt_left_list[i] = xlib.get_md_symbol()
-                                sample_gt_right_list[i] = xlib.get_md_symbol()
-                                is_variant_imputed = True
-
-                            # progeny alleles: */** -> progeny alleles: M/M
-                            elif sample_gt_left_list[i] != sample_gt_right_list[i] and \
-                                sample_gt_left_list[i] not in mother_gt_plus_M_list and \
-                                sample_gt_right_list[i] not in mother_gt_plus_M_list:
-
-                                sample_gt_left_list[i] = xlib.get_md_symbol()
-                                sample_gt_right_list[i] = xlib.get_md_symbol()
-                                is_variant_imputed = True
-
-                            # progeny alleles: M/M -> progeny alleles: M/M
-                            elif sample_gt_left_list[i] == sample_gt_right_list[i] and \
-                                sample_gt_left_list[i] == xlib.get_md_symbol():
+            gt_position = genotype_parser.get_gt_position(data_dict)
 
-                                pass
+            # get the arrays of the left and right allele codes of the sample genotypes
+            (left_array, right_array) = genotype_parser.parse(data_dict)
 
-                            # in any other progeny alleles
-                            else:
-
-                                raise xlib.ProgramException('', 'L010', data_dict['chrom'], data_dict['pos'], sample_id, scenario, ','.join(mother_gt_list), sample_gt_list[i])
-
-                        # mother alleles: I/I
-                        elif len(mother_gt_list) == 1 and imputed_md_id in mother_gt_list:
-
-                            # progeny alleles: #/# -> progeny alleles: #/I
-                            if sample_gt_left_list[i] == sample_gt_right_list[i] and \
-                                sample_gt_left_list[i] != xlib.get_md_symbol():
-
-                                sample_gt_right_list[i] = imputed_md_id
-                                is_variant_imputed = True
-
-                            # progeny alleles: #/## -> progeny alleles: M/M
-                            elif sample_gt_left_list[i] != sample_gt_right_list[i] and \
-                                sample_gt_left_list[i] != xlib.get_md_symbol() and \
-                                sample_gt_right_list[i] != xlib.get_md_symbol():
-
-                                sample_gt_left_list[i] = xlib.get_md_symbol()
-                                sample_gt_right_list[i] = xlib.get_md_symbol()
-                                is_variant_imputed = True
-
-                            # progeny alleles: M/M -> progeny alleles: I/I
-                            elif sample_gt_left_list[i] == sample_gt_right_list[i] and \
-                                sample_gt_left_list[i] == xlib.get_md_symbol():
-
-                                sample_gt_left_list[i] = imputed_md_id
-                                sample_gt_right_list[i] = imputed_md_id
-                                is_variant_imputed = True
-
-                            # in any other progeny alleles
-                            else:
-
-                                raise xlib.ProgramException('', 'L010', data_dict['chrom'], data_dict['pos'], sample_id, scenario, ','.join(mother_gt_list), sample_gt_list[i])
-
-                        # mother alleles: M/M
-                        elif len(mother_gt_list) == 1 and xlib.get_md_symbol() in mother_gt_list:
-
-                            # progeny alleles: */* -> progeny alleles: */*
-                            if sample_gt_left_list[i] == sample_gt_right_list[i] and \
-                                sample_gt_left_list[i] != xlib.get_md_symbol():
-
-                                pass
-
-                            # progeny alleles: */** -> progeny alleles: */**
-                            elif sample_gt_left_list[i] != sample_gt_right_list[i] and \
-                                sample_gt_left_list[i]  != xlib.get_md_symbol() and \
-                                sample_gt_right_list[i]  != xlib.get_md_symbol():
-
-                                pass
-
-                            # progeny alleles: M/M -> progeny alleles: M/M
-                            elif sample_gt_left_list[i] == sample_gt_right_list[i] and \
-                                sample_gt_left_list[i] == xlib.get_md_symbol():
-
-                                pass
-
-                            # in any other progeny alleles
-                            else:
-
-                                raise xlib.ProgramException('', 'L010', data_dict['chrom'], data_dict['pos'], sample_id, scenario, ','.join(mother_gt_list), sample_gt_list[i])
-
-                        # in any other mother alleles
-                        else:
-
-                            raise xlib.ProgramException('', 'L009', data_dict['chrom'], data_dict['pos'], sample_id, scenario, ','.join(mother_gt_list), sample_gt_list[i])
-
-                    # revision when the scenario is '3' (maximum possible missing data)
-                    elif scenario == '3':
-
-                        # mother alleles: A/A
-                        if len(mother_gt_list) == 1 and imputed_md_id not in mother_gt_list and xlib.get_md_symbol() not in mother_gt_list:
-
-                            # progeny alleles: A/# -> progeny alleles: A/#   OR   progeny alleles: #/A -> progeny alleles: #/A
-                            if sample_gt_left_list[i] in mother_gt_list and sample_gt_right_list[i] != xlib.get_md_symbol() or \
-                                sample_gt_left_list[i] != xlib.get_md_symbol() and sample_gt_right_list[i] in mother_gt_list:
-
-                                pass
-
-                            # progeny alleles: */* -> progeny alleles: M/M
-                            elif sample_gt_left_list[i] == sample_gt_right_list[i] and \
-                                sample_gt_left_list[i] not in mother_gt_plus_M_list:
-
-                                sample_gt_left_list[i] = xlib.get_md_symbol()
-                                sample_gt_right_list[i] = xlib.get_md_symbol()
-                                is_variant_imputed = True
-
-                            # progeny alleles: */** -> progeny alleles: M/M
-                            elif sample_gt_left_list[i] != sample_gt_right_list[i] and \
-                                sample_gt_left_list[i] not in mother_gt_plus_M_list and \
-                                sample_gt_right_list[i] not in mother_gt_plus_M_list:
-
-                                sample_gt_left_list[i] = xlib.get_md_symbol()
-                                sample_gt_right_list[i] = xlib.get_md_symbol()
-                                is_variant_imputed = True
-
-                            # progeny alleles: M/M -> progeny alleles: M/M
-                            elif sample_gt_left_list[i] == sample_gt_right_list[i] and \
-                                sample_gt_left_list[i] == xlib.get_md_symbol():
-
-                                pass
-
-                            # in any other progeny alleles
-                            else:
-
-                                raise xlib.ProgramException('', 'L010', data_dict['chrom'], data_dict['pos'], sample_id, scenario, ','.join(mother_gt_list), sample_gt_list[i])
-
-                        # mother alleles: A/M
-                        elif len(mother_gt_list) == 2 and xlib.get_md_symbol() in mother_gt_list:
-
-                            # progeny alleles: A/A -> progeny alleles: A/M
-                            if sample_gt_left_list[i] == sample_gt_right_list[i] and \
-                                sample_gt_left_list[i] in mother_gt_list and sample_gt_left_list[i] != imputed_md_id:
-
-                                sample_gt_right_list[i] = xlib.get_md_symbol()
-                                is_variant_imputed = True
-
-                            # progeny alleles: A/* -> progeny alleles: A/*    OR   progeny alleles: */A -> progeny alleles: */A
-                            elif sample_gt_left_list[i] != sample_gt_right_list[i] and \
-                                sample_gt_left_list[i] not in M_I_list and sample_gt_right_list[i] not in M_I_list and \
-                                (sample_gt_left_list[i] in mother_gt_list and sample_gt_right_list[i] not in mother_gt_list or \
-                                 sample_gt_left_list[i] not in mother_gt_list and sample_gt_right_list[i] in mother_gt_list):
-
-                                pass
-
-                            # progeny alleles: */* -> progeny alleles: */M
-                            elif sample_gt_left_list[i] == sample_gt_right_list[i] and \
-                                sample_gt_left_list[i] not in mother_gt_plus_M_list:
-
-                                sample_gt_right_list[i] = xlib.get_md_symbol()
-                                is_variant_imputed = True
-
-                            # progeny alleles: */** -> progeny alleles: M/M
-                            elif sample_gt_left_list[i] != sample_gt_right_list[i] and \
-                                sample_gt_left_list[i] not in mother_gt_plus_M_list and \
-                                sample_gt_right_list[i] not in mother_gt_plus_M_list:
-
-                                sample_gt_left_list[i] = xlib.get_md_symbol()
-                                sample_gt_right_list[i] = xlib.get_md_symbol()
-                                is_variant_imputed = True
-
-                            # progeny alleles: M/M -> progeny alleles: M/M
-                            elif sample_gt_left_list[i] == sample_gt_right_list[i] and \
-                                sample_gt_left_list[i] == xlib.get_md_symbol():
-
-                                pass
-
-                            # in any other progeny alleles
-                            else:
-
-                                raise xlib.ProgramException('', 'L010', data_dict['chrom'], data_dict['pos'], sample_id, scenario, ','.join(mother_gt_list), sample_gt_list[i])
-
-                        # mother alleles: A/B
-                        elif len(mother_gt_list) == 2 and imputed_md_id not in mother_gt_list and xlib.get_md_symbol() not in mother_gt_list:
-
-                            # progeny alleles: A/# -> progeny alleles: A/#   OR   progeny alleles: #/A -> progeny alleles: #/A   OR
-                            # progeny alleles: B/# -> progeny alleles: B/#   OR   progeny alleles: #/B -> progeny alleles: #/B
-                            if sample_gt_left_list[i] in mother_gt_list and sample_gt_right_list[i] != xlib.get_md_symbol() or \
-                                sample_gt_left_list[i] != xlib.get_md_symbol() and sample_gt_right_list[i] in mother_gt_list:
-
-                                pass
-
-                            # progeny alleles: */* -> progeny alleles: M/M
-                            elif sample_gt_left_list[i] == sample_gt_right_list[i] and \
-                                sample_gt_left_list[i] not in mother_gt_plus_M_list:
-
-                                sample_gt_left_list[i] = xlib.get_md_symbol()
-                                sample_gt_right_list[i] = xlib.get_md_symbol()
-                                is_variant_imputed = True
-
-                            # progeny alleles: */** -> progeny alleles: M/M
-                            elif sample_gt_left_list[i] != sample_gt_right_list[i] and \
-                                sample_gt_left_list[i] not in mother_gt_plus_M_list and \
-                                sample_gt_right_list[i] not in mother_gt_plus_M_list:
-
-                                sample_gt_left_list[i] = xlib.get_md_symbol()
-                                sample_gt_right_list[i] = xlib.get_md_symbol()
-                                is_variant_imputed = True
-
-                            # progeny alleles: M/M -> progeny alleles: M/M
-                            elif sample_gt_left_list[i] == sample_gt_right_list[i] and \
-                                sample_gt_left_list[i] == xlib.get_md_symbol():
-
-                                pass
-
-                            # in any other progeny alleles
-                            else:
-
-                                raise xlib.ProgramException('', 'L010', data_dict['chrom'], data_dict['pos'], sample_id, scenario, ','.join(mother_gt_list), sample_gt_list[i])
-
-                        # mother alleles: I/I
-                        elif len(mother_gt_list) == 1 and imputed_md_id in mother_gt_list:
-
-                            # progeny alleles: A/A -> progeny alleles: A/I
-                            if sample_gt_left_list[i] == sample_gt_right_list[i] and \
-                                sample_gt_left_list[i] not in M_I_list:
-
-                                sample_gt_right_list[i] = imputed_md_id
-                                is_variant_imputed = True
-
-                            # progeny alleles: A/B -> progeny alleles: M/M
-                            elif sample_gt_left_list[i] != sample_gt_right_list[i] and \
-                                sample_gt_left_list[i] not in M_I_list and \
-                                sample_gt_right_list[i] not in M_I_list:
-
-                                sample_gt_left_list[i] = xlib.get_md_symbol()
-                                sample_gt_right_list[i] = xlib.get_md_symbol()
-                                is_variant_imputed = True
-
-                            # progeny alleles: M/M -> progeny alleles: I/I
-                            elif sample_gt_left_list[i] == sample_gt_right_list[i] and \
-                                sample_gt_left_list[i] == xlib.get_md_symbol():
-
-                                sample_gt_left_list[i] = imputed_md_id
-                                sample_gt_right_list[i] = imputed_md_id
-                                is_variant_imputed = True
-
-                            # in any other progeny alleles
-                            else:
-
-                                raise xlib.ProgramException('', 'L010', data_dict['chrom'], data_dict['pos'], sample_id, scenario, ','.join(mother_gt_list), sample_gt_list[i])
-
-                        # mother alleles: M/M
-                        elif len(mother_gt_list) == 1 and xlib.get_md_symbol() in mother_gt_list:
-
-                            # progeny alleles: */* -> progeny alleles: */*
-                            if sample_gt_left_list[i] == sample_gt_right_list[i] and \
-                                sample_gt_left_list[i] != xlib.get_md_symbol():
-
-                                pass
-
-                            # progeny alleles: */** -> progeny alleles: */**
-                            elif sample_gt_left_list[i] != sample_gt_right_list[i] and \
-                                sample_gt_left_list[i]  != xlib.get_md_symbol() and \
-                                sample_gt_right_list[i]  != xlib.get_md_symbol():
-
-                                pass
-
-                            # progeny alleles: M/M -> progeny alleles: M/M
-                            elif sample_gt_left_list[i] == sample_gt_right_list[i] and \
-                                sample_gt_left_list[i] == xlib.get_md_symbol():
-
-                                pass
-
-                            # in any other progeny alleles
-                            else:
-
-                                raise xlib.ProgramException('', 'L010', data_dict['chrom'], data_dict['pos'], sample_id, scenario, ','.join(mother_gt_list), sample_gt_list[i])
-
-                        # in any other mother alleles
-                        else:
-
-                            raise xlib.ProgramException('', 'L009', data_dict['chrom'], data_dict['pos'], sample_id, scenario, ','.join(mother_gt_list), sample_gt_list[i])
+            # get the list of sample genotypes of the variant
+            sample_list = data_dict['sample_list']
+            if variant_id in tvi_list:
+                sample_gt_list = [sample_list[i].split(':')[gt_position] for i in range(sample_number)]
+                xlib.Message.print('trace', f'sample_gt_list: {sample_gt_list}')
+                xlib.Message.print('trace', f'genotype list before imputation revision:  {" ".join(sample_gt_list)} ')
+
+            # revise the progeny genotypes depending on the genotype compatibility between every progeny and its mother
+            (revised_left_array, revised_right_array, is_variant_imputed, mother_error_array, progeny_error_array) = revise_progeny_genotypes(scenario, left_array, right_array, progeny_index_array, mother_index_array)
+
+            # check the mother and progeny alleles (the error of the first sample is raised)
+            error_index_array = np.flatnonzero(mother_error_array | progeny_error_array)
+            if error_index_array.size > 0:
+                k = error_index_array[0]
+                sample_gt = sample_list[progeny_index_array[k]].split(':')[gt_position]
+                (mother_gt_left, _, mother_gt_right) = split_gt(sample_list[mother_index_array[k]].split(':')[gt_position], data_dict)
+                mother_gt_list = [mother_gt_left] if mother_gt_left == mother_gt_right else [mother_gt_left, mother_gt_right]
+                code_exception = 'L009' if mother_error_array[k] else 'L010'
+                raise xlib.ProgramException('', code_exception, data_dict['chrom'], data_dict['pos'], sample_id_list[progeny_index_array[k]], scenario, ','.join(mother_gt_list), sample_gt)
+
+            # rebuild the sample genotype data of the revised progenies (the revised alleles are always missing data or imputed missing data)
+            progeny_left_array = left_array[progeny_index_array]
+            progeny_right_array = right_array[progeny_index_array]
+            for k in np.flatnonzero((revised_left_array != progeny_left_array) | (revised_right_array != progeny_right_array)).tolist():
+                i = progeny_index_array[k]
+                sample_data_list = sample_list[i].split(':')
+                (sample_gt_left, sample_sep, sample_gt_right) = split_gt(sample_data_list[gt_position], data_dict)
+                if revised_left_array[k] != progeny_left_array[k]:
+                    sample_gt_left = xlib.get_md_symbol() if revised_left_array[k] == xlib.Const.GT_MD_CODE else imputed_md_id
+                if revised_right_array[k] != progeny_right_array[k]:
+                    sample_gt_right = xlib.get_md_symbol() if revised_right_array[k] == xlib.Const.GT_MD_CODE else imputed_md_id
+                sample_data_list[gt_position] = f'{sample_gt_left}{sample_sep}{sample_gt_right}'
+                sample_list[i] = ':'.join(sample_data_list)
 
             # add 1 to the imputed variant counter
             if is_variant_imputed:
                 imputed_variant_counter += 1
 
             if variant_id in tvi_list:
-                literal = ' '
-                for i in range(sample_number):
-                    literal += f'{str(sample_gt_left_list[i])}{sample_sep_list[i]}{str(sample_gt_right_list[i])} '
-                xlib.Message.print('trace', f' genotype list after imputation revision: {literal}')
-
-            # rebuild the list of the field GT for every sample
-            for i in range(sample_number):
-                sample_gt_list[i] = f'{sample_gt_left_list[i]}{sample_sep_list[i]}{sample_gt_right_list[i]}'
-
-            # rebuild the sample genotype data list and their corresponding record data
-            sample_list = []
-            for i in range(sample_number):
-                sample_data_list[i][gt_position] = sample_gt_list[i]
-                sample_list.append(':'.join(sample_data_list[i]))
-            if variant_id in tvi_list: xlib.Message.print('trace', f'(17) sample_gt_list: {sample_gt_list}')
+                sample_gt_list = [sample_list[i].split(':')[gt_position] for i in range(sample_number)]
+                xlib.Message.print('trace', f' genotype list after imputation revision:  {" ".join(sample_gt_list)} ')
+                xlib.Message.print('trace', f'(17) sample_gt_list: {sample_gt_list}')
 
             # write the variant record
             sample_list_text = '\t'.join(sample_list)
@@ -938,6 +396,182 @@ def impute_progenies(input_vcf_file, sample_file, scenario, imputed_md_id, sp1_i
     # print OK message
     xlib.Message.print('info', f'The file {os.path.basename(output_vcf_file)} is created.')
 
+    # return the record counter
+    return input_record_counter
+
+#-------------------------------------------------------------------------------
+
+def split_gt(sample_gt, data_dict):
+    '''
+    Split a genotype (subfield GT) into its left side, separator and right side.
+    '''
+
+    sep = '/'
+    sep_pos = sample_gt.find(sep)
+    if sep_pos == -1:
+        sep = '|'
+        sep_pos = sample_gt.find(sep)
+    if sep_pos == -1:
+        raise xlib.ProgramException('', 'L008', 'GT', data_dict['chrom'], data_dict['pos'])
+
+    return sample_gt[:sep_pos], sep, sample_gt[sep_pos+1:]
+
+#-------------------------------------------------------------------------------
+
+def revise_progeny_genotypes(scenario, left_array, right_array, progeny_index_array, mother_index_array):
+    '''
+    Revise the genotypes of all progenies of a variant depending on the genotype compatibility between every progeny
+    and its mother, and get the arrays of the revised left and right allele codes of the progenies, the imputation
+    status of the variant and the masks of the progenies with mother alleles and progeny alleles not OK.
+    '''
+
+    # set the codes of the missing data (M) and imputed missing data (I) alleles
+    M = xlib.Const.GT_MD_CODE
+    I = xlib.Const.GT_IMPUTED_MD_CODE
+
+    # get the allele codes of the progenies and their mothers
+    progeny_left_array = left_array[progeny_index_array]
+    progeny_right_array = right_array[progeny_index_array]
+    mother_left_array = left_array[mother_index_array]
+    mother_right_array = right_array[mother_index_array]
+
+    # get the masks of the mother alleles
+    mother_homozygous_mask = mother_left_array == mother_right_array
+    mother_with_I_mask = (mother_left_array == I) | (mother_right_array == I)
+    mother_with_M_mask = (mother_left_array == M) | (mother_right_array == M)
+
+    # get the masks of the progeny alleles
+    progeny_homozygous_mask = progeny_left_array == progeny_right_array
+    left_M_mask = progeny_left_array == M
+    right_M_mask = progeny_right_array == M
+    left_I_mask = progeny_left_array == I
+    right_I_mask = progeny_right_array == I
+    left_in_mother_mask = (progeny_left_array == mother_left_array) | (progeny_left_array == mother_right_array)
+    right_in_mother_mask = (progeny_right_array == mother_left_array) | (progeny_right_array == mother_right_array)
+    left_not_in_mother_M_mask = ~left_in_mother_mask & ~left_M_mask
+    right_not_in_mother_M_mask = ~right_in_mother_mask & ~right_M_mask
+    left_not_M_I_mask = ~left_M_mask & ~left_I_mask
+    right_not_M_I_mask = ~right_M_mask & ~right_I_mask
+
+    # build the rule lists of every kind of mother alleles: (progeny allele condition, revised left allele, revised right allele); None means that the allele is not revised
+    # A: any allele different to imputed (I) and missing data (M) ones
+    # B: other allele different to A and imputed (I) and missing data (M) ones
+    # *: a allele different to mother alleles and  missing data (M) one
+    # **: a allele different to * and mother alleles and  missing data (M) one
+    # #: any allele different to missing data (M) one
+    # ##: any allele different to # and missing data (M) one
+    # M (P): missing data allele
+    # I (99): imputed allele
+
+    # mother alleles: A/A or A/B
+    AX_rule_list = [
+        # progeny alleles: A/# -> A/#   OR   #/A -> #/A   (A/B mother: also B/# -> B/#   OR   #/B -> #/B)
+        (left_in_mother_mask & ~right_M_mask | ~left_M_mask & right_in_mother_mask, None, None),
+        # progeny alleles: */* -> M/M
+        (progeny_homozygous_mask & left_not_in_mother_M_mask, M, M),
+        # progeny alleles: */** -> M/M
+        (~progeny_homozygous_mask & left_not_in_mother_M_mask & right_not_in_mother_M_mask, M, M),
+        # progeny alleles: M/M -> M/M
+        (progeny_homozygous_mask & left_M_mask, None, None),
+        ]
+
+    # mother alleles: A/I
+    AI_rule_list = [
+        # progeny alleles: A/A -> A/I
+        (progeny_homozygous_mask & left_in_mother_mask & ~left_I_mask, None, I),
+        # progeny alleles: A/* -> A/*   OR   */A -> */A
+        (~progeny_homozygous_mask & ~left_I_mask & ~right_I_mask & (left_in_mother_mask != right_in_mother_mask), None, None),
+        # progeny alleles: */* -> */I
+        (progeny_homozygous_mask & left_not_in_mother_M_mask, None, I),
+        # progeny alleles: */** -> M/M
+        (~progeny_homozygous_mask & left_not_in_mother_M_mask & right_not_in_mother_M_mask, M, M),
+        # progeny alleles: M/M -> I/I
+        (progeny_homozygous_mask & left_M_mask, I, I),
+        ]
+
+    # mother alleles: A/M
+    AM_rule_list = [
+        # progeny alleles: A/A -> A/M
+        (progeny_homozygous_mask & left_in_mother_mask & ~left_I_mask, None, M),
+        # progeny alleles: A/* -> A/*   OR   */A -> */A
+        (~progeny_homozygous_mask & left_not_M_I_mask & right_not_M_I_mask & (left_in_mother_mask != right_in_mother_mask), None, None),
+        # progeny alleles: */* -> */M
+        (progeny_homozygous_mask & left_not_in_mother_M_mask, None, M),
+        # progeny alleles: */** -> M/M
+        (~progeny_homozygous_mask & left_not_in_mother_M_mask & right_not_in_mother_M_mask, M, M),
+        # progeny alleles: M/M -> M/M
+        (progeny_homozygous_mask & left_M_mask, None, None),
+        ]
+
+    # mother alleles: I/I
+    if scenario == '1':
+        II_rule_list = [
+            # progeny alleles: #/# -> #/I
+            (progeny_homozygous_mask & ~left_M_mask, None, I),
+            # progeny alleles: #/## -> M/M
+            (~progeny_homozygous_mask & ~left_M_mask & ~right_M_mask, M, M),
+            # progeny alleles: M/M -> I/I
+            (progeny_homozygous_mask & left_M_mask, I, I),
+            ]
+    else:
+        II_rule_list = [
+            # progeny alleles: A/A -> A/I
+            (progeny_homozygous_mask & left_not_M_I_mask, None, I),
+            # progeny alleles: A/B -> M/M
+            (~progeny_homozygous_mask & left_not_M_I_mask & right_not_M_I_mask, M, M),
+            # progeny alleles: M/M -> I/I
+            (progeny_homozygous_mask & left_M_mask, I, I),
+            ]
+
+    # mother alleles: M/M
+    MM_rule_list = [
+        # progeny alleles: */* -> */*
+        (progeny_homozygous_mask & ~left_M_mask, None, None),
+        # progeny alleles: */** -> */**
+        (~progeny_homozygous_mask & ~left_M_mask & ~right_M_mask, None, None),
+        # progeny alleles: M/M -> M/M
+        (progeny_homozygous_mask & left_M_mask, None, None),
+        ]
+
+    # get the masks of the kinds of mother alleles
+    AA_mask = mother_homozygous_mask & ~mother_with_I_mask & ~mother_with_M_mask
+    AB_mask = ~mother_homozygous_mask & ~mother_with_I_mask & ~mother_with_M_mask
+    II_mask = mother_homozygous_mask & (mother_left_array == I)
+    MM_mask = mother_homozygous_mask & (mother_left_array == M)
+
+    # set the kinds of mother alleles accepted by the scenario: '0' (no imputation) or '2' (maximum possible imputation), '1' (standard) and '3' (maximum possible missing data)
+    if scenario in ['0', '2']:
+        mother_rule_list = [(AA_mask, AX_rule_list), (~mother_homozygous_mask & mother_with_I_mask, AI_rule_list), (AB_mask, AX_rule_list), (II_mask, II_rule_list), (MM_mask, MM_rule_list)]
+    elif scenario == '1':
+        mother_rule_list = [(AA_mask, AX_rule_list), (AB_mask, AX_rule_list), (II_mask, II_rule_list), (MM_mask, MM_rule_list)]
+    elif scenario == '3':
+        mother_rule_list = [(AA_mask, AX_rule_list), (~mother_homozygous_mask & mother_with_M_mask, AM_rule_list), (AB_mask, AX_rule_list), (II_mask, II_rule_list), (MM_mask, MM_rule_list)]
+
+    # initialize the revised allele codes, the imputation status and the error masks
+    revised_left_array = progeny_left_array.copy()
+    revised_right_array = progeny_right_array.copy()
+    is_variant_imputed = False
+    mother_error_array = np.ones(len(progeny_index_array), dtype=bool)
+    progeny_error_array = np.zeros(len(progeny_index_array), dtype=bool)
+
+    # apply the first rule whose condition is true to every progeny
+    for (mother_mask, rule_list) in mother_rule_list:
+        pending_mask = mother_mask.copy()
+        for (condition_mask, revised_left, revised_right) in rule_list:
+            rule_mask = pending_mask & condition_mask
+            if (revised_left is not None or revised_right is not None) and rule_mask.any():
+                if revised_left is not None:
+                    revised_left_array[rule_mask] = revised_left
+                if revised_right is not None:
+                    revised_right_array[rule_mask] = revised_right
+                is_variant_imputed = True
+            pending_mask &= ~condition_mask
+        mother_error_array &= ~mother_mask
+        progeny_error_array |= pending_mask
+
+    # return the revised allele codes, the imputation status and the error masks
+    return revised_left_array, revised_right_array, is_variant_imputed, mother_error_array, progeny_error_array
+
 #-------------------------------------------------------------------------------
 
 if __name__ == '__main__':
@@ -55,6 +55,8 @@ rem Run the program launch-phase-processes.py
     --thinning=1 ^
     --burnin=100 ^
     --otherparams=NONE ^
+    --scheduling=STATIC ^
+    --retries=1 ^
     --verbose=Y ^
     --trace=N
 if %ERRORLEVEL% neq 0 (set RC=%ERRORLEVEL% & set ERROR=2 & goto END)
@@ -52,6 +52,8 @@ cd $NGSHELPER_DIR
         --thinning=1 \
         --burnin=100 \
         --otherparams=NONE \
+        --scheduling=STATIC \
+        --retries=1 \
         --verbose=Y \
         --trace=N
 if [ $? -ne 0 ]; then echo 'Script ended with errors.'; exit 1; fi
@@ -25,9 +25,13 @@ Licence: GNU General Public Licence Version 3.
 #-------------------------------------------------------------------------------
 
 import argparse
+import concurrent.futures
 import pathlib
 import os
+import shlex
+import subprocess
 import sys
+import time
 
 import xlib
 
@@ -57,7 +61,12 @@ def main():
     check_args(args)
 
     # launch PHASE processes with a input file list
-    launch_phase_processes(args.phase_dir, args.processes_number, args.input_dir, args.output_dir, args.iterations_number, args.thinning_interval, args.burn_in, args.other_parameters)
+    if args.scheduling == 'STATIC':
+        launch_phase_processes(args.phase_dir, args.processes_number, args.input_dir, args.output_dir, args.iterations_number, args.thinning_interval, args.burn_in, args.other_parameters)
+
+    # run PHASE processes with a supervisor which schedules the input files by their estimated cost
+    elif args.scheduling == 'DYNAMIC':
+        schedule_phase_processes(args.phase_dir, args.processes_number, args.input_dir, args.output_dir, args.iterations_number, args.thinning_interval, args.burn_in, args.other_parameters, args.retries_number)
 
 #-------------------------------------------------------------------------------
 
@@ -80,6 +89,8 @@ def build_parser():
     parser.add_argument('--thinning', dest='thinning_interval', help=f'Thinning interval; default: {xlib.Const.DEFAULT_THINNING_INTERVAL}.')
     parser.add_argument('--burnin', dest='burn_in', help=f'Burn-in; default: {xlib.Const.DEFAULT_BURN_IN}.')
     parser.add_argument('--otherparams', dest='other_parameters', help='Other parameters (between quotation marks) to be included in the PHASE run or NONE; default: NONE.')
+    parser.add_argument('--scheduling', dest='scheduling', help=f'Scheduling of input files: {xlib.get_phase_scheduling_code_list_text()}; default: {xlib.Const.DEFAULT_PHASE_SCHEDULING}.')
+    parser.add_argument('--retries', dest='retries_number', help=f'Number of retries of a failed input file when scheduling is DYNAMIC; default: {xlib.Const.DEFAULT_PHASE_RETRIES_NUMBER}.')
     parser.add_argument('--verbose', dest='verbose', help=f'Additional job status info during the run: {xlib.get_verbose_code_list_text()}; default: {xlib.Const.DEFAULT_VERBOSE}.')
     parser.add_argument('--trace', dest='trace', help=f'Additional info useful to the developer team: {xlib.get_trace_code_list_text()}; default: {xlib.Const.DEFAULT_TRACE}.')
 
@@ -160,6 +171,24 @@ def check_args(args):
     if args.other_parameters is None or args.other_parameters.upper() == 'NONE':
         args.other_parameters = 'NONE'
 
+    # check "scheduling"
+    if args.scheduling is None:
+        args.scheduling = xlib.Const.DEFAULT_PHASE_SCHEDULING
+    elif not xlib.check_code(args.scheduling, xlib.get_phase_scheduling_code_list(), case_sensitive=False):
+        xlib.Message.print('error', f'*** The scheduling has to be {xlib.get_phase_scheduling_code_list_text()}.')
+        OK = False
+    else:
+        args.scheduling = args.scheduling.upper()
+
+    # check "retries_number"
+    if args.retries_number is None:
+        args.retries_number = xlib.Const.DEFAULT_PHASE_RETRIES_NUMBER
+    elif not xlib.check_int(args.retries_number, minimum=0):
+        xlib.Message.print('error', 'The retries number has to be a integer number greater than or equal to 0.')
+        OK = False
+    else:
+        args.retries_number = int(args.retries_number)
+
     # check "verbose"
     if args.verbose is None:
         args.verbose = xlib.Const.DEFAULT_VERBOSE
@@ -296,6 +325,201 @@ def launch_phase_processes(phase_dir, processes_number, input_dir, output_dir, i
 
 #-------------------------------------------------------------------------------
 
+def schedule_phase_processes(phase_dir, processes_number, input_dir, output_dir, iterations_number, thinning_interval, burn_in, other_parameters, retries_number):
+    '''
+    Run PHASE processes with a supervisor: the input files are queued from the highest to the lowest estimated cost
+    and a file is launched when a process is free. Failed files are retried and the runtime of every processed file
+    is recorded in a journal used to estimate costs in later runs and to resume an interrupted run.
+    '''
+
+    # get the journal file and read its data
+    journal_file = get_phase_journal_file(output_dir)
+    journal_dict = read_phase_journal(journal_file)
+
+    # get the rate of seconds per byte of the files processed OK in previous runs
+    ok_data_list = [(file_size, runtime) for (file_size, runtime, rc) in journal_dict.values() if rc == 0]
+    if ok_data_list and sum([file_size for (file_size, _) in ok_data_list]) > 0:
+        seconds_per_byte = sum([runtime for (_, runtime) in ok_data_list]) / sum([file_size for (file_size, _) in ok_data_list])
+    else:
+        seconds_per_byte = 1.0
+
+    # build the input file list with the estimated cost of every file skipping the files already processed OK
+    input_file_data_list = []
+    skipped_file_counter = 0
+    for path in pathlib.Path(input_dir).iterdir():
+        if path.is_file():
+            file_name = os.path.basename(path)
+            file_size = path.stat().st_size
+            journal_data = journal_dict.get(file_name)
+            if journal_data is not None and journal_data[0] == file_size and journal_data[2] == 0:
+                skipped_file_counter += 1
+                continue
+            if journal_data is not None and journal_data[0] == file_size:
+                estimated_cost = journal_data[1]
+            else:
+                estimated_cost = file_size * seconds_per_byte
+            input_file_data_list.append((file_name, estimated_cost))
+    input_file_data_list.sort(key=lambda x: x[1], reverse=True)
+    xlib.Message.print('info', f'Input files to process: {len(input_file_data_list)} - Input files already processed: {skipped_file_counter}')
+
+    # get the PHASE command prefix (in Windows, PHASE runs in WSL)
+    if sys.platform.startswith('win32'):
+        command_prefix_list = ['wsl', f'{xlib.windows_path_2_wsl_path(phase_dir)}/PHASE', '-d1']
+    else:
+        command_prefix_list = [os.path.join(phase_dir, 'PHASE'), '-d1']
+    if other_parameters != 'NONE':
+        command_prefix_list += shlex.split(other_parameters)
+
+    # open the journal file to append the results of this run
+    try:
+        journal_file_id = open(journal_file, mode='a', encoding='iso-8859-1', newline='\n')
+    except Exception as e:
+        raise xlib.ProgramException(e, 'F003', journal_file)
+    if os.path.getsize(journal_file) == 0:
+        journal_file_id.write('"file_name";"file_size";"runtime_seconds";"rc"\n')
+        journal_file_id.flush()
+
+    # initialize counters and the list of files with errors
+    processed_file_counter = 0
+    retried_file_counter = 0
+    witherror_file_list = []
+
+    # run the files in a pool of processes slots
+    with concurrent.futures.ThreadPoolExecutor(max_workers=processes_number) as executor:
+
+        # submit the files from the highest to the lowest estimated cost
+        future_dict = {}
+        for (file_name, _) in input_file_data_list:
+            future = executor.submit(run_phase_file, command_prefix_list, input_dir, output_dir, file_name, iterations_number, thinning_interval, burn_in)
+            future_dict[future] = (file_name, 1)
+
+        # process the results as the files end and resubmit the failed files
+        while future_dict:
+            (done_future_set, _) = concurrent.futures.wait(future_dict, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done_future_set:
+                (file_name, attempt) = future_dict.pop(future)
+                (rc, runtime) = future.result()
+
+                # record the result in the journal
+                file_size = os.path.getsize(os.path.join(input_dir, file_name))
+                journal_file_id.write(f'"{file_name}";{file_size};{runtime:.3f};{rc}\n')
+                journal_file_id.flush()
+
+                # the file is processed OK
+                if rc == 0:
+                    processed_file_counter += 1
+
+                # the file failed and it is retried
+                elif attempt <= retries_number:
+                    retried_file_counter += 1
+                    xlib.Message.print('trace', f'{file_name}: attempt {attempt} ended with RC {rc}.')
+                    future = executor.submit(run_phase_file, command_prefix_list, input_dir, output_dir, file_name, iterations_number, thinning_interval, burn_in)
+                    future_dict[future] = (file_name, attempt + 1)
+
+                # the file failed and there are no retries left
+                else:
+                    witherror_file_list.append(file_name)
+
+                # print the counters
+                xlib.Message.print('verbose', f'\rProcessed files ... {processed_file_counter:6d} of {len(input_file_data_list):6d} - Retries ... {retried_file_counter:6d} - Files with errors ... {len(witherror_file_list):6d}')
+
+    xlib.Message.print('verbose', '\n')
+
+    # close the journal file
+    journal_file_id.close()
+
+    # write the files with errors
+    witherror_file = f'{output_dir}{os.sep}phase-unprocessed-files.txt'
+    try:
+        with open(witherror_file, mode='w', encoding='iso-8859-1', newline='\n') as witherror_file_id:
+            for file_name in witherror_file_list:
+                witherror_file_id.write(f'{file_name}\n')
+    except Exception as e:
+        raise xlib.ProgramException(e, 'F003', witherror_file)
+
+    # print OK message
+    if witherror_file_list:
+        xlib.Message.print('info', f'{len(witherror_file_list)} files have not been processed; they are listed in {os.path.basename(witherror_file)}.')
+    xlib.Message.print('info', f'The PHASE processes have ended. The runtimes are recorded in {os.path.basename(journal_file)}.')
+
+#-------------------------------------------------------------------------------
+
+def run_phase_file(command_prefix_list, input_dir, output_dir, file_name, iterations_number, thinning_interval, burn_in):
+    '''
+    Run PHASE with an input file writing its output in a log file and return the RC and the runtime.
+    '''
+
+    # set the input, output and log files
+    in_file = os.path.join(input_dir, file_name)
+    out_file = os.path.join(output_dir, file_name)
+    log_file = f'{output_dir}{os.sep}{file_name}-phase-log.txt'
+    if sys.platform.startswith('win32'):
+        in_file = xlib.windows_path_2_wsl_path(in_file)
+        out_file = xlib.windows_path_2_wsl_path(out_file)
+
+    # run PHASE
+    start_time = time.perf_counter()
+    try:
+        with open(log_file, mode='w', encoding='iso-8859-1', newline='\n') as log_file_id:
+            rc = subprocess.run(command_prefix_list + [in_file, out_file, str(iterations_number), str(thinning_interval), str(burn_in)], stdout=log_file_id, stderr=subprocess.STDOUT, cwd=output_dir, check=False).returncode
+    except Exception as e:
+        xlib.Message.print('trace', f'{file_name}: {e}')
+        rc = -1
+
+    # return the RC and the runtime
+    return (rc, time.perf_counter() - start_time)
+
+#-------------------------------------------------------------------------------
+
+def read_phase_journal(journal_file):
+    '''
+    Read the journal of PHASE runs and get a dictionary with the last file size, runtime and RC of every file.
+    '''
+
+    # initialize the journal dictionary
+    journal_dict = {}
+
+    # return an empty dictionary when the journal does not exist
+    if not os.path.isfile(journal_file):
+        return journal_dict
+
+    # open the journal file
+    try:
+        journal_file_id = open(journal_file, mode='r', encoding='iso-8859-1')
+    except Exception as e:
+        raise xlib.ProgramException(e, 'F001', journal_file)
+
+    # read the journal records (the last record of a file has its last result)
+    for record in journal_file_id:
+        if record.startswith('"file_name"') or record.strip() == '':
+            continue
+        try:
+            (file_name, file_size, runtime, rc) = record.strip().split(';')
+            journal_dict[file_name.strip('"')] = (int(file_size), float(runtime), int(rc))
+        except Exception as e:
+            raise xlib.ProgramException(e, 'D001', record.strip(), journal_file)
+
+    # close the journal file
+    journal_file_id.close()
+
+    # return the journal dictionary
+    return journal_dict
+
+#-------------------------------------------------------------------------------
+
+def get_phase_journal_file(output_dir):
+    '''
+    Get the path of the journal file of PHASE runs.
+    '''
+
+    # assign the journal file path
+    journal_file = f'{output_dir}{os.sep}phase-journal.csv'
+
+    # return the journal file path
+    return journal_file
+
+#-------------------------------------------------------------------------------
+
 def build_phase_process_script(process_number, phase_dir, input_dir, input_files_list_file, witherror_file_list, output_dir, iterations_number, thinning_interval, burn_in, other_parameters):
     '''
     Build the PHASE process script corresponding to the process number
@@ -25,7 +25,7 @@ Licence: GNU General Public Licence Version 3.
 #-------------------------------------------------------------------------------
 
 import argparse
-import gzip
+import itertools
 import os
 import sys
 
@@ -156,54 +156,30 @@ def load_annotations(conn, annotation_file, toa_file_type):
     # initialize the inserted row counter
     inserted_row_counter = 0
 
-    # open the annotation file
-    if annotation_file.endswith('.gz'):
-        try:
-            annotation_file_id = gzip.open(annotation_file, mode='rt', encoding='iso-8859-1')
-        except Exception as e:
-            raise xlib.ProgramException(e, 'F002', annotation_file)
-    else:
-        try:
-            annotation_file_id = open(annotation_file, mode='r', encoding='iso-8859-1')
-        except Exception as e:
-            raise xlib.ProgramException(e, 'F001', annotation_file)
-
-    # read head record of the annotation file
-    (record, _, data_dict) = xlib.read_toa_annotation_record(annotation_file, annotation_file_id, toa_file_type, record_counter)
-
-    # add 1 to record counter
-    record_counter += 1
-
-    # read the first data record of the annotation file
-    (record, _, data_dict) = xlib.read_toa_annotation_record(annotation_file, annotation_file_id, toa_file_type, record_counter)
-
-    # while there are records
-    while record != '':
+    # for each sequence identification of the annotation file (the records of a sequence are consecutive)
+    record_iterator = xlib.iter_annotation_file_records(annotation_file, f'TOA-{toa_file_type}', ['seq_id', 'hsp_evalue', 'desc'])
+    for (seq_id, seq_record_iterator) in itertools.groupby(record_iterator, key=lambda record_data: record_data[0]):
 
-        # add 1 to record counter
-        record_counter += 1
-
-        # save the sequence identification
-        seq_id = data_dict['seq_id']
+        # initialize the minimum e-Value and the description
         min_evalue = float(sys.maxsize)
         description = 'N/A'
 
-        # while there are records and same sequence identification
-        while record != '' and seq_id == data_dict['seq_id']:
+        # for each record of the sequence identification
+        for (_, hsp_evalue, desc) in seq_record_iterator:
+
+            # add 1 to record counter
+            record_counter += 1
 
             # get e-Value
             try:
-                hsp_evalue = float(data_dict['hsp_evalue'])
+                hsp_evalue = float(hsp_evalue)
             except Exception as e:
                 raise xlib.ProgramException(e, 'F009', os.path.basename(annotation_file), record_counter)
 
             # save the description of the annotation with lower e-Value provided that the description is not 'N/A'
-            if min_evalue > hsp_evalue and data_dict['desc'] != 'N/A':
+            if min_evalue > hsp_evalue and desc != 'N/A':
                 min_evalue = hsp_evalue
-                description = data_dict['desc'].replace("'", '´').replace(';', ',')
-
-            # read the next record
-            (record, _, data_dict) = xlib.read_toa_annotation_record(annotation_file, annotation_file_id, toa_file_type, record_counter)
+                description = desc.replace("'", '´').replace(';', ',')
 
         # insert data into the table "annotations"
         row_dict = {'seq_id': seq_id, 'description': description}
@@ -213,9 +189,6 @@ def load_annotations(conn, annotation_file, toa_file_type):
         # print counters
         xlib.Message.print('verbose', f'\rAnnotations file: {record_counter} processed records - Inserted rows: {inserted_row_counter}')
 
-        # read the next record
-        record = annotation_file_id.readline()
-
     xlib.Message.print('verbose', '\n')
 
     # create the index "vcf_annotations_index" on the table "annotations"
@@ -228,9 +201,6 @@ def load_annotations(conn, annotation_file, toa_file_type):
     conn.commit()
     xlib.Message.print('verbose', 'Changes are saved.\n')
 
-    # close annotations file
-    annotation_file_id.close()
-
 #-------------------------------------------------------------------------------
 
 if __name__ == '__main__':
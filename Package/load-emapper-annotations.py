@@ -240,6 +240,11 @@ def load_emapper_annotations(conn, annotation_file, taxname_file):
     xsqlite.create_emapper_annotations_index(conn)
     xlib.Message.print('verbose', 'The index is created.\n')
 
+    # calculate the statistics of the database that depend on the table "emapper_annotations"
+    xlib.Message.print('verbose', 'Calculating the statistics of the database ...\n')
+    xsqlite.update_db_stats(conn, 'emapper_annotations')
+    xlib.Message.print('verbose', 'The statistics are calculated.\n')
+
     # save changes into SQLite database
     xlib.Message.print('verbose', 'Saving changes into SQLite database ...\n')
     conn.commit()
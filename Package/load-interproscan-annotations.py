@@ -293,6 +293,11 @@ def load_interproscan_annotations(conn, annotation_file, stats_file):
     xsqlite.create_interproscan_annotations_index(conn)
     xlib.Message.print('verbose', 'The index is created.\n')
 
+    # calculate the statistics of the database that depend on the table "interproscan_annotations"
+    xlib.Message.print('verbose', 'Calculating the statistics of the database ...\n')
+    xsqlite.update_db_stats(conn, 'interproscan_annotations')
+    xlib.Message.print('verbose', 'The statistics are calculated.\n')
+
     # save changes into SQLite database
     xlib.Message.print('verbose', 'Saving changes into SQLite database ...\n')
     conn.commit()
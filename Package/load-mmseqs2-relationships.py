@@ -136,6 +136,16 @@ def load_mmseqs2_relationships(conn, relationship_file):
     xsqlite.drop_mmseqs2_relationships(conn)
     xlib.Message.print('verbose', 'The table is droped.\n')
 
+    # drop the table "mmseqs2_mf_data" (if it exists)
+    xlib.Message.print('verbose', 'Droping the table "mmseqs2_mf_data" ...\n')
+    xsqlite.drop_mmseqs2_mf_data(conn)
+    xlib.Message.print('verbose', 'The table is droped.\n')
+
+    # drop the table "mmseqs2_species" (if it exists)
+    xlib.Message.print('verbose', 'Droping the table "mmseqs2_species" ...\n')
+    xsqlite.drop_mmseqs2_species(conn)
+    xlib.Message.print('verbose', 'The table is droped.\n')
+
     # create the table "mmseqs2_relationships"
     xlib.Message.print('verbose', 'Creating the table "mmseqs2_relationships" ...\n')
     xsqlite.create_mmseqs2_relationships(conn)
@@ -147,6 +157,9 @@ def load_mmseqs2_relationships(conn, relationship_file):
     # initialize the inserted row counter
     inserted_row_counter = 0
 
+    # initialize the dictionary of species identifications (key: species; value: species identification)
+    species_id_dict = {}
+
     # open the relationship file
     if relationship_file.endswith('.gz'):
         try:
@@ -190,6 +203,9 @@ def load_mmseqs2_relationships(conn, relationship_file):
         # replace characters not allowed in species name
         row_dict['species'] = row_dict['species'].replace('"', '').replace("'", "").replace(';', ',')
 
+        # get the species identification, assigning a new one when the species is not found before
+        row_dict['species_id'] = species_id_dict.setdefault(row_dict['species'], len(species_id_dict) + 1)
+
         # insert data into the table "mmseqs2_relationships"
         xsqlite.insert_mmseqs2_relationships_row(conn, row_dict)
         inserted_row_counter += 1
@@ -212,6 +228,37 @@ def load_mmseqs2_relationships(conn, relationship_file):
     xsqlite.create_mmseqs2_relationships_index_2(conn)
     xlib.Message.print('verbose', 'The index 2 is created.\n')
 
+    # create the index "mmseqs2_relationships_index_3" on the table "mmseqs2_relationships"
+    xlib.Message.print('verbose', 'Creating the index 3 on the table "mmseqs2_relationships" ...\n')
+    xsqlite.create_mmseqs2_relationships_index_3(conn)
+    xlib.Message.print('verbose', 'The index 3 is created.\n')
+
+    # create the table "mmseqs2_species" and insert the species
+    xlib.Message.print('verbose', 'Creating the table "mmseqs2_species" ...\n')
+    xsqlite.create_mmseqs2_species(conn)
+    xsqlite.insert_mmseqs2_species_rows(conn, species_id_dict)
+    xlib.Message.print('verbose', 'The table is created.\n')
+
+    # create the index "mmseqs2_species_index" on the table "mmseqs2_species"
+    xlib.Message.print('verbose', 'Creating the index on the table "mmseqs2_species" ...\n')
+    xsqlite.create_mmseqs2_species_index(conn)
+    xlib.Message.print('verbose', 'The index is created.\n')
+
+    # create the table "mmseqs2_mf_data" with the most frequent description and species of each cluster
+    xlib.Message.print('verbose', 'Creating the table "mmseqs2_mf_data" ...\n')
+    xsqlite.create_mmseqs2_mf_data(conn)
+    xlib.Message.print('verbose', 'The table is created.\n')
+
+    # create the index "mmseqs2_mf_data_index" on the table "mmseqs2_mf_data"
+    xlib.Message.print('verbose', 'Creating the index on the table "mmseqs2_mf_data" ...\n')
+    xsqlite.create_mmseqs2_mf_data_index(conn)
+    xlib.Message.print('verbose', 'The index is created.\n')
+
+    # calculate the statistics of the database that depend on the table "mmseqs2_relationships"
+    xlib.Message.print('verbose', 'Calculating the statistics of the database ...\n')
+    xsqlite.update_db_stats(conn, 'mmseqs2_relationships')
+    xlib.Message.print('verbose', 'The statistics are calculated.\n')
+
     # save changes into SQLite database
     xlib.Message.print('verbose', 'Saving changes into SQLite database ...\n')
     conn.commit()
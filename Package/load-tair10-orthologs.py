@@ -198,6 +198,11 @@ def load_tair10_orthologs(conn, alignment_file):
     xsqlite.create_tair10_orthologs_index(conn)
     xlib.Message.print('verbose', 'The index is created.\n')
 
+    # calculate the statistics of the database that depend on the table "tair10_orthologs"
+    xlib.Message.print('verbose', 'Calculating the statistics of the database ...\n')
+    xsqlite.update_db_stats(conn, 'tair10_orthologs')
+    xlib.Message.print('verbose', 'The statistics are calculated.\n')
+
     # save changes into SQLite database
     xlib.Message.print('verbose', 'Saving changes into SQLite database ...\n')
     conn.commit()
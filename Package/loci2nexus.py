@@ -27,7 +27,6 @@ Licence: GNU General Public Licence Version 3.
 
 import argparse
 import os
-import re
 import sys
 
 import xlib
@@ -65,7 +64,7 @@ def build_parser():
     parser._optionals.title = 'Arguments'    # pylint: disable=protected-access
     parser.add_argument('-l', '--loci_id_file', dest='selection_loci_id_file_path', help='loci id file path to select (mandatory)')
     parser.add_argument('-c', '--complete_loci_file', dest='complete_loci_file_path', help='complete loci file path (mandatory)')
-    parser.add_argument('-s', '--selected_loci_file', dest='selected_loci_file_path', help='selected loci file path (mandatory)')
+    parser.add_argument('-s', '--selected_loci_file', dest='selected_loci_file_path', help='selected loci file path or NONE; default: NONE')
     parser.add_argument('-n', '--nexus_file', dest='nexus_file_path', help='Nexus file path (mandatory)')
     parser.add_argument('--verbose', dest='verbose', help=f'Additional job status info during the run: {xlib.get_verbose_code_list_text()}; default: {xlib.Const.DEFAULT_VERBOSE}.')
     parser.add_argument('--trace', dest='trace', help=f'Additional info useful to the developer team: {xlib.get_trace_code_list_text()}; default: {xlib.Const.DEFAULT_TRACE}.')
@@ -105,9 +104,8 @@ def check_args(args):
             OK = False
 
     # check selected_loci_file_path
-    if args.selected_loci_file_path is None:
-        xlib.Message.print('error', '*** A selected loci file path is not indicated in the input arguments.')
-        OK = False
+    if args.selected_loci_file_path is None or args.selected_loci_file_path.upper() == 'NONE':
+        args.selected_loci_file_path = 'NONE'
     else:
         if not args.selected_loci_file_path.endswith('.loci'):
             xlib.Message.print('error', f'*** The file {args.selected_loci_file_path} does not end in ".loci".')
@@ -151,117 +149,75 @@ def build_nexus_file(selection_loci_id_file_path, complete_loci_file_path, selec
     Build a Nexus file from a ypirad loci file for a determinated loci set.
     '''
 
-    # initialize the selected loci id list
-    selected_loci_id_list = []
+    # initialize the selected loci id set
+    selected_loci_id_set = set()
 
-    # load the selected loci ids and set the selected loci id list
+    # load the selected loci ids and set the selected loci id set
     try:
         with open(selection_loci_id_file_path) as selected_loci_ids_file_id:
             for record in selected_loci_ids_file_id:
-                selected_loci_id_list.append(record[6:].rstrip())
+                selected_loci_id_set.add(record[6:].rstrip())
     except Exception as e:
         raise xlib.ProgramException(e, 'F001', selection_loci_id_file_path)
-    xlib.Message.print('trace', f'selected_loci_id_list: {selected_loci_id_list}\n')
+    xlib.Message.print('trace', f'selected_loci_id_set: {selected_loci_id_set}\n')
+
+    # get the byte-offset index of the complete loci file
+    xlib.Message.print('verbose', 'Getting the index of the complete loci file ...\n')
+    loci_index_dict = xlib.get_loci_index(complete_loci_file_path)
+    xlib.Message.print('verbose', 'The index is got.\n')
+
+    # get the selected loci ids in order of the complete loci file
+    selected_loci_id_list = sorted([locus_id for locus_id in selected_loci_id_set if locus_id in loci_index_dict], key=lambda locus_id: loci_index_dict[locus_id][0])
 
-    # open the complete loci file
+    # open the complete loci file in binary mode to seek the selected loci
     try:
-        complete_loci_file_id = open(complete_loci_file_path, mode='r', encoding='iso-8859-1')
+        complete_loci_file_id = open(complete_loci_file_path, mode='rb')
     except Exception as e:
         raise xlib.ProgramException(e, 'F001', complete_loci_file_path)
 
     # open the selected loci file
-    try:
-        selected_loci_file_id = open(selected_loci_file_path, mode='w', encoding='iso-8859-1')
-    except Exception as e:
-        raise xlib.ProgramException(e, 'F001', selected_loci_file_path)
+    if selected_loci_file_path != 'NONE':
+        try:
+            selected_loci_file_id = open(selected_loci_file_path, mode='w', encoding='iso-8859-1')
+        except Exception as e:
+            raise xlib.ProgramException(e, 'F001', selected_loci_file_path)
 
-    # set the pattern of the locus id records
-    pattern1 = r'^\/\/(.*)\|(.*)\|$'
-
-    # set the pattern of the locus information records
-    pattern2 = r'^(.*) (.*)$'
-
-    # initialize the list of locus information records
-    locus_line_list = []
+    # initialize the matrix of the selected loci (a dictionary of sequences per taxon id for every locus)
+    locus_sequence_dict_list = []
 
     # initialize the sequence locus lenght list
     seq_locus_lenght_list = []
 
-    # initialize the taxon id list
-    taxon_id_list = []
-
-    # initialize the base count
-    base_count = 0
-
-    # read the first record of complete loci file
-    record = complete_loci_file_id.readline()
-
-    # while there are records
-    while record != '':
-
-        # process the locus id record
-        if record.startswith('//'):
-
-            # extract the locus id
-            mo = re.search(pattern1, record)
-            locus_id = mo.group(2)
-
-            # when the locus id is a selected locus, write locus information in the selected loci file
-            if locus_id in selected_loci_id_list:
-                for i in range(len(locus_line_list)):
-
-                    # extract the taxon id and sequence
-                    mo = re.search(pattern2, locus_line_list[i])
-                    taxon_id = mo.group(1).strip()
-                    sequence = mo.group(2).strip()
-
-                    # add the taxon id to taxon id list
-                    if taxon_id not in taxon_id_list:
-                        taxon_id_list.append(taxon_id)
-
-                    # when the first taxon
-                    if i == 0:
-
-                        # add the sequence length to the base count
-                        base_count += len(sequence)
+    # initialize the taxon id set
+    taxon_id_set = set()
 
-                        # add the sequence length to the sequence locus lenght list to the first taxon found
-                        seq_locus_lenght_list.append(len(sequence))
+    # for each selected locus
+    for locus_id in selected_loci_id_list:
 
-                    # write the line to the selected loci file
-                    selected_loci_file_id.write(locus_line_list[i])
+        # read the locus
+        (locus_offset, length, _) = loci_index_dict[locus_id]
+        (taxon_sequence_list, locus_id_record) = xlib.read_locus(complete_loci_file_id, locus_offset, length)
 
-                # write the locus id record to the selected loci file
-                selected_loci_file_id.write(record)
+        # add the sequences of the locus to the matrix and the taxon ids to the taxon id set
+        locus_sequence_dict_list.append(dict(taxon_sequence_list))
+        taxon_id_set.update([taxon_id for (taxon_id, _) in taxon_sequence_list])
 
-            # initialize the list of locus information records
-            locus_line_list = []
+        # add the sequence length of the first taxon to the sequence locus lenght list
+        seq_locus_lenght_list.append(len(taxon_sequence_list[0][1]) if taxon_sequence_list else 0)
 
-        # process a locus information record
-        else:
-
-            # add the record to the list of locus information records
-            locus_line_list.append(record)
-
-        # read the next record of complete loci file
-        record = complete_loci_file_id.readline()
+        # write the locus records to the selected loci file
+        if selected_loci_file_path != 'NONE':
+            complete_loci_file_id.seek(locus_offset)
+            selected_loci_file_id.write(complete_loci_file_id.read(length).decode('iso-8859-1'))
 
     # sort the taxon id list
-    taxon_id_list.sort()
+    taxon_id_list = sorted(taxon_id_set)
     xlib.Message.print('trace', f'taxon_id_list: {taxon_id_list}\n')
 
     # close files
     complete_loci_file_id.close()
-    selected_loci_file_id.close()
-
-    # initialize the dictionary of locus information records
-    locus_line_dict = {}
-
-    # open the selected loci file
-    try:
-        selected_loci_file_id = open(selected_loci_file_path, mode='r', encoding='iso-8859-1')
-    except Exception as e:
-        raise xlib.ProgramException(e, 'F001', selected_loci_file_path)
+    if selected_loci_file_path != 'NONE':
+        selected_loci_file_id.close()
 
     # open the Nexus file
     try:
@@ -272,50 +228,19 @@ def build_nexus_file(selection_loci_id_file_path, complete_loci_file_path, selec
     # write the head records in Nexus file
     nexus_file_id.write( '#nexus\n')
     nexus_file_id.write( 'begin data;\n')
-    nexus_file_id.write(f'  dimensions ntax={len(taxon_id_list)} nchar={base_count};\n')
+    nexus_file_id.write(f'  dimensions ntax={len(taxon_id_list)} nchar={sum(seq_locus_lenght_list)};\n')
     nexus_file_id.write( '  format datatype=DNA interleave=yes gap=-;\n')
     nexus_file_id.write( '  matrix\n')
 
-    # read the first record of the selected loci file
-    record = selected_loci_file_id.readline()
-
-    # while there are records
-    while record != '':
-
-        # process the locus id record
-        if record.startswith('//'):
-
-            # get the sequence length of a taxon
-            sequence_len = len(locus_line_dict[list(locus_line_dict.keys())[0]])
-
-            # for each taxon, write its information
-            for taxon_id in taxon_id_list:
-
-                # get the taxon sequence
-                sequence = locus_line_dict.get(taxon_id, 'N' * sequence_len)
-
-                # write the locus information record in the Nexus file
-                nexus_file_id.write(f'  {taxon_id:30} {sequence}\n')
-
-            # write a blank line in the Nexus file
-            nexus_file_id.write('\n')
-
-            # initialize the dictionary of locus information records
-            locus_line_dict = {}
-
-        # process a locus information record
-        else:
-
-            # extract the taxon id and sequence
-            mo = re.search(pattern2, record)
-            taxon_id = mo.group(1).strip()
-            sequence = mo.group(2).strip()
+    # for each selected locus
+    for locus_sequence_dict, sequence_len in zip(locus_sequence_dict_list, seq_locus_lenght_list):
 
-            # add the record to the dictionary of locus information records
-            locus_line_dict[taxon_id] = sequence
+        # for each taxon, write its sequence (or Ns when the taxon is not in the locus)
+        missing_sequence = 'N' * sequence_len
+        nexus_file_id.writelines([f'  {taxon_id:30} {locus_sequence_dict.get(taxon_id, missing_sequence)}\n' for taxon_id in taxon_id_list])
 
-        # read the next record of selected loci file
-        record = selected_loci_file_id.readline()
+        # write a blank line in the Nexus file
+        nexus_file_id.write('\n')
 
     # write the tail records in Nexus file
     nexus_file_id.write( '  ;\n')
@@ -329,7 +254,6 @@ def build_nexus_file(selection_loci_id_file_path, complete_loci_file_path, selec
     nexus_file_id.write( 'end;\n')
 
     # close files
-    selected_loci_file_id.close()
     nexus_file_id.close()
 
 #-------------------------------------------------------------------------------
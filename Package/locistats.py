@@ -27,7 +27,6 @@ Licence: GNU General Public Licence Version 3.
 import argparse
 import operator
 import os
-import re
 import sys
 
 import xlib
@@ -131,77 +130,22 @@ def calculate_haplotype_statistics(loci_file_path, stats_file_path):
     Calculates haplotype statistics per locus.
     '''
 
-    # open the loci file
-    try:
-        loci_file_id = open(loci_file_path, mode='r', encoding='iso-8859-1')
-    except Exception as e:
-        raise xlib.ProgramException(e, 'F001', loci_file_path)
-
-    # set the pattern of the locus id records
-    pattern1 = r'^\/\/(.*)\|(.*)\|$'
-
-    # set the pattern of the locus information records
-    pattern2 = r'^(.*) (.*)$'
-
-    # initialize the list of locus information records
-    locus_line_list = []
-
     # initialize the dictionary of haplotype sequence number by locus
     haplotype_number_by_locus_dict = {}
 
-    # initialize the dictionary of haplotype sequences in the locus
-    haplotype_seqs_in_locus_dict = {}
-
-    # read the first record of complete loci file
-    record = loci_file_id.readline()
-
-    # while there are records
-    while record != '':
-
-        # process the locus id record
-        if record.startswith('//'):
-
-            # extract the locus id
-            mo = re.search(pattern1, record)
-            variant_seq = mo.group(1)
-            locus_id = mo.group(2)
-
-            # write in locus statistics
-            for i in range(len(locus_line_list)):
-
-                # extract the taxon id and sequence
-                mo = re.search(pattern2, locus_line_list[i])
-                taxon_id = mo.group(1).strip()
-                sequence = mo.group(2).strip()
-
-                # add the sequence to the dictionary of haplotype sequences in the locus
-                if sequence not in haplotype_seqs_in_locus_dict:
-                    haplotype_seqs_in_locus_dict[sequence] = sequence
-
-            # calculate de variant sequence
-            variant_seq = variant_seq[-len(sequence):]
-            xlib.Message.print('trace', f'locus_id: {locus_id:8} - variant_seq: >{variant_seq}<\n')
-
-            # add the haplotype sequence number to the dictionary of haplotype sequence number by locus
-            haplotype_number_by_locus_dict[locus_id] = len(haplotype_seqs_in_locus_dict.keys())
-
-            # initialize the list of locus information records
-            locus_line_list = []
-
-            # initialize the dictionary of haplotype sequences in the locus
-            haplotype_seqs_in_locus_dict = {}
-
-        # process a locus information record
-        else:
+    # for each locus of the loci file
+    for locus_id, variant_seq, taxon_sequence_list in xlib.iter_loci(loci_file_path):
 
-            # add the record to the list of locus information records
-            locus_line_list.append(record)
+        # get the set of haplotype sequences in the locus
+        haplotype_seq_set = {sequence for (_, sequence) in taxon_sequence_list}
 
-        # read the next record of complete loci file
-        record = loci_file_id.readline()
+        # calculate de variant sequence
+        if taxon_sequence_list:
+            variant_seq = variant_seq[-len(taxon_sequence_list[-1][1]):]
+        xlib.Message.print('trace', f'locus_id: {locus_id:8} - variant_seq: >{variant_seq}<\n')
 
-    # close file
-    loci_file_id.close()
+        # add the haplotype sequence number to the dictionary of haplotype sequence number by locus
+        haplotype_number_by_locus_dict[locus_id] = len(haplotype_seq_set)
 
     # get a list of haplotype sequence number by locus sorted by locus identification
     haplotype_seqs_in_locus_list = sorted(haplotype_number_by_locus_dict.items(), key=operator.itemgetter(1))
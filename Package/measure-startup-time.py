@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# pylint: disable=broad-except
+# pylint: disable=invalid-name
+# pylint: disable=line-too-long
+# pylint: disable=multiple-statements
+# pylint: disable=too-many-lines
+
+#-------------------------------------------------------------------------------
+
+'''
+This program measures the startup time of the NGShelper programs running them with
+the option --help and records the module import times reported by "python -X importtime".
+
+This software has been developed by:
+
+    GI en Desarrollo de Especies y Comunidades Leñosas (WooSp)
+    Dpto. Sistemas y Recursos Naturales
+    ETSI Montes, Forestal y del Medio Natural
+    Universidad Politecnica de Madrid
+    https://github.com/ggfhf/
+
+Licence: GNU General Public Licence Version 3.
+'''
+
+#-------------------------------------------------------------------------------
+
+import argparse
+import gzip
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+import xlib
+
+#-------------------------------------------------------------------------------
+
+def main():
+    '''
+    Main line of the program.
+    '''
+
+    # check the operating system
+    xlib.check_os()
+
+    # get and check the arguments
+    parser = build_parser()
+    args = parser.parse_args()
+    check_args(args)
+
+    # measure the startup time of the programs
+    measure_startup_time(args.program_list, args.runs_number, args.max_time, args.output_file)
+
+#-------------------------------------------------------------------------------
+
+def build_parser():
+    '''
+    Build the parser with the available arguments.
+    '''
+
+    # create the parser and add arguments
+    description = 'Description: This program measures the startup time of the NGShelper programs running them with the option --help and records the module import times reported by "python -X importtime".'
+    text = f'{xlib.get_project_name()} v{xlib.get_project_version()} - {os.path.basename(__file__)}\n\n{description}\n'
+    usage = f'\r{text.ljust(len("usage:"))}\nUsage: {os.path.basename(__file__)} arguments'
+    parser = argparse.ArgumentParser(usage=usage)
+    parser._optionals.title = 'Arguments'    # pylint: disable=protected-access
+    parser.add_argument('--programs', dest='program_list', help='Program list to measure with format program_1,program_2,...,program_n or ALL; default: ALL.')
+    parser.add_argument('--runs', dest='runs_number', help=f'Number of runs of every program; default: {xlib.Const.DEFAULT_STARTUP_RUNS_NUMBER}.')
+    parser.add_argument('--maxtime', dest='max_time', help=f'Maximum startup time in milliseconds; programs with a greater median time are marked; default: {xlib.Const.DEFAULT_STARTUP_MAX_TIME}.')
+    parser.add_argument('--out', dest='output_file', help='Path of the output CSV file with the startup and import times (mandatory).')
+    parser.add_argument('--verbose', dest='verbose', help=f'Additional job status info during the run: {xlib.get_verbose_code_list_text()}; default: {xlib.Const.DEFAULT_VERBOSE}.')
+    parser.add_argument('--trace', dest='trace', help=f'Additional info useful to the developer team: {xlib.get_trace_code_list_text()}; default: {xlib.Const.DEFAULT_TRACE}.')
+
+    # return the paser
+    return parser
+
+#-------------------------------------------------------------------------------
+
+def check_args(args):
+    '''
+    Check the input arguments.
+    '''
+
+    # initialize the control variable
+    OK = True
+
+    # check "program_list"
+    if args.program_list is None or args.program_list.upper() == 'ALL':
+        args.program_list = xlib.get_program_list()
+    else:
+        args.program_list = xlib.split_literal_to_text_list(args.program_list)
+        for program in args.program_list:
+            if not os.path.isfile(os.path.join(xlib.get_program_dir(), program)):
+                xlib.Message.print('error', f'*** The program {program} does not exist.')
+                OK = False
+
+    # check "runs_number"
+    if args.runs_number is None:
+        args.runs_number = xlib.Const.DEFAULT_STARTUP_RUNS_NUMBER
+    elif not xlib.check_int(args.runs_number, minimum=1):
+        xlib.Message.print('error', 'The number of runs has to be an integer number greater than or equal to 1.')
+        OK = False
+    else:
+        args.runs_number = int(args.runs_number)
+
+    # check "max_time"
+    if args.max_time is None:
+        args.max_time = xlib.Const.DEFAULT_STARTUP_MAX_TIME
+    elif not xlib.check_float(args.max_time, minimum=0.0):
+        xlib.Message.print('error', 'The maximum startup time has to be a float number greater than or equal to 0.0.')
+        OK = False
+    else:
+        args.max_time = float(args.max_time)
+
+    # check "output_file"
+    if args.output_file is None:
+        xlib.Message.print('error', '*** The output CSV file is not indicated in the input arguments.')
+        OK = False
+
+    # check "verbose"
+    if args.verbose is None:
+        args.verbose = xlib.Const.DEFAULT_VERBOSE
+    elif not xlib.check_code(args.verbose, xlib.get_verbose_code_list(), case_sensitive=False):
+        xlib.Message.print('error', f'*** verbose has to be {xlib.get_verbose_code_list_text()}.')
+        OK = False
+    if args.verbose.upper() == 'Y':
+        xlib.Message.set_verbose_status(True)
+
+    # check "trace"
+    if args.trace is None:
+        args.trace = xlib.Const.DEFAULT_TRACE
+    elif not xlib.check_code(args.trace, xlib.get_trace_code_list(), case_sensitive=False):
+        xlib.Message.print('error', f'*** trace has to be {xlib.get_trace_code_list_text()}.')
+        OK = False
+    if args.trace.upper() == 'Y':
+        xlib.Message.set_trace_status(True)
+
+    # if there are errors, exit with exception
+    if not OK:
+        raise xlib.ProgramException('', 'P001')
+
+#-------------------------------------------------------------------------------
+
+def parse_importtime(importtime_text):
+    '''
+    Parse the output of "python -X importtime" and get the total import time and the dictionary of the cumulative time of top-level modules (microseconds).
+    '''
+
+    # initialize the dictionary of the cumulative time of top-level modules
+    top_module_time_dict = {}
+
+    # set the record pattern
+    # format: import time: self [us] | cumulative | imported package
+    record_pattern = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+    # get the cumulative time of the modules imported by the program (not indented)
+    for record in importtime_text.splitlines():
+        mo = record_pattern.match(record)
+        if mo is not None and len(mo.group(3)) == 1:
+            top_module_time_dict[mo.group(4)] = top_module_time_dict.get(mo.group(4), 0) + int(mo.group(2))
+
+    # return the total import time and the dictionary
+    return sum(top_module_time_dict.values()), top_module_time_dict
+
+#-------------------------------------------------------------------------------
+
+def measure_startup_time(program_list, runs_number, max_time, output_file):
+    '''
+    Measure the startup time of the programs.
+    '''
+
+    # get the program directory
+    program_dir = xlib.get_program_dir()
+
+    # open the output file
+    if output_file.endswith('.gz'):
+        try:
+            output_file_id = gzip.open(output_file, mode='wt', encoding='iso-8859-1', newline='\n')
+        except Exception as e:
+            raise xlib.ProgramException(e, 'F004', output_file)
+    else:
+        try:
+            output_file_id = open(output_file, mode='w', encoding='iso-8859-1', newline='\n')
+        except Exception as e:
+            raise xlib.ProgramException(e, 'F003', output_file)
+
+    # write the header record
+    output_file_id.write('"program";"median_time_ms";"minimum_time_ms";"median_import_time_ms";"slowest_modules";"over_max_time";"return_code"\n')
+
+    # initialize the lists of programs with a startup time greater than the maximum and programs ended with errors
+    slow_program_list = []
+    failed_program_list = []
+
+    # for each program
+    for program_counter, program in enumerate(program_list, start=1):
+
+        # initialize the lists of run times and import times
+        run_time_list = []
+        import_time_list = []
+        top_module_time_dict = {}
+
+        # run the program with the option --help (the runs end when a run fails)
+        for _ in range(runs_number):
+            start_time = time.perf_counter()
+            process = subprocess.run([sys.executable, '-X', 'importtime', os.path.join(program_dir, program), '--help'], stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, cwd=program_dir, check=False)
+            run_time_list.append((time.perf_counter() - start_time) * 1000)
+            (import_time, top_module_time_dict) = parse_importtime(process.stderr.decode('utf-8', errors='replace'))
+            import_time_list.append(import_time / 1000)
+            if process.returncode != 0:
+                xlib.Message.print('error', f'\n*** The run of {program} --help has ended with RC {process.returncode}.')
+                failed_program_list.append(program)
+                break
+
+        # get the slowest modules of the last run
+        slowest_module_list = sorted(top_module_time_dict.items(), key=lambda x: x[1], reverse=True)[:xlib.Const.STARTUP_SLOWEST_MODULES_NUMBER]
+        slowest_modules_text = ','.join([f'{module}:{module_time / 1000:.1f}' for (module, module_time) in slowest_module_list])
+
+        # check the maximum time
+        median_time = statistics.median(run_time_list)
+        over_max_time = 'Y' if median_time > max_time else 'N'
+        if over_max_time == 'Y':
+            slow_program_list.append(program)
+
+        # write the program record
+        output_file_id.write(f'"{program}";{median_time:.1f};{min(run_time_list):.1f};{statistics.median(import_time_list):.1f};"{slowest_modules_text}";"{over_max_time}";{process.returncode}\n')
+        xlib.Message.print('trace', f'{program}: {run_time_list} - {slowest_modules_text}')
+
+        # print the counters
+        xlib.Message.print('verbose', f'\rProcessed programs ... {program_counter:4d} of {len(program_list):4d}')
+
+    xlib.Message.print('verbose', '\n')
+
+    # close the output file
+    output_file_id.close()
+
+    # print the programs with a startup time greater than the maximum
+    if slow_program_list:
+        xlib.Message.print('info', f'Programs with a median startup time greater than {max_time} ms: {",".join(slow_program_list)}.')
+
+    # print the programs ended with errors
+    if failed_program_list:
+        xlib.Message.print('info', f'Programs ended with errors: {",".join(failed_program_list)}.')
+
+    # print OK message
+    xlib.Message.print('info', f'The file {os.path.basename(output_file)} is created.')
+
+#-------------------------------------------------------------------------------
+
+if __name__ == '__main__':
+
+    main()
+    sys.exit(0)
+
+#-------------------------------------------------------------------------------
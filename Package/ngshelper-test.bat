@@ -0,0 +1,89 @@
+@echo off
+
+rem ----------------------------------------------------------------------------
+
+rem This script performs a test of the program ngshelper.py
+rem in a Windows environment.
+rem
+rem This software has been developed by:
+rem
+rem     GI en Desarrollo de Especies y Comunidades Leñosas (WooSp)
+rem     Dpto. Sistemas y Recursos Naturales
+rem     ETSI Montes, Forestal y del Medio Natural
+rem     Universidad Politecnica de Madrid
+rem     https://github.com/ggfhf/
+rem
+rem Licence: GNU General Public Licence Version 3.
+
+rem ----------------------------------------------------------------------------
+
+rem Control parameters
+
+if not "%*" == "" (set ERROR=1 & goto END)
+
+rem ----------------------------------------------------------------------------
+
+rem Set environment
+
+setlocal EnableDelayedExpansion
+
+set ERROR=0
+
+set PYTHON=python.exe
+set PYTHON_OPTIONS=
+set PYTHONPATH=.
+
+set NGSHELPER_DIR=%NGSHELPER%
+set DATA_DIR=%NGSHELPER%\data
+set OUTPUT_DIR=%NGSHELPER%\output
+
+if not exist %OUTPUT_DIR% (mkdir %OUTPUT_DIR%)
+
+set INITIAL_DIR=%cd%
+cd %NGSHELPER_DIR%
+
+rem ----------------------------------------------------------------------------
+
+rem Build the pipeline file
+
+(
+    echo recreate-database --db=%OUTPUT_DIR%\ngshelper-pipeline.db
+    echo simulate-md --vcf=%DATA_DIR%\variants-nonko.vcf --method=RANDOM --mdp=0.20 --mpiwmd=10 --out=%OUTPUT_DIR%\variants-nonko-wmd.vcf --replicates=1 --seed=NONE
+    echo calculate-genotype-data --threads=8 --db=%OUTPUT_DIR%\ngshelper-pipeline.db --vcf=%OUTPUT_DIR%\variants-nonko-wmd.vcf
+    echo impute-md-som --threads=4 --db=%OUTPUT_DIR%\ngshelper-pipeline.db --input_vcf=%OUTPUT_DIR%\variants-nonko-wmd.vcf --output_vcf=%OUTPUT_DIR%\variants-nonko-wmd-imputed.vcf --impdata=%OUTPUT_DIR%\imputation_data.csv --xdim=5 --ydim=5 --sigma=1.0 --ilrate=0.5 --iter=1000 --mr2=0.001 --estimator=ru --snps=5 --gim=MF
+) > %OUTPUT_DIR%\ngshelper-pipeline.txt
+
+rem ----------------------------------------------------------------------------
+
+rem Run the program ngshelper.py
+
+%PYTHON% %PYTHON_OPTIONS% ngshelper.py ^
+    --pipeline=%OUTPUT_DIR%\ngshelper-pipeline.txt ^
+    --metrics=NONE ^
+    --verbose=Y ^
+    --trace=N
+if %ERRORLEVEL% neq 0 (set RC=%ERRORLEVEL% & set ERROR=2 & goto END)
+
+rem ----------------------------------------------------------------------------
+
+:END
+
+cd %INITIAL_DIR%
+
+if %ERROR% equ 0 (
+    rem -- exit 0
+)
+
+if %ERROR% equ 1 (
+    echo *** ERROR: This script does not have input parameters.
+    rem -- pause
+    rem -- exit %RC%
+)
+
+if %ERROR% equ 2 (
+    echo *** ERROR: The program ended with return code %RC%.
+    rem -- pause
+    rem -- exit %RC%
+)
+
+rem ----------------------------------------------------------------------------
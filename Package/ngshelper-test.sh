@@ -0,0 +1,97 @@
+#!/bin/bash
+
+#-------------------------------------------------------------------------------
+
+# This script performs a test of the program  a ngshelper.py 
+# in a Linux environment.
+#
+# This software has been developed by:
+#
+#    GI en Desarrollo de Especies y Comunidades Leñosas (WooSp)
+#    Dpto. Sistemas y Recursos Naturales
+#    ETSI Montes, Forestal y del Medio Natural
+#    Universidad Politecnica de Madrid
+#    https://github.com/ggfhf/
+#
+# Licence: GNU General Public Licence Version 3.
+
+#-------------------------------------------------------------------------------
+
+# Control parameters
+
+if [ -n "$*" ]; then echo 'This script does not have parameters'; exit 1; fi
+
+#-------------------------------------------------------------------------------
+
+# Set environment
+
+PYTHON=python3
+PYTHON_OPTIONS=
+PYTHONPATH=.
+
+NGSHELPER_DIR=$NGSHELPER
+DATA_DIR=$NGSHELPER/data
+OUTPUT_DIR=$NGSHELPER/output
+
+if [ ! -d "$OUTPUT_DIR" ]; then mkdir --parents $OUTPUT_DIR; fi
+
+INITIAL_DIR=$(pwd)
+cd $NGSHELPER_DIR
+
+#-------------------------------------------------------------------------------
+
+# Build the pipeline file
+
+cat > $OUTPUT_DIR/ngshelper-pipeline.txt << EOF
+recreate-database \
+    --db=$OUTPUT_DIR/ngshelper-pipeline.db
+simulate-md \
+    --vcf=$DATA_DIR/variants-nonko.vcf \
+    --method=RANDOM \
+    --mdp=0.20 \
+    --mpiwmd=10 \
+    --out=$OUTPUT_DIR/variants-nonko-wmd.vcf \
+    --replicates=1 \
+    --seed=NONE
+calculate-genotype-data \
+    --threads=8 \
+    --db=$OUTPUT_DIR/ngshelper-pipeline.db \
+    --vcf=$OUTPUT_DIR/variants-nonko-wmd.vcf
+impute-md-som \
+    --threads=4 \
+    --db=$OUTPUT_DIR/ngshelper-pipeline.db \
+    --input_vcf=$OUTPUT_DIR/variants-nonko-wmd.vcf \
+    --output_vcf=$OUTPUT_DIR/variants-nonko-wmd-imputed.vcf \
+    --impdata=$OUTPUT_DIR/imputation_data.csv \
+    --xdim=5 \
+    --ydim=5 \
+    --sigma=1.0 \
+    --ilrate=0.5 \
+    --iter=1000 \
+    --mr2=0.001 \
+    --estimator=ru \
+    --snps=5 \
+    --gim=MF
+EOF
+
+#-------------------------------------------------------------------------------
+
+# Run the program ngshelper.py
+
+/usr/bin/time \
+    $PYTHON $PYTHON_OPTIONS ngshelper.py \
+        --pipeline=$OUTPUT_DIR/ngshelper-pipeline.txt \
+        --metrics=NONE \
+        --verbose=Y \
+        --trace=N
+if [ $? -ne 0 ]; then echo 'Script ended with errors.'; exit 1; fi
+
+#-------------------------------------------------------------------------------
+
+# End
+
+cd $INITIAL_DIR
+
+exit 0
+
+#-------------------------------------------------------------------------------
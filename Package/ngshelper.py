@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# pylint: disable=broad-except
+# pylint: disable=invalid-name
+# pylint: disable=line-too-long
+# pylint: disable=multiple-statements
+# pylint: disable=too-many-lines
+
+#-------------------------------------------------------------------------------
+
+'''
+This program is the unified entry point of the NGShelper programs. It runs a program
+as a subcommand (ngshelper.py program arguments) or runs the steps of a pipeline
+in the same process (ngshelper.py --pipeline=file): the database connections are
+shared by the steps and the genotype data of a VCF file read by calculate-genotype-data.py,
+vcf2mach.py or vcf2structure.py are reused by the next of these steps which read the same
+VCF file (the other programs stream the VCF records and read the file in every step).
+
+This software has been developed by:
+
+    GI en Desarrollo de Especies y Comunidades Leñosas (WooSp)
+    Dpto. Sistemas y Recursos Naturales
+    ETSI Montes, Forestal y del Medio Natural
+    Universidad Politecnica de Madrid
+    https://github.com/ggfhf/
+
+Licence: GNU General Public Licence Version 3.
+'''
+
+#-------------------------------------------------------------------------------
+
+import argparse
+import gzip
+import importlib.util
+import os
+import shlex
+import sys
+
+import xgenotype
+import xlib
+import xsqlite
+
+#-------------------------------------------------------------------------------
+
+def main():
+    '''
+    Main line of the program.
+    '''
+
+    # check the operating system
+    xlib.check_os()
+
+    # when the first argument is a program, run it as a subcommand
+    if len(sys.argv) > 1 and not sys.argv[1].startswith('-'):
+        rc = run_program(sys.argv[1], sys.argv[2:])
+        sys.exit(rc)
+
+    # get and check the arguments
+    parser = build_parser()
+    args = parser.parse_args()
+    check_args(args)
+
+    # measure the run metrics (the report is written when the run ends)
+    with xlib.Metrics.run(args.metrics_file):
+
+        # run the steps of the pipeline
+        run_pipeline(args.pipeline_file)
+
+#-------------------------------------------------------------------------------
+
+def build_parser():
+    '''
+    Build the parser with the available arguments.
+    '''
+
+    # create the parser and add arguments
+    description = 'Description: This program is the unified entry point of the NGShelper programs. It runs a program as a subcommand (ngshelper.py program arguments) or runs the steps of a pipeline in the same process sharing the database connections and the genotype data of the VCF files read by calculate-genotype-data.py, vcf2mach.py and vcf2structure.py.'
+    text = f'{xlib.get_project_name()} v{xlib.get_project_version()} - {os.path.basename(__file__)}\n\n{description}\n'
+    usage = f'\r{text.ljust(len("usage:"))}\nUsage: {os.path.basename(__file__)} program arguments | {os.path.basename(__file__)} arguments'
+    parser = argparse.ArgumentParser(usage=usage)
+    parser._optionals.title = 'Arguments'    # pylint: disable=protected-access
+    parser.add_argument('--pipeline', dest='pipeline_file', help='Path of the pipeline file: a step (program and arguments) per record; records ending with \\ continue in the next one, # begins a comment and environment variables are expanded (mandatory).')
+    parser.add_argument('--metrics', dest='metrics_file', help='Path of the output JSON file with the run metrics (elapsed time, throughput of stages and peak memory) or NONE; default: NONE.')
+    parser.add_argument('--verbose', dest='verbose', help=f'Additional job status info during the run: {xlib.get_verbose_code_list_text()}; default: {xlib.Const.DEFAULT_VERBOSE}.')
+    parser.add_argument('--trace', dest='trace', help=f'Additional info useful to the developer team: {xlib.get_trace_code_list_text()}; default: {xlib.Const.DEFAULT_TRACE}.')
+
+    # return the paser
+    return parser
+
+#-------------------------------------------------------------------------------
+
+def check_args(args):
+    '''
+    Check the input arguments.
+    '''
+
+    # initialize the control variable
+    OK = True
+
+    # check "pipeline_file"
+    if args.pipeline_file is None:
+        xlib.Message.print('error', '*** The pipeline file is not indicated in the input arguments.')
+        OK = False
+    elif not os.path.isfile(args.pipeline_file):
+        xlib.Message.print('error', f'*** The file {args.pipeline_file} does not exist.')
+        OK = False
+
+    # check "metrics_file"
+    if args.metrics_file is None or args.metrics_file.upper() == 'NONE':
+        args.metrics_file = None
+
+    # check "verbose"
+    if args.verbose is None:
+        args.verbose = xlib.Const.DEFAULT_VERBOSE
+    elif not xlib.check_code(args.verbose, xlib.get_verbose_code_list(), case_sensitive=False):
+        xlib.Message.print('error', f'*** verbose has to be {xlib.get_verbose_code_list_text()}.')
+        OK = False
+    if args.verbose.upper() == 'Y':
+        xlib.Message.set_verbose_status(True)
+
+    # check "trace"
+    if args.trace is None:
+        args.trace = xlib.Const.DEFAULT_TRACE
+    elif not xlib.check_code(args.trace, xlib.get_trace_code_list(), case_sensitive=False):
+        xlib.Message.print('error', f'*** trace has to be {xlib.get_trace_code_list_text()}.')
+        OK = False
+    if args.trace.upper() == 'Y':
+        xlib.Message.set_trace_status(True)
+
+    # if there are errors, exit with exception
+    if not OK:
+        raise xlib.ProgramException('', 'P001')
+
+#-------------------------------------------------------------------------------
+
+def get_program_module(program):
+    '''
+    Get the module of a program, loading it when it is used for the first time.
+    '''
+
+    # get the program file and the module name (the name of the programs can not be used because it has hyphens)
+    program_file = program if program.endswith('.py') else f'{program}.py'
+    module_name = f'{xlib.get_project_code()}_{program_file[:-3].replace("-", "_")}'
+
+    # return the module if it is already loaded
+    module = sys.modules.get(module_name)
+    if module is not None:
+        return module
+
+    # check the program
+    if program_file not in xlib.get_program_list() or program_file == os.path.basename(__file__):
+        raise xlib.ProgramException('', 'P003', program)
+
+    # load the module
+    spec = importlib.util.spec_from_file_location(module_name, os.path.join(xlib.get_program_dir(), program_file))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+
+    # return the module
+    return module
+
+#-------------------------------------------------------------------------------
+
+def run_program(program, argument_list):
+    '''
+    Run the main line of a program with a list of arguments and return its RC.
+    '''
+
+    # get the module of the program
+    module = get_program_module(program)
+
+    # set the arguments of the program
+    saved_argv = sys.argv
+    sys.argv = [module.__file__] + argument_list
+
+    # run the main line of the program (the programs exit with RC 1 when an exception is raised)
+    rc = 0
+    try:
+        module.main()
+    except SystemExit as e:
+        if e.code is None:
+            rc = 0
+        elif isinstance(e.code, int):
+            rc = e.code
+        else:
+            xlib.Message.print('error', e.code)
+            rc = 1
+    finally:
+        sys.argv = saved_argv
+        sys.stdout.flush()
+
+    # return the RC
+    return rc
+
+#-------------------------------------------------------------------------------
+
+def get_pipeline_step(step_text, pipeline_file):
+    '''
+    Get the program and the argument list of a pipeline step expanding the environment variables.
+    '''
+
+    # expand the environment variables (in Windows, the backslashes of paths are not escape characters)
+    step_text = os.path.expandvars(step_text)
+    if sys.platform.startswith('win32'):
+        step_text = step_text.replace('\\', '\\\\')
+
+    # split the step text
+    try:
+        step_data_list = shlex.split(step_text, comments=True)
+    except Exception as e:
+        raise xlib.ProgramException(e, 'D001', step_text, pipeline_file)
+    if not step_data_list:
+        raise xlib.ProgramException('', 'D001', step_text, pipeline_file)
+
+    return step_data_list[0], step_data_list[1:]
+
+#-------------------------------------------------------------------------------
+
+def get_pipeline_step_list(pipeline_file):
+    '''
+    Get the step list (program and argument list) of a pipeline file.
+    '''
+
+    # initialize the step list
+    step_list = []
+
+    # open the pipeline file
+    if pipeline_file.endswith('.gz'):
+        try:
+            pipeline_file_id = gzip.open(pipeline_file, mode='rt', encoding='iso-8859-1')
+        except Exception as e:
+            raise xlib.ProgramException(e, 'F002', pipeline_file)
+    else:
+        try:
+            pipeline_file_id = open(pipeline_file, mode='r', encoding='iso-8859-1')
+        except Exception as e:
+            raise xlib.ProgramException(e, 'F001', pipeline_file)
+
+    # initialize the text of the current step
+    step_text = ''
+
+    # for each record of the pipeline file
+    for record in pipeline_file_id:
+
+        # skip comment records and remove the record end
+        record = record.rstrip()
+        if record.lstrip().startswith('#'):
+            continue
+
+        # add the record to the text of the current step
+        if record.endswith('\\'):
+            step_text = f'{step_text} {record[:-1].strip()}'
+            continue
+        step_text = f'{step_text} {record.strip()}'.strip()
+
+        # append the step to the step list
+        if step_text != '':
+            step_list.append(get_pipeline_step(step_text, pipeline_file))
+            step_text = ''
+
+    # append the last step when the last record ends with \
+    if step_text.strip() != '':
+        step_list.append(get_pipeline_step(step_text.strip(), pipeline_file))
+
+    # close the pipeline file
+    pipeline_file_id.close()
+
+    # return the step list
+    return step_list
+
+#-------------------------------------------------------------------------------
+
+def run_pipeline(pipeline_file):
+    '''
+    Run the steps of a pipeline in the same process.
+    '''
+
+    # get the step list
+    step_list = get_pipeline_step_list(pipeline_file)
+
+    # check the programs of the steps and load their modules before running the first step
+    for (program, _) in step_list:
+        get_program_module(program)
+
+    # save the message status of the pipeline (every step sets its own status)
+    verbose_status = xlib.Message.verbose_status
+    trace_status = xlib.Message.trace_status
+
+    # share the database connections, the cluster data and the genotype data of VCF files among the steps
+    xsqlite.SharedConnection.set_sharing_status(True)
+    xsqlite.ClusterDataCache.set_cache_status(True)
+    xgenotype.GenotypeDataCache.set_cache_status(True)
+
+    try:
+
+        # for each step
+        for step_counter, (program, argument_list) in enumerate(step_list, start=1):
+
+            # print the step
+            xlib.Message.print('info', f'Step {step_counter} of {len(step_list)}: {program} {" ".join(argument_list)}')
+
+            # restore the message status of the pipeline
+            xlib.Message.set_verbose_status(verbose_status)
+            xlib.Message.set_trace_status(trace_status)
+
+            # run the step measuring its time
+            with xlib.Metrics.stage(f'step {step_counter}: {program}'):
+                rc = run_program(program, argument_list)
+            if rc != 0:
+                raise xlib.ProgramException('', 'P004', step_counter, program, rc)
+
+    finally:
+
+        # close the shared database connections and release the cluster data and the genotype data
+        xsqlite.SharedConnection.set_sharing_status(False)
+        xsqlite.ClusterDataCache.set_cache_status(False)
+        xgenotype.GenotypeDataCache.set_cache_status(False)
+
+    # print OK message
+    xlib.Message.print('info', f'The pipeline {os.path.basename(pipeline_file)} has ended OK.')
+
+#-------------------------------------------------------------------------------
+
+if __name__ == '__main__':
+
+    main()
+    sys.exit(0)
+
+#-------------------------------------------------------------------------------
@@ -52,6 +52,7 @@ rem Run the program purge-vcf.py
     --value=99 ^
     --nvalue=88 ^
     --out=%OUTPUT_DIR%\concatenated_imputed_progenies-6000DP-scenario2-chaval.vcf ^
+    --contigs=NONE ^
     --verbose=Y ^
     --trace=N
 if %ERRORLEVEL% neq 0 (set RC=%ERRORLEVEL% & set ERROR=2 & goto END)
@@ -62,6 +63,7 @@ if %ERRORLEVEL% neq 0 (set RC=%ERRORLEVEL% & set ERROR=2 & goto END)
     --value=3 ^
     --nvalue=NONE ^
     --out=%OUTPUT_DIR%\concatenated_imputed_progenies-6000DP-scenario2-delvar.vcf ^
+    --contigs=%OUTPUT_DIR%\concatenated_imputed_progenies-6000DP-scenario2-delvar-contigs.csv ^
     --verbose=Y ^
     --trace=N
 if %ERRORLEVEL% neq 0 (set RC=%ERRORLEVEL% & set ERROR=2 & goto END)
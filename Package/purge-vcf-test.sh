@@ -49,6 +49,7 @@ cd $NGSHELPER_DIR
         --value=99 \
         --nvalue=88 \
         --out=$OUTPUT_DIR/concatenated_imputed_progenies-6000DP-scenario2-chaval.vcf \
+        --contigs=NONE \
         --verbose=Y \
         --trace=N
 if [ $? -ne 0 ]; then echo 'Script ended with errors.'; exit 1; fi
@@ -60,6 +61,7 @@ if [ $? -ne 0 ]; then echo 'Script ended with errors.'; exit 1; fi
         --value=3 \
         --nvalue=NONE \
         --out=$OUTPUT_DIR/concatenated_imputed_progenies-6000DP-scenario2-delvar.vcf \
+        --contigs=$OUTPUT_DIR/concatenated_imputed_progenies-6000DP-scenario2-delvar-contigs.csv \
         --verbose=Y \
         --trace=N
 if [ $? -ne 0 ]; then echo 'Script ended with errors.'; exit 1; fi
@@ -52,7 +52,7 @@ def main():
 
     # if the operation is the filter of variant containing a determined value in left or right sides of sample genotypes
     elif args.purge_operation == 'FILVAR':
-        filter_variant(args.input_vcf_file, args.value, args.output_purged_file)
+        filter_variant(args.input_vcf_file, args.value, args.output_purged_file, args.contig_usage_file)
 
 #-------------------------------------------------------------------------------
 
@@ -72,6 +72,7 @@ def build_parser():
     parser.add_argument('--value', dest='value', help='value to operate (mandatory)')
     parser.add_argument('--nvalue', dest='new_value', help='new value that replaces value when operation in CHAVAR (mandatory); else NONE (default)')
     parser.add_argument('--out', dest='output_purged_file', help='Path of the purged file (mandatory).')
+    parser.add_argument('--contigs', dest='contig_usage_file', help='Path of the output CSV file with the variant number of every contig after filtering when operation is FILVAR or NONE; default: NONE.')
     parser.add_argument('--verbose', dest='verbose', help=f'Additional job status info during the run: {xlib.get_verbose_code_list_text()}; default: {xlib.Const.DEFAULT_VERBOSE}.')
     parser.add_argument('--trace', dest='trace', help=f'Additional info useful to the developer team: {xlib.get_trace_code_list_text()}; default: {xlib.Const.DEFAULT_TRACE}.')
 
@@ -125,6 +126,10 @@ def check_args(args):
         xlib.Message.print('error', '*** The purged file is not indicated in the input arguments.')
         OK = False
 
+    # check "contig_usage_file"
+    if args.contig_usage_file is None or args.contig_usage_file.upper() == 'NONE':
+        args.contig_usage_file = None
+
     # check "verbose"
     if args.verbose is None:
         args.verbose = xlib.Const.DEFAULT_VERBOSE
@@ -317,7 +322,7 @@ def change_value(input_vcf_file, value, new_value, output_purged_file):
 
 #-------------------------------------------------------------------------------
 
-def filter_variant(input_vcf_file, value, output_purged_file):
+def filter_variant(input_vcf_file, value, output_purged_file, contig_usage_file):
     '''
     Filter variants containing a determined value in left or right sides of sample genotypes in a VCF file.
     '''
@@ -325,11 +330,14 @@ def filter_variant(input_vcf_file, value, output_purged_file):
     # initialize the sample number
     sample_number = 0
 
-    # initialize the non-filtered sequence identification list
-    non_filtered_seq_id_list = []
+    # initialize the header record list (the contig records are written when the variants are filtered)
+    header_record_list = []
+
+    # initialize the dictionary of the variant number of non-filtered sequence identifications
+    contig_usage_dict = {}
 
-    # set the temporal VCF file
-    temporal_vcf_file = f'{output_purged_file}.tmp'
+    # create the spool of non-filtered variant records
+    variant_spool = xlib.RecordSpool()
 
     # open the input VCF file
     if input_vcf_file.endswith('.gz'):
@@ -343,18 +351,6 @@ def filter_variant(input_vcf_file, value, output_purged_file):
         except Exception as e:
             raise xlib.ProgramException(e, 'F001', input_vcf_file)
 
-    # open the temporal VCF file
-    if temporal_vcf_file.endswith('.gz'):
-        try:
-            temporal_vcf_file_id = gzip.open(temporal_vcf_file, mode='wt', encoding='iso-8859-1', newline='\n')
-        except Exception as e:
-            raise xlib.ProgramException(e, 'F004', temporal_vcf_file)
-    else:
-        try:
-            temporal_vcf_file_id = open(temporal_vcf_file, mode='w', encoding='iso-8859-1', newline='\n')
-        except Exception as e:
-            raise xlib.ProgramException(e, 'F003', temporal_vcf_file)
-
     # initialize counters
     input_record_counter = 0
     total_variant_counter = 0
@@ -372,8 +368,8 @@ def filter_variant(input_vcf_file, value, output_purged_file):
             # add 1 to the read sequence counter
             input_record_counter += 1
 
-            # write the metadata record
-            temporal_vcf_file_id.write(record)
+            # save the metadata record
+            header_record_list.append(record)
 
             # print the counters
             xlib.Message.print('verbose', f'\rProcessed records ... {input_record_counter:8d} - Total variants ... {total_variant_counter:8d} - Filtered variants ... {filtered_variant_counter:8d}')
@@ -393,8 +389,8 @@ def filter_variant(input_vcf_file, value, output_purged_file):
             # set the sample number
             sample_number = len(record_data_list) - 9
 
-            # write the column description record
-            temporal_vcf_file_id.write(record)
+            # save the column description record
+            header_record_list.append(record)
 
             # print the counters
             xlib.Message.print('verbose', f'\rProcessed records ... {input_record_counter:8d} - Total variants ... {total_variant_counter:8d} - Filtered variants ... {filtered_variant_counter:8d}')
@@ -473,13 +469,12 @@ def filter_variant(input_vcf_file, value, output_purged_file):
                     sample_data_list[i][gt_position] = sample_gt_list[i]
                     sample_list.append(':'.join(sample_data_list[i]))
 
-                # add the sequence identification to the non filtered sequence identification list
-                if data_dict['chrom'] not in non_filtered_seq_id_list:
-                    non_filtered_seq_id_list.append(data_dict['chrom'])
+                # add 1 to the variant number of the sequence identification
+                contig_usage_dict[data_dict['chrom']] = contig_usage_dict.get(data_dict['chrom'], 0) + 1
 
-                # write the variant record
+                # spool the variant record
                 sample_list_text = '\t'.join(sample_list)
-                temporal_vcf_file_id.write(f'{data_dict["chrom"]}\t{data_dict["pos"]}\t{data_dict["id"]}\t{reference_bases}\t{alternative_alleles}\t{data_dict["qual"]}\t{data_dict["filter"]}\t{data_dict["info"]}\t{data_dict["format"]}\t{sample_list_text}\n')
+                variant_spool.write(f'{data_dict["chrom"]}\t{data_dict["pos"]}\t{data_dict["id"]}\t{reference_bases}\t{alternative_alleles}\t{data_dict["qual"]}\t{data_dict["filter"]}\t{data_dict["info"]}\t{data_dict["format"]}\t{sample_list_text}\n')
 
             # if the process does not have to write the variant
             else:
@@ -495,25 +490,8 @@ def filter_variant(input_vcf_file, value, output_purged_file):
 
     xlib.Message.print('verbose', '\n')
 
-    # close files
+    # close the input VCF file
     input_vcf_file_id.close()
-    temporal_vcf_file_id.close()
-
-    # print OK message
-    xlib.Message.print('info', f'The temporal file {os.path.basename(temporal_vcf_file)} containing the filtered variants is created.')
-    xlib.Message.print('info', 'Removing metadata of filtered variants ...')
-
-    # open the temporal VCF file
-    if temporal_vcf_file.endswith('.gz'):
-        try:
-            temporal_vcf_file_id = gzip.open(temporal_vcf_file, mode='rt', encoding='iso-8859-1')
-        except Exception as e:
-            raise xlib.ProgramException(e, 'F002', temporal_vcf_file)
-    else:
-        try:
-            temporal_vcf_file_id = open(temporal_vcf_file, mode='r', encoding='iso-8859-1')
-        except Exception as e:
-            raise xlib.ProgramException(e, 'F001', temporal_vcf_file)
 
     # open the output purged file
     if output_purged_file.endswith('.gz'):
@@ -527,45 +505,85 @@ def filter_variant(input_vcf_file, value, output_purged_file):
         except Exception as e:
             raise xlib.ProgramException(e, 'F003', output_purged_file)
 
-    # read the first record of temporal VCF file
-    record = temporal_vcf_file_id.readline()
+    # initialize the sequence identification list of the contig records
+    header_seq_id_list = []
 
-    # while there are records in temporal VCF file
-    while record != '':
+    # write the header records removing the contig records of sequence identifications without variants
+    for header_record in header_record_list:
 
         # process contig records
-        if record.startswith('##contig'):
+        if header_record.startswith('##contig'):
 
             # get the sequence identification and the position
             seq_id = ''
             i1 = 13
-            i2 = record.find(',', i1)
+            i2 = header_record.find(',', i1)
             if i2 > -1:
-                seq_id = record[i1:i2]
+                seq_id = header_record[i1:i2]
+                header_seq_id_list.append(seq_id)
 
             # write the record when the sequence identification was not filtered
-            if seq_id in non_filtered_seq_id_list:
-                output_purged_file_id.write(record)
+            if seq_id in contig_usage_dict:
+                output_purged_file_id.write(header_record)
 
         # process other records
         else:
 
             # write record
-            output_purged_file_id.write(record)
+            output_purged_file_id.write(header_record)
 
-        # read the next record
-        record = temporal_vcf_file_id.readline()
+    # write the spooled variant records
+    for variant_record in variant_spool.read_records():
+        output_purged_file_id.write(variant_record)
 
-    # close files
-    temporal_vcf_file_id.close()
+    # close the output purged file and the spool
     output_purged_file_id.close()
+    variant_spool.close()
 
     # print OK message
     xlib.Message.print('info', f'The purged file {os.path.basename(output_purged_file)} is created.')
 
-    # delete temporal VCF file
-    os.remove(temporal_vcf_file)
-    xlib.Message.print('info', f'The temporal VCF file {os.path.basename(temporal_vcf_file)} is deleted.')
+    # write the contig usage file
+    if contig_usage_file is not None:
+        write_contig_usage_file(contig_usage_file, header_seq_id_list, contig_usage_dict)
+
+#-------------------------------------------------------------------------------
+
+def write_contig_usage_file(contig_usage_file, header_seq_id_list, contig_usage_dict):
+    '''
+    Write the variant number of every contig after filtering (contigs of the header and contigs only found in variant records).
+    '''
+
+    # open the contig usage file
+    if contig_usage_file.endswith('.gz'):
+        try:
+            contig_usage_file_id = gzip.open(contig_usage_file, mode='wt', encoding='iso-8859-1', newline='\n')
+        except Exception as e:
+            raise xlib.ProgramException(e, 'F004', contig_usage_file)
+    else:
+        try:
+            contig_usage_file_id = open(contig_usage_file, mode='w', encoding='iso-8859-1', newline='\n')
+        except Exception as e:
+            raise xlib.ProgramException(e, 'F003', contig_usage_file)
+
+    # write the header record
+    contig_usage_file_id.write('"seq_id";"variant_number";"in_header"\n')
+
+    # write the contigs of the header
+    header_seq_id_set = set(header_seq_id_list)
+    for seq_id in header_seq_id_list:
+        contig_usage_file_id.write(f'"{seq_id}";{contig_usage_dict.get(seq_id, 0)};"Y"\n')
+
+    # write the contigs only found in variant records
+    for seq_id, variant_number in contig_usage_dict.items():
+        if seq_id not in header_seq_id_set:
+            contig_usage_file_id.write(f'"{seq_id}";{variant_number};"N"\n')
+
+    # close the contig usage file
+    contig_usage_file_id.close()
+
+    # print OK message
+    xlib.Message.print('info', f'The contig usage file {os.path.basename(contig_usage_file)} is created.')
 
 #-------------------------------------------------------------------------------
 
@@ -115,6 +115,10 @@ def check_args(args):
     if args.hybrid_id is None:
         args.hybrid_id = 'NONE'
 
+    # check "imputed_md_id"
+    if args.imputed_md_id is None:
+        args.imputed_md_id = xlib.Const.DEFAULT_IMPUTED_MD_ID
+
     # check "max_separation"
     if args.max_separation is None:
         xlib.Message.print('error', '*** The maximum separation between variants of the same intergenic fragment is not indicated in the input arguments.')
@@ -210,121 +214,10 @@ def query_data(conn, file_name, sp1_id, sp2_id, hybrid_id, imputed_md_id, max_se
         raise xlib.ProgramException('', 'B003', 'vcf_samples_alleles')
     xlib.Message.print('verbose', 'The table is loaded.\n')
 
-    # get the variant dictionary
-    xlib.Message.print('verbose', 'Getting variant data ...\n')
-    variant_dict = xsqlite.query_variants(conn)
-    xlib.Message.print('verbose', 'Data are got.\n')
-
-    # get the allele dictionary
-    xlib.Message.print('verbose', 'Getting allele data ...\n')
-    allele_dict = xsqlite.get_vcf_allele_dict(conn)
-    xlib.Message.print('verbose', 'Data are got.\n')
-
-    # get the imputated allele dictionary
-    xlib.Message.print('verbose', 'Getting imputated allele data ...\n')
-    imputed_allele_dict = xsqlite.query_imputed_alleles(conn, imputed_md_id)
-    xlib.Message.print('verbose', 'Data are got.\n')
-
-    # get the dictionary of allele frecuency per species
-    xlib.Message.print('verbose', 'Getting the dictionary of allele frecuency per species ...\n')
-    species_allele_frequency_dict = xsqlite.query_species_allele_frequencies(conn, xlib.get_md_symbol())
-    xlib.Message.print('verbose', 'Data are got.\n')
-
-    # get the dictionary of allele frecuency per species
-    xlib.Message.print('verbose', 'Getting the dictionary of allele frecuency per species and type ...\n')
-    species_and_type_allele_frequency_dict = xsqlite.query_species_and_type_allele_frequencies(conn, xlib.get_md_symbol())
-    xlib.Message.print('verbose', 'Data are got.\n')
-
-    #-------------------------------------------------------------------------------
-    # build the intergenic variant dictionary
-    #-------------------------------------------------------------------------------
-
-    xlib.Message.print('verbose', 'Building the intergenic variant dictionary ...\n')
-
-    # initialize intergenic variant dictionary
-    intergenic_variant_dict = xlib.NestedDefaultDict()
-
-    # initialize the current item
-    i = 0
-
-    # while there are items in the variant dictionary
-    while i < len(variant_dict):
-
-        # initialize data
-        variant_id = variant_dict[i]['variant_id']
-        seq_id = ''
-        position = 0
-        found_gene = False
-        found_exon = False
-
-        # while there are items in the variant dictionary and the items have the same variant identification
-        while i < len(variant_dict) and variant_id == variant_dict[i]['variant_id']:
-
-            # save data
-            variant_id = variant_dict[i]['variant_id']
-            seq_id = variant_dict[i]['seq_id']
-            position = variant_dict[i]['position']
-            gene = variant_dict[i]['gene']
-
-            # next item
-            i += 1
-
-        # add item to the intergenic variant dictionary
-        if gene == 'N/A':
-            intergenic_variant_dict[seq_id][position] = {'variant_id': variant_id}
-
-    xlib.Message.print('verbose', 'Dictionary is built.\n')
-
-    #-------------------------------------------------------------------------------
-    # build the intergenic fragment dictionary
-    #-------------------------------------------------------------------------------
-
-    xlib.Message.print('verbose', 'Building the intergenic fragment dictionary ...\n')
-
-    # initialize the fragment dictionary
-    fragment_dict = xlib.NestedDefaultDict()
-
-    # for each sequence identification in the intergenic variant dictionary
-    for seq_id in sorted(intergenic_variant_dict.keys()):
-
-        if seq_id in tsi_list: xlib.Message.print('trace', f'seq_id: {seq_id}')
-        if seq_id in tsi_list: xlib.Message.print('trace', f'intergenic_variant_dict[seq_id]: {intergenic_variant_dict[seq_id]}')
-
-        # initialize control variable for the first variant in the sequence
-        first_variant = True
-
-        # initialize the fragment number
-        fragment_num = 0
-
-        # for each position in the sequence
-        for position in sorted(intergenic_variant_dict[seq_id]):
-
-            # first variant in the sequence
-            if first_variant:
-                first_variant = False
-                variant_id = intergenic_variant_dict[seq_id][position]['variant_id']
-                fragment_id = f'{seq_id}-F{fragment_num:03d}'
-                fragment_dict[variant_id] = {'fragment_id': fragment_id}
-                old_position = position
-
-            # the following variants in the sequence
-            else:
-
-                # when the position is less or equal to the maximum separation between variants of the same intergenic fragment
-                if position <= old_position + max_separation:
-                    variant_id = intergenic_variant_dict[seq_id][position]['variant_id']
-                    fragment_id = f'{seq_id}-F{fragment_num:03d}'
-                    fragment_dict[variant_id] = {'fragment_id': fragment_id}
-
-                # when the position is greater to the maximum separation between variants of the same intergenic fragment
-                else:
-                    fragment_num += 1
-                    variant_id = intergenic_variant_dict[seq_id][position]['variant_id']
-                    fragment_id = f'{seq_id}-F{fragment_num:03d}'
-                    fragment_dict[variant_id] = {'fragment_id': fragment_id}
-                    old_position = position
-
-    xlib.Message.print('verbose', 'Dictionary is built.\n')
+    # build the temporary tables with variant data (genomic zone, gene or intergenic fragment and imputations) in the database
+    xlib.Message.print('verbose', 'Building the variant data and the intergenic fragments ...\n')
+    xsqlite.create_scenariox_data(conn, imputed_md_id, max_separation)
+    xlib.Message.print('verbose', 'Data are built.\n')
 
     #-------------------------------------------------------------------------------
     # Create the variant file
@@ -332,9 +225,6 @@ def query_data(conn, file_name, sp1_id, sp2_id, hybrid_id, imputed_md_id, max_se
 
     xlib.Message.print('verbose', 'Writting the variant file ...\n')
 
-    # initialize the imputation dictionary
-    imputation_dict = xlib.NestedDefaultDict()
-
     # open the output variant file
     variant_file = f'{output_dir}/{file_name}-data2scenarioX-variants.csv'
     try:
@@ -345,65 +235,13 @@ def query_data(conn, file_name, sp1_id, sp2_id, hybrid_id, imputed_md_id, max_se
     # write head record of the output variant file
     variant_file_id.write('"variant_id";"seq_id";"position";"genomic_zone";"gene/fragment";"description";"chromosome_id";"imputations"\n')
 
-    # initialize the current item
-    i = 0
-
-    # while there are items in the variant dictionary
-    while i < len(variant_dict):
-
-        # initialize data
-        variant_id = variant_dict[i]['variant_id']
-        found_gene = False
-        found_exon = False
-
-        # while there are items in the variant dictionary and the items have the same variant identification
-        while i < len(variant_dict) and variant_id == variant_dict[i]['variant_id']:
-
-            # save data
-            seq_id = variant_dict[i]['seq_id']
-            position = variant_dict[i]['position']
-            # -- start = variant_dict[i]['start']
-            end = variant_dict[i]['end']
-            gene = variant_dict[i]['gene']
-            description = variant_dict[i]['description']
-            if description == None:
-                description = 'N/A'
-            chromosome_id = variant_dict[i]['chromosome_id']
-            if chromosome_id == None:
-                chromosome_id = 'N/A'
-            if variant_dict[i]['gene'] != 'N/A':
-                gene_or_fragment = variant_dict[i]['gene']
-            else:
-                gene_or_fragment = fragment_dict[variant_id]['fragment_id']
-            if variant_dict[i]['type'] in ['gene', 'pseudogene']:
-                found_gene = True
-            elif variant_dict[i]['type'] == 'exon':
-                found_exon = True
-
-            # next item
-            i += 1
-
-        # set genomic_zone
-        if end == 0:
-            genomic_zone = 'N/A'
-        elif not found_gene:
-            genomic_zone = 'intergenic'
-        elif found_exon:
-            genomic_zone = 'exonic'
-        else:
-            genomic_zone = 'intronic'
-
-        # set imputations
-        if imputed_allele_dict.get(variant_id, 0) == 0:
-            imputations = 'N'
-        else:
-            imputations = 'Y'
-
-        # add variant dictionary to the gene dictionary
-        imputation_dict[gene_or_fragment][variant_id] = {'imputations': imputations}
+    # for each variant
+    for variant_data_dict in xsqlite.iter_scenariox_variants(conn):
+
+        if variant_data_dict['seq_id'] in tsi_list: xlib.Message.print('trace', f'variant_data_dict: {variant_data_dict}')
 
         # write data
-        variant_file_id.write(f'"{variant_id}";"{seq_id}";{position};"{genomic_zone}";"{gene_or_fragment}";"{description}";"{chromosome_id}";"{imputations}"\n')
+        variant_file_id.write(f'"{variant_data_dict["variant_id"]}";"{variant_data_dict["seq_id"]}";{variant_data_dict["position"]};"{variant_data_dict["genomic_zone"]}";"{variant_data_dict["gene_or_fragment"]}";"{variant_data_dict["description"]}";"{variant_data_dict["chromosome_id"]}";"{variant_data_dict["imputations"]}"\n')
 
     # print OK message
     xlib.Message.print('info', f'The file {os.path.basename(variant_file)} containing variant data is created.')
@@ -427,171 +265,22 @@ def query_data(conn, file_name, sp1_id, sp2_id, hybrid_id, imputed_md_id, max_se
     # write head record of the output allele file
     allele_file_id.write(f'"variant_id";"seq_id";"position";"genomic_zone";"gene/fragment";"description";"chromosome_id";"imputations";"allele_id";"bases";"{sp1_id}_frequency";"{sp2_id}_frequency";"{hybrid_id}_frequency";"{sp1_id}_mothers_frequency";"{sp2_id}_mothers_frequency";"{hybrid_id}_mothers_frequency";"{sp1_id}_progenies_frequency";"{sp2_id}_progenies_frequency";"{hybrid_id}_progenies_frequency"\n')
 
-    # initialize the current item
-    i = 0
-
-    # while there are items in the variant dictionary
-    while i < len(variant_dict):
-
-        # initialize data
-        variant_id = variant_dict[i]['variant_id']
-        found_gene = False
-        found_exon = False
-
-        if seq_id in tsi_list: xlib.Message.print('trace', f'variant_id: {variant_id}')
-
-        # while there are items in the variant dictionary and the items have the same variant identification
-        while i < len(variant_dict) and variant_id == variant_dict[i]['variant_id']:
-
-            # save data
-            seq_id = variant_dict[i]['seq_id']
-            position = variant_dict[i]['position']
-            # -- start = variant_dict[i]['start']
-            end = variant_dict[i]['end']
-            gene = variant_dict[i]['gene']
-            description = variant_dict[i]['description']
-            if description == None:
-                description = 'N/A'
-            chromosome_id = variant_dict[i]['chromosome_id']
-            if chromosome_id == None:
-                chromosome_id = 'N/A'
-            if variant_dict[i]['gene'] != 'N/A':
-                gene_or_fragment = variant_dict[i]['gene']
-            else:
-                gene_or_fragment = fragment_dict[variant_id]['fragment_id']
-            if variant_dict[i]['type'] in ['gene', 'pseudogene']:
-                found_gene = True
-            elif variant_dict[i]['type'] == 'exon':
-                found_exon = True
-
-            # next item
-            i += 1
-
-        # set genomic_zone
-        if end == 0:
-            genomic_zone = 'N/A'
-        elif not found_gene:
-            genomic_zone = 'intergenic'
-        elif found_exon:
-            genomic_zone = 'exonic'
-        else:
-            genomic_zone = 'intronic'
-
-        # set imputations
-        if imputed_allele_dict.get(variant_id, 0) == 0:
-            imputations = 'N'
-        else:
-            imputations = 'Y'
-
-        # build the frecuency summation dictionary of every species per allele
-        species_frecuency_summation_dict = {}
-        for species_id in species_allele_frequency_dict[variant_id].keys():
-            for allele_id in species_allele_frequency_dict[variant_id][species_id].keys():
-                allele_data_dict = species_frecuency_summation_dict.get(allele_id, {sp1_id: 0, sp2_id: 0, hybrid_id: 0})
-                allele_data_dict[species_id] += species_allele_frequency_dict[variant_id][species_id][allele_id]['frecuency_sum']
-                species_frecuency_summation_dict[allele_id] = allele_data_dict
-
-        if seq_id in tsi_list: xlib.Message.print('trace', f'species_frecuency_summation_dict: {species_frecuency_summation_dict}')
-
-        # build the frecuency summation dictionary of every species and type per allele
-        # species_and_type_allele_frequency_dict
-        species_and_type_frecuency_summation_dict = {}
-        for species_id in species_and_type_allele_frequency_dict[variant_id].keys():
-            for type in species_and_type_allele_frequency_dict[variant_id][species_id].keys():
-                for allele_id in species_and_type_allele_frequency_dict[variant_id][species_id][type].keys():
-                    allele_data_dict = species_and_type_frecuency_summation_dict.get(allele_id, {f'{sp1_id}_mothers': 0, f'{sp2_id}_mothers': 0, f'{hybrid_id}_mothers': 0, f'{sp1_id}_progenies': 0, f'{sp2_id}_progenies': 0, f'{hybrid_id}_progenies': 0})
-                    if type == 'MOTHER':
-                        data_id = f'{species_id}_mothers'
-                    elif type == 'PROGENY':
-                        data_id = f'{species_id}_progenies'
-                    allele_data_dict[data_id] += species_and_type_allele_frequency_dict[variant_id][species_id][type][allele_id]['frecuency_sum']
-                    species_and_type_frecuency_summation_dict[allele_id] = allele_data_dict
-
-        if seq_id in tsi_list: xlib.Message.print('trace', f'species_and_type_frecuency_summation_dict: {species_and_type_frecuency_summation_dict}')
-
-        # calculate the allelle frecuency totals per species
-        allele_frecuency_total_sp1 = 0
-        allele_frecuency_total_sp2 = 0
-        allele_frecuency_total_hybrid = 0
-        for allele_id in species_frecuency_summation_dict.keys():
-            allele_frecuency_total_sp1 += species_frecuency_summation_dict.get(allele_id, {}).get(sp1_id, 0)
-            allele_frecuency_total_sp2 += species_frecuency_summation_dict.get(allele_id, {}).get(sp2_id, 0)
-            allele_frecuency_total_hybrid += species_frecuency_summation_dict.get(allele_id, {}).get(hybrid_id, 0)
-
-        if seq_id in tsi_list: xlib.Message.print('trace', f'allele_frecuency_total_sp1: {allele_frecuency_total_sp1}')
-        if seq_id in tsi_list: xlib.Message.print('trace', f'allele_frecuency_total_sp2: {allele_frecuency_total_sp2}')
-        if seq_id in tsi_list: xlib.Message.print('trace', f'allele_frecuency_total_hybrid: {allele_frecuency_total_hybrid}')
-
-        # calculate the allelle frecuency totals per species and type
-        allele_frecuency_total_sp1_mothers = 0
-        allele_frecuency_total_sp2_mothers = 0
-        allele_frecuency_total_hybrid_mothers = 0
-        allele_frecuency_total_sp1_progenies = 0
-        allele_frecuency_total_sp2_progenies = 0
-        allele_frecuency_total_hybrid_progenies = 0
-        for allele_id in species_frecuency_summation_dict.keys():
-            allele_frecuency_total_sp1_mothers += species_and_type_frecuency_summation_dict.get(allele_id, {}).get(f'{sp1_id}_mothers', 0)
-            allele_frecuency_total_sp2_mothers += species_and_type_frecuency_summation_dict.get(allele_id, {}).get(f'{sp2_id}_mothers', 0)
-            allele_frecuency_total_hybrid_mothers += species_and_type_frecuency_summation_dict.get(allele_id, {}).get(f'{hybrid_id}_mothers', 0)
-            allele_frecuency_total_sp1_progenies += species_and_type_frecuency_summation_dict.get(allele_id, {}).get(f'{sp1_id}_progenies', 0)
-            allele_frecuency_total_sp2_progenies += species_and_type_frecuency_summation_dict.get(allele_id, {}).get(f'{sp2_id}_progenies', 0)
-            allele_frecuency_total_hybrid_progenies += species_and_type_frecuency_summation_dict.get(allele_id, {}).get(f'{hybrid_id}_progenies', 0)
-
-        if seq_id in tsi_list: xlib.Message.print('trace', f'allele_frecuency_total_sp1_mothers: {allele_frecuency_total_sp1_mothers}')
-        if seq_id in tsi_list: xlib.Message.print('trace', f'allele_frecuency_total_sp2_mothers: {allele_frecuency_total_sp2_mothers}')
-        if seq_id in tsi_list: xlib.Message.print('trace', f'allele_frecuency_total_hybrid_mothers: {allele_frecuency_total_hybrid_mothers}')
-        if seq_id in tsi_list: xlib.Message.print('trace', f'allele_frecuency_total_sp1_progenies: {allele_frecuency_total_sp1_progenies}')
-        if seq_id in tsi_list: xlib.Message.print('trace', f'allele_frecuency_total_sp2_progenies: {allele_frecuency_total_sp2_progenies}')
-        if seq_id in tsi_list: xlib.Message.print('trace', f'allele_frecuency_total_hybrid_progenies: {allele_frecuency_total_hybrid_progenies}')
-
-        # for each allele of the variant
-        for allele_id in species_frecuency_summation_dict.keys():
-
-            # calculate the relative frequency of each specie per allele
-            try:
-                sp1_frequency = species_frecuency_summation_dict[allele_id][sp1_id] / allele_frecuency_total_sp1
-            except:
-                sp1_frequency = 'N/A'
-            try:
-                sp2_frequency = species_frecuency_summation_dict[allele_id][sp2_id] / allele_frecuency_total_sp2
-            except:
-                sp2_frequency = 'N/A'
-            try:
-                hybrid_frequency = species_frecuency_summation_dict[allele_id][hybrid_id] / allele_frecuency_total_hybrid
-            except:
-                hybrid_frequency = 'N/A'
+    # for each allele of each variant (the frecuency summations of every species and type and their totals per variant are calculated in the database)
+    for allele_data_dict in xsqlite.iter_scenariox_alleles(conn, xlib.get_md_symbol(), sp1_id, sp2_id, hybrid_id):
 
-            # calculate the relative frequency of each specie and type per allele
-            try:
-                sp1_mothers_frequency = species_and_type_frecuency_summation_dict.get(allele_id, {}).get(f'{sp1_id}_mothers', 0) / allele_frecuency_total_sp1_mothers
-            except:
-                sp1_mothers_frequency = 'N/A'
-            try:
-                sp2_mothers_frequency = species_and_type_frecuency_summation_dict.get(allele_id, {}).get(f'{sp2_id}_mothers', 0) / allele_frecuency_total_sp2_mothers
-            except:
-                sp2_mothers_frequency =  'N/A'
-            try:
-                hybrid_mothers_frequency = species_and_type_frecuency_summation_dict.get(allele_id, {}).get(f'{hybrid_id}_mothers', 0) / allele_frecuency_total_hybrid_mothers
-            except:
-                hybrid_mothers_frequency = 'N/A'
-            try:
-                sp1_progenies_frequency = species_and_type_frecuency_summation_dict.get(allele_id, {}).get(f'{sp1_id}_progenies', 0) / allele_frecuency_total_sp1_progenies
-            except:
-                sp1_progenies_frequency = 'N/A'
-            try:
-                sp2_progenies_frequency = species_and_type_frecuency_summation_dict.get(allele_id, {}).get(f'{sp2_id}_progenies', 0) / allele_frecuency_total_sp2_progenies
-            except:
-                sp2_progenies_frequency = 'N/A'
-            try:
-                hybrid_progenies_frequency = species_and_type_frecuency_summation_dict.get(allele_id, {}).get(f'{hybrid_id}_progenies', 0) / allele_frecuency_total_hybrid_progenies
-            except:
-                hybrid_progenies_frequency = 'N/A'
+        if allele_data_dict['seq_id'] in tsi_list: xlib.Message.print('trace', f'allele_data_dict: {allele_data_dict}')
 
-            # get bases sequence
-            bases = allele_dict[variant_id][allele_id]['bases']
+        # calculate the relative frequency of each species, and each species and type, per allele
+        frequency_list = []
+        for frecuency_sum, frecuency_total in zip(allele_data_dict['frecuency_sum_list'], allele_data_dict['frecuency_total_list']):
+            try:
+                frequency_list.append(frecuency_sum / frecuency_total)
+            except ZeroDivisionError:
+                frequency_list.append('N/A')
+        frequencies = ';'.join([f'"{frequency}"' for frequency in frequency_list])
 
-            # write data variant identification
-            allele_file_id.write(f'"{variant_id}";"{seq_id}";{position};"{genomic_zone}";"{gene_or_fragment}";"{description}";"{chromosome_id}";"{imputations}";"{allele_id}";"{bases}";"{sp1_frequency}";"{sp2_frequency}";"{hybrid_frequency}";"{sp1_mothers_frequency}";"{sp2_mothers_frequency}";"{hybrid_mothers_frequency}";"{sp1_progenies_frequency}";"{sp2_progenies_frequency}";"{hybrid_progenies_frequency}"\n')
+        # write data variant identification
+        allele_file_id.write(f'"{allele_data_dict["variant_id"]}";"{allele_data_dict["seq_id"]}";{allele_data_dict["position"]};"{allele_data_dict["genomic_zone"]}";"{allele_data_dict["gene_or_fragment"]}";"{allele_data_dict["description"]}";"{allele_data_dict["chromosome_id"]}";"{allele_data_dict["imputations"]}";"{allele_data_dict["allele_id"]}";"{allele_data_dict["bases"]}";{frequencies}\n')
 
     # print OK message
     xlib.Message.print('info', f'The file {os.path.basename(allele_file)} containing allele data is created.')
@@ -612,24 +301,9 @@ def query_data(conn, file_name, sp1_id, sp2_id, hybrid_id, imputed_md_id, max_se
     except Exception as e:
         raise xlib.ProgramException(e, 'F003', selected_id_file)
 
-    # for every gene/fragment write the variant identifications corresponding to scenario X
-    for gene_or_fragment in sorted(imputation_dict.keys()):
-
-        # initialize control variables
-        imputations_with_y = False
-        imputations_with_n = False
-
-        # check imputations of variants of this gene/fragment
-        for variant_id in imputation_dict[gene_or_fragment].keys():
-            if imputation_dict[gene_or_fragment][variant_id]['imputations'] == 'Y':
-                imputations_with_y = True
-            else:
-                imputations_with_n = True
-
-        # write variant identitications
-        for variant_id in imputation_dict[gene_or_fragment].keys():
-            if imputations_with_y == True and imputations_with_n == False or imputation_dict[gene_or_fragment][variant_id]['imputations'] == 'N':
-                selected_id_file_id.write(f'{variant_id}\n')
+    # write the variant identifications corresponding to scenario X (for every gene/fragment, all variants when all of them have imputations, otherwise its variants without imputations)
+    for variant_id in xsqlite.iter_scenariox_selected_variant_ids(conn):
+        selected_id_file_id.write(f'{variant_id}\n')
 
     # print OK message
     xlib.Message.print('info', f'The file {os.path.basename(selected_id_file)} containing selected ids is created.')
@@ -637,6 +311,8 @@ def query_data(conn, file_name, sp1_id, sp2_id, hybrid_id, imputed_md_id, max_se
     # close the output allele file
     selected_id_file_id.close()
 
+    # drop the temporary tables
+    xsqlite.drop_scenariox_data(conn)
 
 #-------------------------------------------------------------------------------
 
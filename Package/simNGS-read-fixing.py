@@ -77,7 +77,7 @@ def main():
     check_args(args)
 
     # fix sequence identifiers
-    fix_seq_ids(args.filenum, args.readfile)
+    fix_seq_ids(args.filenum, args.readfile, args.readfile2, args.threads_num)
 
 #-------------------------------------------------------------------------------
 
@@ -94,6 +94,8 @@ def build_parser():
     parser._optionals.title = 'Arguments'    # pylint: disable=protected-access
     parser.add_argument('--filenum', dest='filenum', help='1: in SE file or the first file in PE files; 2: the second file in PE files')
     parser.add_argument('--readfile', dest='readfile', help='Path of a read file generated by simNGS in FASTQ format')
+    parser.add_argument('--readfile2', dest='readfile2', help='Path of the second read file in PE files generated by simNGS in FASTQ format, which is processed together with the first one (readfile with filenum 1), or NONE; default: NONE')
+    parser.add_argument('--threads', dest='threads_num', help=f'Number of threads (processes compressing the fixed read files when they are GZ files); default: {xlib.Const.DEFAULT_THREADS_NUMBER}')
 
     # return the paser
     return parser
@@ -108,8 +110,10 @@ def check_args(args):
     # initialize the control variable
     OK = True
 
-    # check filenum
-    if args.filenum is None:
+    # check filenum (when there is a second read file, the read file is the first file in PE files)
+    if args.filenum is None and args.readfile2 is not None and args.readfile2.upper() != 'NONE':
+        args.filenum = 1
+    elif args.filenum is None:
         xlib.Message.print('error', '*** The file number must be indicated  in the input arguments.')
         OK = False
     else:
@@ -134,120 +138,205 @@ def check_args(args):
             xlib.Message.print('error', f'*** The file {args.readfile} does not end in ".fastq", ".fq", ".fastq.gz or ".fq.gz".')
             OK = False
 
+    # check readfile2
+    if args.readfile2 is None or args.readfile2.upper() == 'NONE':
+        args.readfile2 = None
+    else:
+        if not os.path.isfile(args.readfile2):
+            xlib.Message.print('error', f'*** The file {args.readfile2} does not exist.')
+            OK = False
+        if not args.readfile2.endswith('.fastq') and not args.readfile2.endswith('.fq') and not args.readfile2.endswith('.fastq.gz') and not args.readfile2.endswith('.fq.gz'):
+            xlib.Message.print('error', f'*** The file {args.readfile2} does not end in ".fastq", ".fq", ".fastq.gz or ".fq.gz".')
+            OK = False
+        if args.filenum != 1:
+            xlib.Message.print('error', '*** The file number has to be 1 when there is a second read file.')
+            OK = False
+
+    # check threads_num
+    if args.threads_num is None:
+        args.threads_num = xlib.Const.DEFAULT_THREADS_NUMBER
+    elif not xlib.check_int(args.threads_num, minimum=1):
+        xlib.Message.print('error', '*** The number of threads has to be an integer number greater than or equal to 1.')
+        OK = False
+    else:
+        args.threads_num = int(args.threads_num)
+
     # if there are errors, exit with exception
     if not OK:
         raise xlib.ProgramException('', 'P001')
 
 #-------------------------------------------------------------------------------
 
-def fix_seq_ids(filenum, readfile):
+def fix_seq_ids(filenum, readfile, readfile2, threads_num):
     '''
-    Fix sequence identifiers.
+    Fix sequence identifiers. The read files are processed in blocks of bytes: only the sequence identifier records
+    are rewritten and, in PE files, the blocks of both files have the same reads. The fixed files are compressed
+    when the read files are GZ files, in parallel when there are several threads.
+    '''
+
+    # set the read files and their file numbers
+    if readfile2 is None:
+        readfile_list = [readfile]
+        filenum_list = [filenum]
+    else:
+        readfile_list = [readfile, readfile2]
+        filenum_list = [1, 2]
+
+    # set the fixed read file paths
+    fixed_readfile_list = [os.path.join(os.path.dirname(readfile_path), f'fixed_{os.path.basename(readfile_path)}') for readfile_path in readfile_list]
+
+    # set the templates of the fixed sequence identifier records
+    header_template_list = [get_header_template(filenum_item) for filenum_item in filenum_list]
+
+    # open the read files
+    readfile_id_list = []
+    for readfile_path in readfile_list:
+        try:
+            if readfile_path.endswith('.gz'):
+                readfile_id_list.append(gzip.open(readfile_path, mode='rb'))
+            else:
+                readfile_id_list.append(open(readfile_path, mode='rb'))
+        except Exception as e:
+            raise xlib.ProgramException(e, 'F001', readfile_path)
+
+    # open the fixed read files (the compressed blocks are written as members of a GZ file)
+    fixed_readfile_id_list = []
+    for fixed_readfile in fixed_readfile_list:
+        try:
+            fixed_readfile_id_list.append(open(fixed_readfile, mode='wb'))
+        except Exception as e:
+            raise xlib.ProgramException(e, 'F003', fixed_readfile)
+
+    # set the compression status of the fixed read files
+    compression_list = [readfile_path.endswith('.gz') for readfile_path in readfile_list]
+
+    # fix the blocks of reads and compress them when it is necessary
+    block_list_iterator = ((block_list, compression_list) for block_list in iter_fixed_blocks(readfile_id_list, readfile_list, header_template_list))
+    with xlib.OrderedProcessPool(threads_num if any(compression_list) else 1) as process_pool:
+        for block_list in process_pool.iter_results(compress_blocks, block_list_iterator):
+
+            # write the blocks
+            for (fixed_readfile_id, block) in zip(fixed_readfile_id_list, block_list):
+                fixed_readfile_id.write(block)
+
+    # close files
+    for readfile_id in readfile_id_list:
+        readfile_id.close()
+    for fixed_readfile_id in fixed_readfile_id_list:
+        fixed_readfile_id.close()
+
+    # show OK message
+    for fixed_readfile in fixed_readfile_list:
+        xlib.Message.print('info', f'The file {fixed_readfile} with cut reads is created.')
+
+#-------------------------------------------------------------------------------
+
+def get_header_template(filenum):
+    '''
+    Get the template of the fixed sequence identifier records of a file number
+    (the flowcell and the coordinates of the cluster are the fragment number).
     '''
 
     # set default values in sequence identifier data
     instrument = 'MG00HS20'
     run = 1
-    flowcell = 'XXX'
     lane = 1
     tile = 1
     is_filtered = 'N'
     control = 0
     index = 'ACTG' if filenum == 1 else 'GTCA'
 
-    # check if read file is a GZ file
-    if readfile.endswith('.gz'):
-        is_gz = True
-    else:
-        is_gz = False
-
-    # set the read file and the fixed read file path
-    fixed_readfile = os.path.dirname(readfile) + 'fixed_' + os.path.basename(readfile)
-
-    # open the read file
-    try:
-        if is_gz:
-            readfile_id = gzip.open(readfile, mode='rt', encoding='iso-8859-1')
-        else:
-            readfile_id = open(readfile, mode='r', encoding='iso-8859-1')
-    except Exception as e:
-        raise xlib.ProgramException(e, 'F001', readfile)
-
-    # open the fixed read file
-    try:
-        if is_gz:
-            fixed_readfile_id = gzip.open(fixed_readfile, mode='wt', encoding='iso-8859-1')
-        else:
-            fixed_readfile_id = open(fixed_readfile, mode='w', encoding='iso-8859-1')
-    except Exception as e:
-        raise xlib.ProgramException(e, 'F001', fixed_readfile)
-
-    # set the pattern of the sequence identifier record
-    pattern = r'^@Frag_([0-9]+) (\S+) .* Strand ([\+\-]) Offset ([0-9]+--[0-9]+) .*$'
-
-    # read the first record of readfile
-    record = readfile_id.readline()
-
-    # while there are records in readfile
-    while record != '':
-
-        # process the sequence identifier record
-        if record.startswith('@'):
-
-            # extract the data
-            record = record.replace('(','')
-            record = record.replace(')','')
-            mo = re.search(pattern, record)
-            fragment = mo.group(1)
-            # -- transcript = mo.group(2)
-            # -- strand = mo.group(3)
-            # -- offset = mo.group(4)
-
-            # set the remaining data
-            # -- instrument = f'___{fragment}___{transcript}___{strand}___{offset}___'
-            flowcell = f'{fragment}'
-            x_pos = y_pos = fragment
-
-            # write the fixed sequence identifier record
-            fixed_readfile_id.write(f'@{instrument}:{run}:{flowcell}:{lane}:{tile}:{x_pos}:{y_pos} {filenum}:{is_filtered}:{control}:{index}\n')
-
-        else:
-            # control the FASTQ format
-            raise xlib.ProgramException('', 'F006', fixed_readfile, 'FASTQ')
+    # return the template
+    return f'@{instrument}:{run}:%b:{lane}:{tile}:%b:%b {filenum}:{is_filtered}:{control}:{index}'.encode('iso-8859-1')
 
-        # read next record and process the sequence record
-        record = readfile_id.readline()
-        if record != '':
-            fixed_readfile_id.write(record)
-        else:
-            # control the FASTQ format
-            raise xlib.ProgramException('', 'F006', readfile, 'FASTQ')
+#-------------------------------------------------------------------------------
 
-        # read next record and process quality score identifier record
-        record = readfile_id.readline()
-        if record.startswith('+'):
-            fixed_readfile_id.write(record)
-        else:
-            # control the FASTQ format
-            raise xlib.ProgramException('', 'F006', readfile, 'FASTQ')
+def iter_fixed_blocks(readfile_id_list, readfile_list, header_template_list):
+    '''
+    Read blocks of the read files opened in binary mode and yield the list of blocks with their fixed reads.
+    In PE files, the blocks of both files have the same number of reads and their fragments have to be equal.
+    '''
+
+    # set the pattern of the sequence identifier records: "@Frag_" followed by the fragment number
+    header_pattern = re.compile(rb'^@Frag_([0-9]+) ', re.MULTILINE)
+
+    # initialize the bytes pending to be processed and the end of file control variables
+    pending_list = [b''] * len(readfile_id_list)
+    eof_list = [False] * len(readfile_id_list)
+
+    while True:
+
+        # read the next block of every file when it has not enough pending bytes
+        for i, readfile_id in enumerate(readfile_id_list):
+            if not eof_list[i] and len(pending_list[i]) < xlib.Const.FASTQ_BLOCK_SIZE:
+                block = readfile_id.read(xlib.Const.FASTQ_BLOCK_SIZE)
+                if block == b'':
+                    eof_list[i] = True
+                    if pending_list[i] != b'' and not pending_list[i].endswith(b'\n'):
+                        pending_list[i] += b'\n'
+                else:
+                    pending_list[i] += block
+
+        # split the pending bytes in records (the last item is an incomplete record or an empty one)
+        record_list_list = [pending.split(b'\n') for pending in pending_list]
+
+        # get the number of complete reads of the blocks
+        read_number = min((len(record_list) - 1) // 4 for record_list in record_list_list)
+
+        # when there are not complete reads in a file which is ended, check that the rest of files are ended too
+        if read_number == 0 and any(eof_list):
+            for i, record_list in enumerate(record_list_list):
+                if len(record_list) > 1 or record_list[0] != b'':
+                    if len(readfile_list) > 1 and (len(record_list) - 1) // 4 > 0:
+                        raise xlib.ProgramException('', 'L023', readfile_list[0], readfile_list[1])
+                    raise xlib.ProgramException('', 'F006', readfile_list[i], 'FASTQ')
+            break
+
+        # when there are not complete reads in a file whose pending bytes fill a block, the file is not a FASTQ file
+        # (no more bytes are read from it, so the process could not continue)
+        if read_number == 0:
+            for i, record_list in enumerate(record_list_list):
+                if (len(record_list) - 1) // 4 == 0 and len(pending_list[i]) >= xlib.Const.FASTQ_BLOCK_SIZE:
+                    raise xlib.ProgramException('', 'F006', readfile_list[i], 'FASTQ')
+
+        # fix the reads of every file
+        fixed_block_list = []
+        fragment_list_list = []
+        for i, record_list in enumerate(record_list_list):
+
+            # keep the records of incomplete reads for the next block
+            pending_list[i] = b'\n'.join(record_list[read_number * 4:])
+            del record_list[read_number * 4:]
+
+            # get the fragments of the sequence identifier records
+            fragment_list = header_pattern.findall(b'\n'.join(record_list[0::4]))
 
-        # read next record and process quality score record
-        record = readfile_id.readline()
-        if record != '':
-            fixed_readfile_id.write(record)
-        else:
             # control the FASTQ format
-            raise xlib.ProgramException('', 'F006', readfile, 'FASTQ')
+            if len(fragment_list) != read_number or (record_list[2::4].count(b'+') != read_number and not all(record.startswith(b'+') for record in record_list[2::4])):
+                raise xlib.ProgramException('', 'F006', readfile_list[i], 'FASTQ')
 
-        # read the next record
-        record = readfile_id.readline()
+            # rewrite the sequence identifier records
+            header_template = header_template_list[i]
+            record_list[0::4] = [header_template % (fragment, fragment, fragment) for fragment in fragment_list]
+            record_list.append(b'')
+            fixed_block_list.append(b'\n'.join(record_list))
+            fragment_list_list.append(fragment_list)
 
-    # close files
-    readfile_id.close()
-    fixed_readfile_id.close()
+        # check that the reads of PE files are paired
+        if len(fragment_list_list) > 1 and fragment_list_list[0] != fragment_list_list[1]:
+            raise xlib.ProgramException('', 'L023', readfile_list[0], readfile_list[1])
 
-    # show OK message
-    xlib.Message.print('info', f'The file {fixed_readfile} with cut reads is created.')
+        # yield the fixed blocks
+        yield fixed_block_list
+
+#-------------------------------------------------------------------------------
+
+def compress_blocks(block_list, compression_list):
+    '''
+    Compress the blocks whose compression status is True as members of a GZ file.
+    '''
+
+    return [gzip.compress(block, compresslevel=xlib.Const.GZIP_COMPRESSION_LEVEL) if compression else block for (block, compression) in zip(block_list, compression_list)]
 
 #-------------------------------------------------------------------------------
 
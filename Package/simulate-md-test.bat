@@ -52,6 +52,9 @@ rem Run the program simulate-md.py
     --mdp=0.2 ^
     --mpiwmd=10 ^
     --out=%OUTPUT_DIR%\test-SUBERINTRO-AL-samples-filtered2-sorted-wmd-A.vcf ^
+    --replicates=1 ^
+    --seed=NONE ^
+    --metrics=NONE ^
     --verbose=Y ^
     --trace=N ^
     --tsi=NONE
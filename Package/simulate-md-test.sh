@@ -49,6 +49,9 @@ cd $NGSHELPER_DIR
         --mdp=0.20 \
         --mpiwmd=10 \
         --out=$OUTPUT_DIR/test-SUBERINTRO-AL-samples-filtered2-sorted-wmd.vcf \
+        --replicates=1 \
+        --seed=NONE \
+        --metrics=NONE \
         --verbose=Y \
         --trace=N \
         --tsi=NONE
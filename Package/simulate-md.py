@@ -26,7 +26,6 @@ Licence: GNU General Public Licence Version 3.
 
 import argparse
 import gzip
-import random
 import os
 import sys
 
@@ -34,6 +33,11 @@ import xlib
 
 #-------------------------------------------------------------------------------
 
+# import heavy modules when they are used for the first time
+np = xlib.LazyModule('numpy')
+
+#-------------------------------------------------------------------------------
+
 def main():
     '''
     Main line of the program.
@@ -47,8 +51,13 @@ def main():
     args = parser.parse_args()
     check_args(args)
 
-    # simulate missing data
-    simulate_md(args.input_vcf_file, args.simulation_method, args.md_probability, args.maxperc_ind_wmd, args.output_vcf_file, args.tsi_list)
+    # measure the run metrics (the report is written when the run ends)
+    with xlib.Metrics.run(args.metrics_file):
+
+        # simulate missing data
+        with xlib.Metrics.stage('simulate missing data') as stage:
+            record_counter = simulate_md(args.input_vcf_file, args.simulation_method, args.md_probability, args.maxperc_ind_wmd, args.output_vcf_file, args.replicates_number, args.seed, args.tsi_list)
+            stage.add(records=record_counter, bytes_number=os.path.getsize(args.input_vcf_file))
 
 #-------------------------------------------------------------------------------
 
@@ -67,7 +76,10 @@ def build_parser():
     parser.add_argument('--method', dest='simulation_method', help=f'Simulation method (mandatory): {xlib.get_simulation_method_code_list_text()}.')
     parser.add_argument('--mdp', dest='md_probability', help='Probability of a locus having missing data (mandatory).')
     parser.add_argument('--mpiwmd', dest='maxperc_ind_wmd', help=f'Maximum percentage of individuals with missing data in each locus (RANDOM method); default: {xlib.Const.DEFAULT_MAXPERC_IND_WMD}.')
-    parser.add_argument('--out', dest='output_vcf_file', help='Path of output VCF file (mandatory).')
+    parser.add_argument('--out', dest='output_vcf_file', help='Path of output VCF file (mandatory); when there are several replicates, the replicate number is added to the file name.')
+    parser.add_argument('--replicates', dest='replicates_number', help=f'Number of replicates simulated in a single pass of the input VCF file; default: {xlib.Const.DEFAULT_REPLICATES_NUMBER}.')
+    parser.add_argument('--seed', dest='seed', help='Seed of the random number generator (non negative integer) or NONE; default: NONE.')
+    parser.add_argument('--metrics', dest='metrics_file', help='Path of the output JSON file with the run metrics (elapsed time, throughput of stages and peak memory) or NONE; default: NONE.')
     parser.add_argument('--verbose', dest='verbose', help=f'Additional job status info during the run: {xlib.get_verbose_code_list_text()}; default: {xlib.Const.DEFAULT_VERBOSE}.')
     parser.add_argument('--trace', dest='trace', help=f'Additional info useful to the developer team: {xlib.get_trace_code_list_text()}; default: {xlib.Const.DEFAULT_TRACE}.')
     parser.add_argument('--tsi', dest='tsi_list', help='Sequence identification list to trace with format seq_id,seq_id_2,...,seq_id or NONE; default: NONE.')
@@ -127,6 +139,28 @@ def check_args(args):
         xlib.Message.print('error', '*** The output VCF file is not indicated in the input arguments.')
         OK = False
 
+    # check "replicates_number"
+    if args.replicates_number is None:
+        args.replicates_number = xlib.Const.DEFAULT_REPLICATES_NUMBER
+    elif not xlib.check_int(args.replicates_number, minimum=1):
+        xlib.Message.print('error', 'The number of replicates has to be an integer number greater than or equal to 1.')
+        OK = False
+    else:
+        args.replicates_number = int(args.replicates_number)
+
+    # check "seed"
+    if args.seed is None or args.seed.upper() == 'NONE':
+        args.seed = None
+    elif not xlib.check_int(args.seed, minimum=0):
+        xlib.Message.print('error', 'The seed has to be a non negative integer number or NONE.')
+        OK = False
+    else:
+        args.seed = int(args.seed)
+
+    # check "metrics_file"
+    if args.metrics_file is None or args.metrics_file.upper() == 'NONE':
+        args.metrics_file = None
+
     # check "verbose"
     if args.verbose is None:
         args.verbose = xlib.Const.DEFAULT_VERBOSE
@@ -157,17 +191,19 @@ def check_args(args):
 
 #-------------------------------------------------------------------------------
 
-def simulate_md(input_vcf_file, simulation_method, md_probability, maxperc_ind_wmd, output_vcf_file, tsi_list):
+def simulate_md(input_vcf_file, simulation_method, md_probability, maxperc_ind_wmd, output_vcf_file, replicates_number, seed, tsi_list):
     '''
-    Simulate missing data in a VCF file.
+    Simulate missing data in a VCF file building several replicates in a single pass and return the number of records read.
     '''
 
-    # initialize the sample lists and sample number
-    # -- sample_name_list = []
-    sample_id_list = []
-    sample_list = []
+    # initialize the sample number
     sample_number = 0
 
+    # build the random number generators of the replicates, each one with its own seed sequence
+    seed_sequence = np.random.SeedSequence(seed)
+    xlib.Message.print('trace', f'seed_sequence.entropy: {seed_sequence.entropy}')
+    rng_list = [np.random.default_rng(replicate_seed_sequence) for replicate_seed_sequence in seed_sequence.spawn(replicates_number)]
+
     # open the input VCF file
     if input_vcf_file.endswith('.gz'):
         try:
@@ -180,22 +216,28 @@ def simulate_md(input_vcf_file, simulation_method, md_probability, maxperc_ind_w
         except Exception as e:
             raise xlib.ProgramException(e, 'F001', input_vcf_file)
 
-    # open the VCF file with missing data
-    if output_vcf_file.endswith('.gz'):
-        try:
-            output_vcf_file_id = gzip.open(output_vcf_file, mode='wt', encoding='iso-8859-1', newline='\n')
-        except Exception as e:
-            raise xlib.ProgramException(e, 'F004', output_vcf_file)
-    else:
-        try:
-            output_vcf_file_id = open(output_vcf_file, mode='w', encoding='iso-8859-1', newline='\n')
-        except Exception as e:
-            raise xlib.ProgramException(e, 'F003', output_vcf_file)
+    # open the VCF files with missing data of every replicate
+    output_vcf_file_id_list = []
+    for replicate_num in range(replicates_number):
+        replicate_vcf_file = get_replicate_file_name(output_vcf_file, replicate_num, replicates_number)
+        if replicate_vcf_file.endswith('.gz'):
+            try:
+                output_vcf_file_id_list.append(gzip.open(replicate_vcf_file, mode='wt', encoding='iso-8859-1', newline='\n'))
+            except Exception as e:
+                raise xlib.ProgramException(e, 'F004', replicate_vcf_file)
+        else:
+            try:
+                output_vcf_file_id_list.append(open(replicate_vcf_file, mode='w', encoding='iso-8859-1', newline='\n'))
+            except Exception as e:
+                raise xlib.ProgramException(e, 'F003', replicate_vcf_file)
 
     # initialize counters
     input_record_counter = 0
     total_variant_counter = 0
-    variant_wmd_counter = 0
+    variant_wmd_counter_list = [0] * replicates_number
+
+    # initialize the block of variants pending to be simulated
+    variant_block_list = []
 
     # read the first record of input VCF file
     (record, _, data_dict) = xlib.read_vcf_file(input_vcf_file_id, sample_number)
@@ -209,11 +251,12 @@ def simulate_md(input_vcf_file, simulation_method, md_probability, maxperc_ind_w
             # add 1 to the read sequence counter
             input_record_counter += 1
 
-            # write the metadata record
-            output_vcf_file_id.write(record)
+            # write the metadata record in every replicate
+            for output_vcf_file_id in output_vcf_file_id_list:
+                output_vcf_file_id.write(record)
 
             # print the counters
-            xlib.Message.print('verbose', f'\rProcessed records ... {input_record_counter:8d} - Total variants ... {total_variant_counter:8d} - Variants with missing data ... {variant_wmd_counter:8d}')
+            xlib.Message.print('verbose', f'\rProcessed records ... {input_record_counter:8d} - Total variants ... {total_variant_counter:8d} - Variants with missing data ... {sum(variant_wmd_counter_list):8d}')
 
             # read the next record of the input VCF file
             (record, _, data_dict) = xlib.read_vcf_file(input_vcf_file_id, sample_number)
@@ -224,23 +267,16 @@ def simulate_md(input_vcf_file, simulation_method, md_probability, maxperc_ind_w
             # add 1 to the read sequence counter
             input_record_counter += 1
 
-            # get the record data list
-            record_data_list = data_dict['record_data_list']
-
-            # build sample identification list
-            for i in range(9, len(record_data_list)):
-                # -- sample_name_list.append(os.path.basename(record_data_list[i]))
-                sample_id_list.append(i - 9)
-
             # set the samples number
-            sample_number = len(sample_id_list)
+            sample_number = len(data_dict['record_data_list']) - 9
             xlib.Message.print('trace', f'sample_number: {sample_number}')
 
-            # write the column description record
-            output_vcf_file_id.write(record)
+            # write the column description record in every replicate
+            for output_vcf_file_id in output_vcf_file_id_list:
+                output_vcf_file_id.write(record)
 
             # print the counters
-            xlib.Message.print('verbose', f'\rProcessed records ... {input_record_counter:8d} - Total variants ... {total_variant_counter:8d} - Variants with missing data ... {variant_wmd_counter:8d}')
+            xlib.Message.print('verbose', f'\rProcessed records ... {input_record_counter:8d} - Total variants ... {total_variant_counter:8d} - Variants with missing data ... {sum(variant_wmd_counter_list):8d}')
 
             # read the next record of the input VCF file
             (record, _, data_dict) = xlib.read_vcf_file(input_vcf_file_id, sample_number)
@@ -248,37 +284,13 @@ def simulate_md(input_vcf_file, simulation_method, md_probability, maxperc_ind_w
         # process variant record
         while record != '' and not record.startswith('##') and not record.startswith('#CHROM'):
 
-            # set the sequence identification
-            seq_id = data_dict['chrom']
-
-            # add set the variant identification
-            variant_id = f'{data_dict["chrom"]}-{data_dict["pos"]}'
-
             # add 1 to the read sequence counter
             input_record_counter += 1
 
             # add 1 to the total variant counter
             total_variant_counter += 1
 
-            if seq_id in tsi_list: xlib.Message.print('trace', f'\n\n\n\nseq_id: {data_dict["chrom"]} - position {data_dict["pos"]}')
-
-            # get the reference bases (field REF) and alternative alleles (field ALT)
-            reference_bases = data_dict['ref']
-            alternative_alleles = data_dict['alt']
-
-            # build the alternative alleles list from field ALT
-            alternative_allele_list = data_dict['alt'].split(',')
-
-            # check if the variant is an indel (both SAMtools/BCFtools and Freebayes)
-            is_indel = False
-            if len(reference_bases) > 1:
-                is_indel = True
-            else:
-                for alternative_allele in alternative_allele_list:
-                    if len(alternative_allele) > 1:
-                        is_indel = True
-                        break
-            if seq_id in tsi_list: xlib.Message.print('trace', f'(1) INDEL?: {is_indel}')
+            if data_dict['chrom'] in tsi_list: xlib.Message.print('trace', f'\n\n\n\nseq_id: {data_dict["chrom"]} - position {data_dict["pos"]}')
 
             # get the position of the genotype (subfield GT) in the field FORMAT
             format_subfield_list = data_dict['format'].upper().split(':')
@@ -287,92 +299,162 @@ def simulate_md(input_vcf_file, simulation_method, md_probability, maxperc_ind_w
             except Exception as e:
                 raise xlib.ProgramException(e, 'L007', 'GT', data_dict['chrom'], data_dict['pos'])
 
-            # build the list of sample genotypes of a variant
+            # build the list of sample data and the list of genotype separators of a variant
             sample_data_list = []
-            sample_gt_list = []
-            for i in range(sample_number):
-                sample_data_list.append(data_dict['sample_list'][i].split(':'))
-                sample_gt_list.append(sample_data_list[i][gt_position])
-
-            # build the lists of the left and right side of sample genotypes of a variant
-            sample_gt_left_list = []
             sample_sep_list = []
-            sample_gt_right_list = []
             for i in range(sample_number):
-                sep = '/'
-                sep_pos = sample_gt_list[i].find(sep)
-                if sep_pos == -1:
-                    sep = '|'
-                    sep_pos = sample_gt_list[i].find(sep)
-                if sep_pos == -1:
+                sample_data_list.append(data_dict['sample_list'][i].split(':'))
+                sample_gt = sample_data_list[i][gt_position]
+                if sample_gt.find('/') != -1:
+                    sample_sep_list.append('/')
+                elif sample_gt.find('|') != -1:
+                    sample_sep_list.append('|')
+                else:
                     raise xlib.ProgramException('', 'L008', 'GT', data_dict['chrom'], data_dict['pos'])
-                sample_sep_list.append(sep)
-                sample_gt_left_list.append(sample_gt_list[i][:sep_pos])
-                sample_gt_right_list.append(sample_gt_list[i][sep_pos+1:])
-
-            # simulate missing data when method is RANDOM
-            if simulation_method == 'RANDOM':
-                if md_probability > random.random():
-
-                    xlib.Message.print('trace', f'\n\nseq_id: {data_dict["chrom"]} - position {data_dict["pos"]}')
-
-                    # build the genotype text before simulation
-                    genotype_text_before_simulation = ''
-                    for i in range(sample_number):
-                        genotype_text_before_simulation += f'{str(sample_gt_left_list[i])}{sample_sep_list[i]}{str(sample_gt_right_list[i])} '
-
-                    # get the number of individuals with missing data
-                    perc_ind_wmd = random.uniform(0., maxperc_ind_wmd)
-                    num_ind_wmd = max(1, round(sample_number * perc_ind_wmd / 100))
-
-                    # get the list of individuals with missing data
-                    ind_id_wmd_list = []
-                    w_sample_id_list = sample_id_list.copy()
-                    for _ in range(num_ind_wmd):
-                        j = random.randrange(0, len(w_sample_id_list))
-                        ind_id_wmd_list.append(w_sample_id_list[j])
-                        del w_sample_id_list[j]
-
-                    # asign missing data to the individuals
-                    for ind_id in ind_id_wmd_list:
-                        sample_gt_left_list[ind_id] = xlib.get_md_symbol()
-                        sample_gt_right_list[ind_id] = xlib.get_md_symbol()
-
-                    # add 1 to the variant with missing data counter
-                    variant_wmd_counter += 1
-
-                    # build the genotype text after simulation
-                    genotype_text_after_simulation = ''
-                    for i in range(sample_number):
-                        genotype_text_after_simulation += f'{str(sample_gt_left_list[i])}{sample_sep_list[i]}{str(sample_gt_right_list[i])} '
-                    xlib.Message.print('trace', f'genotype list before simulation: {genotype_text_before_simulation}')
-                    xlib.Message.print('trace', f'genotype list  after simulation: {genotype_text_after_simulation}')
-
-            # rebuild the list of the field GT for every sample
-            for i in range(sample_number):
-                sample_gt_list[i] = f'{sample_gt_left_list[i]}{sample_sep_list[i]}{sample_gt_right_list[i]}'
 
-            # rebuild the sample genotype data list and their corresponding record data
-            sample_list = []
-            for i in range(sample_number):
-                sample_data_list[i][gt_position] = sample_gt_list[i]
-                sample_list.append(':'.join(sample_data_list[i]))
+            # add the variant to the block
+            variant_block_list.append({'data_dict': data_dict, 'gt_position': gt_position, 'sample_data_list': sample_data_list, 'sample_sep_list': sample_sep_list})
 
-            # write the variant record
-            sample_list_text = '\t'.join(sample_list)
-            output_vcf_file_id.write(f'{data_dict["chrom"]}\t{data_dict["pos"]}\t{data_dict["id"]}\t{data_dict["ref"]}\t{data_dict["alt"]}\t{data_dict["qual"]}\t{data_dict["filter"]}\t{data_dict["info"]}\t{data_dict["format"]}\t{sample_list_text}\n')
+            # when the block is full, simulate missing data in every replicate and write the variant records
+            if len(variant_block_list) == xlib.Const.SIMULATION_BLOCK_SIZE:
+                write_simulated_block(variant_block_list, sample_number, simulation_method, md_probability, maxperc_ind_wmd, rng_list, output_vcf_file_id_list, variant_wmd_counter_list)
+                variant_block_list = []
 
             # print the counters
-            xlib.Message.print('verbose', f'\rProcessed records ... {input_record_counter:8d} - Total variants ... {total_variant_counter:8d} - Variants with missing data ... {variant_wmd_counter:8d}')
+            xlib.Message.print('verbose', f'\rProcessed records ... {input_record_counter:8d} - Total variants ... {total_variant_counter:8d} - Variants with missing data ... {sum(variant_wmd_counter_list):8d}')
 
             # read the next record of the input VCF file
             (record, _, data_dict) = xlib.read_vcf_file(input_vcf_file_id, sample_number)
 
+    # simulate missing data in every replicate and write the variant records of the last block
+    if variant_block_list:
+        write_simulated_block(variant_block_list, sample_number, simulation_method, md_probability, maxperc_ind_wmd, rng_list, output_vcf_file_id_list, variant_wmd_counter_list)
+
+    # print the counters
+    xlib.Message.print('verbose', f'\rProcessed records ... {input_record_counter:8d} - Total variants ... {total_variant_counter:8d} - Variants with missing data ... {sum(variant_wmd_counter_list):8d}')
     xlib.Message.print('verbose', '\n')
 
+    # print the variants with missing data of every replicate
+    if replicates_number > 1:
+        for replicate_num in range(replicates_number):
+            xlib.Message.print('verbose', f'Replicate {replicate_num + 1:3d} - Variants with missing data ... {variant_wmd_counter_list[replicate_num]:8d}\n')
+
     # close files
     input_vcf_file_id.close()
-    output_vcf_file_id.close()
+    for output_vcf_file_id in output_vcf_file_id_list:
+        output_vcf_file_id.close()
+
+    # return the record counter
+    return input_record_counter
+
+#-------------------------------------------------------------------------------
+
+def get_replicate_file_name(output_vcf_file, replicate_num, replicates_number):
+    '''
+    Get the path of the VCF file of a replicate.
+    '''
+
+    # when there is only one replicate, the file name is not changed
+    if replicates_number == 1:
+        return output_vcf_file
+
+    # add the replicate number before the file extensions
+    if output_vcf_file.endswith('.vcf.gz'):
+        (root, extension) = (output_vcf_file[:-len('.vcf.gz')], '.vcf.gz')
+    elif output_vcf_file.endswith('.gz'):
+        (root, extension) = (output_vcf_file[:-len('.gz')], '.gz')
+    else:
+        (root, extension) = os.path.splitext(output_vcf_file)
+
+    # return the path of the VCF file of the replicate
+    return f'{root}-rep{replicate_num + 1:03d}{extension}'
+
+#-------------------------------------------------------------------------------
+
+def build_md_mask_matrix(rng, variant_number, sample_number, simulation_method, md_probability, maxperc_ind_wmd):
+    '''
+    Build the boolean matrix (variants x samples) of the genotypes with simulated missing data of a replicate.
+    '''
+
+    # initialize the mask matrix
+    md_mask_matrix = np.zeros((variant_number, sample_number), dtype=bool)
+
+    # simulate missing data when method is RANDOM
+    if simulation_method == 'RANDOM':
+
+        # select the variants with missing data
+        md_variant_array = np.flatnonzero(rng.random(variant_number) < md_probability)
+
+        if md_variant_array.size > 0 and sample_number > 0:
+
+            # get the number of individuals with missing data of each selected variant
+            perc_ind_wmd_array = rng.uniform(0., maxperc_ind_wmd, md_variant_array.size)
+            num_ind_wmd_array = np.clip(np.round(sample_number * perc_ind_wmd_array / 100), 1, sample_number).astype(np.int64)
+
+            # get a random order of the individuals of each selected variant and mark the first ones
+            order_matrix = rng.random((md_variant_array.size, sample_number)).argsort(axis=1)
+            md_mask_matrix[md_variant_array[:, np.newaxis], order_matrix] = np.arange(sample_number)[np.newaxis, :] < num_ind_wmd_array[:, np.newaxis]
+
+    # return the mask matrix
+    return md_mask_matrix
+
+#-------------------------------------------------------------------------------
+
+def write_simulated_block(variant_block_list, sample_number, simulation_method, md_probability, maxperc_ind_wmd, rng_list, output_vcf_file_id_list, variant_wmd_counter_list):
+    '''
+    Simulate missing data in a block of variants for every replicate and write the variant records.
+    '''
+
+    # get the missing data symbol
+    md_symbol = xlib.get_md_symbol()
+
+    # build the mask matrix of every replicate
+    md_mask_matrix_list = [build_md_mask_matrix(rng, len(variant_block_list), sample_number, simulation_method, md_probability, maxperc_ind_wmd) for rng in rng_list]
+
+    # for each variant of the block
+    for i, variant_dict in enumerate(variant_block_list):
+
+        data_dict = variant_dict['data_dict']
+        gt_position = variant_dict['gt_position']
+        sample_data_list = variant_dict['sample_data_list']
+        sample_sep_list = variant_dict['sample_sep_list']
+
+        # build the fixed fields of the variant record
+        fixed_fields_text = f'{data_dict["chrom"]}\t{data_dict["pos"]}\t{data_dict["id"]}\t{data_dict["ref"]}\t{data_dict["alt"]}\t{data_dict["qual"]}\t{data_dict["filter"]}\t{data_dict["info"]}\t{data_dict["format"]}'
+
+        # build the sample data of the variant without missing data
+        sample_list = [':'.join(sample_data) for sample_data in sample_data_list]
+
+        # for each replicate
+        for replicate_num, md_mask_matrix in enumerate(md_mask_matrix_list):
+
+            # get the individuals with missing data
+            ind_id_wmd_array = np.flatnonzero(md_mask_matrix[i])
+
+            # asign missing data to the individuals
+            if ind_id_wmd_array.size > 0:
+
+                replicate_sample_list = sample_list.copy()
+                for ind_id in ind_id_wmd_array:
+                    sample_data = sample_data_list[ind_id].copy()
+                    sample_data[gt_position] = f'{md_symbol}{sample_sep_list[ind_id]}{md_symbol}'
+                    replicate_sample_list[ind_id] = ':'.join(sample_data)
+
+                # add 1 to the variant with missing data counter
+                variant_wmd_counter_list[replicate_num] += 1
+
+                if xlib.Message.trace_status:
+                    xlib.Message.print('trace', f'\n\nseq_id: {data_dict["chrom"]} - position {data_dict["pos"]} - replicate {replicate_num + 1}')
+                    xlib.Message.print('trace', f'genotype list before simulation: {" ".join([sample_data[gt_position] for sample_data in sample_data_list])}')
+                    xlib.Message.print('trace', f'genotype list  after simulation: {" ".join([sample.split(":")[gt_position] for sample in replicate_sample_list])}')
+
+            else:
+
+                replicate_sample_list = sample_list
+
+            # write the variant record
+            sample_list_text = '\t'.join(replicate_sample_list)
+            output_vcf_file_id_list[replicate_num].write(f'{fixed_fields_text}\t{sample_list_text}\n')
 
 #-------------------------------------------------------------------------------
 
@@ -54,12 +54,15 @@ cd $NGSHELPER_DIR
     ./transcriptome-blastx.py \
         --machine_type='local' \
         --node_number=1 \
+        --chunk_number=1 \
+        --worker_number=1 \
         --blastx_thread_number=1 \
         --blast_db=$BLASTDB \
         --protein_database_name=$PROTEIN_DATABASE_NAME \
         --transcriptome=$TRANSCRIPTOME_DIR/$TRANSCRIPTOME_FILE \
         --e_value=$E_VALUE \
         --max_target_seqs=$MAX_TARGET_SEQS \
+        --output_format='xml' \
         --output=$OUTPUT_DIR \
         --verbose='y'
 if [ $? -ne 0 ]; then echo 'Script ended with errors.'; exit 1; fi
@@ -24,7 +24,9 @@ Licence: GNU General Public Licence Version 3.
 
 #-------------------------------------------------------------------------------
 
+import concurrent.futures
 import gzip
+import heapq
 import optparse
 import os
 import re
@@ -55,121 +57,52 @@ def main():
     # set environment
     os.environ['BLASTDB'] = options.blast_db
 
+    # set the outfmt code and the extension of annotation files
+    (outfmt, extension) = (5, 'xml') if options.output_format == 'xml' else (6, 'tsv')
+
     # if machine type is local:
     if options.machine_type == 'local':
 
         # set the annotation file
-        annotation_file = f'{options.output_directory}/annotation.xml'
+        annotation_file = f'{options.output_directory}/annotation.{extension}'
         xlib.Message.print('info', f'Annotation file: {annotation_file} ')
 
-        # execute blastn with the transcriptome sequence
-        command = f'blastx -num_threads {options.blastx_thread_number} -db {options.protein_database_name} -query {options.transcriptome_file} -evalue {options.e_value} -max_target_seqs {options.max_target_seqs} -outfmt 5 -out {annotation_file}'
-        xlib.Message.print('info', f'Run command: {command}')
-        rc = subprocess.call(command, shell=True)
-        if rc != 0:
-            raise xlib.ProgramException('', 'S002', command, rc)
+        # if there is only one chunk, execute blastx with the transcriptome sequence
+        if options.chunk_number == 1:
+            command = build_blastx_command(options, options.transcriptome_file, outfmt, annotation_file)
+            xlib.Message.print('info', f'Run command: {command}')
+            rc = subprocess.call(command, shell=True)
+            if rc != 0:
+                raise xlib.ProgramException('', 'S002', command, rc)
+
+        # if there are two or more chunks, run a blastx process per chunk feeding the workers dynamically and merge the annotation files
+        else:
+
+            # split the transcriptome in chunks balanced by residues
+            chunk_file_list = [f'{options.output_directory}/blastx-{i:02d}-transcripts.fasta' for i in range(options.chunk_number)]
+            (chunk_data_list, transcript_chunk_list) = partition_transcriptome(options.transcriptome_file, chunk_file_list)
+
+            # run the blastx processes of the chunks
+            annotation_file_list = run_blastx_chunks(options, chunk_file_list, chunk_data_list, outfmt, extension)
+
+            # merge the annotation files in the transcript order of the transcriptome file
+            merge_annotation_files(annotation_file_list, annotation_file, options.output_format, transcript_chunk_list)
 
     # if machine type is ngscloud:
     elif options.machine_type == 'ngscloud':
 
-        # initialize the transcript file list of each node
+        # initialize the transcript file list of each node and the chunk list of the transcripts
         node_transcript_file_list = []
+        transcript_chunk_list = None
 
         # if there is only one node
         if options.node_number == 1:
             node_transcript_file_list.append(options.transcriptome_file)
 
-        # if there are two  or more nodes
+        # if there are two  or more nodes, split the transcriptome in a chunk per node balanced by residues
         else:
-
-            xlib.Message.print('info', 'Creating the node transcript files ...')
-
-            # open the transcriptome file
-            if options.transcriptome_file.endswith('.gz'):
-                try:
-                    transcriptome_file_id = gzip.open(options.transcriptome_file, mode='rt', encoding='iso-8859-1')
-                except Exception as e:
-                    raise xlib.ProgramException(e, 'F002', options.transcriptome_file)
-            else:
-                try:
-                    transcriptome_file_id = open(options.transcriptome_file, mode='r', encoding='iso-8859-1')
-                except Exception as e:
-                    raise xlib.ProgramException(e, 'F001', options.transcriptome_file)
-
-            # initialize the transcript file identification list of each node
-            node_transcript_file_id_list = []
-
-            # open a transcript file per node to write
-            for i in range(options.node_number):
-                node_transcript_file = f'{options.output_directory}/blastx-{i:02d}-transcripts.fasta'
-                node_transcript_file_list.append(node_transcript_file)
-                try:
-                    node_transcript_file_id = open(node_transcript_file, mode='w', encoding='iso-8859-1')
-                except Exception as e:
-                    raise xlib.ProgramException(e, 'F003', node_transcript_file)
-                node_transcript_file_id_list.append(node_transcript_file_id)
-
-            # initialize the count of transcripts
-            transcript_count = 0
-
-            # set the pattern of the head records (>transcriptome_info)
-            pattern = r'^>(.*)$'
-
-            # read the first record
-            record = transcriptome_file_id.readline()
-
-            # while there are records
-            while record != '':
-
-                # process the head record
-                if record.startswith('>'):
-
-                    # extract the data
-                    mo = re.search(pattern, record)
-                    transcript_info = mo.group(1)
-
-                    # initialize the transcript sequence
-                    transcript_seq = ''
-
-                    # read the next record
-                    record = transcriptome_file_id.readline()
-
-                else:
-
-                    # control the FASTA format
-                    raise xlib.ProgramException('', 'F006', node_transcript_file, 'FASTA')
-
-                # while there are records and they are sequence
-                while record != '' and not record.startswith('>'):
-
-                    # concatenate the record to the transcript sequence
-                    transcript_seq += record.strip()
-
-                    # read the next record
-                    record = transcriptome_file_id.readline()
-
-                # write the transcript sequence in the corresponding node
-                j = transcript_count % options.node_number
-                node_transcript_file_id_list[j].write(f'>{transcript_info}\n')
-                k = 0
-                while k < len(transcript_seq) - xlib.Const.FASTA_RECORD_LEN:
-                    node_transcript_file_id_list[j].write(f'{transcript_seq[k:k+xlib.Const.FASTA_RECORD_LEN]}\n')
-                    k += xlib.Const.FASTA_RECORD_LEN
-                node_transcript_file_id_list[j].write(f'{transcript_seq[k:]}\n')
-
-                # add 1 to trascript count and print it
-                transcript_count += 1
-                xlib.Message.print('verbose', f'\rProcessed transcripts ... {transcript_count:9d}')
-
-            xlib.Message.print('verbose', '\n')
-            xlib.Message.print('info', f'There are {transcript_count} transcripts in the transcriptome file.')
-
-            # close files
-            transcriptome_file_id.close()
-            for i in range(options.node_number):
-                node_transcript_file_id_list[i].close()
-
-            xlib.Message.print('info', 'The transcripts files are created.')
+            node_transcript_file_list = [f'{options.output_directory}/blastx-{i:02d}-transcripts.fasta' for i in range(options.node_number)]
+            (_, transcript_chunk_list) = partition_transcriptome(options.transcriptome_file, node_transcript_file_list)
 
         # set lists related to blastx process and watcher scripts
         blastx_process_script_list = []
@@ -182,7 +115,7 @@ def main():
         watcher_err_list = []
         for i in range(options.node_number):
             blastx_process_script_list.append(f'{options.output_directory}/blastx-{i:02d}-process.sh')
-            annotation_file_list.append(f'{options.output_directory}/blastx-{i:02d}-annotation.xml')
+            annotation_file_list.append(f'{options.output_directory}/blastx-{i:02d}-annotation.{extension}')
             control_file_list.append(f'{options.output_directory}/blastx-{i:02d}-control.txt')
             log_file_list.append(f'{options.output_directory}/blastx-{i:02d}-log.txt')
             watcher_script_list.append(f'{options.output_directory}/blastx-{i:02d}-watcher.sh')
@@ -208,7 +141,7 @@ def main():
         for i in range(options.node_number):
 
             # build the blastx process script
-            build_blastx_process_script(blastx_process_script_list[i], options.blastx_thread_number, options.blast_db, options.protein_database_name, node_transcript_file_list[i], options.e_value, options.max_target_seqs, options.max_hsps, options.qcov_hsp_perc, annotation_file_list[i], control_file_list[i], watcher_script_list[i], watcher_out_list[i], watcher_err_list[i])
+            build_blastx_process_script(blastx_process_script_list[i], options.blastx_thread_number, options.blast_db, options.protein_database_name, node_transcript_file_list[i], options.e_value, options.max_target_seqs, options.max_hsps, options.qcov_hsp_perc, outfmt, annotation_file_list[i], control_file_list[i], watcher_script_list[i], watcher_out_list[i], watcher_err_list[i])
 
             # set run permision to the blastx process script
             command = f'chmod u+x {blastx_process_script_list[i]}'
@@ -281,74 +214,8 @@ def main():
         if ok_count < options.node_number:
             raise xlib.ProgramException('', 'P002')
 
-        # set concatenation file
-        concatenation_file = f'{options.output_directory}/annotation.xml'
-
-        # when there is only one annotation file, rename it
-        if range(options.node_number) == 1:
-            command = f'mv {annotation_file_list[0]} {concatenation_file}'
-            rc = subprocess.call(command, shell=True)
-            if rc != 0:
-                raise xlib.ProgramException('', 'S002', command, rc)
-
-        # when there are more than one annotation files, concatenate them in the concatenation file
-        else:
-
-            xlib.Message.print('info', 'Concatenating the annotation files ...')
-
-            try:
-
-                # open the concatenation file
-                concatenation_file_id = open(concatenation_file, mode='w', encoding='utf8', newline='\n')
-
-                # process every annotation file
-                for i in range(options.node_number):
-
-                    # set the query number
-                    query_number = (i + 1) * xlib.Const.MAX_QUERY_NUMBER_PER_FILE
-
-                    # open the annotation file
-                    annotation_file_id = open(annotation_file_list[i], mode='r', encoding='utf8', newline='\n')
-
-                    # read the first record
-                    record = annotation_file_id.readline()
-
-                    # while there are records
-                    while record != '':
-
-                        # write the record in the concatenation file
-                        if record.strip().startswith('<?xml') or record.strip().startswith('<!DOCTYPE') or record.strip().startswith('<BlastOutput') or record.strip().startswith('</BlastOutput_param>') or record.strip().startswith('<Parameters') or record.strip().startswith('</Parameters>'):
-                            if i == 0:
-                                concatenation_file_id.write(record)
-                            else:
-                                pass
-                        elif record.strip().startswith('</BlastOutput_iterations>') or record.strip().startswith('</BlastOutput>'):
-                            if i == options.node_number -1 :
-                                concatenation_file_id.write(record)
-                            else:
-                                pass
-                        elif record.strip().startswith('<Iteration_iter-num>'):
-                            concatenation_file_id.write(f'  <Iteration_iter-num>{query_number}</Iteration_iter-num>\n')
-                            concatenation_file_id.write(f'  <Iteration_query-ID>Query_{query_number}</Iteration_query-ID>>\n')
-                            query_number += 1
-                        elif record.strip().startswith('<Iteration_query-ID>'):
-                            pass
-                        elif record.strip() != '':
-                            concatenation_file_id.write(record)
-
-                        # read the next record
-                        record = annotation_file_id.readline()
-
-                    # close the annotation file
-                    annotation_file_id.close()
-
-                # close the concatenation file
-                concatenation_file_id.close()
-
-            except Exception as e:
-                raise xlib.ProgramException(e, 'F008')
-
-            xlib.Message.print('info', 'The annotation files are concatenated.')
+        # merge the annotation files in the transcript order of the transcriptome file
+        merge_annotation_files(annotation_file_list, f'{options.output_directory}/annotation.{extension}', options.output_format, transcript_chunk_list)
 
 #-------------------------------------------------------------------------------
 
@@ -361,6 +228,8 @@ def build_parser():
     parser = optparse.OptionParser()
     parser.add_option('-m', '--machine_type', dest='machine_type', help=f'Machine type: local or ngscloud (default: {xlib.Const.DEFAULT_MACHINE_TYPE})')
     parser.add_option('-n', '--node_number', dest='node_number', help=f'Node number (default: {xlib.Const.DEFAULT_NODE_NUMBER}; it must be 1 if machine type is local)')
+    parser.add_option('-k', '--chunk_number', dest='chunk_number', help=f'Number of transcriptome chunks balanced by residues when machine type is local; they are fed to the blastx workers as they become free (default: {xlib.Const.DEFAULT_BLASTX_CHUNK_NUMBER}; it must be 1 if machine type is ngscloud, where there is a chunk per node)')
+    parser.add_option('-w', '--worker_number', dest='worker_number', help=f'Number of blastx processes running at the same time when machine type is local (default: {xlib.Const.DEFAULT_BLASTX_WORKER_NUMBER})')
     parser.add_option('-t', '--blastx_thread_number', dest='blastx_thread_number', help=f'Threads number using by blastx in every node (default: {xlib.Const.DEFAULT_BLASTX_THREADS_NUMBER})')
     parser.add_option('-d', '--blast_db', dest='blast_db', help='Path of the protein data base directory')
     parser.add_option('-p', '--protein_database_name', dest='protein_database_name', help='Protein database name')
@@ -369,6 +238,7 @@ def build_parser():
     parser.add_option('-s', '--max_target_seqs', dest='max_target_seqs', help=f'Maximum number of aligned sequences to keep (default: {xlib.Const.DEFAULT_MAX_TARGET_SEQS})')
     parser.add_option('-x', '--max_hsps', dest='max_hsps', help=f'Maximum number of HSPs per subject sequence to save for each query (default: {xlib.Const.DEFAULT_MAX_HSPS})')
     parser.add_option('-c', '--qcov_hsp_perc', dest='qcov_hsp_perc', help=f'Aligments below the specified query coverage per HSPs are removed (default: {xlib.Const.DEFAULT_QCOV_HSP_PERC})')
+    parser.add_option('-f', '--output_format', dest='output_format', help=f'Format of the annotation file: xml or tabular (default: {xlib.Const.DEFAULT_BLASTX_OUTPUT_FORMAT})')
     parser.add_option('-o', '--output', dest='output_directory', help='Path of a directory where the results will be saved')
     parser.add_option('-l', '--email', dest='email', help='Email direction to send warnings')
     parser.add_option('-v', '--verbose', dest='verbose', help=f'Additional job status info during the run (y: YES; n: NO, default: {xlib.Const.DEFAULT_VERBOSE}).')
@@ -410,6 +280,35 @@ def check_options(options):
             xlib.Message.print('error', f'*** The node number value {options.node_number} is not an integer greater or equal to 1.')
             OK = False
 
+    # check chunk_number
+    if options.chunk_number is None:
+        options.chunk_number = xlib.Const.DEFAULT_BLASTX_CHUNK_NUMBER
+    else:
+        try:
+            options.chunk_number = int(options.chunk_number)
+            if options.chunk_number < 1:
+                xlib.Message.print('error', f'*** The chunk number value {options.chunk_number} is not an integer greater or equal to 1.')
+                OK = False
+            elif options.chunk_number > 1 and options.machine_type == 'ngscloud':
+                xlib.Message.print('error', f'*** The chunk number is {options.chunk_number} but it must be 1 where the machine type is ngscloud.')
+                OK = False
+        except Exception:
+            xlib.Message.print('error', f'*** The chunk number value {options.chunk_number} is not an integer greater or equal to 1.')
+            OK = False
+
+    # check worker_number
+    if options.worker_number is None:
+        options.worker_number = xlib.Const.DEFAULT_BLASTX_WORKER_NUMBER
+    else:
+        try:
+            options.worker_number = int(options.worker_number)
+            if options.worker_number < 1:
+                xlib.Message.print('error', f'*** The worker number value {options.worker_number} is not an integer greater or equal to 1.')
+                OK = False
+        except Exception:
+            xlib.Message.print('error', f'*** The worker number value {options.worker_number} is not an integer greater or equal to 1.')
+            OK = False
+
     # check blastx_thread_number
     if options.blastx_thread_number is None:
         options.blastx_thread_number = xlib.Const.DEFAULT_BLASTX_THREADS_NUMBER
@@ -495,6 +394,16 @@ def check_options(options):
             xlib.Message.print('error', f'*** The query coverage per HSPs {options.qcov_hsp_perc} is not a float between 0.0 and 100.0.')
             OK = False
 
+    # check output_format
+    if options.output_format is None:
+        options.output_format = xlib.Const.DEFAULT_BLASTX_OUTPUT_FORMAT
+    else:
+        if options.output_format.lower() not in ['xml', 'tabular']:
+            xlib.Message.print('error', f'*** The output format value {options.output_format} is not xml or tabular.')
+            OK = False
+        else:
+            options.output_format = options.output_format.lower()
+
     # check output_directory
     if options.output_directory is None:
         xlib.Message.print('error', '*** A directory where the results will be saved base is not indicated in the options.')
@@ -528,7 +437,373 @@ def check_options(options):
 
 #-------------------------------------------------------------------------------
 
-def build_blastx_process_script(blastx_process_script, blastx_thread_number, blast_db, protein_database_name, node_transcript_file, e_value, max_target_seqs, max_hsps, qcov_hsp_perc, output_file, control_file, watcher_script, watcher_out, watcher_err):
+def partition_transcriptome(transcriptome_file, chunk_file_list):
+    '''
+    Split a transcriptome in chunk files balancing their total residues (longest processing time first packing)
+    and return the data (transcripts and residues) of every chunk and the identification and chunk of every
+    transcript in the transcriptome order.
+    '''
+
+    xlib.Message.print('info', 'Creating the chunk transcript files ...')
+
+    # get the length of the transcripts
+    transcript_length_list = get_transcript_length_list(transcriptome_file)
+
+    # initialize the data of every chunk
+    chunk_data_list = [{'transcripts': 0, 'residues': 0} for _ in chunk_file_list]
+
+    # assign the transcripts from the longest to the shortest to the chunk with the least residues
+    chunk_assignment_list = [0] * len(transcript_length_list)
+    chunk_heap = [(0, i) for i in range(len(chunk_file_list))]
+    for transcript_index in sorted(range(len(transcript_length_list)), key=lambda x: transcript_length_list[x], reverse=True):
+        (residues, chunk_index) = heapq.heappop(chunk_heap)
+        chunk_assignment_list[transcript_index] = chunk_index
+        chunk_data_list[chunk_index]['transcripts'] += 1
+        chunk_data_list[chunk_index]['residues'] += transcript_length_list[transcript_index]
+        heapq.heappush(chunk_heap, (residues + transcript_length_list[transcript_index], chunk_index))
+
+    # open the transcriptome file
+    if transcriptome_file.endswith('.gz'):
+        try:
+            transcriptome_file_id = gzip.open(transcriptome_file, mode='rt', encoding='iso-8859-1')
+        except Exception as e:
+            raise xlib.ProgramException(e, 'F002', transcriptome_file)
+    else:
+        try:
+            transcriptome_file_id = open(transcriptome_file, mode='r', encoding='iso-8859-1')
+        except Exception as e:
+            raise xlib.ProgramException(e, 'F001', transcriptome_file)
+
+    # open a transcript file per chunk to write
+    chunk_file_id_list = []
+    for chunk_file in chunk_file_list:
+        try:
+            chunk_file_id_list.append(open(chunk_file, mode='w', encoding='iso-8859-1'))
+        except Exception as e:
+            raise xlib.ProgramException(e, 'F003', chunk_file)
+
+    # initialize the count of transcripts and the identification and chunk list of the transcripts
+    transcript_count = 0
+    transcript_chunk_list = []
+
+    # set the pattern of the head records (>transcriptome_info)
+    pattern = r'^>(.*)$'
+
+    # read the first record
+    record = transcriptome_file_id.readline()
+
+    # while there are records
+    while record != '':
+
+        # process the head record
+        if record.startswith('>'):
+
+            # extract the data
+            mo = re.search(pattern, record)
+            transcript_info = mo.group(1)
+
+            # initialize the transcript sequence
+            transcript_seq = ''
+
+            # read the next record
+            record = transcriptome_file_id.readline()
+
+        else:
+
+            # control the FASTA format
+            raise xlib.ProgramException('', 'F006', transcriptome_file, 'FASTA')
+
+        # while there are records and they are sequence
+        while record != '' and not record.startswith('>'):
+
+            # concatenate the record to the transcript sequence
+            transcript_seq += record.strip()
+
+            # read the next record
+            record = transcriptome_file_id.readline()
+
+        # write the transcript sequence in the assigned chunk
+        j = chunk_assignment_list[transcript_count]
+        transcript_chunk_list.append((transcript_info.split()[0] if transcript_info.strip() != '' else '', j))
+        chunk_file_id_list[j].write(f'>{transcript_info}\n')
+        k = 0
+        while k < len(transcript_seq) - xlib.Const.FASTA_RECORD_LEN:
+            chunk_file_id_list[j].write(f'{transcript_seq[k:k+xlib.Const.FASTA_RECORD_LEN]}\n')
+            k += xlib.Const.FASTA_RECORD_LEN
+        chunk_file_id_list[j].write(f'{transcript_seq[k:]}\n')
+
+        # add 1 to trascript count and print it
+        transcript_count += 1
+        xlib.Message.print('verbose', f'\rProcessed transcripts ... {transcript_count:9d}')
+
+    xlib.Message.print('verbose', '\n')
+    xlib.Message.print('info', f'There are {transcript_count} transcripts in the transcriptome file.')
+
+    # close files
+    transcriptome_file_id.close()
+    for chunk_file_id in chunk_file_id_list:
+        chunk_file_id.close()
+
+    xlib.Message.print('info', f'The transcripts files are created. Residues per chunk: minimum {min([chunk_data["residues"] for chunk_data in chunk_data_list])} - maximum {max([chunk_data["residues"] for chunk_data in chunk_data_list])}.')
+
+    # return the chunk data list and the chunk list of the transcripts
+    return (chunk_data_list, transcript_chunk_list)
+
+#-------------------------------------------------------------------------------
+
+def get_transcript_length_list(transcriptome_file):
+    '''
+    Get the length list of the transcripts of a transcriptome file in FASTA format.
+    '''
+
+    # initialize the transcript length list
+    transcript_length_list = []
+
+    # open the transcriptome file
+    if transcriptome_file.endswith('.gz'):
+        try:
+            transcriptome_file_id = gzip.open(transcriptome_file, mode='rt', encoding='iso-8859-1')
+        except Exception as e:
+            raise xlib.ProgramException(e, 'F002', transcriptome_file)
+    else:
+        try:
+            transcriptome_file_id = open(transcriptome_file, mode='r', encoding='iso-8859-1')
+        except Exception as e:
+            raise xlib.ProgramException(e, 'F001', transcriptome_file)
+
+    # add the length of the sequence records of every transcript
+    for record in transcriptome_file_id:
+        if record.startswith('>'):
+            transcript_length_list.append(0)
+        elif transcript_length_list:
+            transcript_length_list[-1] += len(record.strip())
+        elif record.strip() != '':
+            raise xlib.ProgramException('', 'F006', transcriptome_file, 'FASTA')
+
+    # close the transcriptome file
+    transcriptome_file_id.close()
+
+    # return the transcript length list
+    return transcript_length_list
+
+#-------------------------------------------------------------------------------
+
+def run_blastx_chunks(options, chunk_file_list, chunk_data_list, outfmt, extension):
+    '''
+    Run a blastx process per chunk in a pool of workers, launching the chunks from the most to the least residues
+    as the workers become free, and return the annotation file list in the chunk order (the chunks without transcripts
+    are not run, so they have not an annotation file).
+    '''
+
+    # set the annotation and log files of the chunks
+    annotation_file_list = [f'{options.output_directory}/blastx-{i:02d}-annotation.{extension}' for i in range(len(chunk_file_list))]
+    log_file_list = [f'{options.output_directory}/blastx-{i:02d}-log.txt' for i in range(len(chunk_file_list))]
+
+    # get the chunks with transcripts ordered from the most to the least residues
+    chunk_index_list = sorted([i for i in range(len(chunk_file_list)) if chunk_data_list[i]['transcripts'] > 0], key=lambda x: chunk_data_list[x]['residues'], reverse=True)
+
+    xlib.Message.print('info', f'Running {len(chunk_index_list)} blastx processes with {options.worker_number} workers ...')
+
+    # initialize the counters
+    ended_count = 0
+    wrong_count = 0
+
+    # run the chunks
+    with concurrent.futures.ThreadPoolExecutor(max_workers=options.worker_number) as executor:
+        future_dict = {}
+        for i in chunk_index_list:
+            command = build_blastx_command(options, chunk_file_list[i], outfmt, annotation_file_list[i])
+            future_dict[executor.submit(run_blastx_command, command, log_file_list[i])] = (i, command)
+        for future in concurrent.futures.as_completed(future_dict):
+            (i, command) = future_dict[future]
+            rc = future.result()
+            ended_count += 1
+            if rc != 0:
+                wrong_count += 1
+                xlib.Message.print('error', f'*** The command {command} has returned RC {rc}; its log is {log_file_list[i]}.')
+            xlib.Message.print('info', f'{time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime())} UTC ... ENDED: {ended_count:03d} of {len(chunk_index_list):03d} - WRONG: {wrong_count:03d}')
+
+    # check all blastx processes are ended OK
+    if wrong_count > 0:
+        raise xlib.ProgramException('', 'P002')
+
+    # return the annotation file list
+    return annotation_file_list
+
+#-------------------------------------------------------------------------------
+
+def build_blastx_command(options, query_file, outfmt, output_file):
+    '''
+    Build the blastx command of a query file with the options of the local run.
+    '''
+
+    # return the command
+    return f'blastx -num_threads {options.blastx_thread_number} -db {options.protein_database_name} -query {query_file} -evalue {options.e_value} -max_target_seqs {options.max_target_seqs} -max_hsps {options.max_hsps} -qcov_hsp_perc {options.qcov_hsp_perc} -outfmt {outfmt} -out {output_file}'
+
+#-------------------------------------------------------------------------------
+
+def run_blastx_command(command, log_file):
+    '''
+    Run a blastx command writing its output in a log file and return its RC.
+    '''
+
+    try:
+        with open(log_file, mode='w', encoding='utf8', newline='\n') as log_file_id:
+            rc = subprocess.call(command, shell=True, stdout=log_file_id, stderr=subprocess.STDOUT)
+    except Exception as e:
+        raise xlib.ProgramException(e, 'F003', log_file)
+
+    # return the RC
+    return rc
+
+#-------------------------------------------------------------------------------
+
+def merge_annotation_files(annotation_file_list, merged_file, output_format, transcript_chunk_list):
+    '''
+    Merge the annotation files of the chunks writing the queries in the transcript order of the transcriptome file.
+    '''
+
+    # get the chunks with transcripts
+    chunk_index_list = [0] if transcript_chunk_list is None else sorted(set([chunk_index for (_, chunk_index) in transcript_chunk_list]))
+
+    # when there is only one annotation file, rename it
+    if len(chunk_index_list) == 1:
+        try:
+            os.replace(annotation_file_list[chunk_index_list[0]], merged_file)
+        except Exception as e:
+            raise xlib.ProgramException(e, 'F008')
+        return
+
+    xlib.Message.print('info', 'Merging the annotation files in the transcript order ...')
+
+    try:
+
+        # open the merged file
+        merged_file_id = open(merged_file, mode='w', encoding='utf8', newline='\n')
+
+        # open the annotation files and get the first block of every one
+        annotation_file_id_dict = {}
+        block_iterator_dict = {}
+        block_dict = {}
+        for chunk_index in chunk_index_list:
+            annotation_file_id_dict[chunk_index] = open(annotation_file_list[chunk_index], mode='r', encoding='utf8', newline='\n')
+            block_iterator_dict[chunk_index] = iter_annotation_blocks(annotation_file_id_dict[chunk_index], output_format)
+            block_dict[chunk_index] = next(block_iterator_dict[chunk_index], None)
+
+        # write the XML head of the first annotation file and skip the other ones
+        for chunk_index in chunk_index_list:
+            if block_dict[chunk_index] is not None and block_dict[chunk_index][0] == 'head':
+                if chunk_index == chunk_index_list[0]:
+                    merged_file_id.writelines(block_dict[chunk_index][2])
+                block_dict[chunk_index] = next(block_iterator_dict[chunk_index], None)
+
+        # initialize the query number
+        query_number = 1
+
+        # write the query block of every transcript from the annotation file of its chunk
+        # (there is a XML iteration per query, but only the tabular records of the queries with hits)
+        for (transcript_id, chunk_index) in transcript_chunk_list:
+            block = block_dict[chunk_index]
+            if block is None or block[0] != 'query' or output_format == 'tabular' and block[1] != transcript_id:
+                continue
+            write_annotation_block(merged_file_id, block, query_number)
+            query_number += 1
+            block_dict[chunk_index] = next(block_iterator_dict[chunk_index], None)
+
+        # write the query blocks not matched with a transcript, if any, in the chunk order
+        for chunk_index in chunk_index_list:
+            while block_dict[chunk_index] is not None and block_dict[chunk_index][0] == 'query':
+                xlib.Message.print('error', f'*** WARNING: The query {block_dict[chunk_index][1]} of {annotation_file_list[chunk_index]} is not matched with a transcript and it is written at the end.')
+                write_annotation_block(merged_file_id, block_dict[chunk_index], query_number)
+                query_number += 1
+                block_dict[chunk_index] = next(block_iterator_dict[chunk_index], None)
+
+        # write the XML tail of the last annotation file
+        if block_dict[chunk_index_list[-1]] is not None and block_dict[chunk_index_list[-1]][0] == 'tail':
+            merged_file_id.writelines(block_dict[chunk_index_list[-1]][2])
+
+        # close files
+        for annotation_file_id in annotation_file_id_dict.values():
+            annotation_file_id.close()
+        merged_file_id.close()
+
+    except Exception as e:
+        raise xlib.ProgramException(e, 'F008')
+
+    xlib.Message.print('info', 'The annotation files are merged.')
+
+#-------------------------------------------------------------------------------
+
+def iter_annotation_blocks(annotation_file_id, output_format):
+    '''
+    Iterate over the blocks of an annotation file: in tabular format, a block per query with the records of its hits;
+    in XML format, the head block, a block per query iteration and the tail block.
+    Every block is a tuple (block type, query identification, record list).
+    '''
+
+    # tabular format
+    if output_format == 'tabular':
+        query_id = None
+        record_list = []
+        for record in annotation_file_id:
+            if record.strip() == '':
+                continue
+            record_query_id = record.split('\t', 1)[0]
+            if record_query_id != query_id and record_list:
+                yield ('query', query_id, record_list)
+                record_list = []
+            query_id = record_query_id
+            record_list.append(record)
+        if record_list:
+            yield ('query', query_id, record_list)
+
+    # XML format
+    else:
+        block_type = 'head'
+        query_id = None
+        record_list = []
+        for record in annotation_file_id:
+            if record.strip() == '':
+                continue
+            if record.strip().startswith('<Iteration>'):
+                if block_type == 'head':
+                    yield (block_type, query_id, record_list)
+                block_type = 'query'
+                record_list = []
+            elif record.strip().startswith('</BlastOutput_iterations>'):
+                if block_type == 'head':
+                    yield (block_type, query_id, record_list)
+                block_type = 'tail'
+                record_list = []
+            elif record.strip().startswith('<Iteration_query-def>'):
+                query_id = record.strip()[len('<Iteration_query-def>'):].split('<', 1)[0].split(' ', 1)[0]
+            record_list.append(record)
+            if record.strip().startswith('</Iteration>'):
+                yield (block_type, query_id, record_list)
+                block_type = 'between'
+                record_list = []
+        if block_type == 'tail':
+            yield (block_type, query_id, record_list)
+
+#-------------------------------------------------------------------------------
+
+def write_annotation_block(merged_file_id, block, query_number):
+    '''
+    Write a query block in the merged annotation file renumbering the XML iteration with the query number.
+    '''
+
+    for record in block[2]:
+        if record.strip().startswith('<Iteration_iter-num>'):
+            merged_file_id.write(f'  <Iteration_iter-num>{query_number}</Iteration_iter-num>\n')
+            merged_file_id.write(f'  <Iteration_query-ID>Query_{query_number}</Iteration_query-ID>\n')
+        elif record.strip().startswith('<Iteration_query-ID>'):
+            pass
+        else:
+            merged_file_id.write(record)
+
+#-------------------------------------------------------------------------------
+
+def build_blastx_process_script(blastx_process_script, blastx_thread_number, blast_db, protein_database_name, node_transcript_file, e_value, max_target_seqs, max_hsps, qcov_hsp_perc, outfmt, output_file, control_file, watcher_script, watcher_out, watcher_err):
     '''
     Build the current blastx process script.
     '''
@@ -582,7 +857,7 @@ def build_blastx_process_script(blastx_process_script, blastx_thread_number, bla
             file_id.write(f'            -max_target_seqs {max_target_seqs} \\\n')
             file_id.write(f'            -max_hsps {max_hsps} \\\n')
             file_id.write(f'            -qcov_hsp_perc {qcov_hsp_perc} \\\n')
-            file_id.write( '            -outfmt 5 \\\n')
+            file_id.write(f'            -outfmt {outfmt} \\\n')
             file_id.write(f'            -out {output_file}\n')
             file_id.write( '    RC=$?\n')
             file_id.write( '    if [ $RC -ne 0 ]; then manage_error $RC; fi\n')
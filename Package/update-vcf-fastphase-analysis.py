@@ -30,6 +30,7 @@ import gzip
 import os
 import sys
 
+import xgenotype
 import xlib
 
 #-------------------------------------------------------------------------------
@@ -223,149 +224,162 @@ def update_vcf_with_fastphase_analysis(input_vcf_file, output_vcf_file, analysis
             # print the counters
             xlib.Message.print('verbose', f'\rProcessed VCF records ... {record_counter:8d} - Seq ids ... {seq_id_counter:8d} - Variants ... {variant_counter:8d}')
 
-        # process variant records
-        while record != '' and not record.startswith('##') and not record.startswith('#CHROM'):
-
-            # add 1 to the sequence identification counter
-            seq_id_counter += 1
-
-            # initialize variants per sequence counter
-            variants_per_seq_counter = 0
-
-            # save the sequence identification
-            old_seq_id = data_dict['chrom']
-
-            # get the genotypes per sample dictionary from imputated sequence by fastPHASE
-            genotypes_per_sample_dict = get_genotypes_per_sample_dict(analysis_dir, prefix, old_seq_id)
-
-            # process variant records of the same sequence identification
-            while record != '' and not record.startswith('##') and not record.startswith('#CHROM') and data_dict['chrom'] == old_seq_id:
-
-                # add 1 to the VCF record counter
-                record_counter += 1
-
-                # add 1 to the total variant counter
-                variant_counter += 1
-
-                # set the current sequence identification
-                seq_id = data_dict['chrom']
-
-                # set the variant identification
-                variant_id = f'{data_dict["chrom"]}-{data_dict["pos"]}'
-                if seq_id in tsi_list: xlib.Message.print('trace', f'\n\n\nnvariant_id: {variant_id}')
-
-                # get the reference bases (field REF) and alternative alleles (field ALT)
-                reference_bases = data_dict['ref']
-                alternative_alleles = data_dict['alt']
-                if seq_id in tsi_list: xlib.Message.print('trace', f'reference_bases: {reference_bases}')
-                if seq_id in tsi_list: xlib.Message.print('trace', f'alternative_alleles: {alternative_alleles}')
-
-                # build the alternative allele list
-                alternative_allele_list = alternative_alleles.split(',')
-                if seq_id in tsi_list: xlib.Message.print('trace', f'alternative_allele_list: {alternative_allele_list}')
-
-                # build the complete allele list
-                complete_allele_list = [reference_bases] + alternative_allele_list
-                if seq_id in tsi_list: xlib.Message.print('trace', f'complete_allele_list: {complete_allele_list}')
-
-                # build the allele code list
-                allele_code_list = ['A', 'T', 'C', 'G']
-                for i in range(len(complete_allele_list)):
-                    if len(complete_allele_list[i]) > 1 and complete_allele_list[i] != xlib.get_md_symbol():
-                        allele_code_list.append(complete_allele_list[i].upper())
-                if seq_id in tsi_list: xlib.Message.print('trace', f'allele_code_list: {allele_code_list}')
-
-                # get the position of the genotype (subfield GT) in the field FORMAT
-                format_subfield_list = data_dict['format'].upper().split(':')
-                try:
-                    gt_position = format_subfield_list.index('GT')
-                except Exception as e:
-                    raise xlib.ProgramException(e, 'L007', 'GT', data_dict['chrom'], data_dict['pos'])
-
-                # build the list of sample genotypes of a variant
-                sample_data_list = []
-                sample_gt_list = []
-                for i in range(sample_number):
-                    sample_data_list.append(data_dict['sample_list'][i].split(':'))
-                    sample_gt_list.append(sample_data_list[i][gt_position])
-                if seq_id in tsi_list: xlib.Message.print('trace', f'sample_gt_list: {sample_gt_list}')
-
-                # build the lists of the left and right side of sample genotypes of a variant
-                sample_gt_left_list = []
-                sample_sep_list = []
-                sample_gt_right_list = []
-                for i in range(sample_number):
-                    sep = '/'
-                    sep_pos = sample_gt_list[i].find(sep)
-                    if sep_pos == -1:
-                        sep = '|'
-                        sep_pos = sample_gt_list[i].find(sep)
-                    if sep_pos == -1:
-                        raise xlib.ProgramException('', 'L008', 'GT', data_dict['chrom'], data_dict['pos'])
-                    sample_sep_list.append(sep)
-                    sample_gt_left_list.append(sample_gt_list[i][:sep_pos])
-                    sample_gt_right_list.append(sample_gt_list[i][sep_pos+1:])
-                if variant_id in tsi_list: xlib.Message.print('trace', f'sample_gt_list: {sample_gt_list}')
-
-                # set imputation in missing data
-                for i in range(sample_number):
-                    if sample_gt_left_list[i] == xlib.get_md_symbol() or sample_gt_right_list[i] == xlib.get_md_symbol():
-                        # get left
-                        sample_id = sample_info_list[i]
-                        impute_sample_gt_left_numeric = genotypes_per_sample_dict[sample_id]['first_genotype_list'][variants_per_seq_counter]
-                        impute_sample_gt_left_text = allele_code_list[int(impute_sample_gt_left_numeric) - 1]
-                        if impute_sample_gt_left_text == reference_bases:
-                            impute_sample_gt_left = '0'
-                        else:
-                            try:
-                                impute_sample_gt_left = str(alternative_allele_list.index(impute_sample_gt_left_text) + 1)
-                            except Exception:
-                                impute_sample_gt_left = '*'
-                        # get right
-                        impute_sample_gt_right_numeric = genotypes_per_sample_dict[sample_id]['second_genotype_list'][variants_per_seq_counter]
-                        impute_sample_gt_right_text = allele_code_list[int(impute_sample_gt_right_numeric) - 1]
-                        if impute_sample_gt_right_text == reference_bases:
-                            impute_sample_gt_right = '0'
-                        else:
-                            try:
-                                impute_sample_gt_right = str(alternative_allele_list.index(impute_sample_gt_right_text) + 1)
-                            except Exception:
-                                impute_sample_gt_right = '*'
-                        # oder
-                        impute_sample_gt_list = sorted([impute_sample_gt_left, impute_sample_gt_right])
-                        # save imputation
-                        sample_gt_left_list[i] = impute_sample_gt_list[0]
-                        sample_gt_right_list[i] = impute_sample_gt_list[1]
-
-                # rebuild the list of the field GT for every sample
-                for i in range(sample_number):
-                    sample_gt_list[i] = f'{sample_gt_left_list[i]}{sample_sep_list[i]}{sample_gt_right_list[i]}'
-
-                # rebuild the sample genotype data list and their corresponding record data
-                sample_list = []
-                for i in range(sample_number):
-                    sample_data_list[i][gt_position] = sample_gt_list[i]
-                    sample_list.append(':'.join(sample_data_list[i]))
-                if variant_id in tsi_list: xlib.Message.print('trace', f'(17) sample_gt_list: {sample_gt_list}')
-
-                # get the sample list as text
-                sample_list_text = '\t'.join(sample_list)
-
-                # # save data in the variants per sequence dictionary
-                # variants_per_seq_dict[variants_per_seq_counter] = {'chrom': data_dict['chrom'], 'pos': data_dict['pos'], 'id': data_dict['id'], 'ref': data_dict['ref'], 'alt': data_dict['alt'], 'qual': data_dict['qual'], 'filter': data_dict['filter'], 'info': data_dict['info'], 'format': data_dict['format'], 'sample_list_text': sample_list_text}
-
-                # write the variant record
-                sample_list_text = '\t'.join(sample_list)
-                output_vcf_file_id.write(f'{data_dict["chrom"]}\t{data_dict["pos"]}\t{data_dict["id"]}\t{data_dict["ref"]}\t{data_dict["alt"]}\t{data_dict["qual"]}\t{data_dict["filter"]}\t{data_dict["info"]}\t{data_dict["format"]}\t{sample_list_text}\n')
-
-                # add 1 to the variants per sequence counter
-                variants_per_seq_counter += 1
-
-                # read the next record of the VCF file with missing data
-                (record, _, data_dict) = xlib.read_vcf_file(input_vcf_file_id, sample_number)
-
-                # print the counters
-                xlib.Message.print('verbose', f'\rProcessed VCF records ... {record_counter:8d} - Seq ids ... {seq_id_counter:8d} - Variants ... {variant_counter:8d}')
+        # process variant records grouped by sequence identification (the fastPHASE file of the next sequence is read in background)
+        if record != '' and not record.startswith('##') and not record.startswith('#CHROM'):
+
+            with xgenotype.GenotypeBlockPrefetcher(xgenotype.read_fastphase_genotype_block) as genotype_block_prefetcher:
+
+                # get the first sequence identification and its variant records
+                seq_iterator = xlib.iter_vcf_sequence_variant_records(record, input_vcf_file_id)
+                (current_seq_id, seq_record_list) = next(seq_iterator, (None, []))
+
+                # while there are sequences
+                while current_seq_id is not None:
+
+                    # add 1 to the sequence identification counter
+                    seq_id_counter += 1
+
+                    # get the next sequence identification and its variant records and start reading its fastPHASE file
+                    (next_seq_id, next_seq_record_list) = next(seq_iterator, (None, []))
+                    if next_seq_id is not None:
+                        genotype_block_prefetcher.prefetch(get_fastphase_sequence_file(analysis_dir, prefix, next_seq_id))
+
+                    # get the genotype block of the sequence imputed by fastPHASE
+                    genotype_block = genotype_block_prefetcher.get(get_fastphase_sequence_file(analysis_dir, prefix, current_seq_id))
+
+                    # process variant records of the sequence identification
+                    for variants_per_seq_counter, record in enumerate(seq_record_list):
+
+                        # get the variant data dictionary
+                        data_dict = xlib.get_vcf_variant_data_dict(record)
+
+                        # add 1 to the VCF record counter
+                        record_counter += 1
+
+                        # add 1 to the total variant counter
+                        variant_counter += 1
+
+                        # set the current sequence identification
+                        seq_id = data_dict['chrom']
+
+                        # set the variant identification
+                        variant_id = f'{data_dict["chrom"]}-{data_dict["pos"]}'
+                        if seq_id in tsi_list: xlib.Message.print('trace', f'\n\n\nnvariant_id: {variant_id}')
+
+                        # get the reference bases (field REF) and alternative alleles (field ALT)
+                        reference_bases = data_dict['ref']
+                        alternative_alleles = data_dict['alt']
+                        if seq_id in tsi_list: xlib.Message.print('trace', f'reference_bases: {reference_bases}')
+                        if seq_id in tsi_list: xlib.Message.print('trace', f'alternative_alleles: {alternative_alleles}')
+
+                        # build the alternative allele list
+                        alternative_allele_list = alternative_alleles.split(',')
+                        if seq_id in tsi_list: xlib.Message.print('trace', f'alternative_allele_list: {alternative_allele_list}')
+
+                        # build the complete allele list
+                        complete_allele_list = [reference_bases] + alternative_allele_list
+                        if seq_id in tsi_list: xlib.Message.print('trace', f'complete_allele_list: {complete_allele_list}')
+
+                        # build the allele code list
+                        allele_code_list = ['A', 'T', 'C', 'G']
+                        for i in range(len(complete_allele_list)):
+                            if len(complete_allele_list[i]) > 1 and complete_allele_list[i] != xlib.get_md_symbol():
+                                allele_code_list.append(complete_allele_list[i].upper())
+                        if seq_id in tsi_list: xlib.Message.print('trace', f'allele_code_list: {allele_code_list}')
+
+                        # get the position of the genotype (subfield GT) in the field FORMAT
+                        format_subfield_list = data_dict['format'].upper().split(':')
+                        try:
+                            gt_position = format_subfield_list.index('GT')
+                        except Exception as e:
+                            raise xlib.ProgramException(e, 'L007', 'GT', data_dict['chrom'], data_dict['pos'])
+
+                        # build the list of sample genotypes of a variant
+                        sample_data_list = []
+                        sample_gt_list = []
+                        for i in range(sample_number):
+                            sample_data_list.append(data_dict['sample_list'][i].split(':'))
+                            sample_gt_list.append(sample_data_list[i][gt_position])
+                        if seq_id in tsi_list: xlib.Message.print('trace', f'sample_gt_list: {sample_gt_list}')
+
+                        # build the lists of the left and right side of sample genotypes of a variant
+                        sample_gt_left_list = []
+                        sample_sep_list = []
+                        sample_gt_right_list = []
+                        for i in range(sample_number):
+                            sep = '/'
+                            sep_pos = sample_gt_list[i].find(sep)
+                            if sep_pos == -1:
+                                sep = '|'
+                                sep_pos = sample_gt_list[i].find(sep)
+                            if sep_pos == -1:
+                                raise xlib.ProgramException('', 'L008', 'GT', data_dict['chrom'], data_dict['pos'])
+                            sample_sep_list.append(sep)
+                            sample_gt_left_list.append(sample_gt_list[i][:sep_pos])
+                            sample_gt_right_list.append(sample_gt_list[i][sep_pos+1:])
+                        if variant_id in tsi_list: xlib.Message.print('trace', f'sample_gt_list: {sample_gt_list}')
+
+                        # set imputation in missing data
+                        for i in range(sample_number):
+                            if sample_gt_left_list[i] == xlib.get_md_symbol() or sample_gt_right_list[i] == xlib.get_md_symbol():
+                                # get left
+                                sample_id = sample_info_list[i]
+                                sample_index = genotype_block['sample_index_dict'][sample_id]
+                                impute_sample_gt_left_numeric = genotype_block['genotype_array'][sample_index, 0, variants_per_seq_counter]
+                                impute_sample_gt_left_text = allele_code_list[int(impute_sample_gt_left_numeric) - 1]
+                                if impute_sample_gt_left_text == reference_bases:
+                                    impute_sample_gt_left = '0'
+                                else:
+                                    try:
+                                        impute_sample_gt_left = str(alternative_allele_list.index(impute_sample_gt_left_text) + 1)
+                                    except Exception:
+                                        impute_sample_gt_left = '*'
+                                # get right
+                                impute_sample_gt_right_numeric = genotype_block['genotype_array'][sample_index, 1, variants_per_seq_counter]
+                                impute_sample_gt_right_text = allele_code_list[int(impute_sample_gt_right_numeric) - 1]
+                                if impute_sample_gt_right_text == reference_bases:
+                                    impute_sample_gt_right = '0'
+                                else:
+                                    try:
+                                        impute_sample_gt_right = str(alternative_allele_list.index(impute_sample_gt_right_text) + 1)
+                                    except Exception:
+                                        impute_sample_gt_right = '*'
+                                # oder
+                                impute_sample_gt_list = sorted([impute_sample_gt_left, impute_sample_gt_right])
+                                # save imputation
+                                sample_gt_left_list[i] = impute_sample_gt_list[0]
+                                sample_gt_right_list[i] = impute_sample_gt_list[1]
+
+                        # rebuild the list of the field GT for every sample
+                        for i in range(sample_number):
+                            sample_gt_list[i] = f'{sample_gt_left_list[i]}{sample_sep_list[i]}{sample_gt_right_list[i]}'
+
+                        # rebuild the sample genotype data list and their corresponding record data
+                        sample_list = []
+                        for i in range(sample_number):
+                            sample_data_list[i][gt_position] = sample_gt_list[i]
+                            sample_list.append(':'.join(sample_data_list[i]))
+                        if variant_id in tsi_list: xlib.Message.print('trace', f'(17) sample_gt_list: {sample_gt_list}')
+
+                        # get the sample list as text
+                        sample_list_text = '\t'.join(sample_list)
+
+                        # # save data in the variants per sequence dictionary
+                        # variants_per_seq_dict[variants_per_seq_counter] = {'chrom': data_dict['chrom'], 'pos': data_dict['pos'], 'id': data_dict['id'], 'ref': data_dict['ref'], 'alt': data_dict['alt'], 'qual': data_dict['qual'], 'filter': data_dict['filter'], 'info': data_dict['info'], 'format': data_dict['format'], 'sample_list_text': sample_list_text}
+
+                        # write the variant record
+                        sample_list_text = '\t'.join(sample_list)
+                        output_vcf_file_id.write(f'{data_dict["chrom"]}\t{data_dict["pos"]}\t{data_dict["id"]}\t{data_dict["ref"]}\t{data_dict["alt"]}\t{data_dict["qual"]}\t{data_dict["filter"]}\t{data_dict["info"]}\t{data_dict["format"]}\t{sample_list_text}\n')
+
+                        # print the counters
+                        xlib.Message.print('verbose', f'\rProcessed VCF records ... {record_counter:8d} - Seq ids ... {seq_id_counter:8d} - Variants ... {variant_counter:8d}')
+
+                    # release the genotype block and go to the next sequence
+                    genotype_block = None
+                    (current_seq_id, seq_record_list) = (next_seq_id, next_seq_record_list)
+
+            # all the records of the VCF file with missing data have been read
+            record = ''
 
     xlib.Message.print('verbose', '\n')
 
@@ -375,69 +389,12 @@ def update_vcf_with_fastphase_analysis(input_vcf_file, output_vcf_file, analysis
 
 #-------------------------------------------------------------------------------
 
-def get_genotypes_per_sample_dict(analysis_dir, prefix, seq_id):
+def get_fastphase_sequence_file(analysis_dir, prefix, seq_id):
     '''
-    Get the genotypes per sample dictionary from imputated sequence by fastPHASE.
+    Get the path of the fastPHASE analysis file of a sequence.
     '''
 
-    # set the path of que fastPHASE analysis file
-    fastphase_sequence_file = f'{analysis_dir}{os.sep}{prefix}-{seq_id}_hapguess_switch.out'
-
-    # initialize the genotypes per sample dictionary
-    genotypes_per_sample_dict = xlib.NestedDefaultDict()
-
-    # open the fastPHASE sequence file
-    if fastphase_sequence_file.endswith('.gz'):
-        try:
-            fastphase_sequence_file_id = gzip.open(fastphase_sequence_file, mode='rt', encoding='iso-8859-1')
-        except Exception as e:
-            raise xlib.ProgramException(e, 'F002', fastphase_sequence_file)
-    else:
-        try:
-            fastphase_sequence_file_id = open(fastphase_sequence_file, mode='r', encoding='iso-8859-1')
-        except Exception as e:
-            raise xlib.ProgramException(e, 'F001', fastphase_sequence_file)
-
-    # read the first record of the fastPHASE sequence file
-    record = fastphase_sequence_file_id.readline()
-
-    # while there are records in the fastPHASE sequence file
-    while record != '':
-
-        while record != '' and not record.strip().startswith('#'):
-
-            # read the next record of the fastPHASE sequence file
-            record = fastphase_sequence_file_id.readline()
-
-        while record != '' and record.strip().startswith('#'):
-
-            sample_id = record.strip()[1:]
-
-            # read the next record of the fastPHASE sequence file (first genotypes line)
-            record = fastphase_sequence_file_id.readline()
-
-            # get the first genotype list
-            first_genotype_list = record.strip().split(' ')
-
-            # read the next record of the PHASE fastPHASE sequence file (second genotypes line)
-            record = fastphase_sequence_file_id.readline()
-
-            # get the second genotypes list and join with the firts genotype list
-            second_genotype_list = record.strip().split(' ')
-
-            # add genotypes lists to the the genotypes per sample dictionary
-            genotypes_per_sample_dict[sample_id] = {'first_genotype_list': first_genotype_list, 'second_genotype_list': second_genotype_list}
-
-            # read the next record of the fastPHASE sequence file
-            record = fastphase_sequence_file_id.readline()
-
-    xlib.Message.print('verbose', '\n')
-
-    # close the fastPHASE sequence file
-    fastphase_sequence_file_id.close()
-
-    # return the genotypes per sample dictionary
-    return genotypes_per_sample_dict
+    return f'{analysis_dir}{os.sep}{prefix}-{seq_id}_hapguess_switch.out'
 
 #-------------------------------------------------------------------------------
 
@@ -31,10 +31,16 @@ import gzip
 import os
 import sys
 
+import xgenotype
 import xlib
 
 #-------------------------------------------------------------------------------
 
+# import heavy modules when they are used for the first time
+np = xlib.LazyModule('numpy')
+
+#-------------------------------------------------------------------------------
+
 def main():
     '''
     Main line of the program.
@@ -154,11 +160,17 @@ def update_vcf_with_mach_analysis(md_vcf_file, imputed_vcf_file, analysis_file,
     Update the missing data in a VCF file with the results of an analysis performed using MACH.
     '''
 
-    # get the variant identification list of the analysis
+    # get the variant identification list of the analysis and build the variant index dictionary (the first position of every variant identification)
     analysis_variant_id_list = get_variant_id_list(variant_file)
+    analysis_variant_index_dict = {}
+    for i, variant_id in enumerate(analysis_variant_id_list):
+        analysis_variant_index_dict.setdefault(variant_id, i)
 
     # get the genotype data of the analysis
-    (analysis_sample_list, allele_matrix) = get_genotype_data(analysis_file)
+    analysis_genotype_data_dict = xgenotype.read_mach_genotype_data(analysis_file)
+    analysis_sample_list = analysis_genotype_data_dict['sample_id_list']
+    analysis_sample_index_dict = analysis_genotype_data_dict['sample_index_dict']
+    allele_matrix = analysis_genotype_data_dict['allele_matrix']
 
     # initialize the sample number in the VCF file with missing data
     md_vcf_sample_number = 0
@@ -307,7 +319,7 @@ def update_vcf_with_mach_analysis(md_vcf_file, imputed_vcf_file, analysis_file,
             if variant_id in tsi_list: xlib.Message.print('trace', f'sample_gt_list: {sample_gt_list}')
 
             # get the position of the variant identification in the variant identification list of the analysis
-            variant_pos = analysis_variant_id_list.index(variant_id)
+            variant_pos = analysis_variant_index_dict[variant_id]
 
             # get the analysis genotype list
             (analysis_gt_left_list, analysis_gt_right_list) = get_analysis_gt_lists(allele_matrix, variant_pos, reference_bases, alternative_allele_list, len(analysis_sample_list))
@@ -318,7 +330,7 @@ def update_vcf_with_mach_analysis(md_vcf_file, imputed_vcf_file, analysis_file,
                     # -- sample_gt_left_list[i] = analysis_gt_left_list[i]
                     # -- sample_gt_right_list[i] = analysis_gt_right_list[i]
                     current_sample = md_vcf_sample_list[i]
-                    j = analysis_sample_list.index(current_sample)
+                    j = analysis_sample_index_dict[current_sample]
                     sample_gt_left_list[i] = analysis_gt_left_list[j]
                     sample_gt_right_list[i] = analysis_gt_right_list[j]
 
@@ -354,86 +366,6 @@ def update_vcf_with_mach_analysis(md_vcf_file, imputed_vcf_file, analysis_file,
 
 #-------------------------------------------------------------------------------
 
-def get_genotype_data(analysis_file):
-    '''
-    Get the genotype data (sample identification list and genotype matrix).
-    '''
-
-    # initialize the sample identification list
-    sample_id_list = []
-
-    # initialize the allele matrix (rows: samples (two row per sample); columns: variants)
-    allele_matrix = []
-    col_number = 0
-
-    # open the analysis file
-    if analysis_file.endswith('.gz'):
-        try:
-            analysis_file_id = gzip.open(analysis_file, mode='rt', encoding='iso-8859-1')
-        except Exception as e:
-            raise xlib.ProgramException(e, 'F002', analysis_file)
-    else:
-        try:
-            analysis_file_id = open(analysis_file, mode='r', encoding='iso-8859-1')
-        except Exception as e:
-            raise xlib.ProgramException(e, 'F001', analysis_file)
-
-    # initialize analysis record counter
-    analysis_record_counter = 0
-
-    # read first record
-    record = analysis_file_id.readline()
-
-    # while there are records in the analysis file
-    while record != '':
-
-        # add 1 to the analysis record counter
-        analysis_record_counter += 1
-
-        # split the record data
-        record_data_list = []
-        start = 0
-        for end in [i for i, chr in enumerate(record) if chr == ' ']:
-            record_data_list.append(record[start:end].strip())
-            start = end + 1
-        record_data_list.append(record[start:].strip('\n').strip())
-
-        # check if there are 3 data
-        if len(record_data_list) != 3:
-            raise xlib.ProgramException('', 'L014')
-
-        # add the sample identification to the list
-        if analysis_record_counter % 2 != 0:
-            greater_than_pos =  record_data_list[0].find('>')
-            sample_id = record_data_list[0][:greater_than_pos - 1]
-            sample_id_list.append(sample_id)
-
-        # get the allele list
-        allele_list = list(record_data_list[2])
-
-        # set and verify the column number
-        if col_number == 0:
-            col_number = len(allele_list)
-        elif col_number != len(allele_list):
-            raise xlib.ProgramException('', 'L014')
-
-        # append allele list to allele matrix
-        allele_matrix.append(allele_list)
-
-        # print the input record counter
-        xlib.Message.print('verbose', f'\rProcessed analysis records ... {analysis_record_counter:8d}')
-
-        # read next record
-        record = analysis_file_id.readline()
-
-    # close the analysis file
-    analysis_file_id.close()
-
-    # return the sample identification list and allele matrix
-    return sample_id_list, allele_matrix
-
-#-------------------------------------------------------------------------------
-
 def get_variant_id_list(variant_file):
     '''
     Get the variant identification list.
@@ -499,37 +431,23 @@ def get_analysis_gt_lists(allele_matrix, variant_pos, reference_bases, alternati
     Get the genotype list of a varint from the analysis data.
     '''
 
-    # initialize the analysis genotype lists
-    analysis_gt_left_list = []
-    analysis_gt_right_list = []
-
-    # build the analysis genotype list
-    for i in range(sample_number):
-
-        # the first allele
-        allele_base_1 = allele_matrix[i * 2][variant_pos]
-        if allele_base_1.upper() == reference_bases:
-            allele_1 = '0'
-        elif allele_base_1.upper() == alternative_allele_list[0]:
-            allele_1 = '1'
-        else:
-            allele_1 = '*'
-
-        # the second allele
-        allele_base_2 = allele_matrix[i * 2 + 1][variant_pos]
-        if allele_base_2.upper() == reference_bases:
-            allele_2 = '0'
-        elif allele_base_2.upper() == alternative_allele_list[0]:
-            allele_2 = '1'
-        else:
-            allele_2 = '*'
-
-        # sort the alleles
-        allele_list = sorted([allele_1, allele_2])
-
-        # add genotype to list
-        analysis_gt_left_list.append(f'{allele_list[0]}')
-        analysis_gt_right_list.append(f'{allele_list[1]}')
+    # get the allele codes of the variant (rows: samples (two row per sample))
+    allele_base_array = allele_matrix[:sample_number * 2, variant_pos]
+
+    # set the alleles: 0 (reference bases), 1 (first alternative allele) or -1 (other bases)
+    # (the alleles of the allele matrix are one character, so they can only be equal to bases of one character)
+    allele_array = np.full(len(allele_base_array), -1, dtype=np.int8)
+    if len(alternative_allele_list[0]) == 1:
+        allele_array[allele_base_array == ord(alternative_allele_list[0])] = 1
+    if len(reference_bases) == 1:
+        allele_array[allele_base_array == ord(reference_bases)] = 0
+
+    # sort the alleles of every sample ("*" is sorted before "0" and "1")
+    allele_1_array = allele_array[0::2]
+    allele_2_array = allele_array[1::2]
+    allele_text_array = np.array(['0', '1', '*'])
+    analysis_gt_left_list = allele_text_array[np.minimum(allele_1_array, allele_2_array)].tolist()
+    analysis_gt_right_list = allele_text_array[np.maximum(allele_1_array, allele_2_array)].tolist()
 
     # return the analysis genotype list
     return analysis_gt_left_list, analysis_gt_right_list
@@ -417,12 +417,7 @@ def read_analysis_file(analysis_file_id):
     if record != '':
 
         # split the record data
-        record_data_list = []
-        start = 0
-        for end in [i for i, chr in enumerate(record) if chr == '\t']:
-            record_data_list.append(record[start:end].strip())
-            start = end + 1
-        record_data_list.append(record[start:].strip('\n').strip())
+        record_data_list = [datum.strip() for datum in record.rstrip('\n').split('\t')]
 
         # extract data from the record
         hyphen_pos = record_data_list[0].find('-')
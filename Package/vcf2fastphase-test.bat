@@ -49,6 +49,7 @@ rem Run the program vcf2fastphase.py
 %PYTHON% %PYTHON_OPTIONS% vcf2fastphase.py ^
     --vcf=%DATA_DIR%\test-SUBERINTRO-AL-B-wmd.vcf ^
     --outdir=%OUTPUT_DIR%\vcf2fastphase ^
+    --metrics=NONE ^
     --verbose=Y ^
     --trace=N ^
     --tsi=NONE
@@ -51,6 +51,8 @@ rem Run the program vcf2mach.py
     --dat=%OUTPUT_DIR%\test-SUBERINTRO-AL-J-wmd.dat ^
     --ped=%OUTPUT_DIR%\test-SUBERINTRO-AL-J-wmd.ped ^
     --mdc=. ^
+    --memmap=NONE ^
+    --metrics=NONE ^
     --verbose=Y ^
     --trace=N ^
     --tvi=NONE
@@ -49,6 +49,8 @@ cd $NGSHELPER_DIR
         --dat=$OUTPUT_DIR/test-SUBERINTRO-AL-J-wmd.dat \
         --ped=$OUTPUT_DIR/test-SUBERINTRO-AL-J-wmd.ped \
         --mdc=. \
+        --memmap=NONE \
+        --metrics=NONE \
         --verbose=Y \
         --trace=N \
         --tvi=NONE
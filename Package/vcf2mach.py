@@ -29,10 +29,16 @@ import gzip
 import os
 import sys
 
+import xgenotype
 import xlib
 
 #-------------------------------------------------------------------------------
 
+# import heavy modules when they are used for the first time
+np = xlib.LazyModule('numpy')
+
+#-------------------------------------------------------------------------------
+
 def main():
     '''
     Main line of the program.
@@ -46,8 +52,11 @@ def main():
     args = parser.parse_args()
     check_args(args)
 
-    # convert the VCF file to files (.dat & .ped) used by MACH
-    convert_vcf_to_mach(args.vcf_file, args.dat_file, args.ped_file, args.md_characters, args.tvi_list)
+    # measure the run metrics (the report is written when the run ends)
+    with xlib.Metrics.run(args.metrics_file):
+
+        # convert the VCF file to files (.dat & .ped) used by MACH
+        convert_vcf_to_mach(args.vcf_file, args.dat_file, args.ped_file, args.md_characters, args.memmap_dir, args.tvi_list)
 
 #-------------------------------------------------------------------------------
 
@@ -57,7 +66,8 @@ def build_parser():
     '''
 
     # create the parser and add arguments
-    description = 'Description: This program converts a VCF file to files (.dat & .ped) used by MACH.'
+    description = 'Description: This program converts a VCF file to files (.dat & .ped) used by MACH.\n' \
+        f'Allele indexes of genotypes (subfield GT) greater than {xlib.Const.GT_MAX_ALLELE_CODE} are not supported.'
     text = f'{xlib.get_project_name()} v{xlib.get_project_version()} - {os.path.basename(__file__)}\n\n{description}\n'
     usage = f'\r{text.ljust(len("usage:"))}\nUsage: {os.path.basename(__file__)} arguments'
     parser = argparse.ArgumentParser(usage=usage)
@@ -66,6 +76,8 @@ def build_parser():
     parser.add_argument('--dat', dest='dat_file', help='Path of the output file .dat (mandatory).')
     parser.add_argument('--ped', dest='ped_file', help='Path of the output file .ped (mandatory).')
     parser.add_argument('--mdc', dest='md_characters', help='Characters representing missing data (mandatory).')
+    parser.add_argument('--memmap', dest='memmap_dir', help='Directory where the genotype matrix is stored in disk-backed files or NONE (genotype matrix in memory); default: NONE.')
+    parser.add_argument('--metrics', dest='metrics_file', help='Path of the output JSON file with the run metrics (elapsed time, throughput of stages and peak memory) or NONE; default: NONE.')
     parser.add_argument('--verbose', dest='verbose', help=f'Additional job status info during the run: {xlib.get_verbose_code_list_text()}; default: {xlib.Const.DEFAULT_VERBOSE}.')
     parser.add_argument('--trace', dest='trace', help=f'Additional info useful to the developer team: {xlib.get_trace_code_list_text()}; default: {xlib.Const.DEFAULT_TRACE}.')
     parser.add_argument('--tvi', dest='tvi_list', help='Variant identification list to trace with format seq_id_1-pos_1,seq_id_2-pos_2,...,seq_id_n-pos_n or NONE; default: NONE.')
@@ -106,6 +118,17 @@ def check_args(args):
         xlib.Message.print('error', '*** Characters representing missing data are not indicated in the input arguments.')
         OK = False
 
+    # check "memmap_dir"
+    if args.memmap_dir is None or args.memmap_dir.upper() == 'NONE':
+        args.memmap_dir = None
+    elif not os.path.isdir(args.memmap_dir):
+        xlib.Message.print('error', f'*** The directory {args.memmap_dir} does not exist.')
+        OK = False
+
+    # check "metrics_file"
+    if args.metrics_file is None or args.metrics_file.upper() == 'NONE':
+        args.metrics_file = None
+
     # check "verbose"
     if args.verbose is None:
         args.verbose = xlib.Const.DEFAULT_VERBOSE
@@ -136,7 +159,7 @@ def check_args(args):
 
 #-------------------------------------------------------------------------------
 
-def convert_vcf_to_mach(vcf_file, dat_file, ped_file, md_characters, tvi_list):
+def convert_vcf_to_mach(vcf_file, dat_file, ped_file, md_characters, memmap_dir, tvi_list):
     '''
     Converts a VCF file to files (.dat & .ped) used by MACH.
     '''
@@ -144,146 +167,39 @@ def convert_vcf_to_mach(vcf_file, dat_file, ped_file, md_characters, tvi_list):
     # initialize the variant identification list
     variant_id_list = []
 
-    # initialize the matrices (rows: variants; columns: samples) on left and right sides of genotypes
-    gt_left_matrix = []
-    gt_right_matrix = []
+    # initialize the list of distinct genotype text lists (index: left code * 3 + right code; codes: 0 - missing data, 1 - reference, 2 - alternative),
+    # its dictionary (key: reference and alternative alleles; value: index in the list) and the index list of each variant
+    gt_text_list = []
+    gt_text_index_dict = {}
+    variant_gt_text_index_list = []
 
-    # open the VCF file
-    if vcf_file.endswith('.gz'):
-        try:
-            vcf_file_id = gzip.open(vcf_file, mode='rt', encoding='iso-8859-1')
-        except Exception as e:
-            raise xlib.ProgramException(e, 'F002', vcf_file)
-    else:
-        try:
-            vcf_file_id = open(vcf_file, mode='r', encoding='iso-8859-1')
-        except Exception as e:
-            raise xlib.ProgramException(e, 'F001', vcf_file)
-
-    # initialize counters
-    record_counter = 0
-    variant_counter = 0
-
-    # read the first record of VCF file
-    (record, _, data_dict) = xlib.read_vcf_file(vcf_file_id, sample_number=0, check_sample_number=False)
-
-    # while there are records in the VCF file
-    while record != '':
-
-        # process metadata records
-        while record != '' and record.startswith('##'):
-
-            # add 1 to the VCF record counter
-            record_counter += 1
-
-            # print the counters
-            xlib.Message.print('verbose', f'\rProcessed VCF records ... {record_counter:8d} - Variants ... {variant_counter:8d}')
-
-            # read the next record of the VCF file
-            (record, _, data_dict) = xlib.read_vcf_file(vcf_file_id, sample_number=0, check_sample_number=False)
-
-        # process the column description record
-        if record.startswith('#CHROM'):
-
-            # add 1 to the VCF record counter
-            record_counter += 1
-
-            # get the sample list
-            sample_list = record.strip().split('\t')[9:]
-
-            # get the sample number
-            sample_number = len(sample_list)
-
-            # print the counters
-            xlib.Message.print('verbose', f'\rProcessed VCF records ... {record_counter:8d} - Variants ... {variant_counter:8d}')
-
-            # read the next record of the VCF file
-            (record, _, data_dict) = xlib.read_vcf_file(vcf_file_id, sample_number=0, check_sample_number=False)
-
-        # process variant records
-        while record != '' and not record.startswith('##') and not record.startswith('#CHROM'):
-
-            # add 1 to the VCF record counter
-            record_counter += 1
-
-            # add 1 to the variant counter
-            variant_counter += 1
-
-            # set the variant identification and append it to the variant identification list
-            variant_id = f'{data_dict["chrom"]}-{data_dict["pos"]:0>8}'
-            variant_id_list.append(variant_id)
-
-            # get the reference bases (field REF) and alternative alleles (field ALT)
-            reference_bases = data_dict['ref']
-            alternative_alleles = data_dict['alt']
-
-            # build the alternative alleles list from field ALT
-            alternative_allele_list = alternative_alleles.split(',')
-
-            # check if the variant has more than one alternative allele
-            if len(alternative_allele_list) > 1:
-                raise xlib.ProgramException('', 'L021', variant_id) from None
-
-            # get the position of the genotype (subfield GT) in the field FORMAT
-            format_subfield_list = data_dict['format'].upper().split(':')
-            try:
-                gt_position = format_subfield_list.index('GT')
-            except Exception as e:
-                raise xlib.ProgramException(e, 'L007', 'GT', data_dict['chrom'], data_dict['pos'])
-
-            # build the list of sample genotypes of a variant
-            sample_data_list = []
-            sample_gt_list = []
-            for i in range(sample_number):
-                sample_data_list.append(data_dict['sample_list'][i].split(':'))
-                sample_gt_list.append(sample_data_list[i][gt_position])
-            if variant_id in tvi_list: xlib.Message.print('trace', f'(4) sample_gt_list: {sample_gt_list}')
-
-            # build the lists of the left and right side of sample genotypes of a variant
-            sample_gt_left_list = []
-            sample_gt_right_list = []
-            for i in range(sample_number):
-                sep = '/'
-                sep_pos = sample_gt_list[i].find(sep)
-                if sep_pos == -1:
-                    sep = '|'
-                    sep_pos = sample_gt_list[i].find(sep)
-                if sep_pos == -1:
-                    raise xlib.ProgramException('', 'L008', 'GT', data_dict['chrom'], data_dict['pos'])
-                try:
-                    # left
-                    sample_gt_left = sample_gt_list[i][:sep_pos]
-                    if sample_gt_left == xlib.get_md_symbol():
-                        sample_gt_left_list.append(md_characters)
-                    elif sample_gt_left == '0':
-                        sample_gt_left_list.append(reference_bases)
-                    else:
-                        sample_gt_left_list.append(alternative_allele_list[0])
-                    # right
-                    sample_gt_right = sample_gt_list[i][sep_pos+1:]
-                    if sample_gt_right == xlib.get_md_symbol():
-                        sample_gt_right_list.append(md_characters)
-                    elif sample_gt_right == '0':
-                        sample_gt_right_list.append(reference_bases)
-                    else:
-                        sample_gt_right_list.append(alternative_allele_list[0])
-                except Exception as e:
-                    raise xlib.ProgramException(e, 'L008', 'GT', data_dict['chrom'], data_dict['pos'])
-
-            # append a row to the matrices (rows: variant; columns: samples) of left and right sides of genotypes
-            gt_left_matrix.append(sample_gt_left_list)
-            gt_right_matrix.append(sample_gt_right_list)
-
-            # print the counters
-            xlib.Message.print('verbose', f'\rProcessed VCF records ... {record_counter:8d} - Variants ... {variant_counter:8d}')
-
-            # read the next record of the VCF file
-            (record, _, data_dict) = xlib.read_vcf_file(vcf_file_id, sample_number=0, check_sample_number=False)
-
-    xlib.Message.print('verbose', '\n')
-
-    # close the VCF file
-    vcf_file_id.close()
+    # read the VCF file and get its genotype data
+    genotype_data = xgenotype.read_genotype_data(vcf_file, None, memmap_dir, tvi_list)
+    genotype_matrix = genotype_data['genotype_matrix']
+    sample_list = genotype_data['sample_id_list']
+
+    # for each variant
+    for (chrom, pos, reference_bases, alternative_alleles) in genotype_data['variant_data_list']:
+
+        # set the variant identification and append it to the variant identification list
+        variant_id = f'{chrom}-{pos:0>8}'
+        variant_id_list.append(variant_id)
+
+        # build the alternative alleles list from field ALT
+        alternative_allele_list = alternative_alleles.split(',')
+
+        # check if the variant has more than one alternative allele
+        if len(alternative_allele_list) > 1:
+            raise xlib.ProgramException('', 'L021', variant_id) from None
+
+        # append the index of the genotype texts of the variant
+        gt_text_index = gt_text_index_dict.get((reference_bases, alternative_allele_list[0]))
+        if gt_text_index is None:
+            allele_text_list = [md_characters, reference_bases, alternative_allele_list[0]]
+            gt_text_list.append([f'{left}/{right}' for left in allele_text_list for right in allele_text_list])
+            gt_text_index = len(gt_text_list) - 1
+            gt_text_index_dict[(reference_bases, alternative_allele_list[0])] = gt_text_index
+        variant_gt_text_index_list.append(gt_text_index)
 
     # open the output file (.dat)
     if dat_file.endswith('.gz'):
@@ -319,21 +235,34 @@ def convert_vcf_to_mach(vcf_file, dat_file, ped_file, md_characters, tvi_list):
         except Exception as e:
             raise xlib.ProgramException(e, 'F003', ped_file)
 
-    # write sample records
-    for i in range(sample_number):
+    # build the lookup table from genotype codes to MACH allele codes (0: missing data, 1: reference, 2: alternative)
+    lut_array = np.full(xlib.Const.GT_MAX_ALLELE_CODE + xlib.Const.GT_CODE_OFFSET + 1, 2, dtype=np.intp)
+    lut_array[xlib.Const.GT_MD_CODE + xlib.Const.GT_CODE_OFFSET] = 0
+    lut_array[xlib.Const.GT_CODE_OFFSET] = 1
 
-        # build left and right side lists of variants of a sample
-        sample_variant_gt_list = []
-        for j in range(len(gt_left_matrix)):    #pylint: disable=consider-using-enumerate
-            sample_variant_gt_list.append(f'{gt_left_matrix[j][i]}/{gt_right_matrix[j][i]}')
+    # build the matrix of distinct genotype texts (rows: reference and alternative alleles; columns: left code * 3 + right code)
+    gt_text_matrix = np.array(gt_text_list, dtype=object).reshape(len(gt_text_list), 9)
+    variant_gt_text_index_array = np.array(variant_gt_text_index_list, dtype=np.intp)[np.newaxis, :]
 
-        # write the sample record
-        sample_variant_gt_left_list_text = '\t'.join(sample_variant_gt_list)
-        ped_file_id.write(f'{sample_list[i]}\t{sample_list[i]}\t0\t0\t2\t{sample_variant_gt_left_list_text}\n')
+    # write sample records by blocks of samples (rows: samples; columns: variants)
+    with xlib.Metrics.stage('write MACH file .ped') as stage:
+        for (first_sample, gt_left_block, gt_right_block) in genotype_matrix.iter_sample_blocks():
+            gt_index_block = lut_array[gt_left_block.astype(np.intp) + xlib.Const.GT_CODE_OFFSET] * 3 + lut_array[gt_right_block.astype(np.intp) + xlib.Const.GT_CODE_OFFSET]
+            gt_text_block = gt_text_matrix[variant_gt_text_index_array, gt_index_block]
+            for i in range(gt_left_block.shape[0]):
+                sample_id = sample_list[first_sample + i]
+                sample_variant_gt_list_text = '\t'.join(gt_text_block[i].tolist())
+                ped_file_id.write(f'{sample_id}\t{sample_id}\t0\t0\t2\t{sample_variant_gt_list_text}\n')
+
+        # add the samples written to the stage counters
+        stage.add(records=len(sample_list))
 
     # close file .ped
     ped_file_id.close()
 
+    # release the genotype data
+    xgenotype.release_genotype_data(genotype_data)
+
     # print OK message
     xlib.Message.print('info', f'The converted file {os.path.basename(ped_file)} is created.')
 
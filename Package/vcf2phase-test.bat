@@ -55,6 +55,7 @@ rem Run the program vcf2phase.py
     --hyb_id=HY ^
     --imd_id=99 ^
     --outdir=%OUTPUT_DIR%\vcf2phase ^
+    --metrics=NONE ^
     --verbose=Y ^
     --trace=N ^
     --tsi=NONE
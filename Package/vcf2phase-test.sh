@@ -52,6 +52,7 @@ cd $NGSHELPER_DIR
         --hyb_id=HY \
         --imd_id=99 \
         --outdir=$OUTPUT_DIR/vcf2phase \
+        --metrics=NONE \
         --verbose=Y \
         --trace=N \
         --tsi=NONE
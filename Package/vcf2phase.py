@@ -29,6 +29,7 @@ import gzip
 import os
 import sys
 
+import xgenotype
 import xlib
 
 #-------------------------------------------------------------------------------
@@ -46,11 +47,16 @@ def main():
     args = parser.parse_args()
     check_args(args)
 
-    # get variant dictionary
-    variant_dict = get_variant_dict(args.variant_file)
+    # measure the run metrics (the report is written when the run ends)
+    with xlib.Metrics.run(args.metrics_file):
 
-    # convert the VCF file to the PHASE input format
-    convert_vcf_to_phase_input(args.vcf_file, variant_dict, args.sample_file, args.sp1_id, args.sp2_id, args.hybrid_id, args.imputed_md_id, args.output_dir, args.tsi_list)
+        # get variant dictionary
+        variant_dict = get_variant_dict(args.variant_file)
+
+        # convert the VCF file to the PHASE input format
+        with xlib.Metrics.stage('convert to PHASE input format') as stage:
+            record_counter = convert_vcf_to_phase_input(args.vcf_file, variant_dict, args.sample_file, args.sp1_id, args.sp2_id, args.hybrid_id, args.imputed_md_id, args.output_dir, args.tsi_list)
+            stage.add(records=record_counter, bytes_number=os.path.getsize(args.vcf_file))
 
 #-------------------------------------------------------------------------------
 
@@ -60,7 +66,8 @@ def build_parser():
     '''
 
     # create the parser and add arguments
-    description = 'Description: This program converts a VCF file to the PHASE input format.'
+    description = 'Description: This program converts a VCF file to the PHASE input format.\n' \
+        f'Allele indexes of genotypes (subfield GT) greater than {xlib.Const.GT_MAX_ALLELE_CODE} are not supported.'
     text = f'{xlib.get_project_name()} v{xlib.get_project_version()} - {os.path.basename(__file__)}\n\n{description}\n'
     usage = f'\r{text.ljust(len("usage:"))}\nUsage: {os.path.basename(__file__)} arguments'
     parser = argparse.ArgumentParser(usage=usage)
@@ -73,6 +80,7 @@ def build_parser():
     parser.add_argument('--hyb_id', dest='hybrid_id', help='Identification of the hybrid or NONE; default NONE.')
     parser.add_argument('--imd_id', dest='imputed_md_id', help=f'Identification of the alternative allele for imputed missing data; default {xlib.Const.DEFAULT_IMPUTED_MD_ID}')
     parser.add_argument('--outdir', dest='output_dir', help='Path of output directoty where files for PHASE application are saved (mandatory).')
+    parser.add_argument('--metrics', dest='metrics_file', help='Path of the output JSON file with the run metrics (elapsed time, throughput of stages and peak memory) or NONE; default: NONE.')
     parser.add_argument('--verbose', dest='verbose', help=f'Additional job status info during the run: {xlib.get_verbose_code_list_text()}; default: {xlib.Const.DEFAULT_VERBOSE}.')
     parser.add_argument('--trace', dest='trace', help=f'Additional info useful to the developer team: {xlib.get_trace_code_list_text()}; default: {xlib.Const.DEFAULT_TRACE}.')
     parser.add_argument('--tsi', dest='tsi_list', help='Sequence identification list to trace with format seq_id,seq_id_2,...,seq_id or NONE; default: NONE.')
@@ -139,6 +147,10 @@ def check_args(args):
         xlib.Message.print('error', '*** The output directy does not exist.')
         OK = False
 
+    # check "metrics_file"
+    if args.metrics_file is None or args.metrics_file.upper() == 'NONE':
+        args.metrics_file = None
+
     # check "verbose"
     if args.verbose is None:
         args.verbose = xlib.Const.DEFAULT_VERBOSE
@@ -171,7 +183,7 @@ def check_args(args):
 
 def convert_vcf_to_phase_input(vcf_file, variant_dict, sample_file, sp1_id, sp2_id, hybrid_id, imputed_md_id, output_dir, tsi_list):
     '''
-    Convert a VCF file to the PHASE input format.
+    Convert a VCF file to the PHASE input format and return the number of records read.
     '''
 
     xlib.Message.print('trace', f'variant_dict: {variant_dict}')
@@ -261,6 +273,9 @@ def convert_vcf_to_phase_input(vcf_file, variant_dict, sample_file, sp1_id, sp2_
             # set the sample number
             sample_number = len(species_id_list)
 
+            # create the genotype parser
+            genotype_parser = xgenotype.GenotypeParser(sample_number, imputed_md_id)
+
             # print the counters
             xlib.Message.print('verbose', f'\rProcessed VCF records ... {record_counter:8d} - Genes/fragments ... {gene_fragment_counter:8d} - Variants ... {variant_counter:8d}')
 
@@ -285,12 +300,11 @@ def convert_vcf_to_phase_input(vcf_file, variant_dict, sample_file, sp1_id, sp2_
             # initialize the list of variant positions
             variant_position_list = []
 
-            # initialize the matrix of allele codes (rows: variants; columns: allele code list of each variant)
-            allele_code_matrix = []
+            # initialize the list of lookup tables from genotype codes to PHASE allele codes (rows: variants; columns: genotype codes)
+            lut_array_list = []
 
-            # initialize the matrices on left and right sides of genotypes  (rows: variants; columns: samples)
-            gtseq_left_matrix = []
-            gtseq_right_matrix = []
+            # initialize the matrix on left and right sides of genotypes  (rows: variants; columns: samples)
+            genotype_matrix = xgenotype.GenotypeMatrix(sample_number)
 
             # initialize the list of the variant multiallelic status
             variant_multiallelic_status_list = []
@@ -326,81 +340,17 @@ def convert_vcf_to_phase_input(vcf_file, variant_dict, sample_file, sp1_id, sp2_
                 complete_allele_list = [reference_bases] + alternative_allele_list
                 if seq_id in tsi_list: xlib.Message.print('trace', f'complete_allele_list: {complete_allele_list}')
 
-                # build the allele code list
-                allele_code_list = ['A', 'T', 'C', 'G']
-                for i in range(len(complete_allele_list)):
-                    if len(complete_allele_list[i]) > 1 and complete_allele_list[i] != xlib.get_md_symbol():
-                        allele_code_list.append(complete_allele_list[i].upper())
-                if seq_id in tsi_list: xlib.Message.print('trace', f'allele_code_list: {allele_code_list}')
-                allele_code_matrix.append(allele_code_list)
+                # get the left and right sides of sample genotypes of a variant and append them to the genotype matrix
+                (gt_left_array, gt_right_array) = genotype_parser.parse(data_dict)
+                genotype_matrix.append(gt_left_array, gt_right_array)
+                if seq_id in tsi_list: xlib.Message.print('trace', f'gt_left_array: {gt_left_array.tolist()} - gt_right_array: {gt_right_array.tolist()}')
 
-                # get the position of the genotype (subfield GT) in the field FORMAT
-                format_subfield_list = data_dict['format'].upper().split(':')
-                try:
-                    gt_position = format_subfield_list.index('GT')
-                except Exception as e:
-                    raise xlib.ProgramException(e, 'L007', 'GT', data_dict['chrom'], data_dict['pos'])
-
-                # build the list of sample genotypes of a variant
-                sample_data_list = []
-                sample_gt_list = []
-                for i in range(sample_number):
-                    sample_data_list.append(data_dict['sample_list'][i].split(':'))
-                    sample_gt_list.append(sample_data_list[i][gt_position])
-                if seq_id in tsi_list: xlib.Message.print('trace', f'sample_gt_list: {sample_gt_list}')
-
-                # build the lists of the left and right side of sample genotypes of a variant
-                sample_gt_left_list = []
-                sample_gt_right_list = []
-                for i in range(sample_number):
-                    sep = '/'
-                    sep_pos = sample_gt_list[i].find(sep)
-                    if sep_pos == -1:
-                        sep = '|'
-                        sep_pos = sample_gt_list[i].find(sep)
-                    if sep_pos == -1:
-                        raise xlib.ProgramException('', 'L008', 'GT', data_dict['chrom'], data_dict['pos'])
-                    sample_gt_left_list.append(sample_gt_list[i][:sep_pos])
-                    sample_gt_right_list.append(sample_gt_list[i][sep_pos+1:])
-
-                # change the numeric identification of genotypes to its sequence
-                sample_gtseq_left_list = []
-                sample_gtseq_right_list = []
-                for i in range(sample_number):
-                    if sample_gt_left_list[i] != xlib.get_md_symbol() and sample_gt_left_list[i] != imputed_md_id:
-                        sample_gtseq_left_list.append(complete_allele_list[int(sample_gt_left_list[i])].upper())
-                    else:
-                        sample_gtseq_left_list.append(sample_gt_left_list[i])
-                    if sample_gt_right_list[i] != xlib.get_md_symbol() and sample_gt_right_list[i] != imputed_md_id:
-                        sample_gtseq_right_list.append(complete_allele_list[int(sample_gt_right_list[i])].upper())
-                    else:
-                        sample_gtseq_right_list.append(sample_gt_right_list[i])
-
-                # get the allele counters per species
-                allele_counter_dict = {}
-                for i in range(sample_number):
-                    allele_counter_dict[sample_gtseq_left_list[i]] = allele_counter_dict.get(sample_gtseq_left_list[i], 0) + 1
-                    allele_counter_dict[sample_gtseq_right_list[i]] = allele_counter_dict.get(sample_gtseq_right_list[i], 0) + 1
-                if seq_id in tsi_list: xlib.Message.print('trace', f'allele_counter_dict: {allele_counter_dict}')
-
-                # check if the variant is multiallelic
-                if imputed_md_id in allele_counter_dict.keys():
-                    variant_multiallelic_status = 'M'
-                else:
-                    allele_counter = 0
-                    for key in allele_counter_dict.keys():
-                        if key != xlib.get_md_symbol():
-                            allele_counter += 1
-                    if allele_counter > 2:
-                        variant_multiallelic_status = 'M'
-                    else:
-                        variant_multiallelic_status = 'S'
+                # get the lookup table from genotype codes to PHASE allele codes and the variant multiallelic status
+                (lut_array, variant_multiallelic_status) = xgenotype.get_phase_allele_lut(complete_allele_list, gt_left_array, gt_right_array, True, data_dict['chrom'], data_dict['pos'])
+                lut_array_list.append(lut_array)
+                if seq_id in tsi_list: xlib.Message.print('trace', f'lut_array: {lut_array.tolist()}')
                 if seq_id in tsi_list: xlib.Message.print('trace', f'variant_multiallelic_status: {variant_multiallelic_status}')
 
-                # append a row to the matrices (rows: variant; columns: samples) of left and right sides of genotypes using genotype sequences
-                gtseq_left_matrix.append(sample_gtseq_left_list)
-                gtseq_right_matrix.append(sample_gtseq_right_list)
-
                 # append to the list of the variant multiallelic status
                 variant_multiallelic_status_list.append(variant_multiallelic_status)
 
@@ -433,79 +383,18 @@ def convert_vcf_to_phase_input(vcf_file, variant_dict, sample_file, sp1_id, sp2_
                 except Exception as e:
                     raise xlib.ProgramException(e, 'F003', seq_output_converted_file)
 
-            # order variant position list
-            # -- variant_position_list.sort(key=int)
-
-            # write header records
-            header_record_1 = f'{sample_number}\n'
-            seq_output_converted_file_id.write(header_record_1)
-            header_record_2 = f'{len(variant_position_list)}\n'
-            seq_output_converted_file_id.write(header_record_2)
-            header_record_3 = f'P {" ".join(variant_position_list)}\n'
-            seq_output_converted_file_id.write(header_record_3)
-            header_record_4 = f'{"".join(variant_multiallelic_status_list)}\n'
-            seq_output_converted_file_id.write(header_record_4)
-
-            # write sample records
-            for i in range(sample_number):
-
-                # build left and right side lists of variants of a sample
-                sample_variant_gt_left_list = []
-                sample_variant_gt_right_list = []
-                for j in range(len(variant_position_list)):
-                    # left
-                    if seq_id in tsi_list: xlib.Message.print('trace', f'gtseq_left_matrix[j][i]: {gtseq_left_matrix[j][i]}')
-                    if gtseq_left_matrix[j][i] == xlib.get_md_symbol() and variant_multiallelic_status_list[j] == 'S':
-                        allele_left = '?'
-                    elif gtseq_left_matrix[j][i] == xlib.get_md_symbol() and variant_multiallelic_status_list[j] == 'M':
-                        allele_left = '-1'
-                    elif gtseq_left_matrix[j][i]  == imputed_md_id:
-                        allele_left = '49'
-                    else:
-                        try:
-                            allele_left = f'{allele_code_matrix[j].index(gtseq_left_matrix[j][i]) + 1}'
-                            if seq_id in tsi_list: xlib.Message.print('trace', f'allele_left: {allele_left}')
-                        except Exception:
-                            allele_left = '60'
-                    if seq_id in tsi_list: xlib.Message.print('trace', f'allele_left: {allele_left}')
-                    sample_variant_gt_left_list.append(allele_left)
-                    # right
-                    if seq_id in tsi_list: xlib.Message.print('trace', f'gtseq_right_matrix[j][i]: {gtseq_right_matrix[j][i]}')
-                    if gtseq_right_matrix[j][i] == xlib.get_md_symbol() and variant_multiallelic_status_list[j] == 'S':
-                        allele_right = '?'
-                    elif gtseq_right_matrix[j][i] == xlib.get_md_symbol() and variant_multiallelic_status_list[j] == 'M':
-                        allele_right = '-1'
-                    elif gtseq_right_matrix[j][i]  == imputed_md_id:
-                        allele_right = '49'
-                    else:
-                        try:
-                            allele_right = f'{allele_code_matrix[j].index(gtseq_right_matrix[j][i]) + 1}'
-                            if seq_id in tsi_list: xlib.Message.print('trace', f'allele_right: {allele_right}')
-                        except Exception:
-                            allele_right = '60'
-                    if seq_id in tsi_list: xlib.Message.print('trace', f'allele_right: {allele_right}')
-                    sample_variant_gt_right_list.append(allele_right)
-                if seq_id in tsi_list: xlib.Message.print('trace', f'sample_variant_gt_left_list: {sample_variant_gt_left_list}')
-                if seq_id in tsi_list: xlib.Message.print('trace', f'sample_variant_gt_right_list: {sample_variant_gt_right_list}')
-
-                # write the first record of the sample
-                sample_record_1 = f'#{sample_info_list[i][0]}\n'
-                seq_output_converted_file_id.write(sample_record_1)
-                if seq_id in tsi_list: xlib.Message.print('trace', f'sample_record_1: {sample_record_1}'.replace('\n', ''))
-
-                # write the second record of the sample
-                sample_record_2 = f'{" ".join(sample_variant_gt_left_list)}\n'
-                seq_output_converted_file_id.write(sample_record_2)
-                if seq_id in tsi_list: xlib.Message.print('trace', f'sample_record_2: {sample_record_2}'.replace('\n', ''))
-
-                # write the third record of the sample
-                sample_record_3 = f'{" ".join(sample_variant_gt_right_list)}\n'
-                seq_output_converted_file_id.write(sample_record_3)
-                if seq_id in tsi_list: xlib.Message.print('trace', f'sample_record_3: {sample_record_3}'.replace('\n', ''))
+            # build the final genotype matrix
+            genotype_matrix.finish()
+
+            # write header and sample records
+            xgenotype.write_phase_input_file(seq_output_converted_file_id, [sample_info[0] for sample_info in sample_info_list], variant_position_list, variant_multiallelic_status_list, genotype_matrix, lut_array_list)
 
             # close file
             seq_output_converted_file_id.close()
 
+            # release the genotype matrix
+            genotype_matrix.close()
+
             xlib.Message.print('verbose', '\n')
 
             # print OK message
@@ -514,6 +403,9 @@ def convert_vcf_to_phase_input(vcf_file, variant_dict, sample_file, sp1_id, sp2_
     # close VCF file
     vcf_file_id.close()
 
+    # return the record counter
+    return record_counter
+
 #-------------------------------------------------------------------------------
 
 def get_variant_dict(variant_file):
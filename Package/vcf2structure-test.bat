@@ -57,6 +57,8 @@ rem Run the program vcf2structure.py
     --trans=ADD100 ^
     --out=%OUTPUT_DIR%\concatenated_imputed_progenies-6000DP-scenario2-structure.tsv ^
     --format=2 ^
+    --memmap=NONE ^
+    --metrics=NONE ^
     --verbose=Y ^
     --trace=N ^
     --tvi=NONE
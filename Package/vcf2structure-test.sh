@@ -55,6 +55,8 @@ cd $NGSHELPER_DIR
         --trans=ADD100 \
         --out=$OUTPUT_DIR/concatenated_imputed_progenies-6000DP-scenario2-structure.tsv \
         --format=2 \
+        --memmap=NONE \
+        --metrics=NONE \
         --verbose=Y \
         --trace=N \
         --tvi=NONE
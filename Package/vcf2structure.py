@@ -29,10 +29,16 @@ import gzip
 import os
 import sys
 
+import xgenotype
 import xlib
 
 #-------------------------------------------------------------------------------
 
+# import heavy modules when they are used for the first time
+np = xlib.LazyModule('numpy')
+
+#-------------------------------------------------------------------------------
+
 def main():
     '''
     Main line of the program.
@@ -46,8 +52,11 @@ def main():
     args = parser.parse_args()
     check_args(args)
 
-    # convert the VCF file
-    convert_vcf_to_structure(args.vcf_file, args.sample_file, args.sp1_id, args.sp2_id, args.hybrid_id, args.imputed_md_id, args.new_md_id, args.allele_transformation, args.structure_input_format, args.output_converted_file, args.tvi_list)
+    # measure the run metrics (the report is written when the run ends)
+    with xlib.Metrics.run(args.metrics_file):
+
+        # convert the VCF file
+        convert_vcf_to_structure(args.vcf_file, args.sample_file, args.sp1_id, args.sp2_id, args.hybrid_id, args.imputed_md_id, args.new_md_id, args.allele_transformation, args.structure_input_format, args.output_converted_file, args.memmap_dir, args.tvi_list)
 
 #-------------------------------------------------------------------------------
 
@@ -57,7 +66,8 @@ def build_parser():
     '''
 
     # create the parser and add arguments
-    description = 'Description: This program converts a VCF file to the Structure input formats.'
+    description = 'Description: This program converts a VCF file to the Structure input formats.\n' \
+        f'Allele indexes of genotypes (subfield GT) greater than {xlib.Const.GT_MAX_ALLELE_CODE} are not supported.'
     text = f'{xlib.get_project_name()} v{xlib.get_project_version()} - {os.path.basename(__file__)}\n\n{description}\n'
     usage = f'\r{text.ljust(len("usage:"))}\nUsage: {os.path.basename(__file__)} arguments'
     parser = argparse.ArgumentParser(usage=usage)
@@ -72,6 +82,8 @@ def build_parser():
     parser.add_argument('--trans', dest='allele_transformation', help=f'Transformation of the allele symbol: {xlib.get_allele_transformation_code_list_text()}; default: NONE.')
     parser.add_argument('--out', dest='output_converted_file', help='Path of the converted file (mandatory).')
     parser.add_argument('--format', dest='structure_input_format', help=f'Structure file format (mandatory): {xlib.get_structure_input_format_code_list_text()}.')
+    parser.add_argument('--memmap', dest='memmap_dir', help='Directory where the genotype matrix is stored in disk-backed files or NONE (genotype matrix in memory); default: NONE.')
+    parser.add_argument('--metrics', dest='metrics_file', help='Path of the output JSON file with the run metrics (elapsed time, throughput of stages and peak memory) or NONE; default: NONE.')
     parser.add_argument('--verbose', dest='verbose', help=f'Additional job status info during the run: {xlib.get_verbose_code_list_text()}; default: {xlib.Const.DEFAULT_VERBOSE}.')
     parser.add_argument('--trace', dest='trace', help=f'Additional info useful to the developer team: {xlib.get_trace_code_list_text()}; default: {xlib.Const.DEFAULT_TRACE}.')
     parser.add_argument('--tvi', dest='tvi_list', help='Variant identification list to trace with format seq_id_1-pos_1,seq_id_2-pos_2,...,seq_id_n-pos_n or NONE; default: NONE.')
@@ -149,6 +161,17 @@ def check_args(args):
         xlib.Message.print('error', f'*** The Structure input format has to be {xlib.get_structure_input_format_code_list_text()}.')
         OK = False
 
+    # check "memmap_dir"
+    if args.memmap_dir is None or args.memmap_dir.upper() == 'NONE':
+        args.memmap_dir = None
+    elif not os.path.isdir(args.memmap_dir):
+        xlib.Message.print('error', f'*** The directory {args.memmap_dir} does not exist.')
+        OK = False
+
+    # check "metrics_file"
+    if args.metrics_file is None or args.metrics_file.upper() == 'NONE':
+        args.metrics_file = None
+
     # check "verbose"
     if args.verbose is None:
         args.verbose = xlib.Const.DEFAULT_VERBOSE
@@ -179,184 +202,56 @@ def check_args(args):
 
 #-------------------------------------------------------------------------------
 
-def convert_vcf_to_structure(vcf_file, sample_file, sp1_id, sp2_id, hybrid_id, imputed_md_id, new_md_id, allele_transformation, structure_input_format, output_converted_file, tvi_list):
+def convert_vcf_to_structure(vcf_file, sample_file, sp1_id, sp2_id, hybrid_id, imputed_md_id, new_md_id, allele_transformation, structure_input_format, output_converted_file, memmap_dir, tvi_list):
     '''
     Convert a VCF file to the Structure input formats.
     '''
 
-    # initialize the sample number
-    sample_number = 0
-
     # initialize the sample information list
     sample_info_list = []
 
-    # initialize the variant code list
-    variant_code_list = []
-
-    # initialize the matrices (rows: variants; columns: samples) on left and right sides of genotypes
-    gt_left_matrix = []
-    gt_right_matrix = []
-
     # get the sample data
     sample_dict = xlib.get_sample_data(sample_file, sp1_id, sp2_id, hybrid_id)
 
-    # open the VCF file
-    if vcf_file.endswith('.gz'):
-        try:
-            vcf_file_id = gzip.open(vcf_file, mode='rt', encoding='iso-8859-1')
-        except Exception as e:
-            raise xlib.ProgramException(e, 'F002', vcf_file)
-    else:
+    # read the VCF file and get its genotype data
+    genotype_data = xgenotype.read_genotype_data(vcf_file, imputed_md_id, memmap_dir, tvi_list)
+    genotype_matrix = genotype_data['genotype_matrix']
+
+    # build the sample information list
+    for sample_id in genotype_data['sample_id_list']:
         try:
-            vcf_file_id = open(vcf_file, mode='r', encoding='iso-8859-1')
+            species_id = sample_dict[sample_id]['species_id']
         except Exception as e:
-            raise xlib.ProgramException(e, 'F001', vcf_file)
-
-    # initialize counters
-    record_counter = 0
-    variant_counter = 0
-
-    # read the first record of VCF file
-    (record, _, data_dict) = xlib.read_vcf_file(vcf_file_id, sample_number)
-
-    # while there are records in the VCF file
-    while record != '':
-
-        # process metadata records
-        while record != '' and record.startswith('##'):
-
-            # add 1 to the VCF record counter
-            record_counter += 1
-
-            # print the counters
-            xlib.Message.print('verbose', f'\rProcessed VCF records ... {record_counter:8d} - Variants ... {variant_counter:8d}')
-
-            # read the next record of the VCF file
-            (record, _, data_dict) = xlib.read_vcf_file(vcf_file_id, sample_number)
-
-        # process the column description record
-        if record.startswith('#CHROM'):
-
-            # add 1 to the VCF record counter
-            record_counter += 1
-
-            # get the record data list
-            record_data_list = data_dict['record_data_list']
-
-            # build the sample information list
-            for i in range(9, len(record_data_list)):
-                try:
-                    species_id = sample_dict[record_data_list[i]]['species_id']
-                except Exception as e:
-                    raise xlib.ProgramException(e, 'L002', record_data_list[i])
-                if species_id == sp1_id:
-                    numeric_species_id = 1
-                elif species_id == sp2_id:
-                    numeric_species_id = 2
-                else:
-                    numeric_species_id = 3
-                sample_info_list.append([record_data_list[i], numeric_species_id])
-
-            # check if the sample information list is empty
-            if not sample_info_list:
-                raise xlib.ProgramException('', 'L003')
-
-            # set the sample number
-            sample_number = len(sample_info_list)
-
-            # print the counters
-            xlib.Message.print('verbose', f'\rProcessed VCF records ... {record_counter:8d} - Variants ... {variant_counter:8d}')
-
-            # read the next record of the VCF file
-            (record, _, data_dict) = xlib.read_vcf_file(vcf_file_id, sample_number)
-
-        # process variant records
-        while record != '' and not record.startswith('##') and not record.startswith('#CHROM'):
-
-            # add set the variant identification
-            variant_id = f'{data_dict["chrom"]}-{data_dict["pos"]}'
-
-            # add 1 to the VCF record counter
-            record_counter += 1
-
-            # add 1 to the variant counter
-            variant_counter += 1
-
-            # append variant code to the variant code list and write the code and its sequence identification and position in the variant file
-            id = f'{data_dict["chrom"]}-{data_dict["pos"]}'
-            variant_code_list.append(id)
-
-            # get the position of the genotype (subfield GT) in the field FORMAT
-            format_subfield_list = data_dict['format'].upper().split(':')
-            try:
-                gt_position = format_subfield_list.index('GT')
-            except Exception as e:
-                raise xlib.ProgramException(e, 'L007', 'GT', data_dict['chrom'], data_dict['pos'])
-
-            # build the list of sample genotypes of a variant
-            sample_data_list = []
-            sample_gt_list = []
-            for i in range(sample_number):
-                sample_data_list.append(data_dict['sample_list'][i].split(':'))
-                sample_gt_list.append(sample_data_list[i][gt_position])
-            if variant_id in tvi_list: xlib.Message.print('trace', f'(4) sample_gt_list: {sample_gt_list}')
-
-            # build the lists of the left and right side of sample genotypes of a variant
-            sample_gt_left_list = []
-            sample_gt_right_list = []
-            for i in range(sample_number):
-                sep = '/'
-                sep_pos = sample_gt_list[i].find(sep)
-                if sep_pos == -1:
-                    sep = '|'
-                    sep_pos = sample_gt_list[i].find(sep)
-                if sep_pos == -1:
-                    raise xlib.ProgramException('', 'L008', 'GT', data_dict['chrom'], data_dict['pos'])
-                try:
-                    if sample_gt_list[i][:sep_pos] == xlib.get_md_symbol():
-                        sample_gt_left_list.append(new_md_id)
-                    else:
-                        sample_gt_left_list.append(sample_gt_list[i][:sep_pos])
-                    if sample_gt_list[i][sep_pos+1:] == xlib.get_md_symbol():
-                        sample_gt_right_list.append(new_md_id)
-                    else:
-                        sample_gt_right_list.append(sample_gt_list[i][sep_pos+1:])
-                except Exception as e:
-                    raise xlib.ProgramException(e, 'L008', 'GT', data_dict['chrom'], data_dict['pos'])
-
-            # append a row to the matrices (rows: variant; columns: samples) of left and right sides of genotypes
-            gt_left_matrix.append(sample_gt_left_list)
-            gt_right_matrix.append(sample_gt_right_list)
-
-            # print the counters
-            xlib.Message.print('verbose', f'\rProcessed VCF records ... {record_counter:8d} - Variants ... {variant_counter:8d}')
-
-            # read the next record of the VCF file
-            (record, _, data_dict) = xlib.read_vcf_file(vcf_file_id, sample_number)
-
-    xlib.Message.print('verbose', '\n')
-
-    # close the VCF file
-    vcf_file_id.close()
-
-    # review the imputed missing data when the type of the converted file is 2
+            raise xlib.ProgramException(e, 'L002', sample_id)
+        if species_id == sp1_id:
+            numeric_species_id = 1
+        elif species_id == sp2_id:
+            numeric_species_id = 2
+        else:
+            numeric_species_id = 3
+        sample_info_list.append([sample_id, numeric_species_id])
+
+    # check if the sample information list is empty
+    if not sample_info_list:
+        raise xlib.ProgramException('', 'L003')
+
+    # build the variant code list
+    variant_code_list = [f'{chrom}-{pos}' for (chrom, pos, _, _) in genotype_data['variant_data_list']]
+
+    # review the imputed missing data when the type of the converted file is 2: variants with any imputed missing data are excluded
     if structure_input_format == '2':
+        variant_mask = ~genotype_matrix.get_variant_mask(xlib.Const.GT_IMPUTED_MD_CODE)
+        xlib.Message.print('trace', f'excluded_variant_index_list: {np.flatnonzero(~variant_mask).tolist()}')
+        variant_code_list = [variant_code for (variant_code, selected) in zip(variant_code_list, variant_mask) if selected]
+    else:
+        variant_mask = None
 
-        # detect variants with any imputed missing data
-        excluded_variant_index_list = []
-        for i in range(len(gt_left_matrix)):
-            for j in range(sample_number):
-                if gt_left_matrix[i][j] == imputed_md_id or gt_right_matrix[i][j] == imputed_md_id:
-                    excluded_variant_index_list.append(i)
-                    break
-        xlib.Message.print('trace', f'excluded_variant_index_list: {excluded_variant_index_list}')
-
-        # remove data of variants with any imputed missing data
-        excluded_variant_index_list.reverse()
-        for k in excluded_variant_index_list:
-            variant_code_list.pop(k)
-            gt_left_matrix.pop(k)
-            gt_right_matrix.pop(k)
+    # build the text of every allele code
+    text_array = np.empty(xlib.Const.GT_MAX_ALLELE_CODE + xlib.Const.GT_CODE_OFFSET + 1, dtype=object)
+    text_array[xlib.Const.GT_MD_CODE + xlib.Const.GT_CODE_OFFSET] = transform_allele(new_md_id, allele_transformation)
+    text_array[xlib.Const.GT_IMPUTED_MD_CODE + xlib.Const.GT_CODE_OFFSET] = transform_allele(imputed_md_id, allele_transformation)
+    for i in range(xlib.Const.GT_MAX_ALLELE_CODE + 1):
+        text_array[i + xlib.Const.GT_CODE_OFFSET] = transform_allele(str(i), allele_transformation)
 
     # open the output converted file
     if output_converted_file.endswith('.gz'):
@@ -374,44 +269,53 @@ def convert_vcf_to_structure(vcf_file, sample_file, sp1_id, sp2_id, hybrid_id, i
     variant_code_list_text = '\t'.join(variant_code_list)
     output_converted_file_id.write(f'sample_id\tspecies_id\t{variant_code_list_text}\n')
 
-    # write sample records
-    for i in range(sample_number):
-
-        # build left and right side lists of variants of a sample
-        sample_variant_gt_left_list = []
-        sample_variant_gt_right_list = []
-        for j in range(len(gt_left_matrix)):
-            # left
-            if xlib.check_int(gt_left_matrix[j][i]) and allele_transformation == 'ADD100':
-                allele_left = str(int(gt_left_matrix[j][i]) + 100)
-            else:
-                allele_left = gt_left_matrix[j][i]
-            sample_variant_gt_left_list.append(allele_left)
-            # right
-            if xlib.check_int(gt_right_matrix[j][i]) and allele_transformation == 'ADD100':
-                allele_right = str(int(gt_right_matrix[j][i]) + 100)
-            else:
-                allele_right = gt_right_matrix[j][i]
-            sample_variant_gt_right_list.append(allele_right)
-
-        # write the first record of the sample
-        sample_variant_gt_left_list_text = '\t'.join(sample_variant_gt_left_list)
-        output_converted_file_id.write(f'{sample_info_list[i][0]}\t{sample_info_list[i][1]}\t{sample_variant_gt_left_list_text}\n')
-        # -- output_converted_file_id.write(f'{sample_info_list[i][0]};{sample_info_list[i][1]};{";".join(sample_variant_gt_left_list)}\n')
-
-        # write the second record of the sample
-        sample_variant_gt_right_list_text = '\t'.join(sample_variant_gt_right_list)
-        output_converted_file_id.write(f'{sample_info_list[i][0]}\t{sample_info_list[i][1]}\t{sample_variant_gt_right_list_text}\n')
-        # -- output_converted_file_id.write(f'{sample_info_list[i][0]};{sample_info_list[i][1]};{";".join(sample_variant_gt_right_list)}\n')
+    # write sample records by blocks of samples (rows: samples; columns: variants)
+    with xlib.Metrics.stage('write Structure file') as stage:
+        for (first_sample, gt_left_block, gt_right_block) in genotype_matrix.iter_sample_blocks(variant_mask):
+
+            # translate the allele codes to text
+            gt_left_text_block = text_array[gt_left_block.astype(np.intp) + xlib.Const.GT_CODE_OFFSET]
+            gt_right_text_block = text_array[gt_right_block.astype(np.intp) + xlib.Const.GT_CODE_OFFSET]
+
+            for i in range(gt_left_block.shape[0]):
+
+                # get the sample information
+                (sample_id, numeric_species_id) = sample_info_list[first_sample + i]
+
+                # write the first record of the sample
+                sample_variant_gt_left_list_text = '\t'.join(gt_left_text_block[i].tolist())
+                output_converted_file_id.write(f'{sample_id}\t{numeric_species_id}\t{sample_variant_gt_left_list_text}\n')
+
+                # write the second record of the sample
+                sample_variant_gt_right_list_text = '\t'.join(gt_right_text_block[i].tolist())
+                output_converted_file_id.write(f'{sample_id}\t{numeric_species_id}\t{sample_variant_gt_right_list_text}\n')
+
+        # add the samples written to the stage counters
+        stage.add(records=len(sample_info_list))
 
     # close file
     output_converted_file_id.close()
 
+    # release the genotype data
+    xgenotype.release_genotype_data(genotype_data)
+
     # print OK message
     xlib.Message.print('info', f'The converted file {os.path.basename(output_converted_file)} is created.')
 
 #-------------------------------------------------------------------------------
 
+def transform_allele(allele, allele_transformation):
+    '''
+    Transform the symbol of an allele.
+    '''
+
+    if xlib.check_int(allele) and allele_transformation == 'ADD100':
+        allele = str(int(allele) + 100)
+
+    return allele
+
+#-------------------------------------------------------------------------------
+
 if __name__ == '__main__':
 
     main()
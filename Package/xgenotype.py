@@ -0,0 +1,1136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# pylint: disable=broad-except
+# pylint: disable=invalid-name
+# pylint: disable=line-too-long
+# pylint: disable=multiple-statements
+# pylint: disable=too-many-lines
+
+#-------------------------------------------------------------------------------
+
+'''
+This source contains functions and classes used to manage genotype matrices
+(rows: variants; columns: samples) as NumPy arrays in NGShelper software package.
+
+This software has been developed by:
+
+    GI en Desarrollo de Especies y Comunidades Leñosas (WooSp)
+    Dpto. Sistemas y Recursos Naturales
+    ETSI Montes, Forestal y del Medio Natural
+    Universidad Politecnica de Madrid
+    https://github.com/ggfhf/
+
+Licence: GNU General Public Licence Version 3.
+'''
+
+#-------------------------------------------------------------------------------
+
+import concurrent.futures
+import gzip
+import os
+import sys
+import tempfile
+
+import xlib
+
+#-------------------------------------------------------------------------------
+
+# import heavy modules when they are used for the first time
+np = xlib.LazyModule('numpy')
+
+#-------------------------------------------------------------------------------
+
+def get_gt_code(allele, imputed_md_id, chrom, pos):
+    '''
+    Get the code of an allele of the genotype (subfield GT); allele indexes greater than xlib.Const.GT_MAX_ALLELE_CODE are not supported.
+    '''
+
+    # missing data
+    if allele in (xlib.get_md_symbol(), ''):
+        return xlib.Const.GT_MD_CODE
+
+    # imputed missing data
+    if imputed_md_id is not None and allele == imputed_md_id:
+        return xlib.Const.GT_IMPUTED_MD_CODE
+
+    # allele index (the allele codes are int8 numbers)
+    if not xlib.check_int(allele, minimum=0):
+        raise xlib.ProgramException('', 'L008', 'GT', chrom, pos)
+    if int(allele) > xlib.Const.GT_MAX_ALLELE_CODE:
+        raise xlib.ProgramException('', 'L024', allele, chrom, pos, xlib.Const.GT_MAX_ALLELE_CODE)
+
+    return int(allele)
+
+#-------------------------------------------------------------------------------
+
+def translate_gt_block(gt_block, lut_matrix):
+    '''
+    Translate a block of genotype codes (rows: samples; columns: variants) using the lookup table of each variant (rows: variants; columns: genotype codes plus offset).
+    '''
+
+    return lut_matrix[np.arange(lut_matrix.shape[0])[np.newaxis, :], gt_block.astype(np.intp) + xlib.Const.GT_CODE_OFFSET]
+
+#-------------------------------------------------------------------------------
+
+def get_phase_allele_lut(complete_allele_list, left_array, right_array, check_imputed_md, chrom, pos):
+    '''
+    Get the lookup table from genotype codes to PHASE allele codes of a variant and its multiallelic status.
+    '''
+
+    # get the distinct allele indexes of the variant
+    allele_index_array = np.unique(np.concatenate((left_array, right_array)))
+
+    # check the allele indexes
+    if allele_index_array[-1] >= len(complete_allele_list):
+        raise xlib.ProgramException('', 'L008', 'GT', chrom, pos)
+
+    # build the allele code list
+    allele_code_list = ['A', 'T', 'C', 'G']
+    for allele in complete_allele_list:
+        if len(allele) > 1 and allele != xlib.get_md_symbol():
+            allele_code_list.append(allele.upper())
+
+    # check if the variant is multiallelic
+    if check_imputed_md and allele_index_array[0] == xlib.Const.GT_IMPUTED_MD_CODE:
+        variant_multiallelic_status = 'M'
+    elif len({complete_allele_list[i].upper() for i in allele_index_array if i >= 0}) > 2:
+        variant_multiallelic_status = 'M'
+    else:
+        variant_multiallelic_status = 'S'
+
+    # build the lookup table (the PHASE code 0 represents "?")
+    lut_array = np.zeros(len(complete_allele_list) + xlib.Const.GT_CODE_OFFSET, dtype=np.int16)
+    lut_array[xlib.Const.GT_MD_CODE + xlib.Const.GT_CODE_OFFSET] = 0 if variant_multiallelic_status == 'S' else -1
+    lut_array[xlib.Const.GT_IMPUTED_MD_CODE + xlib.Const.GT_CODE_OFFSET] = 49
+    for i, allele in enumerate(complete_allele_list):
+        try:
+            lut_array[i + xlib.Const.GT_CODE_OFFSET] = allele_code_list.index(allele.upper()) + 1
+        except Exception:
+            lut_array[i + xlib.Const.GT_CODE_OFFSET] = 60
+
+    # return the lookup table and the multiallelic status
+    return lut_array, variant_multiallelic_status
+
+#-------------------------------------------------------------------------------
+
+def write_phase_input_file(output_file_id, sample_id_list, variant_position_list, variant_multiallelic_status_list, gt_matrix, lut_array_list):
+    '''
+    Write the header and sample records of a PHASE input file from a genotype matrix.
+    '''
+
+    # write header records
+    output_file_id.write(f'{len(sample_id_list)}\n')
+    output_file_id.write(f'{len(variant_position_list)}\n')
+    output_file_id.write(f'P {" ".join(variant_position_list)}\n')
+    output_file_id.write(f'{"".join(variant_multiallelic_status_list)}\n')
+
+    # build the lookup table matrix with the same number of columns for every variant
+    lut_matrix = np.zeros((len(lut_array_list), max([len(lut_array) for lut_array in lut_array_list], default=0)), dtype=np.int16)
+    for i, lut_array in enumerate(lut_array_list):
+        lut_matrix[i, :len(lut_array)] = lut_array
+
+    # build the text of every PHASE code (from -1 to the maximum code)
+    text_array = np.array(['-1', '?'] + [str(i) for i in range(1, int(lut_matrix.max(initial=0)) + 1)], dtype=object)
+
+    # write sample records
+    for (first_sample, left_block, right_block) in gt_matrix.iter_sample_blocks():
+        left_text_block = text_array[translate_gt_block(left_block, lut_matrix) + 1]
+        right_text_block = text_array[translate_gt_block(right_block, lut_matrix) + 1]
+        for i in range(left_block.shape[0]):
+            output_file_id.write(f'#{sample_id_list[first_sample + i]}\n')
+            output_file_id.write(f'{" ".join(left_text_block[i].tolist())}\n')
+            output_file_id.write(f'{" ".join(right_text_block[i].tolist())}\n')
+
+#-------------------------------------------------------------------------------
+
+def get_family_index_arrays(sample_id_list, mother_id_list):
+    '''
+    Get the arrays of the progeny indexes and the indexes of their mothers in the sample identification list.
+    '''
+
+    # get the index of every sample
+    sample_index_dict = {sample_id: i for i, sample_id in enumerate(sample_id_list)}
+
+    # get the index of the progenies and their mothers
+    progeny_index_list = []
+    mother_index_list = []
+    for i, mother_id in enumerate(mother_id_list):
+        if mother_id != 'NONE':
+            try:
+                mother_index_list.append(sample_index_dict[mother_id])
+            except Exception as e:
+                raise xlib.ProgramException(e, 'L002', mother_id)
+            progeny_index_list.append(i)
+
+    # return the arrays of progeny and mother indexes
+    return np.array(progeny_index_list, dtype=np.intp), np.array(mother_index_list, dtype=np.intp)
+
+#-------------------------------------------------------------------------------
+
+def read_genotype_data(vcf_file, imputed_md_id, memmap_dir, tvi_list):
+    '''
+    Read a VCF file and get its genotype data: sample identifications, variant data (chromosome, position,
+    reference bases and alternative alleles) and genotype matrix. When the genotype data cache is active
+    (pipeline mode), the genotype data of a VCF file already read are returned without reading it again;
+    when they were read with other identification of imputed missing data, their codes are translated.
+    '''
+
+    # get the genotype data from the cache
+    genotype_data = GenotypeDataCache.get(vcf_file, imputed_md_id)
+    if genotype_data is not None:
+        xlib.Message.print('verbose', f'The genotype data of {os.path.basename(vcf_file)} are got from the pipeline cache.\n')
+        return genotype_data
+
+    # get the genotype data read with other identification of imputed missing data from the cache and translate their codes
+    cached_genotype_data_item = GenotypeDataCache.get_any(vcf_file)
+    if cached_genotype_data_item is not None:
+        (cached_imputed_md_id, cached_genotype_data) = cached_genotype_data_item
+        genotype_data = translate_genotype_data(cached_genotype_data, cached_imputed_md_id, imputed_md_id, memmap_dir)
+        GenotypeDataCache.put(vcf_file, imputed_md_id, genotype_data)
+        xlib.Message.print('verbose', f'The genotype data of {os.path.basename(vcf_file)} are got from the pipeline cache translating the imputed missing data.\n')
+        return genotype_data
+
+    # build the genotype data measuring the variants and bytes read
+    with xlib.Metrics.stage(f'read {os.path.basename(vcf_file)}') as stage:
+        genotype_data = build_genotype_data(vcf_file, imputed_md_id, memmap_dir, tvi_list)
+        stage.add(records=len(genotype_data['variant_data_list']), bytes_number=os.path.getsize(vcf_file))
+
+    # save the genotype data in the cache
+    GenotypeDataCache.put(vcf_file, imputed_md_id, genotype_data)
+
+    # return the genotype data
+    return genotype_data
+
+#-------------------------------------------------------------------------------
+
+def build_genotype_data(vcf_file, imputed_md_id, memmap_dir, tvi_list):
+    '''
+    Build the genotype data of a VCF file.
+    '''
+
+    # initialize the sample identification list and the variant data list
+    sample_id_list = []
+    variant_data_list = []
+
+    # initialize the genotype parser and the matrix (rows: variants; columns: samples) of left and right sides of genotypes
+    genotype_parser = None
+    genotype_matrix = None
+
+    # open the VCF file
+    if vcf_file.endswith('.gz'):
+        try:
+            vcf_file_id = gzip.open(vcf_file, mode='rt', encoding='iso-8859-1')
+        except Exception as e:
+            raise xlib.ProgramException(e, 'F002', vcf_file)
+    else:
+        try:
+            vcf_file_id = open(vcf_file, mode='r', encoding='iso-8859-1')
+        except Exception as e:
+            raise xlib.ProgramException(e, 'F001', vcf_file)
+
+    # initialize counters
+    record_counter = 0
+    variant_counter = 0
+
+    # read the first record of VCF file
+    (record, _, data_dict) = xlib.read_vcf_file(vcf_file_id, sample_number=0, check_sample_number=False)
+
+    # while there are records in the VCF file
+    while record != '':
+
+        # process metadata records
+        while record != '' and record.startswith('##'):
+
+            # add 1 to the VCF record counter
+            record_counter += 1
+
+            # print the counters
+            xlib.Message.print('verbose', f'\rProcessed VCF records ... {record_counter:8d} - Variants ... {variant_counter:8d}')
+
+            # read the next record of the VCF file
+            (record, _, data_dict) = xlib.read_vcf_file(vcf_file_id, sample_number=0, check_sample_number=False)
+
+        # process the column description record
+        if record.startswith('#CHROM'):
+
+            # add 1 to the VCF record counter
+            record_counter += 1
+
+            # get the sample identification list
+            sample_id_list = data_dict['record_data_list'][9:]
+
+            # create the genotype parser and matrix
+            genotype_parser = GenotypeParser(len(sample_id_list), imputed_md_id)
+            genotype_matrix = GenotypeMatrix(len(sample_id_list), memmap_dir=memmap_dir)
+
+            # print the counters
+            xlib.Message.print('verbose', f'\rProcessed VCF records ... {record_counter:8d} - Variants ... {variant_counter:8d}')
+
+            # read the next record of the VCF file
+            (record, _, data_dict) = xlib.read_vcf_file(vcf_file_id, sample_number=0, check_sample_number=False)
+
+        # process variant records
+        while record != '' and not record.startswith('##') and not record.startswith('#CHROM'):
+
+            # add 1 to the VCF record counter
+            record_counter += 1
+
+            # add 1 to the variant counter
+            variant_counter += 1
+
+            # check the sample number
+            if len(data_dict['sample_list']) != len(sample_id_list):
+                raise xlib.ProgramException('', 'L006', data_dict['chrom'], data_dict['pos'])
+
+            # append the variant data to the variant data list
+            variant_data_list.append((data_dict['chrom'], data_dict['pos'], data_dict['ref'], data_dict['alt']))
+
+            # append a row to the matrix (rows: variant; columns: samples) of left and right sides of genotypes
+            (gt_left_array, gt_right_array) = genotype_parser.parse(data_dict)
+            genotype_matrix.append(gt_left_array, gt_right_array)
+            if f'{data_dict["chrom"]}-{data_dict["pos"]}' in tvi_list: xlib.Message.print('trace', f'(4) gt_left_array: {gt_left_array.tolist()} - gt_right_array: {gt_right_array.tolist()}')
+
+            # print the counters
+            xlib.Message.print('verbose', f'\rProcessed VCF records ... {record_counter:8d} - Variants ... {variant_counter:8d}')
+
+            # read the next record of the VCF file
+            (record, _, data_dict) = xlib.read_vcf_file(vcf_file_id, sample_number=0, check_sample_number=False)
+
+    xlib.Message.print('verbose', '\n')
+
+    # close the VCF file
+    vcf_file_id.close()
+
+    # check if the column description record has been found
+    if genotype_matrix is None:
+        raise xlib.ProgramException('', 'L003')
+
+    # build the final genotype matrix
+    genotype_matrix.finish()
+
+    # return the genotype data
+    return {'sample_id_list': sample_id_list, 'variant_data_list': variant_data_list, 'genotype_matrix': genotype_matrix}
+
+#-------------------------------------------------------------------------------
+
+def translate_genotype_data(genotype_data, source_imputed_md_id, imputed_md_id, memmap_dir):
+    '''
+    Translate the genotype data of a VCF file read with an identification of imputed missing data to the codes
+    got when the file is read with other identification (the sample identifications and variant data are shared).
+    '''
+
+    # initialize the code dictionary (key: source code; value: new code)
+    code_dict = {}
+
+    # the alleles of the source imputed missing data get the code of the allele read with the new identification
+    if source_imputed_md_id is not None:
+        imputed_md_variant_array = np.flatnonzero(genotype_data['genotype_matrix'].get_variant_mask(xlib.Const.GT_IMPUTED_MD_CODE))
+        if len(imputed_md_variant_array) > 0:
+            (chrom, pos, _, _) = genotype_data['variant_data_list'][imputed_md_variant_array[0]]
+            code_dict[xlib.Const.GT_IMPUTED_MD_CODE] = get_gt_code(source_imputed_md_id, imputed_md_id, chrom, pos)
+
+    # the alleles of the new imputed missing data get the imputed missing data code
+    if imputed_md_id is not None and xlib.check_int(imputed_md_id, minimum=0, maximum=xlib.Const.GT_MAX_ALLELE_CODE):
+        code_dict[int(imputed_md_id)] = xlib.Const.GT_IMPUTED_MD_CODE
+
+    # return the genotype data with the translated genotype matrix
+    return {'sample_id_list': genotype_data['sample_id_list'], 'variant_data_list': genotype_data['variant_data_list'], 'genotype_matrix': genotype_data['genotype_matrix'].get_translated_matrix(code_dict, memmap_dir)}
+
+#-------------------------------------------------------------------------------
+
+def release_genotype_data(genotype_data):
+    '''
+    Release the genotype data of a VCF file when it is not saved in the genotype data cache.
+    '''
+
+    if not GenotypeDataCache.cache_status:
+        genotype_data['genotype_matrix'].close()
+
+#-------------------------------------------------------------------------------
+
+def read_fastphase_genotype_block(fastphase_sequence_file):
+    '''
+    Read the genotypes of a sequence imputed by fastPHASE (file *_hapguess_switch.out) and get a dictionary with the
+    sample index dictionary and the allele code array (dimensions: samples, haplotypes (2), variants).
+    '''
+
+    # initialize the sample index dictionary and the allele code list of every haplotype
+    sample_index_dict = {}
+    haplotype_list = []
+
+    # open the fastPHASE sequence file
+    if fastphase_sequence_file.endswith('.gz'):
+        try:
+            fastphase_sequence_file_id = gzip.open(fastphase_sequence_file, mode='rt', encoding='iso-8859-1')
+        except Exception as e:
+            raise xlib.ProgramException(e, 'F002', fastphase_sequence_file)
+    else:
+        try:
+            fastphase_sequence_file_id = open(fastphase_sequence_file, mode='r', encoding='iso-8859-1')
+        except Exception as e:
+            raise xlib.ProgramException(e, 'F001', fastphase_sequence_file)
+
+    # read the records: a sample identification record (#sample_id) is followed by the records of its two haplotypes
+    record = fastphase_sequence_file_id.readline()
+    while record != '':
+        if record.strip().startswith('#'):
+            sample_index_dict[record.strip()[1:]] = len(sample_index_dict)
+            for _ in range(2):
+                record = fastphase_sequence_file_id.readline()
+                try:
+                    haplotype_list.append(np.array(record.split(), dtype=np.int16))
+                except Exception as e:
+                    raise xlib.ProgramException(e, 'D001', record.strip(), fastphase_sequence_file)
+        record = fastphase_sequence_file_id.readline()
+
+    # close the fastPHASE sequence file
+    fastphase_sequence_file_id.close()
+
+    # build the allele code array
+    if haplotype_list:
+        try:
+            genotype_array = np.stack(haplotype_list).reshape(len(sample_index_dict), 2, -1)
+        except Exception as e:
+            raise xlib.ProgramException(e, 'F006', fastphase_sequence_file, 'fastPHASE')
+    else:
+        genotype_array = np.zeros((0, 2, 0), dtype=np.int16)
+
+    # return the genotype block
+    return {'sample_index_dict': sample_index_dict, 'genotype_array': genotype_array}
+
+#-------------------------------------------------------------------------------
+
+def read_mach_genotype_data(analysis_file):
+    '''
+    Read the haplotypes inferred by MACH and get a dictionary with the sample identification list, the sample index
+    dictionary and the allele matrix (rows: samples (two row per sample); columns: variants) of uppercase ASCII codes.
+    '''
+
+    # initialize the sample identification list and the haplotype list
+    sample_id_list = []
+    haplotype_list = []
+
+    # open the analysis file
+    if analysis_file.endswith('.gz'):
+        try:
+            analysis_file_id = gzip.open(analysis_file, mode='rt', encoding='iso-8859-1')
+        except Exception as e:
+            raise xlib.ProgramException(e, 'F002', analysis_file)
+    else:
+        try:
+            analysis_file_id = open(analysis_file, mode='r', encoding='iso-8859-1')
+        except Exception as e:
+            raise xlib.ProgramException(e, 'F001', analysis_file)
+
+    # initialize analysis record counter
+    analysis_record_counter = 0
+
+    # read the records (format: sample_id->sample_id HAPLO1|HAPLO2 alleles)
+    for record in analysis_file_id:
+
+        # add 1 to the analysis record counter
+        analysis_record_counter += 1
+
+        # split the record data and check if there are 3 data
+        record_data_list = [datum.strip() for datum in record.rstrip('\n').split(' ')]
+        if len(record_data_list) != 3:
+            raise xlib.ProgramException('', 'L014')
+
+        # add the sample identification to the list
+        if analysis_record_counter % 2 != 0:
+            greater_than_pos =  record_data_list[0].find('>')
+            sample_id_list.append(record_data_list[0][:greater_than_pos - 1])
+
+        # add the alleles of the haplotype in uppercase and check the column number
+        haplotype_list.append(np.frombuffer(record_data_list[2].upper().encode('iso-8859-1'), dtype=np.uint8))
+        if len(haplotype_list[-1]) != len(haplotype_list[0]):
+            raise xlib.ProgramException('', 'L014')
+
+        # print the input record counter
+        xlib.Message.print('verbose', f'\rProcessed analysis records ... {analysis_record_counter:8d}')
+
+    # close the analysis file
+    analysis_file_id.close()
+
+    # build the allele matrix
+    allele_matrix = np.stack(haplotype_list) if haplotype_list else np.zeros((0, 0), dtype=np.uint8)
+
+    # build the sample index dictionary (the first position of every sample identification)
+    sample_index_dict = {}
+    for i, sample_id in enumerate(sample_id_list):
+        sample_index_dict.setdefault(sample_id, i)
+
+    # return the genotype data
+    return {'sample_id_list': sample_id_list, 'sample_index_dict': sample_index_dict, 'allele_matrix': allele_matrix}
+
+#-------------------------------------------------------------------------------
+
+class GenotypeParser():
+    '''
+    This class parses the genotypes (subfield GT) of the variant records of a VCF file to arrays of allele codes.
+    '''
+
+    #---------------
+
+    def __init__(self, sample_number, imputed_md_id=None):
+        '''
+        Initialize the object.
+        '''
+
+        self.sample_number = sample_number
+        self.imputed_md_id = imputed_md_id
+
+        # dictionary of the genotypes already parsed (key: genotype; value: index in the lists of left and right codes)
+        self.gt_index_dict = {}
+        self.left_code_list = []
+        self.right_code_list = []
+
+        # arrays of left and right codes of the genotypes already parsed
+        self.left_code_array = np.empty(0, dtype=np.int8)
+        self.right_code_array = np.empty(0, dtype=np.int8)
+
+    #---------------
+
+    def get_gt_position(self, data_dict):
+        '''
+        Get the position of the genotype (subfield GT) in the field FORMAT.
+        '''
+
+        try:
+            gt_position = data_dict['format'].upper().split(':').index('GT')
+        except Exception as e:
+            raise xlib.ProgramException(e, 'L007', 'GT', data_dict['chrom'], data_dict['pos'])
+
+        return gt_position
+
+    #---------------
+
+    def parse(self, data_dict):
+        '''
+        Parse the genotypes of a variant record and return the arrays of left and right allele codes.
+        '''
+
+        # get the position of the genotype in the field FORMAT
+        gt_position = self.get_gt_position(data_dict)
+
+        # get the genotype of every sample
+        sample_gt_list = [sample_data.split(':', gt_position + 1)[gt_position] for sample_data in data_dict['sample_list'][:self.sample_number]]
+
+        # parse the genotypes not found before
+        new_gt_list = [sample_gt for sample_gt in set(sample_gt_list) if sample_gt not in self.gt_index_dict]
+        if new_gt_list:
+            for sample_gt in new_gt_list:
+                sep_pos = sample_gt.find('/')
+                if sep_pos == -1:
+                    sep_pos = sample_gt.find('|')
+                if sep_pos == -1:
+                    raise xlib.ProgramException('', 'L008', 'GT', data_dict['chrom'], data_dict['pos'])
+                self.left_code_list.append(get_gt_code(sample_gt[:sep_pos], self.imputed_md_id, data_dict['chrom'], data_dict['pos']))
+                self.right_code_list.append(get_gt_code(sample_gt[sep_pos+1:], self.imputed_md_id, data_dict['chrom'], data_dict['pos']))
+                self.gt_index_dict[sample_gt] = len(self.left_code_list) - 1
+            self.left_code_array = np.array(self.left_code_list, dtype=np.int8)
+            self.right_code_array = np.array(self.right_code_list, dtype=np.int8)
+
+        # get the index of every sample genotype
+        gt_index_array = np.fromiter(map(self.gt_index_dict.__getitem__, sample_gt_list), dtype=np.intp, count=len(sample_gt_list))
+
+        # return the arrays of left and right allele codes
+        return self.left_code_array[gt_index_array], self.right_code_array[gt_index_array]
+
+    #---------------
+
+#-------------------------------------------------------------------------------
+
+class SpeciesAlleleCounter():
+    '''
+    This class counts the allele codes of the adult samples (samples without mother) per species group
+    (0: first species; 1: second species; 2: hybrids) in a variant or in a block of variants. The counts
+    have a column per allele code plus offset, so missing data and imputed missing data are also counted.
+    '''
+
+    #---------------
+
+    def __init__(self, species_id_list, mother_id_list, sp1_id, sp2_id):
+        '''
+        Initialize the object.
+        '''
+
+        self.sample_number = len(species_id_list)
+        self.group_number = 3
+        self.column_number = xlib.Const.GT_MAX_ALLELE_CODE + 1 + xlib.Const.GT_CODE_OFFSET
+
+        # species group of every sample and mask of the adult samples
+        self.group_array = np.array([0 if species_id == sp1_id else 1 if species_id == sp2_id else 2 for species_id in species_id_list], dtype=np.intp)
+        self.adult_mask = np.array([mother_id == 'NONE' for mother_id in mother_id_list], dtype=bool)
+
+    #---------------
+
+    def get_adult_number_array(self):
+        '''
+        Get the number of adult samples of every species group.
+        '''
+
+        return np.bincount(self.group_array[self.adult_mask], minlength=self.group_number)
+
+    #---------------
+
+    def count_alleles(self, allele_block, sample_mask_block=None):
+        '''
+        Count the allele codes of the adult samples per species group in an array of a variant or in a matrix of a
+        block of variants (rows: variants; columns: samples), only in the samples of the mask when it is passed.
+        The counts have the shape of the variant dimension plus (species groups, allele codes plus offset).
+        '''
+
+        # get the variant shape
+        variant_shape = allele_block.shape[:-1]
+        variant_number = int(np.prod(variant_shape))
+
+        # get the mask of the counted alleles
+        mask_block = np.broadcast_to(self.adult_mask, allele_block.shape)
+        if sample_mask_block is not None:
+            mask_block = mask_block & sample_mask_block
+
+        # get the count index of every allele: (variant, species group, allele code plus offset)
+        index_block = (np.arange(variant_number).reshape(variant_shape + (1,)) * self.group_number + self.group_array) * self.column_number + allele_block.astype(np.intp) + xlib.Const.GT_CODE_OFFSET
+
+        # count the alleles
+        count_block = np.bincount(index_block[mask_block], minlength=variant_number * self.group_number * self.column_number)
+
+        # return the counts
+        return count_block.reshape(variant_shape + (self.group_number, self.column_number))
+
+    #---------------
+
+    @staticmethod
+    def get_allele_frequencies(count_block):
+        '''
+        Get the allele frequencies from allele counts (the frequencies are 0 when there are not alleles).
+        '''
+
+        total_block = count_block.sum(axis=-1, keepdims=True)
+
+        return np.divide(count_block, total_block, out=np.zeros(count_block.shape, dtype=float), where=total_block > 0)
+
+    #---------------
+
+#-------------------------------------------------------------------------------
+
+class GenotypeMatrix():
+    '''
+    This class stores the left and right allele codes of genotypes (rows: variants; columns: samples)
+    in int8 arrays built by chunks, in memory or in disk-backed memory maps.
+    '''
+
+    #---------------
+
+    def __init__(self, sample_number, memmap_dir=None, chunk_size=xlib.Const.GENOTYPE_CHUNK_SIZE):
+        '''
+        Initialize the object.
+        '''
+
+        self.sample_number = sample_number
+        self.memmap_dir = memmap_dir
+        self.chunk_size = chunk_size
+
+        # variant number and buffers of the current chunk (they are grown until the chunk size)
+        self.variant_number = 0
+        self.buffer_row = 0
+        self.left_buffer = np.empty((min(64, chunk_size), sample_number), dtype=np.int8)
+        self.right_buffer = np.empty((min(64, chunk_size), sample_number), dtype=np.int8)
+
+        # completed chunks in memory or disk-backed files
+        self.left_chunk_list = []
+        self.right_chunk_list = []
+        self.left_memmap_file = None
+        self.right_memmap_file = None
+        self.left_memmap_file_id = None
+        self.right_memmap_file_id = None
+        if memmap_dir is not None:
+            (left_fd, self.left_memmap_file) = tempfile.mkstemp(prefix=f'{xlib.get_project_code()}-', suffix='-left.gt', dir=memmap_dir)
+            (right_fd, self.right_memmap_file) = tempfile.mkstemp(prefix=f'{xlib.get_project_code()}-', suffix='-right.gt', dir=memmap_dir)
+            self.left_memmap_file_id = os.fdopen(left_fd, mode='wb')
+            self.right_memmap_file_id = os.fdopen(right_fd, mode='wb')
+
+        # final matrices
+        self.left_matrix = None
+        self.right_matrix = None
+
+    #---------------
+
+    def append(self, left_array, right_array):
+        '''
+        Append the left and right allele codes of a variant.
+        '''
+
+        # grow the buffers or flush the chunk when they are full
+        if self.buffer_row == self.left_buffer.shape[0]:
+            if self.left_buffer.shape[0] < self.chunk_size:
+                new_row_number = min(2 * self.left_buffer.shape[0], self.chunk_size)
+                self.left_buffer = np.resize(self.left_buffer, (new_row_number, self.sample_number))
+                self.right_buffer = np.resize(self.right_buffer, (new_row_number, self.sample_number))
+            else:
+                self._flush()
+
+        # store the allele codes
+        self.left_buffer[self.buffer_row] = left_array
+        self.right_buffer[self.buffer_row] = right_array
+        self.buffer_row += 1
+        self.variant_number += 1
+
+    #---------------
+
+    def append_block(self, left_block, right_block):
+        '''
+        Append the left and right allele codes of a block of variants (rows: variants; columns: samples).
+        '''
+
+        # save the rows of the current chunk before the block
+        self._flush()
+
+        # store the allele codes of the block
+        if self.memmap_dir is None:
+            self.left_chunk_list.append(np.array(left_block, dtype=np.int8))
+            self.right_chunk_list.append(np.array(right_block, dtype=np.int8))
+        else:
+            np.ascontiguousarray(left_block, dtype=np.int8).tofile(self.left_memmap_file_id)
+            np.ascontiguousarray(right_block, dtype=np.int8).tofile(self.right_memmap_file_id)
+        self.variant_number += left_block.shape[0]
+
+    #---------------
+
+    def _flush(self):
+        '''
+        Save the rows of the current chunk.
+        '''
+
+        if self.buffer_row > 0:
+            if self.memmap_dir is None:
+                self.left_chunk_list.append(self.left_buffer[:self.buffer_row].copy())
+                self.right_chunk_list.append(self.right_buffer[:self.buffer_row].copy())
+            else:
+                self.left_buffer[:self.buffer_row].tofile(self.left_memmap_file_id)
+                self.right_buffer[:self.buffer_row].tofile(self.right_memmap_file_id)
+            self.buffer_row = 0
+
+    #---------------
+
+    def finish(self):
+        '''
+        End the load of variants and build the final matrices.
+        '''
+
+        self._flush()
+
+        if self.memmap_dir is None:
+            if self.left_chunk_list:
+                self.left_matrix = np.concatenate(self.left_chunk_list)
+                self.right_matrix = np.concatenate(self.right_chunk_list)
+            else:
+                self.left_matrix = np.empty((0, self.sample_number), dtype=np.int8)
+                self.right_matrix = np.empty((0, self.sample_number), dtype=np.int8)
+            self.left_chunk_list = []
+            self.right_chunk_list = []
+        else:
+            self.left_memmap_file_id.close()
+            self.right_memmap_file_id.close()
+            if self.variant_number > 0:
+                self.left_matrix = np.memmap(self.left_memmap_file, dtype=np.int8, mode='r', shape=(self.variant_number, self.sample_number))
+                self.right_matrix = np.memmap(self.right_memmap_file, dtype=np.int8, mode='r', shape=(self.variant_number, self.sample_number))
+            else:
+                self.left_matrix = np.empty((0, self.sample_number), dtype=np.int8)
+                self.right_matrix = np.empty((0, self.sample_number), dtype=np.int8)
+
+        # release the buffers
+        self.left_buffer = None
+        self.right_buffer = None
+
+    #---------------
+
+    def get_variant_number(self):
+        '''
+        Get the number of variants.
+        '''
+
+        return self.variant_number
+
+    #---------------
+
+    def get_variant_mask(self, gt_code):
+        '''
+        Get a boolean array with the variants where any sample has an allele code.
+        '''
+
+        variant_mask = np.zeros(self.variant_number, dtype=bool)
+
+        for first_variant in range(0, self.variant_number, self.chunk_size):
+            last_variant = min(first_variant + self.chunk_size, self.variant_number)
+            variant_mask[first_variant:last_variant] = np.any(self.left_matrix[first_variant:last_variant] == gt_code, axis=1) | np.any(self.right_matrix[first_variant:last_variant] == gt_code, axis=1)
+
+        return variant_mask
+
+    #---------------
+
+    def get_translated_matrix(self, code_dict, memmap_dir=None):
+        '''
+        Get a new matrix with the allele codes translated by chunks using a dictionary (key: old code; value: new code).
+        '''
+
+        # build the lookup table of the codes
+        lut_array = np.arange(-xlib.Const.GT_CODE_OFFSET, xlib.Const.GT_MAX_ALLELE_CODE + 1, dtype=np.int8)
+        for (old_code, new_code) in code_dict.items():
+            lut_array[old_code + xlib.Const.GT_CODE_OFFSET] = new_code
+
+        # build the translated matrix
+        translated_matrix = GenotypeMatrix(self.sample_number, memmap_dir=memmap_dir, chunk_size=self.chunk_size)
+        for (_, left_block, right_block) in self.iter_variant_blocks():
+            translated_matrix.append_block(lut_array[left_block.astype(np.intp) + xlib.Const.GT_CODE_OFFSET], lut_array[right_block.astype(np.intp) + xlib.Const.GT_CODE_OFFSET])
+        translated_matrix.finish()
+
+        # return the translated matrix
+        return translated_matrix
+
+    #---------------
+
+    def iter_variant_blocks(self):
+        '''
+        Iterate over blocks of variants (a chunk per block) returning the first variant and the left and right matrices (rows: variants; columns: samples) of the block.
+        '''
+
+        for first_variant in range(0, self.variant_number, self.chunk_size):
+            last_variant = min(first_variant + self.chunk_size, self.variant_number)
+            yield first_variant, self.left_matrix[first_variant:last_variant], self.right_matrix[first_variant:last_variant]
+
+    #---------------
+
+    def iter_sample_blocks(self, variant_mask=None, block_size=xlib.Const.GENOTYPE_SAMPLE_BLOCK_SIZE):
+        '''
+        Iterate over blocks of samples returning the first sample and the transposed left and right matrices (rows: samples; columns: variants) of the block.
+        '''
+
+        for first_sample in range(0, self.sample_number, block_size):
+            last_sample = min(first_sample + block_size, self.sample_number)
+            left_block = self.left_matrix[:, first_sample:last_sample]
+            right_block = self.right_matrix[:, first_sample:last_sample]
+            if variant_mask is not None:
+                left_block = left_block[variant_mask]
+                right_block = right_block[variant_mask]
+            yield first_sample, np.ascontiguousarray(left_block.T), np.ascontiguousarray(right_block.T)
+
+    #---------------
+
+    def close(self):
+        '''
+        Release the matrices and remove the disk-backed files.
+        '''
+
+        self.left_matrix = None
+        self.right_matrix = None
+
+        for (memmap_file_id, memmap_file) in [(self.left_memmap_file_id, self.left_memmap_file), (self.right_memmap_file_id, self.right_memmap_file)]:
+            if memmap_file_id is not None and not memmap_file_id.closed:
+                memmap_file_id.close()
+            if memmap_file is not None and os.path.isfile(memmap_file):
+                os.remove(memmap_file)
+
+    #---------------
+
+#-------------------------------------------------------------------------------
+
+class GenotypeBlockPrefetcher():
+    '''
+    This class reads genotype blocks (e.g. the results of an analysis of a sequence) using a read function in a
+    background thread, so the block of the next sequence can be read while the current one is processed. A block
+    is released when it is got.
+    '''
+
+    #---------------
+
+    def __init__(self, read_function):
+        '''
+        Initialize the object.
+        '''
+
+        self.read_function = read_function
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        self.future_dict = {}
+
+    #---------------
+
+    def __enter__(self):
+        '''
+        Return the object in a with statement.
+        '''
+
+        return self
+
+    #---------------
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        '''
+        Shut down the background thread cancelling the pending reads.
+        '''
+
+        self.executor.shutdown(wait=True, cancel_futures=True)
+        self.future_dict = {}
+
+    #---------------
+
+    def prefetch(self, file):
+        '''
+        Start reading the block of a file in the background thread.
+        '''
+
+        if file not in self.future_dict:
+            self.future_dict[file] = self.executor.submit(self.read_function, file)
+
+    #---------------
+
+    def get(self, file):
+        '''
+        Get the block of a file waiting for its reading (the block is not kept by the object).
+        '''
+
+        self.prefetch(file)
+
+        return self.future_dict.pop(file).result()
+
+    #---------------
+
+#-------------------------------------------------------------------------------
+
+class KinshipAccumulator():
+    '''
+    This class accumulates the summations used to calculate the kinship between each pair of samples
+    (Goudet, Kay, Weir - 2018 - How to estimate kinship - DOI: 10.1111/mec.14833) as Gram matrices
+    (samples x samples) updated with blocks of variants:
+
+        rbeta:
+            (1 + (Xi - 1) * (Xj - 1)) / 2 ---> rbeta_summation
+
+        rw:
+            (Xi - 2 * p) * (Xj - 2 * p) ---> rw_numerator_summation
+            2 * p * (1 - p) ---> rw_denominator_summation
+
+        ru:
+            (Xi - 2 * p) * (Xj - 2 * p) / (2 * p * (1 - p)) ---> ru_summation
+
+    where Xi are Xj are the dosage of reference allele for samples i and j respectivily and p is the
+    frecuence of reference allele in the variant (no summation is done when there is missing data in
+    samples i or j, or p value is 0 or 1 when rw and ru).
+    The genotypes of a variant are pseudo binary numbers: 0 (0/0), 1 (0/1), 3 (1/1) and 7 (missing data).
+    '''
+
+    #---------------
+
+    def __init__(self, sample_number, block_size=None):
+        '''
+        Initialize the object.
+        '''
+
+        self.sample_number = sample_number
+        self.block_size = xlib.Const.KINSHIP_VARIANT_BLOCK_SIZE if block_size is None else block_size
+
+        # genotype block of the pending variants
+        self.gt_block = np.empty((self.block_size, sample_number), dtype=np.int8)
+        self.variant_number = 0
+
+        # summation matrices (only the upper triangle is used)
+        self.rbeta_summation = np.zeros((sample_number, sample_number))
+        self.rw_numerator_summation = np.zeros((sample_number, sample_number))
+        self.rw_denominator_summation = np.zeros((sample_number, sample_number))
+        self.ru_summation = np.zeros((sample_number, sample_number))
+        self.ru_l = np.zeros((sample_number, sample_number))
+
+        # summation of the rbeta items of the pairs of samples of the last variant (used to calculate Ms)
+        self.last_summation_mij = 0
+
+    #---------------
+
+    def add_variant(self, pseudobinary_sample_gt_list):
+        '''
+        Add the genotypes of a variant updating the summations when the block is full.
+        '''
+
+        self.gt_block[self.variant_number] = pseudobinary_sample_gt_list
+        self.variant_number += 1
+        if self.variant_number == self.block_size:
+            self.update_summations()
+
+    #---------------
+
+    def update_summations(self):
+        '''
+        Update the summations with the pending variants.
+        '''
+
+        if self.variant_number == 0:
+            return
+
+        gt_block = self.gt_block[:self.variant_number]
+
+        # get the mask of samples without missing data, the dosages of reference allele and its frecuency per variant
+        valid_block = (gt_block != 7).astype(np.float64)
+        x_block = np.where(gt_block == 0, 2.0, np.where(gt_block == 1, 1.0, 0.0))
+        p_array = ((gt_block == 0).sum(axis=1) * 2 + (gt_block == 1).sum(axis=1)) / (self.sample_number * 2)
+
+        # update the rbeta summation: the sum over variants of (1 + (Xi - 1) * (Xj - 1)) / 2 for the pairs without missing data
+        y_block = valid_block * (x_block - 1)
+        self.rbeta_summation += (valid_block.T @ valid_block + y_block.T @ y_block) / 2
+
+        # update the rw and ru summations with the variants whose p value is not 0 or 1
+        informative_array = (p_array != 0) & (p_array != 1)
+        if informative_array.any():
+            valid_informative_block = valid_block[informative_array]
+            p_informative_array = p_array[informative_array][:, np.newaxis]
+            denominator_array = 2 * p_informative_array * (1 - p_informative_array)
+            z_block = valid_informative_block * (x_block[informative_array] - 2 * p_informative_array)
+            self.rw_numerator_summation += z_block.T @ z_block
+            self.rw_denominator_summation += (valid_informative_block * denominator_array).T @ valid_informative_block
+            self.ru_summation += (z_block / denominator_array).T @ z_block
+            self.ru_l += valid_informative_block.T @ valid_informative_block
+
+        # calculate the summation of the rbeta items of the pairs of samples of the last variant
+        valid_number = valid_block[-1].sum()
+        y_summation = y_block[-1].sum()
+        all_pairs_summation = (valid_number * valid_number + y_summation * y_summation) / 2
+        same_sample_summation = (valid_number + (y_block[-1] * y_block[-1]).sum()) / 2
+        self.last_summation_mij = (all_pairs_summation - same_sample_summation) / 2
+
+        self.variant_number = 0
+
+    #---------------
+
+    def get_ms(self):
+        '''
+        Get the Ms value (average of the rbeta items of the pairs of samples of the last variant).
+        '''
+
+        self.update_summations()
+
+        return self.last_summation_mij * 2 / (self.sample_number * (self.sample_number - 1))
+
+    #---------------
+
+    def iter_kinship_rows(self, undefined_value=-999):
+        '''
+        Get a generator of the kinship rows (i, j, rbeta, rw, ru) of each pair of samples i < j; rw and ru are the undefined
+        value when all variants have missing data in at least one of the two samples or p value is 0 or 1.
+        '''
+
+        ms = self.get_ms()
+
+        # for each sample i, calculate the kinship with samples j > i
+        for i in range(self.sample_number - 1):
+            j_array = np.arange(i + 1, self.sample_number)
+            rbeta_array = (self.rbeta_summation[i, i + 1:] - ms) / (1 - ms)
+            ru_l_array = self.ru_l[i, i + 1:]
+            defined_array = ru_l_array != 0
+            rw_array = np.full(len(j_array), float(undefined_value))
+            ru_array = np.full(len(j_array), float(undefined_value))
+            rw_array[defined_array] = self.rw_numerator_summation[i, i + 1:][defined_array] / self.rw_denominator_summation[i, i + 1:][defined_array]
+            ru_array[defined_array] = self.ru_summation[i, i + 1:][defined_array] / ru_l_array[defined_array]
+            yield from zip([i] * len(j_array), j_array.tolist(), rbeta_array.tolist(), rw_array.tolist(), ru_array.tolist())
+
+    #---------------
+
+    def get_undefined_pair_list(self):
+        '''
+        Get the list of pairs of samples (i, j) whose rw and ru can not be calculated.
+        '''
+
+        self.update_summations()
+
+        (i_array, j_array) = np.nonzero(np.triu(self.ru_l == 0, k=1))
+
+        return list(zip(i_array.tolist(), j_array.tolist()))
+
+    #---------------
+
+#-------------------------------------------------------------------------------
+
+class GenotypeDataCache():
+    '''
+    This class keeps the genotype data of the VCF files read with read_genotype_data (vcf2mach.py, vcf2structure.py and
+    calculate-genotype-data.py) by the steps of a pipeline run in the same process. The genotype data of a file are saved
+    per identification of imputed missing data (key: file; value: dictionary with the identification as key).
+    '''
+
+    #---------------
+
+    cache_status = False
+    genotype_data_dict = {}
+
+    #---------------
+
+    @staticmethod
+    def set_cache_status(status):
+        '''
+        Set the cache status; when it is set to False, the genotype data saved are released.
+        '''
+
+        if not status:
+            for imputed_genotype_data_dict in GenotypeDataCache.genotype_data_dict.values():
+                for genotype_data in imputed_genotype_data_dict.values():
+                    genotype_data['genotype_matrix'].close()
+            GenotypeDataCache.genotype_data_dict = {}
+
+        GenotypeDataCache.cache_status = status
+
+    #---------------
+
+    @staticmethod
+    def get_key(vcf_file):
+        '''
+        Get the key of the genotype data of a VCF file (the file can be rewritten by a step).
+        '''
+
+        file_stat = os.stat(vcf_file)
+
+        return (os.path.realpath(vcf_file), file_stat.st_mtime_ns, file_stat.st_size)
+
+    #---------------
+
+    @staticmethod
+    def get(vcf_file, imputed_md_id):
+        '''
+        Get the genotype data of a VCF file if they are saved.
+        '''
+
+        if not GenotypeDataCache.cache_status or not os.path.isfile(vcf_file):
+            return None
+
+        return GenotypeDataCache.genotype_data_dict.get(GenotypeDataCache.get_key(vcf_file), {}).get(imputed_md_id)
+
+    #---------------
+
+    @staticmethod
+    def get_any(vcf_file):
+        '''
+        Get the identification of imputed missing data and the genotype data of a VCF file read with any identification if they are saved.
+        '''
+
+        if not GenotypeDataCache.cache_status or not os.path.isfile(vcf_file):
+            return None
+
+        return next(iter(GenotypeDataCache.genotype_data_dict.get(GenotypeDataCache.get_key(vcf_file), {}).items()), None)
+
+    #---------------
+
+    @staticmethod
+    def put(vcf_file, imputed_md_id, genotype_data):
+        '''
+        Save the genotype data of a VCF file.
+        '''
+
+        if GenotypeDataCache.cache_status:
+            GenotypeDataCache.genotype_data_dict.setdefault(GenotypeDataCache.get_key(vcf_file), {})[imputed_md_id] = genotype_data
+
+    #---------------
+
+#-------------------------------------------------------------------------------
+
+if __name__ == '__main__':
+    print(f'This source contains functions and classes used to manage genotype matrices in {xlib.get_project_name()} software package.')
+    sys.exit(0)
+
+#-------------------------------------------------------------------------------
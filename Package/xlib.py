@@ -26,12 +26,21 @@ Licence: GNU General Public Licence Version 3.
 #-------------------------------------------------------------------------------
 
 import collections
+import concurrent.futures
+import contextlib
+import datetime
 import gzip
+import importlib
+import importlib.util
+import json
+import multiprocessing.util
 import os
 import re
 import subprocess
 import sys
-import requests
+import tempfile
+import time
+import zlib
 
 #-------------------------------------------------------------------------------
 
@@ -62,6 +71,36 @@ def get_project_version():
 
 #-------------------------------------------------------------------------------
 
+def get_program_dir():
+    '''
+    Get the directory of the programs.
+    '''
+
+    return os.path.dirname(os.path.abspath(__file__))
+
+#-------------------------------------------------------------------------------
+
+def get_program_list():
+    '''
+    Get the list of the programs (Python sources with a main line) of the package.
+    '''
+
+    # initialize the program list
+    program_list = []
+
+    # get the programs
+    program_dir = get_program_dir()
+    for file_name in sorted(os.listdir(program_dir)):
+        if file_name.endswith('.py'):
+            with open(os.path.join(program_dir, file_name), mode='r', encoding='utf-8') as file_id:
+                if re.search(r"^if __name__ == '__main__':\n+    main\(\)", file_id.read(), re.MULTILINE):
+                    program_list.append(file_name)
+
+    # return the program list
+    return program_list
+
+#-------------------------------------------------------------------------------
+
 def check_os():
     '''
     Check the operating system.
@@ -498,39 +537,17 @@ def read_vcf_file(vcf_file_id, sample_number, check_sample_number=True):
     # if there is a variant record
     if record != '' and not record.startswith('##') and not record.startswith('#CHROM'):
 
-        # split the record data
-        record_data_list = []
-        start = 0
-        for end in [i for i, chr in enumerate(record) if chr == '\t']:
-            record_data_list.append(record[start:end].strip())
-            start = end + 1
-        record_data_list.append(record[start:].strip('\n').strip())
+        # get the record data dictionary
+        data_dict = get_vcf_variant_data_dict(record)
 
         # check if the number of sample data
-        if check_sample_number and len(record_data_list) - 9 != sample_number:
+        if check_sample_number and len(data_dict['sample_list']) != sample_number:
             print(f'sample_number: {sample_number}')
-            print(f'len(record_data_list) - 9: {len(record_data_list) - 9}')
-            raise ProgramException('L006', record_data_list[0], record_data_list[1])
-
-        # extract data from the record
-        chrom = record_data_list[0]
-        pos = record_data_list[1]
-        id = record_data_list[2]
-        ref = record_data_list[3]
-        alt = record_data_list[4]
-        qual = record_data_list[5]
-        filter = record_data_list[6]
-        info = record_data_list[7]
-        format = record_data_list[8]
-        sample_list = []
-        for i in range(len(record_data_list) - 9):
-            sample_list.append(record_data_list[i + 9])
+            print(f'len(record_data_list) - 9: {len(data_dict["sample_list"])}')
+            raise ProgramException('', 'L006', data_dict['chrom'], data_dict['pos'])
 
         # set the key
-        key = f'{chrom}-{int(pos):09d}'
-
-        # get the record data dictionary
-        data_dict = {'chrom': chrom, 'pos': pos, 'id': id, 'ref': ref, 'alt': alt, 'qual': qual, 'filter': filter, 'info': info, 'format': format, 'sample_list': sample_list}
+        key = f'{data_dict["chrom"]}-{int(data_dict["pos"]):09d}'
 
     # if there is not any record
     else:
@@ -543,6 +560,56 @@ def read_vcf_file(vcf_file_id, sample_number, check_sample_number=True):
 
 #-------------------------------------------------------------------------------
 
+def get_vcf_variant_data_dict(record):
+    '''
+    Get the data dictionary of a VCF variant record.
+    '''
+
+    # split the record data
+    record_data_list = [field.strip() for field in record.split('\t')]
+
+    # return the record data dictionary
+    return {'chrom': record_data_list[0], 'pos': record_data_list[1], 'id': record_data_list[2], 'ref': record_data_list[3], 'alt': record_data_list[4], 'qual': record_data_list[5], 'filter': record_data_list[6], 'info': record_data_list[7], 'format': record_data_list[8], 'sample_list': record_data_list[9:]}
+
+#-------------------------------------------------------------------------------
+
+def iter_vcf_variant_records(first_record, vcf_file_id):
+    '''
+    Iterate over the variant records of a VCF file beginning with the first one already read.
+    '''
+
+    if first_record != '':
+        yield first_record
+
+    yield from vcf_file_id
+
+#-------------------------------------------------------------------------------
+
+def iter_vcf_sequence_variant_records(first_record, vcf_file_id):
+    '''
+    Iterate over the variant records of a VCF file beginning with the first one already read grouped by their
+    sequence identification (field CHROM) yielding the sequence identification and its variant record list.
+    '''
+
+    # initialize the sequence identification and its variant record list
+    seq_id = None
+    seq_record_list = []
+
+    # group the consecutive variant records of the same sequence
+    for record in iter_vcf_variant_records(first_record, vcf_file_id):
+        record_seq_id = record[:record.find('\t')].strip()
+        if record_seq_id != seq_id and seq_record_list:
+            yield seq_id, seq_record_list
+            seq_record_list = []
+        seq_id = record_seq_id
+        seq_record_list.append(record)
+
+    # yield the last sequence
+    if seq_record_list:
+        yield seq_id, seq_record_list
+
+#-------------------------------------------------------------------------------
+
 def get_sample_data(sample_file, sp1_id, sp2_id, hybrid_id):
     '''
     Get data of the samples included in a VCF file from a file with record format: format: sample_id;species_id
@@ -725,6 +792,9 @@ def get_taxonomy_dict(type, value):
     Get a taxonomy dictionary with the a species data downloaded from the taxonomy server.
     '''
 
+    # import requests here because it is only used by this function and its import is slow
+    import requests    # pylint: disable=import-outside-toplevel
+
     # initialize the taxonomy dictionary
     taxonomy_dict = {}
 
@@ -1441,6 +1511,413 @@ def read_trinotate_annotation_record(file_name, file_id, record_counter):
 
 #-------------------------------------------------------------------------------
 
+def get_annotation_format_dict():
+    '''
+    Get the dictionary of the functional annotation file formats (field separator, characters stripped from the values and column list).
+    '''
+
+    # set the column lists of the TOA annotation files
+    toa_plaza_column_list = ['seq_id', 'nt_seq_id', 'aa_seq_id', 'hit_num', 'hsp_num', 'iteration_iter_num', 'hit_accession', 'hsp_evalue', 'hsp_identity', 'hsp_positive', 'hsp_gaps', 'hsp_align_len', 'hsp_qseq', 'species', 'family', 'phylum', 'kingdom', 'superkingdom', 'desc', 'databases', 'go_id', 'go_desc', 'interpro_id', 'interpro_desc', 'mapman_id', 'mapman_desc', 'ec_id', 'kegg_id', 'metacyc_id']
+    toa_refseq_column_list = ['seq_id', 'nt_seq_id', 'aa_seq_id', 'hit_num', 'hsp_num', 'iteration_iter_num', 'hit_id', 'hsp_evalue', 'hsp_identity', 'hsp_positive', 'hsp_gaps', 'hsp_align_len', 'hsp_qseq', 'species', 'family', 'phylum', 'kingdom', 'superkingdom', 'desc', 'databases', 'gene_id', 'status', 'rna_nucleotide_accession', 'protein_accession', 'genomic_nucleotide_accession', 'gene_symbol', 'go_id', 'evidence', 'go_term', 'category', 'interpro_id', 'interpro_desc', 'ec_id', 'kegg_id', 'metacyc_id']
+    toa_nt_nr_column_list = ['seq_id', 'nt_seq_id', 'aa_seq_id', 'hit_num', 'hsp_num', 'iteration_iter_num', 'hit_id', 'hsp_evalue', 'hsp_identity', 'hsp_positive', 'hsp_gaps', 'hsp_align_len', 'hsp_qseq', 'species', 'family', 'phylum', 'kingdom', 'superkingdom', 'desc', 'databases']
+    toa_merger_column_list = ['seq_id', 'nt_seq_id', 'aa_seq_id', 'hit_num', 'hsp_num', 'hit_id', 'hsp_evalue', 'hsp_identity', 'hsp_positive', 'hsp_gaps', 'hsp_align_len', 'hsp_qseq', 'species', 'family', 'phylum', 'kingdom', 'superkingdom', 'desc', 'databases', 'go_id', 'go_desc', 'interpro_id', 'interpro_desc', 'mapman_id', 'mapman_desc', 'ec_id', 'kegg_id', 'metacyc_id', 'refseq_gene_id', 'refseq_desc', 'refseq_status', 'refseq_rna_nucleotide_accession', 'refseq_protein_accession', 'refseq_genomic_nucleotide_accession', 'refseq_gene_symbol']
+
+    # set the column list of the gymnoTOA annotation files
+    gymnotoa_column_list = ['qseqid', 'sseqid', 'pident', 'length', 'mismatch', 'gapopen', 'qstart', 'qend', 'sstart', 'send', 'evalue', 'bitscore', 'aligner', 'ncbi_description', 'ncbi_species', 'tair10_ortholog_seq_id', 'interpro_goterms', 'panther_goterms', 'metacyc_pathways', 'eggnog_ortholog_seq_id', 'eggnog_ortholog_species', 'eggnog_ogs', 'cog_category', 'eggnog_description', 'eggnog_goterms', 'ec', 'kegg_kos', 'kegg_pathways', 'kegg_modules', 'kegg_reactions', 'kegg_rclasses', 'brite', 'kegg_tc', 'cazy', 'pfams']
+
+    # set the column list of the Blast2GO annotation files
+    blast2go_column_list = ['unknown', 'tags', 'seq_name', 'description', 'length', 'hit_counter', 'e_value', 'sim_mean', 'go_counter', 'go_ids', 'go_names', 'enzyme_codes', 'enzyme_names', 'interpro_ids', 'interpro_go_ids', 'interpro_go_names']
+
+    # set the column lists of the EnTAP annotation files
+    entap_eggnog_column_list = ['eggnog_seed_ortholog', 'eggnog_seed_e_value', 'eggnog_seed_score', 'eggnog_tax_scope_max', 'eggnog_member_ogs', 'eggnog_description', 'eggnog_cog_abbreviation', 'eggnog_cog_description', 'eggnog_bigg_reaction', 'eggnog_kegg_ko', 'eggnog_kegg_pathway', 'eggnog_kegg_module', 'eggnog_kegg_reaction', 'eggnog_kegg_rclass', 'eggnog_brite', 'eggnog_go_biological', 'eggnog_go_cellular', 'eggnog_go_molecular', 'eggnog_protein_domains']
+    entap_runn_column_list = ['query_sequence', 'subject_sequence', 'percent_identical', 'alignment_length', 'mismatches', 'gap_openings', 'query_start', 'query_end', 'subject_start', 'subject_end', 'e_value', 'coverage', 'description', 'species', 'taxonomic_lineage', 'origin_database', 'contaminant', 'informative'] + entap_eggnog_column_list
+    entap_runp_column_list = ['query_sequence', 'frame', 'subject_sequence', 'percent_identical', 'alignment_length', 'mismatches', 'gap_openings', 'query_start', 'query_end', 'subject_start', 'subject_end', 'e_value', 'coverage', 'description', 'species', 'taxonomic_lineage', 'origin_database', 'contaminant', 'informative'] + entap_eggnog_column_list
+
+    # set the column list of the TRAPID annotation files
+    trapid_column_list = ['counter', 'transcript_id', 'go', 'evidence_code', 'is_hidden', 'description']
+
+    # set the column list of the Trinotate annotation files
+    trinotate_column_list = ['gene_id', 'transcript_id', 'sprot_top_blastx_hit', 'rnammer', 'prot_id', 'prot_coords', 'sprot_top_blastp_hit', 'pfam', 'signalp', 'tmhmmx', 'eggnog', 'kegg', 'gene_ontology_blastx', 'gene_ontology_blastp', 'gene_ontology_pfam', 'transcript', 'peptide']
+
+    # return the annotation format dictionary
+    return {
+        'TOA-PLAZA': {'separator': ';', 'strip': 'QUOTES', 'column_list': toa_plaza_column_list},
+        'TOA-REFSEQ': {'separator': ';', 'strip': 'QUOTES', 'column_list': toa_refseq_column_list},
+        'TOA-NT': {'separator': ';', 'strip': 'QUOTES', 'column_list': toa_nt_nr_column_list},
+        'TOA-NR': {'separator': ';', 'strip': 'QUOTES', 'column_list': toa_nt_nr_column_list},
+        'TOA-MERGER': {'separator': ';', 'strip': 'QUOTES', 'column_list': toa_merger_column_list},
+        'GYMNOTOA': {'separator': ';', 'strip': 'SPACES', 'column_list': gymnotoa_column_list},
+        'BLAST2GO': {'separator': '\t', 'strip': None, 'column_list': blast2go_column_list},
+        'ENTAP-RUNN': {'separator': '\t', 'strip': None, 'column_list': entap_runn_column_list},
+        'ENTAP-RUNP': {'separator': '\t', 'strip': None, 'column_list': entap_runp_column_list},
+        'TRAPID': {'separator': '\t', 'strip': None, 'column_list': trapid_column_list},
+        'TRINOTATE': {'separator': '\t', 'strip': None, 'column_list': trinotate_column_list},
+        }
+
+#-------------------------------------------------------------------------------
+
+def read_annotation_file_blocks(annotation_file, annotation_format, column_list, block_size=None):
+    '''
+    Read a functional annotation file (the first record is the header) and yield its data records in blocks:
+    every block is a dictionary with the value list of each column of the column list.
+    '''
+
+    # set the block size (characters read in every block)
+    if block_size is None:
+        block_size = Const.ANNOTATION_BLOCK_SIZE
+
+    # get the format data and the positions of the columns
+    format_dict = get_annotation_format_dict()[annotation_format]
+    separator = format_dict['separator']
+    strip = format_dict['strip']
+    column_number = len(format_dict['column_list'])
+    position_list = [format_dict['column_list'].index(column) for column in column_list]
+
+    # open the annotation file
+    if annotation_file.endswith('.gz'):
+        try:
+            annotation_file_id = gzip.open(annotation_file, mode='rt', encoding='iso-8859-1')
+        except Exception as e:
+            raise ProgramException(e, 'F002', annotation_file)
+    else:
+        try:
+            annotation_file_id = open(annotation_file, mode='r', encoding='iso-8859-1')
+        except Exception as e:
+            raise ProgramException(e, 'F001', annotation_file)
+
+    try:
+
+        # skip the header record
+        annotation_file_id.readline()
+        record_counter = 1
+
+        # while there are records, read a block of records
+        record_list = annotation_file_id.readlines(block_size)
+        while record_list:
+
+            # split the records
+            data_list_list = [record.rstrip('\n').split(separator) for record in record_list]
+
+            # check the field number of the records
+            if min(len(data_list) for data_list in data_list_list) < column_number:
+                for i, data_list in enumerate(data_list_list, start=1):
+                    if len(data_list) < column_number:
+                        raise ProgramException('', 'F009', os.path.basename(annotation_file), record_counter + i)
+            record_counter += len(record_list)
+
+            # yield the value lists of the columns
+            if strip is None:
+                yield {column: [data_list[position] for data_list in data_list_list] for (column, position) in zip(column_list, position_list)}
+            elif strip == 'QUOTES':
+                yield {column: [data_list[position].strip('"') for data_list in data_list_list] for (column, position) in zip(column_list, position_list)}
+            else:
+                yield {column: [data_list[position].strip() for data_list in data_list_list] for (column, position) in zip(column_list, position_list)}
+
+            # read the next block of records
+            record_list = annotation_file_id.readlines(block_size)
+
+    finally:
+
+        # close the annotation file
+        annotation_file_id.close()
+
+#-------------------------------------------------------------------------------
+
+def iter_annotation_file_records(annotation_file, annotation_format, column_list, block_size=None):
+    '''
+    Read a functional annotation file (the first record is the header) in blocks and yield a tuple with the values
+    of the column list for every data record.
+    '''
+
+    for block_dict in read_annotation_file_blocks(annotation_file, annotation_format, column_list, block_size):
+        yield from zip(*[block_dict[column] for column in column_list])
+
+#-------------------------------------------------------------------------------
+
+def get_locus_id_data(record):
+    '''
+    Get the variant sequence and the locus identification of a locus id record (//variant_sequence|locus_id|) of an ipyrad loci file.
+    '''
+
+    # the locus identification is between the two last "|"
+    data = record.rstrip('\n')
+    if not data.startswith('//') or not data.endswith('|') or data[2:-1].find('|') == -1:
+        return None, None
+    (variant_seq, _, locus_id) = data[2:-1].rpartition('|')
+
+    return variant_seq, locus_id
+
+#-------------------------------------------------------------------------------
+
+def get_locus_sequence_data(record):
+    '''
+    Get the taxon identification and the sequence of a locus information record (taxon_id sequence) of an ipyrad loci file.
+    '''
+
+    # the sequence is after the last space
+    (taxon_id, _, sequence) = record.rstrip('\n').rpartition(' ')
+
+    return taxon_id.strip(), sequence.strip()
+
+#-------------------------------------------------------------------------------
+
+def iter_loci(loci_file):
+    '''
+    Read an ipyrad loci file and yield the locus identification, the variant sequence and the list of taxon identifications and sequences of every locus.
+    '''
+
+    # open the loci file
+    try:
+        loci_file_id = open(loci_file, mode='r', encoding='iso-8859-1')
+    except Exception as e:
+        raise ProgramException(e, 'F001', loci_file)
+
+    try:
+
+        # initialize the list of taxon identifications and sequences of the locus
+        taxon_sequence_list = []
+
+        # for each record
+        for record_counter, record in enumerate(loci_file_id, start=1):
+
+            # process the locus id record
+            if record.startswith('//'):
+                (variant_seq, locus_id) = get_locus_id_data(record)
+                if locus_id is None:
+                    raise ProgramException('', 'F009', os.path.basename(loci_file), record_counter)
+                yield locus_id, variant_seq, taxon_sequence_list
+                taxon_sequence_list = []
+
+            # process a locus information record
+            else:
+                taxon_sequence_list.append(get_locus_sequence_data(record))
+
+    finally:
+
+        # close the loci file
+        loci_file_id.close()
+
+#-------------------------------------------------------------------------------
+
+def build_loci_index(loci_file):
+    '''
+    Build the byte-offset index of an ipyrad loci file: a dictionary with the locus identification as key
+    and a tuple with the offset, length and taxa number of the records of the locus as value.
+    '''
+
+    # initialize the index
+    loci_index_dict = {}
+
+    # open the loci file in binary mode to get the offsets
+    try:
+        loci_file_id = open(loci_file, mode='rb')
+    except Exception as e:
+        raise ProgramException(e, 'F001', loci_file)
+
+    # initialize the offset and the data of the current locus
+    offset = 0
+    locus_offset = 0
+    taxa_number = 0
+
+    # for each record
+    for record_counter, record in enumerate(loci_file_id, start=1):
+
+        offset += len(record)
+
+        # process the locus id record
+        if record.startswith(b'//'):
+            (_, locus_id) = get_locus_id_data(record.decode('iso-8859-1'))
+            if locus_id is None:
+                raise ProgramException('', 'F009', os.path.basename(loci_file), record_counter)
+            if locus_id in loci_index_dict:
+                raise ProgramException('', 'F012', os.path.basename(loci_file), locus_id)
+            loci_index_dict[locus_id] = (locus_offset, offset - locus_offset, taxa_number)
+            locus_offset = offset
+            taxa_number = 0
+
+        # process a locus information record
+        else:
+            taxa_number += 1
+
+    # close the loci file
+    loci_file_id.close()
+
+    # return the index
+    return loci_index_dict
+
+#-------------------------------------------------------------------------------
+
+def get_loci_index(loci_file):
+    '''
+    Get the byte-offset index of an ipyrad loci file. The index is built the first time and saved in the file
+    {loci_file}.idx; later, it is read from this file while the loci file is not changed.
+    '''
+
+    # set the index file and the loci file data used to check if the index file is updated
+    index_file = f'{loci_file}.idx'
+    header = f'#{os.path.getsize(loci_file)}\t{os.path.getmtime(loci_file)}\n'
+
+    # read the index file when it is updated
+    if os.path.isfile(index_file):
+        try:
+            with open(index_file, mode='r', encoding='iso-8859-1') as index_file_id:
+                if index_file_id.readline() == header:
+                    loci_index_dict = {}
+                    for record in index_file_id:
+                        (locus_id, locus_offset, length, taxa_number) = record.rstrip('\n').split('\t')
+                        loci_index_dict[locus_id] = (int(locus_offset), int(length), int(taxa_number))
+                    return loci_index_dict
+        except Exception as e:
+            Message.print('trace', f'The index file {index_file} can not be read: {e}\n')
+
+    # build the index
+    loci_index_dict = build_loci_index(loci_file)
+
+    # save the index file in a temporal file and move it to its place when it is complete, so an interrupted
+    # write does not leave an index file which seems updated (the index is only used in memory when the file
+    # can not be written)
+    temporal_index_file = f'{index_file}.{os.getpid()}.tmp'
+    try:
+        with open(temporal_index_file, mode='w', encoding='iso-8859-1', newline='\n') as index_file_id:
+            index_file_id.write(header)
+            index_file_id.writelines([f'{locus_id}\t{locus_offset}\t{length}\t{taxa_number}\n' for (locus_id, (locus_offset, length, taxa_number)) in loci_index_dict.items()])
+        os.replace(temporal_index_file, index_file)
+    except Exception as e:
+        Message.print('trace', f'The index file {index_file} can not be written: {e}\n')
+        if os.path.isfile(temporal_index_file):
+            os.remove(temporal_index_file)
+
+    # return the index
+    return loci_index_dict
+
+#-------------------------------------------------------------------------------
+
+def read_locus(loci_file_id, locus_offset, length):
+    '''
+    Read a locus from an ipyrad loci file opened in binary mode using its offset and length
+    and get the list of taxon identifications and sequences and the locus id record.
+    '''
+
+    # read the records of the locus
+    loci_file_id.seek(locus_offset)
+    record_list = loci_file_id.read(length).decode('iso-8859-1').splitlines(keepends=True)
+
+    # return the taxon identifications and sequences and the locus id record
+    return [get_locus_sequence_data(record) for record in record_list[:-1]], record_list[-1]
+
+#-------------------------------------------------------------------------------
+
+def get_record_range_list(file, range_size, record_start='>'):
+    '''
+    Split an uncompressed file in byte ranges of about range_size bytes which begin in a record starting
+    with record_start (e. g. the head record of a FASTA sequence or a GMAP alignment) and get the list of
+    tuples with the offset and length of every range.
+    '''
+
+    # initialize the range list
+    range_list = []
+
+    # get the file size
+    file_size = os.path.getsize(file)
+
+    # open the file in binary mode to get the offsets
+    try:
+        file_id = open(file, mode='rb')
+    except Exception as e:
+        raise ProgramException(e, 'F001', file)
+
+    # set the record start in bytes
+    record_start = record_start.encode('iso-8859-1')
+
+    # initialize the offset of the current range
+    range_offset = 0
+
+    # while the rest of the file is greater than the range size
+    while file_size - range_offset > range_size:
+
+        # position in the middle of a record after the range size and skip the rest of this record
+        file_id.seek(range_offset + range_size)
+        file_id.readline()
+        offset = file_id.tell()
+
+        # read records until the next record starting with record_start
+        record = file_id.readline()
+        while record != b'' and not record.startswith(record_start):
+            offset += len(record)
+            record = file_id.readline()
+
+        # the last range ends at the end of the file
+        if record == b'':
+            break
+
+        # add the range
+        range_list.append((range_offset, offset - range_offset))
+        range_offset = offset
+
+    # add the last range
+    if file_size > range_offset:
+        range_list.append((range_offset, file_size - range_offset))
+
+    # close the file
+    file_id.close()
+
+    # return the range list
+    return range_list
+
+#-------------------------------------------------------------------------------
+
+def read_record_range(file, range_offset, length):
+    '''
+    Read a byte range of a file got by get_record_range_list and get its text.
+    '''
+
+    # open the file in binary mode
+    try:
+        file_id = open(file, mode='rb')
+    except Exception as e:
+        raise ProgramException(e, 'F001', file)
+
+    # read the range
+    file_id.seek(range_offset)
+    text = file_id.read(length).decode('iso-8859-1')
+
+    # close the file
+    file_id.close()
+
+    # return the text of the range
+    return text
+
+#-------------------------------------------------------------------------------
+
+def iter_record_chunks(file_id, chunk_size, record_start='>'):
+    '''
+    Read a file opened in text mode (e. g. a compressed file which can not be split in byte ranges) and
+    yield the text of chunks of about chunk_size characters which begin in a record starting with record_start.
+    '''
+
+    # initialize the record list and the length of the current chunk
+    record_list = []
+    chunk_length = 0
+
+    # for each record
+    for record in file_id:
+
+        # yield the current chunk when its length exceeds the chunk size and a new record starts
+        if chunk_length >= chunk_size and record.startswith(record_start):
+            yield ''.join(record_list)
+            record_list = []
+            chunk_length = 0
+
+        # add the record to the current chunk
+        record_list.append(record)
+        chunk_length += len(record)
+
+    # yield the last chunk
+    if record_list:
+        yield ''.join(record_list)
+
+#-------------------------------------------------------------------------------
+
 def build_go_ontology_dict(ontology_file):
     '''
     Build the dictionary of GO ontology data from a GO ontology data.
@@ -1502,6 +1979,7 @@ def build_go_ontology_dict(ontology_file):
             go_name = ''
             namespace = ''
             alt_id_list = []
+            parent_id_list = []
 
             # while there are records and they are term details
             while record != '' and not record.startswith('[Term]'):
@@ -1528,6 +2006,12 @@ def build_go_ontology_dict(ontology_file):
                 if record.startswith('alt_id:'):
                     alt_id_list.append(record[len('alt_id:'):].strip())
 
+                # get the parent identifications (relationships is_a and part_of, which are used by the true path rule)
+                if record.startswith('is_a:'):
+                    parent_id_list.append(record[len('is_a:'):].split()[0])
+                elif record.startswith('relationship: part_of '):
+                    parent_id_list.append(record[len('relationship: part_of '):].split()[0])
+
                 # print record counter
                 Message.print('verbose', f'\rOntology file: {record_counter} processed records - # GO terms: {go_term_counter}.')
 
@@ -1539,10 +2023,10 @@ def build_go_ontology_dict(ontology_file):
                     break
 
             # insert data into the dictionary of GO ontology data
-            go_ontology_dict[go_id] = {'go_id': go_id, 'go_name': go_name, 'namespace': namespace}
+            go_ontology_dict[go_id] = {'go_id': go_id, 'go_name': go_name, 'namespace': namespace, 'parent_id_list': parent_id_list}
             go_term_counter += 1
             for alt_id in alt_id_list:
-                go_ontology_dict[alt_id] = {'go_id': alt_id, 'go_name': go_name, 'namespace': namespace}
+                go_ontology_dict[alt_id] = {'go_id': alt_id, 'go_name': go_name, 'namespace': namespace, 'parent_id_list': parent_id_list}
                 go_term_counter += 1
 
             # print record counter
@@ -1715,6 +2199,24 @@ def get_go_app_code_list_2_text():
 
 #-------------------------------------------------------------------------------
 
+def get_go_propagation_code_list():
+    '''
+    Get the code list of "go_propagation".
+    '''
+
+    return ['Y', 'N']
+
+#-------------------------------------------------------------------------------
+
+def get_go_propagation_code_list_text():
+    '''
+    Get the code list of "go_propagation" as text.
+    '''
+
+    return 'Y (yes) or N (no)'
+
+#-------------------------------------------------------------------------------
+
 def get_toa_go_seleccion_code_list():
     '''
     Get the code list of selection code for GO term data in TOA results.
@@ -1926,6 +2428,24 @@ def get_fdr_method_text_list():
 
 #-------------------------------------------------------------------------------
 
+def get_phase_scheduling_code_list():
+    '''
+    Get the code list of "phase_scheduling".
+    '''
+
+    return ['STATIC', 'DYNAMIC']
+
+#-------------------------------------------------------------------------------
+
+def get_phase_scheduling_code_list_text():
+    '''
+    Get the code list of "phase_scheduling" as text.
+    '''
+
+    return 'STATIC (input files are divided evenly among background process scripts) or DYNAMIC (a supervisor runs the input files ordered by their estimated cost when a process is free)'
+
+#-------------------------------------------------------------------------------
+
 def get_trace_code_list():
     '''
     Get the code list of "trace".
@@ -1962,6 +2482,27 @@ def get_verbose_code_list_text():
 
 #-------------------------------------------------------------------------------
 
+def get_peak_rss():
+    '''
+    Get the peak memory (RSS) in bytes of the process and of its ended child processes (None when it is not available).
+    '''
+
+    # the module resource is not available in Windows
+    try:
+        import resource    # pylint: disable=import-outside-toplevel
+    except ImportError:
+        return None, None
+
+    # the maximum resident set size is in kilobytes in Linux and in bytes in macOS
+    factor = 1 if sys.platform.startswith('darwin') else 1024
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * factor
+    peak_rss_children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * factor
+
+    # return the peak memory
+    return peak_rss, peak_rss_children
+
+#-------------------------------------------------------------------------------
+
 def get_na():
     '''
     Get the characters to represent not available.
@@ -2005,11 +2546,15 @@ class Const():
 
     #---------------
 
+    DEFAULT_BLASTX_CHUNK_NUMBER = 1
+    DEFAULT_BLASTX_OUTPUT_FORMAT = 'xml'
     DEFAULT_BLASTX_THREADS_NUMBER = 1
+    DEFAULT_BLASTX_WORKER_NUMBER = 1
     DEFAULT_BURN_IN = 100
     DEFAULT_E_VALUE = 1E-6
     DEFAULT_FDR_METHOD = 'by'
     DEFAULT_GENOTYPE_IMPUTATION_METHOD = 'MF'
+    DEFAULT_GO_PROPAGATION = 'N'
     DEFAULT_ID_TYPE = 'LITERAL'
     DEFAULT_IMPUTED_MD_ID = '99'
     DEFAULT_ITERATIONS_NUMBER = 100
@@ -2027,11 +2572,17 @@ class Const():
     DEFAULT_NEW_MD_ID = 'U'
     DEFAULT_NODE_NUMBER = 1
     DEFAULT_NUCLEOTIDE_NUMBER = 25
+    DEFAULT_PHASE_RETRIES_NUMBER = 1
+    DEFAULT_PHASE_SCHEDULING = 'STATIC'
     DEFAULT_QCOV_HSP_PERC = 0.0
     DEFAULT_PROCESSES_NUMBER = 4
     DEFAULT_THINNING_INTERVAL = 1
+    DEFAULT_THREADS_NUMBER = 1
     DEFAULT_TOA_GO_SELECCTION = 'LEVWD'
     DEFAULT_R_ESTIMATOR = 'ru'
+    DEFAULT_REPLICATES_NUMBER = 1
+    DEFAULT_STARTUP_MAX_TIME = 100.0
+    DEFAULT_STARTUP_RUNS_NUMBER = 3
     DEFAULT_STRUCTURE_INFO_COL_NUMBER = 2
     DEFAULT_TRACE = 'N'
     DEFAULT_VARIANT_NUMBER_PER_FILE = 1000
@@ -2063,9 +2614,41 @@ class Const():
 
    #---------------
 
+    ALIGNMENT_CHUNK_SIZE = 16777216
+    ALLELE_COUNTING_BLOCK_SIZE = 1000
+    ANNOTATION_BLOCK_SIZE = 8388608
+    CLUSTER_CACHE_SIZE = 100000
+    CLUSTER_ID_LITERAL_MAX_NUMBER = 100
+    DEBASING_BLOCK_SIZE = 1000
     DELAY_TIME = 60
     FASTA_RECORD_LEN = 70
+    FASTQ_BLOCK_SIZE = 8388608
+    GENOTYPE_CHUNK_SIZE = 10000
+    GENOTYPE_SAMPLE_BLOCK_SIZE = 256
+    GZIP_COMPRESSION_LEVEL = 6
+    KINSHIP_VARIANT_BLOCK_SIZE = 1000
     MAX_QUERY_NUMBER_PER_FILE = 1000000
+    PENDING_CHUNKS_PER_PROCESS = 2
+    PROGRESS_INTERVAL = 0.5
+    SPOOL_BLOCK_SIZE = 1048576
+    SPOOL_MAX_MEMORY_SIZE = 268435456
+    SIMULATION_BLOCK_SIZE = 1000
+    STARTUP_SLOWEST_MODULES_NUMBER = 3
+    VARIANT_CHUNK_SIZE = 100
+
+   #---------------
+
+    # the allele codes of genotypes are int8 numbers, so allele indexes greater than GT_MAX_ALLELE_CODE are not supported
+    GT_CODE_OFFSET = 2
+    GT_IMPUTED_MD_CODE = -2
+    GT_MAX_ALLELE_CODE = 127
+    GT_MD_CODE = -1
+
+   #---------------
+
+    DEBASING_DELETION = 2
+    DEBASING_INSERTION = 1
+    DEBASING_SUBSTITUTION = 0
 
    #---------------
 
@@ -2080,6 +2663,8 @@ class Message():
 
     verbose_status = False
     trace_status = False
+    progress_time = 0.0
+    pending_progress_text = None
 
     #---------------
 
@@ -2103,12 +2688,39 @@ class Message():
 
     #---------------
 
+    @staticmethod
+    def set_status(verbose_status, trace_status):
+        '''
+        Set the verbose and trace status (e. g. in a worker process).
+        '''
+
+        Message.verbose_status = verbose_status
+        Message.trace_status = trace_status
+
+    #---------------
+
     @staticmethod
     def print(message_type, message_text):
         '''
         Print a message depending to its type.
+        The verbose messages beginning with a carriage return (progress counters) are printed at most once every Const.PROGRESS_INTERVAL seconds;
+        the last one not printed is printed before the next message.
         '''
 
+        # check if a progress message has to be delayed
+        if message_type == 'verbose' and Message.verbose_status and message_text.startswith('\r'):
+            current_time = time.perf_counter()
+            if current_time - Message.progress_time < Const.PROGRESS_INTERVAL:
+                Message.pending_progress_text = message_text
+                return
+            Message.progress_time = current_time
+            Message.pending_progress_text = None
+
+        # print the pending progress message before a message which is printed
+        elif Message.pending_progress_text is not None and (message_type in ['info', 'error'] or message_type == 'verbose' and Message.verbose_status or message_type == 'trace' and Message.trace_status):
+            sys.stdout.write(Message.pending_progress_text)
+            Message.pending_progress_text = None
+
         if message_type == 'info':
             print(message_text, file=sys.stdout)
             sys.stdout.flush()
@@ -2119,6 +2731,7 @@ class Message():
             print(message_text, file=sys.stdout)
             sys.stdout.flush()
         elif message_type == 'error':
+            sys.stdout.flush()
             print(message_text, file=sys.stderr)
             sys.stderr.flush()
 
@@ -2126,20 +2739,583 @@ class Message():
 
 #-------------------------------------------------------------------------------
 
-class ProgramException(Exception):
+class Metrics():
     '''
-    This class controls various exceptions that can occur in the execution of the application.
+    This class measures the run of a program: elapsed time, named stages with their records/s and MB/s throughput
+    and peak memory (RSS). When a metrics file is indicated, a JSON report is written at the end of the run.
     '''
 
-   #---------------
+    #---------------
 
-    def __init__(self, e, code_exception, param1='', param2='', param3='', param4='', param5='', param6=''):
-        '''Initialize the object to manage a passed exception.'''
+    run_list = []
 
-        # call the init method of the parent class
-        super().__init__()
+    #---------------
 
-        # print the message of the exception
+    @staticmethod
+    def start(metrics_file):
+        '''
+        Start the metrics of a run (the runs can be nested, e.g. the steps of a pipeline).
+        '''
+
+        Metrics.run_list.append({'metrics_file': metrics_file, 'program': os.path.basename(sys.argv[0]), 'argument_list': sys.argv[1:], 'start_datetime': datetime.datetime.now().isoformat(timespec='seconds'), 'start_time': time.perf_counter(), 'stage_list': []})
+
+    #---------------
+
+    @staticmethod
+    @contextlib.contextmanager
+    def run(metrics_file):
+        '''
+        Measure a run writing its JSON report when it ends without errors; the run is always ended, also when
+        it exits with an error (e.g. a step of a pipeline which raises a ProgramException).
+        '''
+
+        Metrics.start(metrics_file)
+        run_dict = Metrics.run_list[-1]
+        try:
+            yield
+            Metrics.write_report()
+        finally:
+            if Metrics.run_list and Metrics.run_list[-1] is run_dict:
+                Metrics.run_list.pop()
+
+    #---------------
+
+    @staticmethod
+    @contextlib.contextmanager
+    def stage(stage_name):
+        '''
+        Measure a named stage of the run; the stage object yielded counts the records and bytes processed.
+        '''
+
+        stage = MetricsStage(stage_name)
+        try:
+            yield stage
+        finally:
+            stage.stop()
+            if Metrics.run_list and Metrics.run_list[-1]['metrics_file'] is not None:
+                Metrics.run_list[-1]['stage_list'].append(stage.get_data_dict())
+
+    #---------------
+
+    @staticmethod
+    def write_report():
+        '''
+        End the metrics of the current run and write its JSON report when the run has a metrics file.
+        '''
+
+        # check if there is a run started
+        if not Metrics.run_list:
+            return
+
+        # get the data of the run
+        run_dict = Metrics.run_list.pop()
+        if run_dict['metrics_file'] is None:
+            return
+
+        # build the report
+        (peak_rss, peak_rss_children) = get_peak_rss()
+        report_dict = {
+            'project': f'{get_project_name()} v{get_project_version()}',
+            'program': run_dict['program'],
+            'argument_list': run_dict['argument_list'],
+            'start_datetime': run_dict['start_datetime'],
+            'elapsed_seconds': round(time.perf_counter() - run_dict['start_time'], 3),
+            'peak_rss_mb': None if peak_rss is None else round(peak_rss / 1048576, 1),
+            'peak_rss_children_mb': None if peak_rss_children is None else round(peak_rss_children / 1048576, 1),
+            'stage_list': run_dict['stage_list'],
+            }
+
+        # write the report
+        try:
+            with open(run_dict['metrics_file'], mode='w', encoding='utf-8', newline='\n') as metrics_file_id:
+                json.dump(report_dict, metrics_file_id, indent=4)
+                metrics_file_id.write('\n')
+        except Exception as e:
+            raise ProgramException(e, 'F003', run_dict['metrics_file'])
+
+        # print OK message
+        Message.print('info', f'The metrics file {os.path.basename(run_dict["metrics_file"])} is created.')
+
+    #---------------
+
+#-------------------------------------------------------------------------------
+
+class MetricsStage():
+    '''
+    This class measures a named stage of a run.
+    '''
+
+    #---------------
+
+    def __init__(self, stage_name):
+        '''
+        Initialize the object and start the time measurement.
+        '''
+
+        self.stage_name = stage_name
+        self.records_counter = 0
+        self.bytes_counter = 0
+        self.start_time = time.perf_counter()
+        self.elapsed_time = None
+
+    #---------------
+
+    def add(self, records=0, bytes_number=0):
+        '''
+        Add processed records and bytes to the stage counters.
+        '''
+
+        self.records_counter += records
+        self.bytes_counter += bytes_number
+
+    #---------------
+
+    def stop(self):
+        '''
+        Stop the time measurement.
+        '''
+
+        self.elapsed_time = time.perf_counter() - self.start_time
+
+    #---------------
+
+    def get_data_dict(self):
+        '''
+        Get the data dictionary of the stage with its throughput.
+        '''
+
+        return {
+            'stage': self.stage_name,
+            'elapsed_seconds': round(self.elapsed_time, 3),
+            'records': self.records_counter,
+            'bytes': self.bytes_counter,
+            'records_per_second': round(self.records_counter / self.elapsed_time, 1) if self.elapsed_time > 0 else None,
+            'mb_per_second': round(self.bytes_counter / 1048576 / self.elapsed_time, 3) if self.elapsed_time > 0 else None,
+            }
+
+    #---------------
+
+#-------------------------------------------------------------------------------
+
+class OrderedProcessPool():
+    '''
+    This class calls functions in a persistent pool of worker processes and yields their results in the input order.
+    The number of calls pending to be yielded is limited (backpressure), so the memory used does not depend on the
+    number of calls. When there is only a process, the calls are run in the current process.
+
+    The worker initializer is called as worker_initializer(*worker_initializer_arg_list) when a worker starts and
+    the worker finalizer is called as worker_finalizer() when it ends (e.g. to close a database connection of the worker).
+    The functions are passed to the worker processes by reference (module name, module file and function name)
+    and their arguments have to be picklable, so the workers can also be spawned.
+    '''
+
+    #---------------
+
+    worker_finalizer = None
+
+    #---------------
+
+    def __init__(self, processes_num, worker_initializer=None, worker_initializer_arg_list=(), worker_finalizer=None):
+        '''
+        Initialize the object and create the pool of worker processes (when there is only a process, the worker is initialized in the current process).
+        '''
+
+        self.processes_num = processes_num
+        self.max_pending_calls = processes_num * Const.PENDING_CHUNKS_PER_PROCESS
+        initializer_arg_list = (OrderedProcessPool.get_function_reference(worker_initializer), list(worker_initializer_arg_list), OrderedProcessPool.get_function_reference(worker_finalizer), Message.verbose_status, Message.trace_status)
+
+        if processes_num == 1:
+            self.executor = None
+            OrderedProcessPool.initialize_worker(*initializer_arg_list)
+        else:
+            self.executor = concurrent.futures.ProcessPoolExecutor(max_workers=processes_num, initializer=OrderedProcessPool.initialize_pool_worker, initargs=initializer_arg_list)
+
+    #---------------
+
+    def __enter__(self):
+        '''
+        Return the object in a with statement.
+        '''
+
+        return self
+
+    #---------------
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        '''
+        Shut down the pool of worker processes cancelling the calls not started (when there is only a process, finalize the worker of the current process).
+        '''
+
+        if self.executor is not None:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+        else:
+            OrderedProcessPool.finalize_worker()
+
+    #---------------
+
+    def iter_results(self, function, arg_list_iterator):
+        '''
+        Call function(*arg_list) for every argument list and yield the results in the input order.
+        '''
+
+        # when there is only a process, run every call in the current process
+        if self.executor is None:
+            for arg_list in arg_list_iterator:
+                yield function(*arg_list)
+            return
+
+        # get the reference of the function
+        function_reference = OrderedProcessPool.get_function_reference(function)
+
+        # initialize the queue of pending calls
+        pending_future_deque = collections.deque()
+
+        try:
+
+            # submit the calls to the pool
+            for arg_list in arg_list_iterator:
+                pending_future_deque.append(self.executor.submit(OrderedProcessPool.call_function, function_reference, arg_list))
+
+                # when the queue is full, wait for the oldest call and yield its result
+                while len(pending_future_deque) >= self.max_pending_calls:
+                    yield pending_future_deque.popleft().result()
+
+            # yield the results of the pending calls
+            while pending_future_deque:
+                yield pending_future_deque.popleft().result()
+
+        finally:
+
+            # cancel the calls not started when there is an error
+            for future in pending_future_deque:
+                future.cancel()
+
+    #---------------
+
+    @staticmethod
+    def get_function_reference(function):
+        '''
+        Get the reference (module name, module file and function name) used to pass a function to the worker processes.
+        '''
+
+        if function is None:
+            return None
+
+        return (function.__module__, getattr(sys.modules.get(function.__module__), '__file__', None), function.__qualname__)
+
+    #---------------
+
+    @staticmethod
+    def get_referenced_function(function_reference):
+        '''
+        Get a function (or a static method) from its reference, loading its module from the module file when it is not loaded
+        (e.g. a program module loaded by ngshelper.py in a spawned worker process).
+        '''
+
+        if function_reference is None:
+            return None
+
+        (module_name, module_file, function_name) = function_reference
+
+        module = sys.modules.get(module_name)
+        if module is None:
+            spec = importlib.util.spec_from_file_location(module_name, module_file)
+            module = importlib.util.module_from_spec(spec)
+            sys.modules[module_name] = module
+            spec.loader.exec_module(module)
+
+        function = module
+        for name in function_name.split('.'):
+            function = getattr(function, name)
+
+        return function
+
+    #---------------
+
+    @staticmethod
+    def call_function(function_reference, arg_list):
+        '''
+        Call a function from its reference in a worker process.
+        '''
+
+        return OrderedProcessPool.get_referenced_function(function_reference)(*arg_list)
+
+    #---------------
+
+    @staticmethod
+    def initialize_worker(worker_initializer_reference, worker_initializer_arg_list, worker_finalizer_reference, verbose_status, trace_status):
+        '''
+        Initialize a worker calling the worker initializer and saving the worker finalizer.
+        '''
+
+        Message.set_status(verbose_status, trace_status)
+
+        worker_initializer = OrderedProcessPool.get_referenced_function(worker_initializer_reference)
+        if worker_initializer is not None:
+            worker_initializer(*worker_initializer_arg_list)
+
+        OrderedProcessPool.worker_finalizer = OrderedProcessPool.get_referenced_function(worker_finalizer_reference)
+
+    #---------------
+
+    @staticmethod
+    def initialize_pool_worker(*initializer_arg_list):
+        '''
+        Initialize a worker process of the pool registering the finalization of the worker when the process exits
+        (a multiprocessing finalizer is used because the atexit functions are not called in forked processes).
+        '''
+
+        OrderedProcessPool.initialize_worker(*initializer_arg_list)
+
+        multiprocessing.util.Finalize(None, OrderedProcessPool.finalize_worker, exitpriority=10)
+
+    #---------------
+
+    @staticmethod
+    def finalize_worker():
+        '''
+        Finalize a worker calling the worker finalizer.
+        '''
+
+        if OrderedProcessPool.worker_finalizer is not None:
+            worker_finalizer = OrderedProcessPool.worker_finalizer
+            OrderedProcessPool.worker_finalizer = None
+            worker_finalizer()
+
+    #---------------
+
+#-------------------------------------------------------------------------------
+
+class VariantPipeline():
+    '''
+    This class processes the variant records of a VCF file in parallel keeping their order. The caller (reader)
+    gives the raw records, they are processed by chunks in an OrderedProcessPool object and the results are
+    returned (writer) in the input order, so the memory used does not depend on the file size.
+
+    The process function is called as process_function(*worker_arg_list, *common_arg_list, data_dict), where
+    worker_arg_list is the list returned by the worker initializer (e.g. a database connection of the worker)
+    and it has to return the result of the variant. The worker finalizer is called as worker_finalizer(*worker_arg_list)
+    when the worker ends (e.g. to close the database connection of the worker).
+    '''
+
+    #---------------
+
+    process_function = None
+    common_arg_list = []
+    worker_arg_list = []
+    worker_finalizer = None
+
+    #---------------
+
+    def __init__(self, processes_num, process_function, common_arg_list, worker_initializer=None, worker_initializer_arg_list=(), worker_finalizer=None, chunk_size=Const.VARIANT_CHUNK_SIZE):
+        '''
+        Initialize the object and create the pool of worker processes.
+        '''
+
+        self.chunk_size = chunk_size
+        initializer_arg_list = (OrderedProcessPool.get_function_reference(process_function), list(common_arg_list), OrderedProcessPool.get_function_reference(worker_initializer), list(worker_initializer_arg_list), OrderedProcessPool.get_function_reference(worker_finalizer))
+        self.process_pool = OrderedProcessPool(processes_num, worker_initializer=VariantPipeline.initialize_worker, worker_initializer_arg_list=initializer_arg_list, worker_finalizer=VariantPipeline.finalize_worker)
+
+    #---------------
+
+    def __enter__(self):
+        '''
+        Return the object in a with statement.
+        '''
+
+        return self
+
+    #---------------
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        '''
+        Shut down the pool of worker processes.
+        '''
+
+        self.process_pool.__exit__(exc_type, exc_value, exc_traceback)
+
+    #---------------
+
+    def process(self, record_iterator):
+        '''
+        Process the variant records and yield their results in the input order.
+        '''
+
+        for result_list in self.process_pool.iter_results(VariantPipeline.process_chunk, ((record_chunk,) for record_chunk in self.iter_record_chunks(record_iterator))):
+            yield from result_list
+
+    #---------------
+
+    def iter_record_chunks(self, record_iterator):
+        '''
+        Iterate over the chunks of variant records.
+        '''
+
+        record_chunk = []
+        for record in record_iterator:
+            record_chunk.append(record)
+            if len(record_chunk) == self.chunk_size:
+                yield record_chunk
+                record_chunk = []
+        if record_chunk:
+            yield record_chunk
+
+    #---------------
+
+    @staticmethod
+    def initialize_worker(process_function_reference, common_arg_list, worker_initializer_reference, worker_initializer_arg_list, worker_finalizer_reference):
+        '''
+        Initialize a worker saving the process function, its arguments and the worker finalizer.
+        '''
+
+        worker_initializer = OrderedProcessPool.get_referenced_function(worker_initializer_reference)
+
+        VariantPipeline.process_function = OrderedProcessPool.get_referenced_function(process_function_reference)
+        VariantPipeline.common_arg_list = list(common_arg_list)
+        VariantPipeline.worker_arg_list = [] if worker_initializer is None else list(worker_initializer(*worker_initializer_arg_list))
+        VariantPipeline.worker_finalizer = OrderedProcessPool.get_referenced_function(worker_finalizer_reference)
+
+    #---------------
+
+    @staticmethod
+    def finalize_worker():
+        '''
+        Finalize a worker calling the worker finalizer and releasing the process function and its arguments.
+        '''
+
+        if VariantPipeline.worker_finalizer is not None:
+            VariantPipeline.worker_finalizer(*VariantPipeline.worker_arg_list)
+
+        VariantPipeline.process_function = None
+        VariantPipeline.common_arg_list = []
+        VariantPipeline.worker_arg_list = []
+        VariantPipeline.worker_finalizer = None
+
+    #---------------
+
+    @staticmethod
+    def process_record(record):
+        '''
+        Process a variant record.
+        '''
+
+        return VariantPipeline.process_function(*VariantPipeline.worker_arg_list, *VariantPipeline.common_arg_list, get_vcf_variant_data_dict(record))
+
+    #---------------
+
+    @staticmethod
+    def process_chunk(record_chunk):
+        '''
+        Process a chunk of variant records.
+        '''
+
+        return [VariantPipeline.process_record(record) for record in record_chunk]
+
+    #---------------
+
+#-------------------------------------------------------------------------------
+
+class RecordSpool():
+    '''
+    This class spools text records in blocks compressed with zlib. The compressed blocks are kept in memory
+    until their size exceeds a maximum and then they are moved to a temporary file, so the records can be
+    read again in the same order without writing and reading an uncompressed temporary file.
+    '''
+
+    #---------------
+
+    def __init__(self, block_size=Const.SPOOL_BLOCK_SIZE, max_memory_size=Const.SPOOL_MAX_MEMORY_SIZE, spool_dir=None):
+        '''
+        Initialize the object.
+        '''
+
+        self.block_size = block_size
+        self.spool_file_id = tempfile.SpooledTemporaryFile(max_size=max_memory_size, mode='w+b', prefix=f'{get_project_code()}-', dir=spool_dir)
+        self.block_record_list = []
+        self.block_length = 0
+        self.records_counter = 0
+
+    #---------------
+
+    def write(self, record):
+        '''
+        Write a record in the spool.
+        '''
+
+        self.block_record_list.append(record)
+        self.block_length += len(record)
+        self.records_counter += 1
+
+        if self.block_length >= self.block_size:
+            self.write_block()
+
+    #---------------
+
+    def write_block(self):
+        '''
+        Compress the current block and write it with its length in the spool file.
+        '''
+
+        if self.block_record_list:
+            compressed_block = zlib.compress(''.join(self.block_record_list).encode('iso-8859-1'), 1)
+            self.spool_file_id.write(len(compressed_block).to_bytes(4, byteorder='big'))
+            self.spool_file_id.write(compressed_block)
+            self.block_record_list = []
+            self.block_length = 0
+
+    #---------------
+
+    def read_records(self):
+        '''
+        Yield the records of the spool in the order they were written.
+        '''
+
+        # write the last block and go to the spool start
+        self.write_block()
+        self.spool_file_id.seek(0)
+
+        # read the compressed blocks
+        while True:
+            block_length_bytes = self.spool_file_id.read(4)
+            if len(block_length_bytes) < 4:
+                break
+            compressed_block = self.spool_file_id.read(int.from_bytes(block_length_bytes, byteorder='big'))
+            block_text = zlib.decompress(compressed_block).decode('iso-8859-1')
+
+            # yield the records of the block (only "\n" ends a record)
+            start = 0
+            while start < len(block_text):
+                end = block_text.find('\n', start) + 1 or len(block_text)
+                yield block_text[start:end]
+                start = end
+
+    #---------------
+
+    def close(self):
+        '''
+        Close the spool releasing its memory and removing its temporary file.
+        '''
+
+        self.spool_file_id.close()
+
+    #---------------
+
+#-------------------------------------------------------------------------------
+
+class ProgramException(Exception):
+    '''
+    This class controls various exceptions that can occur in the execution of the application.
+    '''
+
+   #---------------
+
+    def __init__(self, e, code_exception, param1='', param2='', param3='', param4='', param5='', param6=''):
+        '''Initialize the object to manage a passed exception.'''
+
+        # call the init method of the parent class
+        super().__init__()
+
+        # print the message of the exception
         if e != '':
             Message.print('error', f'*** EXCEPTION: "{e}"')
 
@@ -2176,11 +3352,13 @@ class ProgramException(Exception):
         elif code_exception == 'F008':
             Message.print('error', f'*** ERROR {code_exception:} The output xml files can not be concatenated.')
         elif code_exception == 'F009':
-            Message.print('error', f'*** ERROR {code_exception}: The record # {param1} of file {param1} has a wrong format.')
+            Message.print('error', f'*** ERROR {code_exception}: The record # {param2} of file {param1} has a wrong format.')
         elif code_exception == 'F010':
             Message.print('error', f'*** ERROR {code_exception}: The {param1} data is wrong in the transcript {param2}.')
         elif code_exception == 'F011':
             Message.print('error', f'*** ERROR {code_exception}: The chimeric data format is wrong in the transcript {param1}.')
+        elif code_exception == 'F012':
+            Message.print('error', f'*** ERROR {code_exception}: The locus {param2} is more than once in the file {param1}.')
         elif code_exception == 'I001':
             Message.print('error', f'*** ERROR {code_exception}: The infrastructure software is not setup.')
         elif code_exception == 'L001':
@@ -2227,10 +3405,18 @@ class ProgramException(Exception):
             Message.print('error', f'\n*** ERROR {code_exception}: The variant {param1} has more than one alternative allele.')
         elif code_exception == 'L022':
             Message.print('error', f'\n*** ERROR {code_exception}: The genotype number does not correspond to variant number in the sample {param1}.')
+        elif code_exception == 'L023':
+            Message.print('error', f'*** ERROR {code_exception}: The reads of the files {param1} and {param2} are not paired.')
+        elif code_exception == 'L024':
+            Message.print('error', f'*** ERROR {code_exception}: The allele index {param1} of the variant with identification {param2} and position {param3} is greater than {param4} (maximum allele index supported in genotypes).')
         elif code_exception == 'P001':
             Message.print('error', f'*** ERROR {code_exception}: The program has parameters with invalid values.')
         elif code_exception == 'P002':
             Message.print('error', f'*** ERROR {code_exception}: There are some node processes ended NOT OK.')
+        elif code_exception == 'P003':
+            Message.print('error', f'*** ERROR {code_exception}: The program {param1} does not exist.')
+        elif code_exception == 'P004':
+            Message.print('error', f'*** ERROR {code_exception}: The step {param1} ({param2}) of the pipeline has ended with RC {param3}.')
         elif code_exception == 'S001':
             Message.print('error', f'*** ERROR {code_exception}: The {param1} OS is not supported.')
         elif code_exception == 'S002':
@@ -2266,6 +3452,43 @@ class NestedDefaultDict(collections.defaultdict):
 
 #-------------------------------------------------------------------------------
 
+class LazyModule():
+    '''
+    This class is used to import a module when one of its attributes is accessed for the first time,
+    so heavy modules are not imported by runs that do not use them (e.g. with --help).
+    '''
+
+    #---------------
+
+    def __init__(self, module_name):
+
+        self._module_name = module_name
+        self._module = None
+
+    #---------------
+
+    def __getattr__(self, name):
+
+        # import the module in the first access
+        if self._module is None:
+            self._module = importlib.import_module(self._module_name)
+
+        # get the attribute and save it in the object to avoid this method in next accesses
+        value = getattr(self._module, name)
+        setattr(self, name, value)
+
+        return value
+
+    #---------------
+
+    def __repr__(self):
+
+        return f'<lazy module {self._module_name!r}>'
+
+    #---------------
+
+#-------------------------------------------------------------------------------
+
 class BreakAllLoops(Exception):
     '''
     This class is used to break out of nested loops.
@@ -25,9 +25,14 @@ Licence: GNU General Public Licence Version 3.
 
 #-------------------------------------------------------------------------------
 
+import collections
+import concurrent.futures
 import math
+import multiprocessing
+import os
 import sqlite3
 import sys
+import urllib.parse
 
 import xlib
 
@@ -38,6 +43,11 @@ def connect_database(database_path, check_same_thread=True):
     Connect to the database.
     '''
 
+    # when the connections are shared (pipeline mode), return the open connection of the database if it exists
+    # (the worker processes of a step use their own connections)
+    if SharedConnection.sharing_status and multiprocessing.parent_process() is None:
+        return SharedConnection.get_connection(database_path)
+
     # connet to the database
     try:
         conn = sqlite3.connect(database_path, check_same_thread=check_same_thread)
@@ -2428,151 +2438,249 @@ def get_vcf_individual_genotype(conn, variant_id, sample_id):
     return gt_left, gt_right
 
 #-------------------------------------------------------------------------------
-# query "query_variants"
+# query rows
 #-------------------------------------------------------------------------------
 
-def query_variants(conn):
+def iter_query_rows(conn, sentence):
     '''
-    Get a dictionary corresponding to rows variant data (genes, pseudogenes and exones).
+    Get a generator of the rows of a query; the rows are fetched from the database while they are used, so the memory does not depend on the row number.
     '''
 
-    # initialize the dictionary
-    variant_dict = {}
-
-    # initialize the dictionary key
-    key = 0
-
     # query
-    sentence = '''
-               SELECT a.variant_id, a.seq_id, a.position, b.start, b.end, b.type, b.gene, c.description, d.chromosome_id
-                   FROM vcf_variants a, genomic_features b
-                   LEFT JOIN gene_info c ON b.gene = c.symbol
-                   LEFT JOIN alignments d ON a.variant_id = d.variant_id
-                   WHERE a.seq_id = b.seq_id
-                     AND a.position >= b.start
-                     AND a.position <= b.end
-                     AND b.type in ('region', 'gene', 'pseudogene', 'exon')
-                UNION
-                SELECT e.variant_id, e.seq_id, e.position, 0, 0, 'N/A', 'N/A', f.description, g.chromosome_id
-                   FROM vcf_variants e
-                   LEFT JOIN annotations f ON e.seq_id = f.seq_id
-                   LEFT JOIN alignments g ON e.variant_id = g.variant_id
-                   WHERE e.seq_id NOT IN (SELECT seq_id FROM genomic_features)
-                ORDER BY 1;
-               '''
     try:
-        rows = conn.execute(sentence)
+        cursor = conn.execute(sentence)
     except Exception as e:
         raise xlib.ProgramException(e, 'B002', sentence, conn)
 
-    # add row data to the dictionary
-    for row in rows:
-        variant_dict[key] = {'variant_id': row[0], 'seq_id': row[1], 'position': row[2], 'start': row[3], 'end': row[4], 'type': row[5], 'gene': row[6], 'description': row[7], 'chromosome_id': row[8]}
-        key += 1
-
-    # return the dictionary
-    return variant_dict
+    # yield the rows
+    try:
+        yield from cursor
+    except Exception as e:
+        raise xlib.ProgramException(e, 'B002', sentence, conn)
+    finally:
+        cursor.close()
 
 #-------------------------------------------------------------------------------
-# query "query_imputed_alleles"
+# temporary tables and view of the scenario X
 #-------------------------------------------------------------------------------
 
-def query_imputed_alleles(conn, imputed_md_id):
+def drop_scenariox_data(conn):
     '''
-    Get a dictionary corresponding to data of alleles with imputations.
+    Drop the temporary tables and view with variant data of the scenario X (if they exist).
     '''
 
-    # initialize the dictionary
-    imputed_allele_dict = {}
+    for sentence in ['DROP VIEW IF EXISTS temp.scenariox_variant_data;', 'DROP TABLE IF EXISTS temp.scenariox_fragments;', 'DROP TABLE IF EXISTS temp.scenariox_intergenic_variants;', 'DROP TABLE IF EXISTS temp.scenariox_variants;']:
+        try:
+            conn.execute(sentence)
+        except Exception as e:
+            raise xlib.ProgramException(e, 'B002', sentence, conn)
 
-    # query
-    sentence = f'''
-                SELECT variant_id, COUNT(*)
-                    FROM vcf_samples_alleles
-                    WHERE allele_id = '{imputed_md_id}'
-                    GROUP BY variant_id;
-                '''
-    try:
-        rows = conn.execute(sentence)
-    except Exception as e:
-        raise xlib.ProgramException(e, 'B002', sentence, conn)
+#-------------------------------------------------------------------------------
 
-    # add row data to the dictionary
-    for row in rows:
-        imputed_allele_dict[row[0]] = {'variant_id': row[0], 'counter': row[1]}
+def create_scenariox_data(conn, imputed_md_id, max_separation):
+    '''
+    Create the temporary tables and view with variant data of the scenario X: a row per variant with the data of the last
+    feature row (genes, pseudogenes and exones), the genomic zone, the intergenic fragment and if it has imputations.
+    '''
 
-    # return the dictionary
-    return imputed_allele_dict
+    # drop the previous temporary tables and view
+    drop_scenariox_data(conn)
+
+    sentence_list = []
+
+    # the rows of a variant are ranked in the reverse order of the rows of the join with the genomic features, so the data of
+    # the last row are got, and the presence of genes and exons is got over all rows of the variant
+    sentence_list.append(f'''
+        CREATE TEMP TABLE scenariox_variants AS
+            WITH variant_rows AS (
+                SELECT a.variant_id, a.seq_id, a.position, b.start, b.end, b.type, b.gene, c.description, d.chromosome_id
+                    FROM vcf_variants a, genomic_features b
+                    LEFT JOIN gene_info c ON b.gene = c.symbol
+                    LEFT JOIN alignments d ON a.variant_id = d.variant_id
+                    WHERE a.seq_id = b.seq_id
+                      AND a.position >= b.start
+                      AND a.position <= b.end
+                      AND b.type in ('region', 'gene', 'pseudogene', 'exon')
+                UNION
+                SELECT e.variant_id, e.seq_id, e.position, 0, 0, 'N/A', 'N/A', f.description, g.chromosome_id
+                    FROM vcf_variants e
+                    LEFT JOIN annotations f ON e.seq_id = f.seq_id
+                    LEFT JOIN alignments g ON e.variant_id = g.variant_id
+                    WHERE e.seq_id NOT IN (SELECT seq_id FROM genomic_features)),
+            ranked_variant_rows AS (
+                SELECT variant_id, seq_id, position, end, gene, description, chromosome_id,
+                       ROW_NUMBER() OVER (PARTITION BY variant_id ORDER BY seq_id DESC, position DESC, start DESC, end DESC, type DESC, gene DESC, description DESC, chromosome_id DESC) AS row_num,
+                       MAX(type IN ('gene', 'pseudogene')) OVER (PARTITION BY variant_id) AS found_gene,
+                       MAX(type = 'exon') OVER (PARTITION BY variant_id) AS found_exon
+                    FROM variant_rows),
+            imputed_variants AS (
+                SELECT DISTINCT variant_id
+                    FROM vcf_samples_alleles
+                    WHERE allele_id = '{imputed_md_id}')
+            SELECT h.variant_id, h.seq_id, h.position, h.end, h.gene, h.description, h.chromosome_id, h.found_gene, h.found_exon,
+                   CASE WHEN i.variant_id IS NULL THEN 'N' ELSE 'Y' END AS imputations
+                FROM ranked_variant_rows h
+                LEFT JOIN imputed_variants i ON h.variant_id = i.variant_id
+                WHERE h.row_num = 1;
+        ''')
+    sentence_list.append('''
+        CREATE UNIQUE INDEX temp.scenariox_variants_index
+            ON scenariox_variants (variant_id);
+        ''')
+
+    # the intergenic variants are numbered in order of sequence and position
+    sentence_list.append('''
+        CREATE TEMP TABLE scenariox_intergenic_variants AS
+            SELECT ROW_NUMBER() OVER (ORDER BY seq_id, position) AS row_num, variant_id, seq_id, position
+                FROM scenariox_variants
+                WHERE gene = 'N/A';
+        ''')
+    sentence_list.append('''
+        CREATE UNIQUE INDEX temp.scenariox_intergenic_variants_index
+            ON scenariox_intergenic_variants (row_num);
+        ''')
+
+    # a fragment begins in the first intergenic variant of a sequence and in the first one whose position is greater than
+    # the position of the first variant of the current fragment plus the maximum separation
+    sentence_list.append(f'''
+        CREATE TEMP TABLE scenariox_fragments AS
+            WITH RECURSIVE fragments (row_num, variant_id, seq_id, fragment_num, start_position) AS (
+                SELECT row_num, variant_id, seq_id, 0, position
+                    FROM scenariox_intergenic_variants
+                    WHERE row_num = 1
+                UNION ALL
+                SELECT j.row_num, j.variant_id, j.seq_id,
+                       CASE WHEN j.seq_id <> k.seq_id THEN 0 WHEN j.position > k.start_position + {max_separation} THEN k.fragment_num + 1 ELSE k.fragment_num END,
+                       CASE WHEN j.seq_id <> k.seq_id OR j.position > k.start_position + {max_separation} THEN j.position ELSE k.start_position END
+                    FROM scenariox_intergenic_variants j, fragments k
+                    WHERE j.row_num = k.row_num + 1)
+            SELECT variant_id, seq_id || '-F' || printf('%03d', fragment_num) AS fragment_id
+                FROM fragments;
+        ''')
+    sentence_list.append('''
+        CREATE UNIQUE INDEX temp.scenariox_fragments_index
+            ON scenariox_fragments (variant_id);
+        ''')
+
+    # the view has the output data of the variants
+    sentence_list.append('''
+        CREATE TEMP VIEW scenariox_variant_data AS
+            SELECT l.variant_id, l.seq_id, l.position,
+                   CASE WHEN l.end = 0 THEN 'N/A' WHEN NOT l.found_gene THEN 'intergenic' WHEN l.found_exon THEN 'exonic' ELSE 'intronic' END AS genomic_zone,
+                   CASE WHEN l.gene <> 'N/A' THEN l.gene ELSE COALESCE(m.fragment_id, 'N/A') END AS gene_or_fragment,
+                   COALESCE(l.description, 'N/A') AS description, COALESCE(l.chromosome_id, 'N/A') AS chromosome_id, l.imputations
+                FROM scenariox_variants l
+                LEFT JOIN scenariox_fragments m ON l.variant_id = m.variant_id;
+        ''')
+
+    # create the temporary tables and view
+    for sentence in sentence_list:
+        try:
+            conn.execute(sentence)
+        except Exception as e:
+            raise xlib.ProgramException(e, 'B002', sentence, conn)
 
 #-------------------------------------------------------------------------------
-# query "query_species_allele_frequencies"
+# query "iter_scenariox_variants"
 #-------------------------------------------------------------------------------
 
-def query_species_allele_frequencies(conn, md_symbol):
+def iter_scenariox_variants(conn):
     '''
-    Get a dictionary corresponding to individual allele frequencies per species of variant (alleles with missing data are not considered).
+    Get a generator of the variant data of the scenario X in order of variant identification.
     '''
 
-    # initialize the dictionary
-    species_allele_frequency_dict = xlib.NestedDefaultDict()
-
     # query
-    sentence = f'''
-                SELECT a.variant_id, b.species_id, a.allele_id, SUM(a.frecuency)
-                    FROM vcf_samples_alleles a, vcf_samples b
-                    WHERE a.sample_id = b.sample_id
-                      AND a.allele_id <> '{md_symbol}'
-                      AND b.mother_id = 'NONE'
-                    GROUP BY a.variant_id, b.species_id, a.allele_id
-                    ORDER BY a.variant_id, b.species_id, a.allele_id;
-                '''
-    try:
-        rows = conn.execute(sentence)
-    except Exception as e:
-        raise xlib.ProgramException(e, 'B002', sentence, conn)
-
-
-    # add row data to the dictionary
-    for row in rows:
-        species_allele_frequency_dict[row[0]][row[1]][row[2]] = {'frecuency_sum': row[3]}
+    sentence = '''
+               SELECT variant_id, seq_id, position, genomic_zone, gene_or_fragment, description, chromosome_id, imputations
+                   FROM scenariox_variant_data
+                   ORDER BY variant_id;
+               '''
 
-    # return the dictionary
-    return species_allele_frequency_dict
+    # yield the row data
+    for row in iter_query_rows(conn, sentence):
+        yield {'variant_id': row[0], 'seq_id': row[1], 'position': row[2], 'genomic_zone': row[3], 'gene_or_fragment': row[4], 'description': row[5], 'chromosome_id': row[6], 'imputations': row[7]}
 
 #-------------------------------------------------------------------------------
-# query "query_species_and_type_allele_frequencies"
+# query "iter_scenariox_alleles"
 #-------------------------------------------------------------------------------
 
-def query_species_and_type_allele_frequencies(conn, md_symbol):
+def iter_scenariox_alleles(conn, md_symbol, sp1_id, sp2_id, hybrid_id):
     '''
-    Get a dictionary corresponding to individual allele frequencies per species and type of variant per species (alleles with missing data and adult individuals are not considered).
+    Get a generator of the allele data of the scenario X with the frecuency summations of adult individuals per species and
+    of mothers and progenies per species and their totals per variant (alleles with missing data and alleles without frecuency
+    in adult individuals are not considered).
     '''
 
-    # initialize the dictionary
-    species_and_type_allele_frequency_dict = xlib.NestedDefaultDict()
-
-    # query
+    # query (the alleles of a variant are ordered by the first species where they are and their identification)
     sentence = f'''
-                SELECT a.variant_id, b.species_id, b.type, a.allele_id, SUM(a.frecuency)
-                    FROM vcf_samples_alleles a, vcf_samples b
-                    WHERE a.sample_id = b.sample_id
-                      AND a.allele_id <> '{md_symbol}'
-                      AND b.type <> 'ADULT'
-                    GROUP BY a.variant_id, b.species_id, b.type, a.allele_id
-                    ORDER BY a.variant_id, b.species_id, b.type, a.allele_id;
+                WITH species_frequencies AS (
+                    SELECT a.variant_id, a.allele_id, MIN(b.species_id) AS first_species_id,
+                           SUM(CASE WHEN b.species_id = '{sp1_id}' THEN a.frecuency ELSE 0 END) AS sp1_sum,
+                           SUM(CASE WHEN b.species_id = '{sp2_id}' THEN a.frecuency ELSE 0 END) AS sp2_sum,
+                           SUM(CASE WHEN b.species_id = '{hybrid_id}' THEN a.frecuency ELSE 0 END) AS hybrid_sum
+                        FROM vcf_samples_alleles a, vcf_samples b
+                        WHERE a.sample_id = b.sample_id
+                          AND a.allele_id <> '{md_symbol}'
+                          AND b.mother_id = 'NONE'
+                        GROUP BY a.variant_id, a.allele_id),
+                species_and_type_frequencies AS (
+                    SELECT c.variant_id, c.allele_id,
+                           SUM(CASE WHEN d.species_id = '{sp1_id}' AND d.type = 'MOTHER' THEN c.frecuency ELSE 0 END) AS sp1_mothers_sum,
+                           SUM(CASE WHEN d.species_id = '{sp2_id}' AND d.type = 'MOTHER' THEN c.frecuency ELSE 0 END) AS sp2_mothers_sum,
+                           SUM(CASE WHEN d.species_id = '{hybrid_id}' AND d.type = 'MOTHER' THEN c.frecuency ELSE 0 END) AS hybrid_mothers_sum,
+                           SUM(CASE WHEN d.species_id = '{sp1_id}' AND d.type = 'PROGENY' THEN c.frecuency ELSE 0 END) AS sp1_progenies_sum,
+                           SUM(CASE WHEN d.species_id = '{sp2_id}' AND d.type = 'PROGENY' THEN c.frecuency ELSE 0 END) AS sp2_progenies_sum,
+                           SUM(CASE WHEN d.species_id = '{hybrid_id}' AND d.type = 'PROGENY' THEN c.frecuency ELSE 0 END) AS hybrid_progenies_sum
+                        FROM vcf_samples_alleles c, vcf_samples d
+                        WHERE c.sample_id = d.sample_id
+                          AND c.allele_id <> '{md_symbol}'
+                          AND d.type <> 'ADULT'
+                        GROUP BY c.variant_id, c.allele_id),
+                allele_frequencies AS (
+                    SELECT e.variant_id, e.allele_id, e.first_species_id, e.sp1_sum, e.sp2_sum, e.hybrid_sum,
+                           COALESCE(f.sp1_mothers_sum, 0) AS sp1_mothers_sum, COALESCE(f.sp2_mothers_sum, 0) AS sp2_mothers_sum, COALESCE(f.hybrid_mothers_sum, 0) AS hybrid_mothers_sum,
+                           COALESCE(f.sp1_progenies_sum, 0) AS sp1_progenies_sum, COALESCE(f.sp2_progenies_sum, 0) AS sp2_progenies_sum, COALESCE(f.hybrid_progenies_sum, 0) AS hybrid_progenies_sum
+                        FROM species_frequencies e
+                        LEFT JOIN species_and_type_frequencies f ON e.variant_id = f.variant_id AND e.allele_id = f.allele_id)
+                SELECT g.variant_id, g.seq_id, g.position, g.genomic_zone, g.gene_or_fragment, g.description, g.chromosome_id, g.imputations, h.allele_id, COALESCE(i.bases, 'N/A'),
+                       h.sp1_sum, h.sp2_sum, h.hybrid_sum, h.sp1_mothers_sum, h.sp2_mothers_sum, h.hybrid_mothers_sum, h.sp1_progenies_sum, h.sp2_progenies_sum, h.hybrid_progenies_sum,
+                       SUM(h.sp1_sum) OVER w, SUM(h.sp2_sum) OVER w, SUM(h.hybrid_sum) OVER w,
+                       SUM(h.sp1_mothers_sum) OVER w, SUM(h.sp2_mothers_sum) OVER w, SUM(h.hybrid_mothers_sum) OVER w,
+                       SUM(h.sp1_progenies_sum) OVER w, SUM(h.sp2_progenies_sum) OVER w, SUM(h.hybrid_progenies_sum) OVER w
+                    FROM scenariox_variant_data g, allele_frequencies h
+                    LEFT JOIN vcf_alleles i ON h.variant_id = i.variant_id AND h.allele_id = i.allele_id
+                    WHERE g.variant_id = h.variant_id
+                    WINDOW w AS (PARTITION BY h.variant_id)
+                    ORDER BY h.variant_id, h.first_species_id, h.allele_id;
                 '''
-    try:
-        rows = conn.execute(sentence)
-    except Exception as e:
-        raise xlib.ProgramException(e, 'B002', sentence, conn)
 
+    # yield the row data
+    for row in iter_query_rows(conn, sentence):
+        yield {'variant_id': row[0], 'seq_id': row[1], 'position': row[2], 'genomic_zone': row[3], 'gene_or_fragment': row[4], 'description': row[5], 'chromosome_id': row[6], 'imputations': row[7], 'allele_id': row[8], 'bases': row[9], 'frecuency_sum_list': row[10:19], 'frecuency_total_list': row[19:28]}
 
-    # add row data to the dictionary
-    for row in rows:
-        species_and_type_allele_frequency_dict[row[0]][row[1]][row[2]][row[3]] = {'frecuency_sum': row[4]}
+#-------------------------------------------------------------------------------
+# query "iter_scenariox_selected_variant_ids"
+#-------------------------------------------------------------------------------
 
-    # return the dictionary
-    return species_and_type_allele_frequency_dict
+def iter_scenariox_selected_variant_ids(conn):
+    '''
+    Get a generator of the variant identifications selected to the scenario X: all variants of a gene/fragment when all of
+    them have imputations, otherwise its variants without imputations.
+    '''
+
+    # query
+    sentence = '''
+               SELECT variant_id
+                   FROM (SELECT variant_id, gene_or_fragment, imputations, MIN(imputations) OVER (PARTITION BY gene_or_fragment) AS minimum_imputations
+                             FROM scenariox_variant_data)
+                   WHERE minimum_imputations = 'Y'
+                      OR imputations = 'N'
+                   ORDER BY gene_or_fragment, variant_id;
+               '''
+
+    # yield the variant identifications
+    for row in iter_query_rows(conn, sentence):
+        yield row[0]
 
 #-------------------------------------------------------------------------------
 # table "vcf_snps"
@@ -3062,6 +3170,23 @@ def insert_vcf_kinship_row(conn, row_dict):
 
 #-------------------------------------------------------------------------------
 
+def insert_vcf_kinship_rows(conn, row_iterator):
+    '''
+    Insert rows (individual_i, individual_j, rbeta, rw, ru) of an iterator into table "vcf_kinship"
+    '''
+
+    sentence = '''
+               INSERT INTO vcf_kinship
+                   (individual_i, individual_j, rbeta, rw, ru)
+                   VALUES (?, ?, ?, ?, ?);
+               '''
+    try:
+        conn.executemany(sentence, row_iterator)
+    except Exception as e:
+        raise xlib.ProgramException(e, 'B002', sentence, conn)
+
+#-------------------------------------------------------------------------------
+
 def check_vcf_kinship(conn):
     '''
     Check if table "vcf_kinship" exists and if there are rows.
@@ -3137,6 +3262,84 @@ def get_vcf_kinship_dict(conn):
     # return the dictionary
     return kinship_dict
 
+#-------------------------------------------------------------------------------
+# cluster identification lists
+#-------------------------------------------------------------------------------
+
+def get_cluster_identification_source(conn, cluster_id_list):
+    '''
+    Get the source of the clusters of a cluster identification list to be used in a condition "cluster_id IN (source)":
+    a literal with the identifications when there are few clusters or a query of the temporary table "cluster_identifications"
+    loaded with them, so the data of the clusters are got with a query instead of running a query per cluster.
+    '''
+
+    # when there are few clusters, return the literal of the cluster identifications
+    if len(cluster_id_list) <= xlib.Const.CLUSTER_ID_LITERAL_MAX_NUMBER:
+        return xlib.join_string_list_to_string(cluster_id_list)
+
+    sentence_list = []
+    sentence_list.append('''
+        CREATE TEMP TABLE IF NOT EXISTS cluster_identifications (
+            cluster_id TEXT PRIMARY KEY);
+        ''')
+    sentence_list.append('''
+        DELETE FROM temp.cluster_identifications;
+        ''')
+
+    # create or empty the temporary table
+    for sentence in sentence_list:
+        try:
+            conn.execute(sentence)
+        except Exception as e:
+            raise xlib.ProgramException(e, 'B002', sentence, conn)
+
+    # insert the cluster identifications
+    sentence = '''
+               INSERT OR IGNORE INTO temp.cluster_identifications
+                   (cluster_id)
+                   VALUES (?);
+               '''
+    try:
+        conn.executemany(sentence, [(cluster_id,) for cluster_id in cluster_id_list])
+    except Exception as e:
+        raise xlib.ProgramException(e, 'B002', sentence, conn)
+
+    # return the query of the temporary table
+    return 'SELECT cluster_id FROM temp.cluster_identifications'
+
+#-------------------------------------------------------------------------------
+
+def get_cluster_data_dict(conn, data_name, cluster_id_list, query_function, empty_data):
+    '''
+    Get the dictionary of the data of a cluster identification list: the data are got from the cache
+    of cluster data and the clusters not found in it are queried all together by the query function.
+    The clusters without rows have the empty data.
+    '''
+
+    # initialize the dictionary
+    cluster_data_dict = {}
+
+    # get the data of the cached clusters and the list of the clusters to query
+    query_cluster_id_list = []
+    for cluster_id in dict.fromkeys(cluster_id_list):
+        cluster_data = ClusterDataCache.get(conn, data_name, cluster_id)
+        if cluster_data is None:
+            query_cluster_id_list.append(cluster_id)
+        else:
+            cluster_data_dict[cluster_id] = cluster_data
+
+    # query the data of the clusters that are not cached
+    if query_cluster_id_list:
+        cluster_id_source = get_cluster_identification_source(conn, query_cluster_id_list)
+        query_cluster_data_dict = query_function(conn, cluster_id_source)
+        for cluster_id in query_cluster_id_list:
+            cluster_data = query_cluster_data_dict.get(cluster_id, empty_data)
+            ClusterDataCache.put(conn, data_name, cluster_id, cluster_data)
+            cluster_data_dict[cluster_id] = cluster_data
+
+    # return the dictionary
+    return cluster_data_dict
+
 #-------------------------------------------------------------------------------
 # table "interproscan_annotations"
 #-------------------------------------------------------------------------------
@@ -3154,6 +3357,12 @@ def drop_interproscan_annotations(conn):
     except Exception as e:
         raise xlib.ProgramException(e, 'B002', sentence, conn)
 
+    # delete the statistics that depend on the table
+    invalidate_db_stats(conn, 'interproscan_annotations')
+
+    # release the cached cluster data of the table
+    ClusterDataCache.release('interproscan_annotations')
+
 #-------------------------------------------------------------------------------
 
 def create_interproscan_annotations(conn):
@@ -3266,27 +3475,46 @@ def get_interproscan_annotation_dict(conn, cluster_id):
     a cluster identification.
     '''
 
+    return get_interproscan_annotations_per_cluster_dict(conn, [cluster_id])[cluster_id]
+
+#-------------------------------------------------------------------------------
+
+def get_interproscan_annotations_per_cluster_dict(conn, cluster_id_list):
+    '''
+    Get the dictionary of the row data from the table "interproscan_annotations" of each cluster
+    of a cluster identification list (an empty dictionary when the cluster has not row).
+    '''
+
+    return get_cluster_data_dict(conn, 'interproscan_annotations', cluster_id_list, query_interproscan_annotations_per_cluster_dict, {})
+
+#-------------------------------------------------------------------------------
+
+def query_interproscan_annotations_per_cluster_dict(conn, cluster_id_source):
+    '''
+    Query the row data from the table "interproscan_annotations" of the clusters of a cluster identification source.
+    '''
+
     # initialize the dictionary
-    annotations_dict = {}
+    annotations_per_cluster_dict = {}
 
     # select rows from the table "interproscan_annotations"
     sentence = f'''
                 SELECT cluster_id, interpro_goterms, panther_goterms, x_goterms, metacyc_pathways, reactome_pathways, x_pathways
                     FROM interproscan_annotations
-                    WHERE cluster_id = "{cluster_id}";
+                    WHERE cluster_id IN ({cluster_id_source})
+                    ORDER BY rowid;
                 '''
     try:
         rows = conn.execute(sentence)
     except Exception as e:
         raise xlib.ProgramException(e, 'B002', sentence, conn)
 
-
-    # add row data to the dictionary
+    # add row data to the dictionary (the last row of a cluster is kept)
     for row in rows:
-        annotations_dict = {'cluster_id': row[0], 'interpro_goterms': row[1], 'panther_goterms': row[2], 'x_goterms': row[3], 'metacyc_pathways': row[4], 'reactome_pathways': row[5], 'x_pathways': row[6]}
+        annotations_per_cluster_dict[row[0]] = {'cluster_id': row[0], 'interpro_goterms': row[1], 'panther_goterms': row[2], 'x_goterms': row[3], 'metacyc_pathways': row[4], 'reactome_pathways': row[5], 'x_pathways': row[6]}
 
     # return the dictionary
-    return annotations_dict
+    return annotations_per_cluster_dict
 
 #-------------------------------------------------------------------------------
 
@@ -3308,9 +3536,7 @@ def get_metacyc_pathways_per_cluster_dict(conn, species_name):
         sentence = f'''
                     SELECT cluster_id, metacyc_pathways
                         FROM interproscan_annotations
-                        WHERE cluster_id in (SELECT DISTINCT cluster_id
-                                                FROM mmseqs2_relationships
-                                                where species like "%{species_name}%");
+                        WHERE cluster_id in ({get_species_cluster_id_sentence(conn, species_name)});
                     '''
     try:
         rows = conn.execute(sentence)
@@ -3341,6 +3567,12 @@ def drop_emapper_annotations(conn):
     except Exception as e:
         raise xlib.ProgramException(e, 'B002', sentence, conn)
 
+    # delete the statistics that depend on the table
+    invalidate_db_stats(conn, 'emapper_annotations')
+
+    # release the cached cluster data of the table
+    ClusterDataCache.release('emapper_annotations')
+
 #-------------------------------------------------------------------------------
 
 def create_emapper_annotations(conn):
@@ -3463,27 +3695,46 @@ def get_emapper_annotation_dict(conn, cluster_id):
     a cluster identification.
     '''
 
+    return get_emapper_annotations_per_cluster_dict(conn, [cluster_id])[cluster_id]
+
+#-------------------------------------------------------------------------------
+
+def get_emapper_annotations_per_cluster_dict(conn, cluster_id_list):
+    '''
+    Get the dictionary of the row data from the table "emapper_annotations" of each cluster
+    of a cluster identification list (an empty dictionary when the cluster has not row).
+    '''
+
+    return get_cluster_data_dict(conn, 'emapper_annotations', cluster_id_list, query_emapper_annotations_per_cluster_dict, {})
+
+#-------------------------------------------------------------------------------
+
+def query_emapper_annotations_per_cluster_dict(conn, cluster_id_source):
+    '''
+    Query the row data from the table "emapper_annotations" of the clusters of a cluster identification source.
+    '''
+
     # initialize the dictionary
-    annotations_dict = {}
+    annotations_per_cluster_dict = {}
 
     # select rows from the table "emapper_annotations"
     sentence = f'''
                 SELECT cluster_id, ortholog_seq_id, ortholog_species, eggnog_ogs, cog_category, description, goterms, ec, kegg_kos, kegg_pathways, kegg_modules, kegg_reactions, kegg_rclasses, brite, kegg_tc, cazy, pfams
                     FROM emapper_annotations
-                    WHERE cluster_id = "{cluster_id}";
+                    WHERE cluster_id IN ({cluster_id_source})
+                    ORDER BY rowid;
                 '''
     try:
         rows = conn.execute(sentence)
     except Exception as e:
         raise xlib.ProgramException(e, 'B002', sentence, conn)
 
-
-    # add row data to the dictionary
+    # add row data to the dictionary (the last row of a cluster is kept)
     for row in rows:
-        annotations_dict = {'cluster_id': row[0], 'ortholog_seq_id': row[1], 'ortholog_species': row[2], 'eggnog_ogs': row[3], 'cog_category': row[4], 'description': row[5], 'goterms': row[6], 'ec': row[7], 'kegg_kos': row[8], 'kegg_pathways': row[9], 'kegg_modules': row[10], 'kegg_reactions': row[11], 'kegg_rclasses': row[12], 'brite': row[13], 'kegg_tc': row[14], 'cazy': row[15], 'pfams': row[16]}
+        annotations_per_cluster_dict[row[0]] = {'cluster_id': row[0], 'ortholog_seq_id': row[1], 'ortholog_species': row[2], 'eggnog_ogs': row[3], 'cog_category': row[4], 'description': row[5], 'goterms': row[6], 'ec': row[7], 'kegg_kos': row[8], 'kegg_pathways': row[9], 'kegg_modules': row[10], 'kegg_reactions': row[11], 'kegg_rclasses': row[12], 'brite': row[13], 'kegg_tc': row[14], 'cazy': row[15], 'pfams': row[16]}
 
     # return the dictionary
-    return annotations_dict
+    return annotations_per_cluster_dict
 
 #-------------------------------------------------------------------------------
 
@@ -3505,9 +3756,7 @@ def get_kegg_kos_per_cluster_dict(conn, species_name):
         sentence = f'''
                     SELECT cluster_id, kegg_kos
                         FROM emapper_annotations
-                        WHERE cluster_id in (SELECT DISTINCT cluster_id
-                                                FROM mmseqs2_relationships
-                                                where species like "%{species_name}%");
+                        WHERE cluster_id in ({get_species_cluster_id_sentence(conn, species_name)});
                     '''
     try:
         rows = conn.execute(sentence)
@@ -3541,9 +3790,7 @@ def get_kegg_pathways_per_cluster_dict(conn, species_name):
         sentence = f'''
                     SELECT cluster_id, kegg_pathways
                         FROM emapper_annotations
-                        WHERE cluster_id in (SELECT DISTINCT cluster_id
-                                                FROM mmseqs2_relationships
-                                                where species like "%{species_name}%");
+                        WHERE cluster_id in ({get_species_cluster_id_sentence(conn, species_name)});
                     '''
     try:
         rows = conn.execute(sentence)
@@ -3574,6 +3821,13 @@ def drop_mmseqs2_relationships(conn):
     except Exception as e:
         raise xlib.ProgramException(e, 'B002', sentence, conn)
 
+    # delete the statistics that depend on the table
+    invalidate_db_stats(conn, 'mmseqs2_relationships')
+
+    # release the cached cluster data of the table
+    ClusterDataCache.release('mmseqs2_relationships')
+    ClusterDataCache.release('mmseqs2_mf_data')
+
 #-------------------------------------------------------------------------------
 
 def create_mmseqs2_relationships(conn):
@@ -3586,7 +3840,8 @@ def create_mmseqs2_relationships(conn):
                    cluster_id  TEXT NOT NULL,
                    seq_id      TEXT NOT NULL,
                    description TEXT NOT NULL,
-                   species     TEXT NOT NULL);
+                   species     TEXT NOT NULL,
+                   species_id  INTEGER NOT NULL);
                '''
     try:
         conn.execute(sentence)
@@ -3627,6 +3882,22 @@ def create_mmseqs2_relationships_index_2(conn):
 
 #-------------------------------------------------------------------------------
 
+def create_mmseqs2_relationships_index_3(conn):
+    '''
+    Create the index "mmseqs2_relationships_index_3" (if it does not exist) with the columns "species_id" and "cluster_id" on the table "mmseqs2_relationships".
+    '''
+
+    sentence = '''
+               CREATE INDEX mmseqs2_relationships_index_3
+                   ON mmseqs2_relationships (species_id, cluster_id);
+               '''
+    try:
+        conn.execute(sentence)
+    except Exception as e:
+        raise xlib.ProgramException(e, 'B002', sentence, conn)
+
+#-------------------------------------------------------------------------------
+
 def insert_mmseqs2_relationships_row(conn, row_dict):
     '''
     Insert a row into table "mmseqs2_relationships".
@@ -3634,8 +3905,8 @@ def insert_mmseqs2_relationships_row(conn, row_dict):
 
     sentence = f'''
                 INSERT INTO mmseqs2_relationships
-                    (cluster_id, seq_id, description, species)
-                    VALUES ('{row_dict["cluster_id"]}', '{row_dict["seq_id"]}', '{row_dict["description"]}', '{row_dict["species"]}');
+                    (cluster_id, seq_id, description, species, species_id)
+                    VALUES ('{row_dict["cluster_id"]}', '{row_dict["seq_id"]}', '{row_dict["description"]}', '{row_dict["species"]}', {row_dict["species_id"]});
                 '''
     try:
         conn.execute(sentence)
@@ -3699,14 +3970,34 @@ def get_mmseqs2_relationship_dict(conn, cluster_id):
     a cluster identification.
     '''
 
+    return get_mmseqs2_relationships_per_cluster_dict(conn, [cluster_id])[cluster_id]
+
+#-------------------------------------------------------------------------------
+
+def get_mmseqs2_relationships_per_cluster_dict(conn, cluster_id_list):
+    '''
+    Get the dictionary of the rows data from the table "mmseqs2_relationships" of each cluster
+    of a cluster identification list (an empty dictionary when the cluster has not rows).
+    '''
+
+    return get_cluster_data_dict(conn, 'mmseqs2_relationships', cluster_id_list, query_mmseqs2_relationships_per_cluster_dict, {})
+
+#-------------------------------------------------------------------------------
+
+def query_mmseqs2_relationships_per_cluster_dict(conn, cluster_id_source):
+    '''
+    Query the rows data from the table "mmseqs2_relationships" of the clusters of a cluster identification source.
+    '''
+
     # initialize the dictionary
-    relationships_dict = {}
+    relationships_per_cluster_dict = {}
 
     # select rows from the table "mmseqs2_relationships"
     sentence = f'''
                 SELECT cluster_id, seq_id, description, species
                     FROM mmseqs2_relationships
-                    WHERE cluster_id = "{cluster_id}";
+                    WHERE cluster_id IN ({cluster_id_source})
+                    ORDER BY rowid;
                 '''
     try:
         rows = conn.execute(sentence)
@@ -3716,10 +4007,10 @@ def get_mmseqs2_relationship_dict(conn, cluster_id):
     # add row data to the dictionary
     for row in rows:
         key = f'{row[0]}-{row[1]}'
-        relationships_dict[key] = {'cluster_id': row[0], 'seq_id': row[1], 'description': row[2], 'species': row[3]}
+        relationships_per_cluster_dict.setdefault(row[0], {})[key] = {'cluster_id': row[0], 'seq_id': row[1], 'description': row[2], 'species': row[3]}
 
     # return the dictionary
-    return relationships_dict
+    return relationships_per_cluster_dict
 
 #-------------------------------------------------------------------------------
 
@@ -3729,50 +4020,49 @@ def get_mmseqs2_seq_mf_data(conn, cluster_id):
     corresponding to a cluster identification.
     '''
 
-    # initialize the description, dictionary
-    description_dict = {}
+    return get_mmseqs2_seq_mf_data_per_cluster_dict(conn, [cluster_id])[cluster_id]
+
+#-------------------------------------------------------------------------------
+
+def get_mmseqs2_seq_mf_data_per_cluster_dict(conn, cluster_id_list):
+    '''
+    Get the dictionary of the most frequent description and species of each cluster of a cluster identification
+    list (empty description and species when the cluster has not rows in the table "mmseqs2_relationships").
+    '''
+
+    return get_cluster_data_dict(conn, 'mmseqs2_mf_data', cluster_id_list, query_mmseqs2_mf_data_per_cluster_dict, ('', ''))
+
+#-------------------------------------------------------------------------------
+
+def query_mmseqs2_mf_data_per_cluster_dict(conn, cluster_id_source):
+    '''
+    Query the most frequent description and species of the clusters of a cluster identification source
+    from the table "mmseqs2_mf_data" or, when the database was loaded without it, from the table "mmseqs2_relationships".
+    '''
 
     # initialize the dictionary
-    species_dict = {}
+    mf_data_per_cluster_dict = {}
 
-    # select rows from the table "mmseqs2_relationships"
-    sentence = f'''
-                SELECT description, species
-                    FROM mmseqs2_relationships
-                    WHERE cluster_id = "{cluster_id}";
-                '''
+    # select rows from the table "mmseqs2_mf_data" or calculate them from the table "mmseqs2_relationships"
+    if check_mmseqs2_mf_data(conn):
+        sentence = f'''
+                    SELECT cluster_id, mf_description, mf_species
+                        FROM mmseqs2_mf_data
+                        WHERE cluster_id IN ({cluster_id_source});
+                    '''
+    else:
+        sentence = get_mmseqs2_mf_data_sentence(f'SELECT rowid, cluster_id, description, species FROM mmseqs2_relationships WHERE cluster_id IN ({cluster_id_source})')
     try:
         rows = conn.execute(sentence)
     except Exception as e:
         raise xlib.ProgramException(e, 'B002', sentence, conn)
 
-    # count descriptions and species
+    # add row data to the dictionary
     for row in rows:
-        # descriptions
-        description_counter = description_dict.get(row[0], 0)
-        description_dict[row[0]] = description_counter + 1
-        # species
-        species_counter = species_dict.get(row[1], 0)
-        species_dict[row[1]] = species_counter + 1
-
-    # calculate the most frecuent description and species
-    higher_counter = -1
-    mf_description = ''
-    for description, description_counter in description_dict.items():
-        if description_counter > higher_counter:
-            mf_description = description
-            higher_counter = description_counter
-
-    # calculate the most frecuent species
-    higher_counter = -1
-    mf_species = ''
-    for species, species_counter in species_dict.items():
-        if species_counter > higher_counter:
-            mf_species = species
-            higher_counter = species_counter
-
-    # return the most frecuent species
-    return mf_description, mf_species
+        mf_data_per_cluster_dict[row[0]] = (row[1], row[2])
+
+    # return the dictionary
+    return mf_data_per_cluster_dict
 
 #-------------------------------------------------------------------------------
 
@@ -3785,11 +4075,18 @@ def get_mmseqs2_species_list(conn):
     species_names_list = []
 
     # select rows from the table "mmseqs2_relationships"
-    sentence = '''
-               SELECT DISTINCT species
-                   FROM mmseqs2_relationships
-                   ORDER by 1;
-               '''
+    if check_table(conn, 'mmseqs2_species'):
+        sentence = '''
+                   SELECT species
+                       FROM mmseqs2_species
+                       ORDER by 1;
+                   '''
+    else:
+        sentence = '''
+                   SELECT DISTINCT species
+                       FROM mmseqs2_relationships
+                       ORDER by 1;
+                   '''
     try:
         rows = conn.execute(sentence)
     except Exception as e:
@@ -3830,9 +4127,7 @@ def get_goterms_per_cluster_dict(conn, species_name):
     else:
         sentence = f'''
                     WITH cluster_identifications AS (
-                        SELECT DISTINCT cluster_id
-                        FROM mmseqs2_relationships
-                        WHERE species LIKE "%{species_name}%"
+                        {get_species_cluster_id_sentence(conn, species_name)}
                     )
                     SELECT a.cluster_id, COALESCE(b.interpro_goterms, '-'), COALESCE(b.panther_goterms, '-'), COALESCE(c.goterms, '-')
                     FROM cluster_identifications a
@@ -3853,50 +4148,71 @@ def get_goterms_per_cluster_dict(conn, species_name):
     return goterms_per_cluster_dict
 
 #-------------------------------------------------------------------------------
-# table "tair10_orthologs"
+# table "mmseqs2_mf_data"
 #-------------------------------------------------------------------------------
 
-def drop_tair10_orthologs(conn):
+def get_mmseqs2_mf_data_sentence(relationship_sentence):
     '''
-    Drop the table "tair10_orthologs" (if it exists)
+    Get the sentence that calculates the most frequent description and species of each cluster of the rows
+    (rowid, cluster_id, description, species) selected by a sentence of the table "mmseqs2_relationships";
+    a tie is resolved in favour of the value found first.
     '''
 
-    sentence = '''
-               DROP TABLE IF EXISTS tair10_orthologs;
-               '''
-    try:
-        conn.execute(sentence)
-    except Exception as e:
-        raise xlib.ProgramException(e, 'B002', sentence, conn)
+    return f'''
+            WITH relationships AS (
+                {relationship_sentence}),
+            description_counters AS (
+                SELECT cluster_id, description, COUNT(*) AS counter, MIN(rowid) AS first_rowid
+                    FROM relationships
+                    GROUP BY cluster_id, description),
+            ranked_descriptions AS (
+                SELECT cluster_id, description,
+                       ROW_NUMBER() OVER (PARTITION BY cluster_id ORDER BY counter DESC, first_rowid) AS row_num
+                    FROM description_counters),
+            species_counters AS (
+                SELECT cluster_id, species, COUNT(*) AS counter, MIN(rowid) AS first_rowid
+                    FROM relationships
+                    GROUP BY cluster_id, species),
+            ranked_species AS (
+                SELECT cluster_id, species,
+                       ROW_NUMBER() OVER (PARTITION BY cluster_id ORDER BY counter DESC, first_rowid) AS row_num
+                    FROM species_counters)
+            SELECT c.cluster_id, c.description AS mf_description, d.species AS mf_species
+                FROM ranked_descriptions c, ranked_species d
+                WHERE c.cluster_id = d.cluster_id
+                  AND c.row_num = 1
+                  AND d.row_num = 1
+            '''
 
 #-------------------------------------------------------------------------------
 
-def create_tair10_orthologs(conn):
+def drop_mmseqs2_mf_data(conn):
     '''
-    Create table "tair10_orthologs".
+    Drop the table "mmseqs2_mf_data" (if it exists)
     '''
 
     sentence = '''
-               CREATE TABLE tair10_orthologs (
-                   cluster_id      TEXT NOT NULL,
-                   ortholog_seq_id TEXT NOT NULL);
+               DROP TABLE IF EXISTS mmseqs2_mf_data;
                '''
     try:
         conn.execute(sentence)
     except Exception as e:
         raise xlib.ProgramException(e, 'B002', sentence, conn)
 
+    # release the cached cluster data of the table
+    ClusterDataCache.release('mmseqs2_mf_data')
+
 #-------------------------------------------------------------------------------
 
-def create_tair10_orthologs_index(conn):
+def create_mmseqs2_mf_data(conn):
     '''
-    Create the index "tair10_orthologs_index" (if it does not exist) with the column "cluster_id" on the table "tair10_orthologs".
+    Create table "mmseqs2_mf_data" with the most frequent description and species of each cluster of the table "mmseqs2_relationships".
     '''
 
-    sentence = '''
-               CREATE UNIQUE INDEX tair10_orthologs_index
-                   ON tair10_orthologs (cluster_id);
-               '''
+    sentence = f'''
+                CREATE TABLE mmseqs2_mf_data AS
+                    {get_mmseqs2_mf_data_sentence('SELECT rowid, cluster_id, description, species FROM mmseqs2_relationships')};
+                '''
     try:
         conn.execute(sentence)
     except Exception as e:
@@ -3904,16 +4220,15 @@ def create_tair10_orthologs_index(conn):
 
 #-------------------------------------------------------------------------------
 
-def insert_tair10_orthologs_row(conn, row_dict):
+def create_mmseqs2_mf_data_index(conn):
     '''
-    Insert a row into table "tair10_orthologs".
+    Create the index "mmseqs2_mf_data_index" (if it does not exist) with the column "cluster_id" on the table "mmseqs2_mf_data".
     '''
 
-    sentence = f'''
-                INSERT INTO tair10_orthologs
-                    (cluster_id, ortholog_seq_id)
-                    VALUES ('{row_dict["cluster_id"]}', '{row_dict["ortholog_seq_id"]}');
-                '''
+    sentence = '''
+               CREATE UNIQUE INDEX mmseqs2_mf_data_index
+                   ON mmseqs2_mf_data (cluster_id);
+               '''
     try:
         conn.execute(sentence)
     except Exception as e:
@@ -3921,18 +4236,18 @@ def insert_tair10_orthologs_row(conn, row_dict):
 
 #-------------------------------------------------------------------------------
 
-def check_tair10_orthologs(conn):
+def check_mmseqs2_mf_data(conn):
     '''
-    Check if table "tair10_orthologs" exists and if there are rows.
+    Check if table "mmseqs2_mf_data" exists.
     '''
 
-    # check if table "tair10_orthologs" exists
+    # check if table "mmseqs2_mf_data" exists
     sentence = '''
                SELECT EXISTS
                    (SELECT 1
                        FROM sqlite_master
                        WHERE type = 'table'
-                         AND tbl_name = 'tair10_orthologs'
+                         AND tbl_name = 'mmseqs2_mf_data'
                        LIMIT 1);
                '''
     try:
@@ -3940,369 +4255,635 @@ def check_tair10_orthologs(conn):
     except Exception as e:
         raise xlib.ProgramException(e, 'B002', sentence, conn)
 
-    # get the row number
+    # get the control value
     for row in rows:
         control = int(row[0])
         break
 
-    # check if there are rows when the table "tair10_orthologs" exists
-    if control == 1:
+    # return the control value
+    return control
 
-        # select the row number
-        sentence = '''
-                   SELECT EXISTS
-                       (SELECT 1
-                           FROM tair10_orthologs
-                           LIMIT 1);
-                   '''
-        try:
-            rows = conn.execute(sentence)
-        except Exception as e:
-            raise xlib.ProgramException(e, 'B002', sentence, conn)
+#-------------------------------------------------------------------------------
+# table "mmseqs2_species"
+#-------------------------------------------------------------------------------
 
-        # get the row number
-        for row in rows:
-            control = int(row[0])
-            break
+def drop_mmseqs2_species(conn):
+    '''
+    Drop the table "mmseqs2_species" (if it exists)
+    '''
 
-    # return the row number
-    return control
+    sentence = '''
+               DROP TABLE IF EXISTS mmseqs2_species;
+               '''
+    try:
+        conn.execute(sentence)
+    except Exception as e:
+        raise xlib.ProgramException(e, 'B002', sentence, conn)
 
 #-------------------------------------------------------------------------------
 
-def get_tair10_ortholog_seq_id(conn, cluster_id):
+def create_mmseqs2_species(conn):
     '''
-    Get the TAIR 10 ortholog sequence identification of a cluster identification.
+    Create table "mmseqs2_species".
     '''
 
-    # initialize ortholog sequence identification
-    ortholog_seq_id = '-'
-
-    # query
-    sentence = f'''
-                SELECT ortholog_seq_id
-                    FROM tair10_orthologs
-                    where cluster_id = '{cluster_id}';
-                '''
+    sentence = '''
+               CREATE TABLE mmseqs2_species (
+                   species_id INTEGER PRIMARY KEY,
+                   species    TEXT NOT NULL);
+               '''
     try:
-        rows = conn.execute(sentence)
+        conn.execute(sentence)
     except Exception as e:
         raise xlib.ProgramException(e, 'B002', sentence, conn)
 
-    # get the row number
-    for row in rows:
-        ortholog_seq_id = row[0]
-        break
-
-    # return the ortholog sequence identification
-    return ortholog_seq_id
-
-#-------------------------------------------------------------------------------
-# Statistics of gymnoTOA database
 #-------------------------------------------------------------------------------
 
-def get_gymnotoa_db_stats(conn):
+def create_mmseqs2_species_index(conn):
     '''
-    Get the statistics of gymnoTOA database.
+    Create the index "mmseqs2_species_index" (if it does not exist) with the column "species" on the table "mmseqs2_species".
     '''
 
-    # count the sequences number of Acrogymnospermae
     sentence = '''
-               SELECT COUNT(*)
-                   FROM mmseqs2_relationships;
+               CREATE UNIQUE INDEX mmseqs2_species_index
+                   ON mmseqs2_species (species);
                '''
     try:
-        rows = conn.execute(sentence)
+        conn.execute(sentence)
     except Exception as e:
         raise xlib.ProgramException(e, 'B002', sentence, conn)
 
-    # set the sequences number of Acrogymnospermae
-    seqnum_acrogymnospermae = 0
-    for row in rows:
-        seqnum_acrogymnospermae = int(row[0])
-        break
+#-------------------------------------------------------------------------------
+
+def insert_mmseqs2_species_rows(conn, species_id_dict):
+    '''
+    Insert the rows of a dictionary (key: species; value: species identification) into table "mmseqs2_species".
+    '''
 
-    # count the total of clusters
     sentence = '''
-               SELECT COUNT(DISTINCT cluster_id)
-                   FROM mmseqs2_relationships;
+               INSERT INTO mmseqs2_species
+                   (species_id, species)
+                   VALUES (?, ?);
                '''
     try:
-        rows = conn.execute(sentence)
+        conn.executemany(sentence, [(species_id, species) for (species, species_id) in species_id_dict.items()])
     except Exception as e:
         raise xlib.ProgramException(e, 'B002', sentence, conn)
 
-    # set the total of clusters
-    clusternum_total = 0
-    for row in rows:
-        clusternum_total = int(row[0])
-        break
+#-------------------------------------------------------------------------------
 
-    # count the clusters number with InterProScan annotations
-    sentence = '''
-               SELECT COUNT(*)
-                   FROM interproscan_annotations;
-               '''
+def get_mmseqs2_species_id_list(conn, species_name):
+    '''
+    Get the identifications of the species of the table "mmseqs2_species" whose name contains a species name.
+    '''
+
+    # initialize the species identification list
+    species_id_list = []
+
+    # select rows from the table "mmseqs2_species"
+    sentence = f'''
+                SELECT species_id
+                    FROM mmseqs2_species
+                    WHERE species LIKE "%{species_name}%";
+                '''
     try:
         rows = conn.execute(sentence)
     except Exception as e:
         raise xlib.ProgramException(e, 'B002', sentence, conn)
 
-    # set the clusters number with InterProScan annotations
-    clusternum_interproscan_annotations = 0
+    # add the species identification to the list
     for row in rows:
-        clusternum_interproscan_annotations = int(row[0])
-        break
+        species_id_list.append(int(row[0]))
+
+    # return the species identification list
+    return species_id_list
+
+#-------------------------------------------------------------------------------
+
+def get_species_cluster_id_sentence(conn, species_name):
+    '''
+    Get the sentence that selects the distinct cluster identifications of the table "mmseqs2_relationships" whose species
+    contains a species name: the species are resolved to their identifications first, so the clusters are got by range
+    scans of the index on species and cluster identifications (the species name is searched in the table
+    "mmseqs2_relationships" when the database was loaded without the table "mmseqs2_species").
+    '''
+
+    if check_table(conn, 'mmseqs2_species'):
+        species_id_list_text = ','.join(str(species_id) for species_id in get_mmseqs2_species_id_list(conn, species_name))
+        sentence = f'''
+                    SELECT DISTINCT cluster_id
+                        FROM mmseqs2_relationships
+                        WHERE species_id IN ({species_id_list_text})
+                    '''
+    else:
+        sentence = f'''
+                    SELECT DISTINCT cluster_id
+                        FROM mmseqs2_relationships
+                        WHERE species LIKE "%{species_name}%"
+                    '''
+
+    return sentence
+
+#-------------------------------------------------------------------------------
+# table "tair10_orthologs"
+#-------------------------------------------------------------------------------
+
+def drop_tair10_orthologs(conn):
+    '''
+    Drop the table "tair10_orthologs" (if it exists)
+    '''
 
-    # count the clusters number with eggNOG-mapper annotations
     sentence = '''
-               SELECT COUNT(*)
-                   FROM emapper_annotations;
+               DROP TABLE IF EXISTS tair10_orthologs;
                '''
     try:
-        rows = conn.execute(sentence)
+        conn.execute(sentence)
     except Exception as e:
         raise xlib.ProgramException(e, 'B002', sentence, conn)
 
-    # set the clusters number with eggNOG-mapper annotations
-    clusternum_emapper_annotations = 0
-    for row in rows:
-        clusternum_emapper_annotations = int(row[0])
-        break
+    # delete the statistics that depend on the table
+    invalidate_db_stats(conn, 'tair10_orthologs')
+
+    # release the cached cluster data of the table
+    ClusterDataCache.release('tair10_orthologs')
+
+#-------------------------------------------------------------------------------
+
+def create_tair10_orthologs(conn):
+    '''
+    Create table "tair10_orthologs".
+    '''
 
-    # count the clusters number with TAIR10 orthologs
     sentence = '''
-               SELECT COUNT(*)
-                   FROM tair10_orthologs;
+               CREATE TABLE tair10_orthologs (
+                   cluster_id      TEXT NOT NULL,
+                   ortholog_seq_id TEXT NOT NULL);
                '''
     try:
-        rows = conn.execute(sentence)
+        conn.execute(sentence)
     except Exception as e:
         raise xlib.ProgramException(e, 'B002', sentence, conn)
 
-    # set the clusters number with TAIR10 orthologs
-    clusternum_tair10_ortologs = 0
-    for row in rows:
-        clusternum_tair10_ortologs = int(row[0])
-        break
+#-------------------------------------------------------------------------------
+
+def create_tair10_orthologs_index(conn):
+    '''
+    Create the index "tair10_orthologs_index" (if it does not exist) with the column "cluster_id" on the table "tair10_orthologs".
+    '''
 
-    # get the cluster identifications with InterProScan annotations
     sentence = '''
-               SELECT cluster_id
-                   FROM interproscan_annotations;
+               CREATE UNIQUE INDEX tair10_orthologs_index
+                   ON tair10_orthologs (cluster_id);
                '''
     try:
-        rows = conn.execute(sentence)
+        conn.execute(sentence)
     except Exception as e:
         raise xlib.ProgramException(e, 'B002', sentence, conn)
 
-    # build the set of clusters identifications with InterProScan annotations
-    interproscan_cluster_id_set = set()
-    for row in rows:
-        interproscan_cluster_id_set.add(row[0])
+#-------------------------------------------------------------------------------
 
-    # get the cluster identifications with eggNOG-mapper annotations
-    sentence = '''
-               SELECT cluster_id
-                   FROM emapper_annotations;
-               '''
+def insert_tair10_orthologs_row(conn, row_dict):
+    '''
+    Insert a row into table "tair10_orthologs".
+    '''
+
+    sentence = f'''
+                INSERT INTO tair10_orthologs
+                    (cluster_id, ortholog_seq_id)
+                    VALUES ('{row_dict["cluster_id"]}', '{row_dict["ortholog_seq_id"]}');
+                '''
     try:
-        rows = conn.execute(sentence)
+        conn.execute(sentence)
     except Exception as e:
         raise xlib.ProgramException(e, 'B002', sentence, conn)
 
-    # build the set of clusters identifications with eggNOG-mapper annotations
-    emapper_cluster_id_set = set()
-    for row in rows:
-        emapper_cluster_id_set.add(row[0])
+#-------------------------------------------------------------------------------
+
+def check_tair10_orthologs(conn):
+    '''
+    Check if table "tair10_orthologs" exists and if there are rows.
+    '''
 
-    # get the cluster identifications with TAIR10 orthologs
+    # check if table "tair10_orthologs" exists
     sentence = '''
-               SELECT cluster_id
-                   FROM tair10_orthologs;
+               SELECT EXISTS
+                   (SELECT 1
+                       FROM sqlite_master
+                       WHERE type = 'table'
+                         AND tbl_name = 'tair10_orthologs'
+                       LIMIT 1);
                '''
     try:
         rows = conn.execute(sentence)
     except Exception as e:
         raise xlib.ProgramException(e, 'B002', sentence, conn)
 
-    # build the set of clusters identifications with TAIR10 orthologs
-    tair10_cluster_id_set = set()
+    # get the row number
     for row in rows:
-        tair10_cluster_id_set.add(row[0])
+        control = int(row[0])
+        break
+
+    # check if there are rows when the table "tair10_orthologs" exists
+    if control == 1:
+
+        # select the row number
+        sentence = '''
+                   SELECT EXISTS
+                       (SELECT 1
+                           FROM tair10_orthologs
+                           LIMIT 1);
+                   '''
+        try:
+            rows = conn.execute(sentence)
+        except Exception as e:
+            raise xlib.ProgramException(e, 'B002', sentence, conn)
 
-    # calculate the clusters number without annotations
-    union_cluster_id_set = interproscan_cluster_id_set | emapper_cluster_id_set | tair10_cluster_id_set
-    clusternum_with_annotations = len(union_cluster_id_set)
-    clusternum_without_annotations = clusternum_total - clusternum_with_annotations
+        # get the row number
+        for row in rows:
+            control = int(row[0])
+            break
 
+    # return the row number
+    return control
 
-    # return the ortholog sequence identification
-    return seqnum_acrogymnospermae, clusternum_total, clusternum_interproscan_annotations, clusternum_emapper_annotations, clusternum_tair10_ortologs, clusternum_without_annotations
+#-------------------------------------------------------------------------------
+
+def get_tair10_ortholog_seq_id(conn, cluster_id):
+    '''
+    Get the TAIR 10 ortholog sequence identification of a cluster identification.
+    '''
+
+    return get_tair10_ortholog_seq_id_per_cluster_dict(conn, [cluster_id])[cluster_id]
 
 #-------------------------------------------------------------------------------
-# Statistics of quercusTOA database
+
+def get_tair10_ortholog_seq_id_per_cluster_dict(conn, cluster_id_list):
+    '''
+    Get the dictionary of the TAIR 10 ortholog sequence identification of each cluster
+    of a cluster identification list ("-" when the cluster has not ortholog).
+    '''
+
+    return get_cluster_data_dict(conn, 'tair10_orthologs', cluster_id_list, query_tair10_ortholog_seq_id_per_cluster_dict, '-')
+
 #-------------------------------------------------------------------------------
 
-def get_quercustoa_db_stats(conn):
+def query_tair10_ortholog_seq_id_per_cluster_dict(conn, cluster_id_source):
     '''
-    Get the statistics of quercusTOA database.
+    Query the TAIR 10 ortholog sequence identification of the clusters of a cluster identification source.
     '''
 
-    # count the sequences number of Quercus
-    sentence = '''
-               SELECT COUNT(*)
-                   FROM mmseqs2_relationships;
-               '''
+    # initialize the dictionary
+    ortholog_seq_id_per_cluster_dict = {}
+
+    # query
+    sentence = f'''
+                SELECT cluster_id, ortholog_seq_id
+                    FROM tair10_orthologs
+                    WHERE cluster_id IN ({cluster_id_source})
+                    ORDER BY rowid;
+                '''
     try:
         rows = conn.execute(sentence)
     except Exception as e:
         raise xlib.ProgramException(e, 'B002', sentence, conn)
 
-    # set the sequences number of Quercus
-    seqnum_quercus = 0
+    # add the ortholog sequence identification to the dictionary (the first row of a cluster is kept)
     for row in rows:
-        seqnum_quercus = int(row[0])
-        break
+        ortholog_seq_id_per_cluster_dict.setdefault(row[0], row[1])
+
+    # return the dictionary
+    return ortholog_seq_id_per_cluster_dict
+
+#-------------------------------------------------------------------------------
+# table "db_stats"
+#-------------------------------------------------------------------------------
+
+def get_db_stat_dict():
+    '''
+    Get the dictionary of the statistics of gymnoTOA and quercusTOA databases saved in the table "db_stats":
+    the tables whose load invalidates each statistic and the sentence that calculates it.
+    '''
+
+    return {
+        'seqnum': {'table_list': ['mmseqs2_relationships'], 'sentence': 'SELECT COUNT(*) FROM mmseqs2_relationships;'},
+        'clusternum_total': {'table_list': ['mmseqs2_relationships'], 'sentence': 'SELECT COUNT(DISTINCT cluster_id) FROM mmseqs2_relationships;'},
+        'clusternum_interproscan_annotations': {'table_list': ['interproscan_annotations'], 'sentence': 'SELECT COUNT(*) FROM interproscan_annotations;'},
+        'clusternum_emapper_annotations': {'table_list': ['emapper_annotations'], 'sentence': 'SELECT COUNT(*) FROM emapper_annotations;'},
+        'clusternum_tair10_ortologs': {'table_list': ['tair10_orthologs'], 'sentence': 'SELECT COUNT(*) FROM tair10_orthologs;'},
+        'clusternum_with_annotations': {'table_list': ['interproscan_annotations', 'emapper_annotations', 'tair10_orthologs'], 'sentence': 'SELECT COUNT(*) FROM (SELECT cluster_id FROM interproscan_annotations UNION SELECT cluster_id FROM emapper_annotations UNION SELECT cluster_id FROM tair10_orthologs);'},
+        }
+
+#-------------------------------------------------------------------------------
+
+def create_db_stats(conn):
+    '''
+    Create table "db_stats" (if it does not exist).
+    '''
 
-    # count the total of clusters
     sentence = '''
-               SELECT COUNT(DISTINCT cluster_id)
-                   FROM mmseqs2_relationships;
+               CREATE TABLE IF NOT EXISTS db_stats (
+                   stat_name TEXT NOT NULL PRIMARY KEY,
+                   value     INTEGER NOT NULL);
                '''
     try:
-        rows = conn.execute(sentence)
+        conn.execute(sentence)
     except Exception as e:
         raise xlib.ProgramException(e, 'B002', sentence, conn)
 
-    # set the total of clusters
-    clusternum_total = 0
-    for row in rows:
-        clusternum_total = int(row[0])
-        break
+#-------------------------------------------------------------------------------
 
-    # count the clusters number with InterProScan annotations
-    sentence = '''
-               SELECT COUNT(*)
-                   FROM interproscan_annotations;
-               '''
+def invalidate_db_stats(conn, table_name):
+    '''
+    Delete the statistics of the table "db_stats" that depend on a table.
+    '''
+
+    # get the statistics that depend on the table
+    stat_name_list = [stat_name for (stat_name, stat_data) in get_db_stat_dict().items() if table_name in stat_data['table_list']]
+
+    # delete the statistics
+    create_db_stats(conn)
+    sentence = f'''
+                DELETE FROM db_stats
+                    WHERE stat_name IN ({xlib.join_string_list_to_string(stat_name_list)});
+                '''
     try:
-        rows = conn.execute(sentence)
+        conn.execute(sentence)
     except Exception as e:
         raise xlib.ProgramException(e, 'B002', sentence, conn)
 
-    # set the clusters number with InterProScan annotations
-    clusternum_interproscan_annotations = 0
-    for row in rows:
-        clusternum_interproscan_annotations = int(row[0])
-        break
+#-------------------------------------------------------------------------------
+
+def get_saved_db_stats_dict(conn):
+    '''
+    Get the dictionary of the statistics saved in the table "db_stats".
+    '''
 
-    # count the clusters number with eggNOG-mapper annotations
+    # initialize the dictionary
+    saved_db_stats_dict = {}
+
+    # return the empty dictionary when the table "db_stats" does not exist (it is not created, so a read-only database can be used)
+    if not check_table(conn, 'db_stats'):
+        return saved_db_stats_dict
+
+    # select rows from the table "db_stats"
     sentence = '''
-               SELECT COUNT(*)
-                   FROM emapper_annotations;
+               SELECT stat_name, value
+                   FROM db_stats;
                '''
     try:
         rows = conn.execute(sentence)
     except Exception as e:
         raise xlib.ProgramException(e, 'B002', sentence, conn)
 
-    # set the clusters number with eggNOG-mapper annotations
-    clusternum_emapper_annotations = 0
+    # add row data to the dictionary
     for row in rows:
-        clusternum_emapper_annotations = int(row[0])
-        break
+        saved_db_stats_dict[row[0]] = int(row[1])
 
-    # count the clusters number with TAIR10 orthologs
-    sentence = '''
-               SELECT COUNT(*)
-                   FROM tair10_orthologs;
-               '''
+    # return the dictionary
+    return saved_db_stats_dict
+
+#-------------------------------------------------------------------------------
+
+def calculate_db_stat(conn, database_path, stat_name):
+    '''
+    Calculate a statistic of the table "db_stats" using the connection or, when the database path is
+    not None, a new read connection to the database.
+    '''
+
+    # connect to the database when it is necessary
+    if database_path is not None:
+        try:
+            conn = sqlite3.connect(f'file:{urllib.parse.quote(database_path)}?mode=ro', uri=True)
+        except Exception as e:
+            raise xlib.ProgramException(e, 'B001', database_path)
+
+    # calculate the statistic
+    sentence = get_db_stat_dict()[stat_name]['sentence']
     try:
         rows = conn.execute(sentence)
     except Exception as e:
         raise xlib.ProgramException(e, 'B002', sentence, conn)
-
-    # set the clusters number with TAIR10 orthologs
-    clusternum_tair10_ortologs = 0
+    value = 0
     for row in rows:
-        clusternum_tair10_ortologs = int(row[0])
+        value = int(row[0])
         break
 
-    # get the cluster identifications with InterProScan annotations
-    sentence = '''
-               SELECT cluster_id
-                   FROM interproscan_annotations;
-               '''
-    try:
-        rows = conn.execute(sentence)
-    except Exception as e:
-        raise xlib.ProgramException(e, 'B002', sentence, conn)
+    # close the read connection
+    if database_path is not None:
+        conn.close()
 
-    # build the set of clusters identifications with InterProScan annotations
-    interproscan_cluster_id_set = set()
-    for row in rows:
-        interproscan_cluster_id_set.add(row[0])
+    # return the statistic
+    return value
 
-    # get the cluster identifications with eggNOG-mapper annotations
-    sentence = '''
-               SELECT cluster_id
-                   FROM emapper_annotations;
-               '''
+#-------------------------------------------------------------------------------
+
+def calculate_db_stats(conn, stat_name_list, threads_num=1):
+    '''
+    Calculate statistics and save them into the table "db_stats" when the database can be written (otherwise, they
+    are only returned); when there are several threads, the statistics are calculated in parallel by read connections
+    to the database (the changes not committed are not seen by them).
+    '''
+
+    # get the database path (the read connections can not be used with an in-memory database)
+    database_path = None
+    if threads_num > 1 and len(stat_name_list) > 1:
+        for row in conn.execute('PRAGMA database_list;'):
+            if row[1] == 'main' and row[2] != '':
+                database_path = row[2]
+
+    # calculate the statistics
+    if database_path is None:
+        value_list = [calculate_db_stat(conn, None, stat_name) for stat_name in stat_name_list]
+    else:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=threads_num) as executor:
+            value_list = list(executor.map(lambda stat_name: calculate_db_stat(None, database_path, stat_name), stat_name_list))
+
+    # save the statistics when the database can be written
+    if check_database_writable(conn):
+        create_db_stats(conn)
+        sentence = '''
+                   INSERT OR REPLACE INTO db_stats
+                       (stat_name, value)
+                       VALUES (?, ?);
+                   '''
+        try:
+            conn.executemany(sentence, zip(stat_name_list, value_list))
+        except Exception as e:
+            raise xlib.ProgramException(e, 'B002', sentence, conn)
+
+    # return the dictionary of the calculated statistics
+    return dict(zip(stat_name_list, value_list))
+
+#-------------------------------------------------------------------------------
+
+def update_db_stats(conn, table_name):
+    '''
+    Calculate the statistics of the table "db_stats" depending on a table that are not saved
+    when all tables which they depend on exist (it is called by the loaders of the tables).
+    '''
+
+    # get the statistics that are not saved
+    saved_db_stats_dict = get_saved_db_stats_dict(conn)
+    stat_name_list = []
+    for (stat_name, stat_data) in get_db_stat_dict().items():
+        if stat_name not in saved_db_stats_dict and table_name in stat_data['table_list'] and all(check_table(conn, table) for table in stat_data['table_list']):
+            stat_name_list.append(stat_name)
+
+    # calculate the statistics and save them
+    calculate_db_stats(conn, stat_name_list)
+
+#-------------------------------------------------------------------------------
+
+def get_db_stats_dict(conn, threads_num=1):
+    '''
+    Get the dictionary of the statistics of the table "db_stats", calculating the statistics that are not saved.
+    '''
+
+    # get the saved statistics
+    db_stats_dict = get_saved_db_stats_dict(conn)
+
+    # calculate the statistics that are not saved
+    stat_name_list = [stat_name for stat_name in get_db_stat_dict() if stat_name not in db_stats_dict]
+    if stat_name_list:
+        db_stats_dict.update(calculate_db_stats(conn, stat_name_list, threads_num))
+
+    # return the dictionary
+    return db_stats_dict
+
+#-------------------------------------------------------------------------------
+
+def check_database_writable(conn):
+    '''
+    Check if the database of a connection can be written (e.g. it is not opened in read-only mode or its file is not read-only).
+    '''
+
+    # a connection with a pending transaction has already written in the database
+    if conn.in_transaction:
+        return True
+
+    # check if the database header can be written rewriting the user version in a transaction that is rolled back
     try:
-        rows = conn.execute(sentence)
-    except Exception as e:
-        raise xlib.ProgramException(e, 'B002', sentence, conn)
+        conn.execute('BEGIN;')
+        for row in conn.execute('PRAGMA user_version;'):
+            user_version = int(row[0])
+        conn.execute(f'PRAGMA user_version = {user_version};')
+        conn.execute('ROLLBACK;')
+    except Exception:
+        if conn.in_transaction:
+            conn.execute('ROLLBACK;')
+        return False
 
-    # build the set of clusters identifications with eggNOG-mapper annotations
-    emapper_cluster_id_set = set()
-    for row in rows:
-        emapper_cluster_id_set.add(row[0])
+    # return the control value
+    return True
 
-    # get the cluster identifications with TAIR10 orthologs
-    sentence = '''
-               SELECT cluster_id
-                   FROM tair10_orthologs;
-               '''
+#-------------------------------------------------------------------------------
+
+def check_table(conn, table_name):
+    '''
+    Check if a table exists.
+    '''
+
+    # check if the table exists
+    sentence = f'''
+                SELECT EXISTS
+                    (SELECT 1
+                        FROM sqlite_master
+                        WHERE type = 'table'
+                          AND tbl_name = '{table_name}'
+                        LIMIT 1);
+                '''
     try:
         rows = conn.execute(sentence)
     except Exception as e:
         raise xlib.ProgramException(e, 'B002', sentence, conn)
 
-    # build the set of clusters identifications with TAIR10 orthologs
-    tair10_cluster_id_set = set()
+    # get the control value
     for row in rows:
-        tair10_cluster_id_set.add(row[0])
+        control = int(row[0])
+        break
 
-    # calculate the clusters number without annotations
-    union_cluster_id_set = interproscan_cluster_id_set | emapper_cluster_id_set | tair10_cluster_id_set
-    clusternum_with_annotations = len(union_cluster_id_set)
-    clusternum_without_annotations = clusternum_total - clusternum_with_annotations
+    # return the control value
+    return control
 
-    # get the cluster identifications with annotations
-    union_cluster_id_txt = ', '.join(f"'{str(cluster_id)}'" for cluster_id in union_cluster_id_set)
+#-------------------------------------------------------------------------------
+# Statistics of gymnoTOA database
+#-------------------------------------------------------------------------------
 
-    # initialize the dictionary
+def get_gymnotoa_db_stats(conn, threads_num=1):
+    '''
+    Get the statistics of gymnoTOA database.
+    '''
+
+    # get the statistics saved in the database, calculating the ones that are not saved
+    db_stats_dict = get_db_stats_dict(conn, threads_num)
+
+    # set the sequences number of Acrogymnospermae, the clusters numbers and the clusters number without annotations
+    seqnum_acrogymnospermae = db_stats_dict['seqnum']
+    clusternum_total = db_stats_dict['clusternum_total']
+    clusternum_interproscan_annotations = db_stats_dict['clusternum_interproscan_annotations']
+    clusternum_emapper_annotations = db_stats_dict['clusternum_emapper_annotations']
+    clusternum_tair10_ortologs = db_stats_dict['clusternum_tair10_ortologs']
+    clusternum_without_annotations = clusternum_total - db_stats_dict['clusternum_with_annotations']
+
+    # return the ortholog sequence identification
+    return seqnum_acrogymnospermae, clusternum_total, clusternum_interproscan_annotations, clusternum_emapper_annotations, clusternum_tair10_ortologs, clusternum_without_annotations
+
+#-------------------------------------------------------------------------------
+# Statistics of quercusTOA database
+#-------------------------------------------------------------------------------
+
+def get_quercustoa_db_stats(conn, threads_num=1):
+    '''
+    Get the statistics of quercusTOA database.
+    '''
+
+    # get the statistics saved in the database, calculating the ones that are not saved
+    db_stats_dict = get_db_stats_dict(conn, threads_num)
+
+    # set the sequences number of Quercus, the clusters numbers and the clusters number without annotations
+    seqnum_quercus = db_stats_dict['seqnum']
+    clusternum_total = db_stats_dict['clusternum_total']
+    clusternum_interproscan_annotations = db_stats_dict['clusternum_interproscan_annotations']
+    clusternum_emapper_annotations = db_stats_dict['clusternum_emapper_annotations']
+    clusternum_tair10_ortologs = db_stats_dict['clusternum_tair10_ortologs']
+    clusternum_without_annotations = clusternum_total - db_stats_dict['clusternum_with_annotations']
+
+    # return the ortholog sequence identification
+    return seqnum_quercus, clusternum_total, clusternum_interproscan_annotations, clusternum_emapper_annotations, clusternum_tair10_ortologs, clusternum_without_annotations
+
+#-------------------------------------------------------------------------------
+
+def get_ids_without_annotations_list(conn):
+    '''
+    Get the list of cluster and sequence identifications of the table "mmseqs2_relationships" whose cluster
+    does not have annotations.
+    '''
+
+    # initialize the list
     ids_without_annotations_list = []
 
     # select rows with identifications without annotations from the table "mmseqs2_relationships"
-    sentence = f'''
-                SELECT cluster_id, seq_id
-                    FROM mmseqs2_relationships
-                    WHERE cluster_id not in ({union_cluster_id_txt})
-                    ORDER BY cluster_id, seq_id;
-                '''
+    sentence = '''
+               SELECT cluster_id, seq_id
+                   FROM mmseqs2_relationships
+                   WHERE cluster_id NOT IN (SELECT cluster_id FROM interproscan_annotations
+                                            UNION
+                                            SELECT cluster_id FROM emapper_annotations
+                                            UNION
+                                            SELECT cluster_id FROM tair10_orthologs)
+                   ORDER BY cluster_id, seq_id;
+               '''
     try:
         rows = conn.execute(sentence)
     except Exception as e:
         raise xlib.ProgramException(e, 'B002', sentence, conn)
 
-    # add row data to the dictionary
+    # add row data to the list
     for row in rows:
         ids_without_annotations_list.append([row[0], row[1]])
 
-    # return the ortholog sequence identification
-    return seqnum_quercus, clusternum_total, clusternum_interproscan_annotations, clusternum_emapper_annotations, clusternum_tair10_ortologs, clusternum_without_annotations, ids_without_annotations_list
+    # return the list
+    return ids_without_annotations_list
 
 #-------------------------------------------------------------------------------
 # General classes
@@ -4356,6 +4937,170 @@ class Stdev:
 
 #-------------------------------------------------------------------------------
 
+class ClusterDataCache():
+    '''
+    This class keeps the data of the clusters got from the annotation tables in a LRU cache per data name, so the
+    clusters queried again (point lookups or batches) do not run queries. The cache is disabled by default; the
+    data of a table are released when it is dropped. The cached data are shared, so they must not be modified.
+    '''
+
+    #---------------
+
+    cache_status = False
+    cache_size = xlib.Const.CLUSTER_CACHE_SIZE
+    cluster_data_dict = {}
+
+    #---------------
+
+    @staticmethod
+    def set_cache_status(status, cache_size=xlib.Const.CLUSTER_CACHE_SIZE):
+        '''
+        Set the cache status and the maximum number of clusters per data name; when it is set to False, the cluster data saved are released.
+        '''
+
+        if not status:
+            ClusterDataCache.cluster_data_dict = {}
+
+        ClusterDataCache.cache_status = status
+        ClusterDataCache.cache_size = cache_size
+
+    #---------------
+
+    @staticmethod
+    def get(conn, data_name, cluster_id):
+        '''
+        Get the data of a cluster if they are saved, marking them as the most recently used.
+        '''
+
+        if not ClusterDataCache.cache_status:
+            return None
+
+        data_dict = ClusterDataCache.cluster_data_dict.get(data_name)
+        if data_dict is None:
+            return None
+
+        cluster_data = data_dict.get((conn, cluster_id))
+        if cluster_data is not None:
+            data_dict.move_to_end((conn, cluster_id))
+
+        return cluster_data
+
+    #---------------
+
+    @staticmethod
+    def put(conn, data_name, cluster_id, cluster_data):
+        '''
+        Save the data of a cluster, releasing the least recently used ones when the cache is full.
+        '''
+
+        if ClusterDataCache.cache_status:
+            data_dict = ClusterDataCache.cluster_data_dict.setdefault(data_name, collections.OrderedDict())
+            data_dict[(conn, cluster_id)] = cluster_data
+            data_dict.move_to_end((conn, cluster_id))
+            while len(data_dict) > ClusterDataCache.cache_size:
+                data_dict.popitem(last=False)
+
+    #---------------
+
+    @staticmethod
+    def release(data_name):
+        '''
+        Release the cluster data saved of a data name.
+        '''
+
+        ClusterDataCache.cluster_data_dict.pop(data_name, None)
+
+    #---------------
+
+#-------------------------------------------------------------------------------
+
+class SharedConnection(sqlite3.Connection):
+    '''
+    This class is used to share a database connection among the steps of a pipeline run in the same process.
+    The close of the connection by a step only commits the pending changes; the connection is closed when the pipeline ends.
+    '''
+
+    #---------------
+
+    sharing_status = False
+    connection_dict = {}
+
+    #---------------
+
+    def close(self):
+        '''
+        Commit the pending changes instead of closing the connection.
+        '''
+
+        self.commit()
+
+    #---------------
+
+    @staticmethod
+    def set_sharing_status(status):
+        '''
+        Set the sharing status; when it is set to False, the shared connections are closed.
+        '''
+
+        if not status:
+            SharedConnection.close_all()
+
+        SharedConnection.sharing_status = status
+
+    #---------------
+
+    @staticmethod
+    def get_connection(database_path):
+        '''
+        Get the shared connection to a database, connecting to it when it is not connected yet.
+        '''
+
+        # get the key of the database
+        key = os.path.realpath(database_path)
+
+        # get the inode of the database file (the file can be deleted and created again by a step)
+        inode = os.stat(database_path).st_ino if os.path.exists(database_path) else None
+
+        # return the connection when the database file has not changed and it has been opened by the current process
+        # (a child process can not use the connections of its parent)
+        (conn, conn_inode, conn_pid) = SharedConnection.connection_dict.get(key, (None, None, None))
+        if conn is not None and inode is not None and inode == conn_inode and conn_pid == os.getpid():
+            return conn
+
+        # close the connection to the old database file
+        if conn is not None and conn_pid == os.getpid():
+            sqlite3.Connection.close(conn)
+
+        # connect to the database (a shared connection can be used by threads of several steps)
+        try:
+            conn = sqlite3.connect(database_path, check_same_thread=False, factory=SharedConnection)
+        except Exception as e:
+            raise xlib.ProgramException(e, 'B001', database_path)
+
+        # save the connection
+        SharedConnection.connection_dict[key] = (conn, os.stat(database_path).st_ino, os.getpid())
+
+        # return the connection
+        return conn
+
+    #---------------
+
+    @staticmethod
+    def close_all():
+        '''
+        Commit the pending changes and close the shared connections.
+        '''
+
+        for (conn, _, conn_pid) in SharedConnection.connection_dict.values():
+            if conn_pid == os.getpid():
+                conn.commit()
+                sqlite3.Connection.close(conn)
+        SharedConnection.connection_dict = {}
+
+    #---------------
+
+#-------------------------------------------------------------------------------
+
 if __name__ == '__main__':
     print('This source contains general functions for the maintenance of the NGShelper SQLite databases in both console mode and gui mode.')
     sys.exit(0)